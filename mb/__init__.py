@@ -5,9 +5,13 @@ import sqlite3
 import os
 import json
 import logging
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,6 +19,211 @@ logger = logging.getLogger(__name__)
 DB_PATH = Path(__file__).parent.parent / "data" / "mb_compass.db"
 
 
+def init_role_recommendation_index(cursor):
+    """Create the normalized (screening_id, role) child table of mb_multimodal_screenings"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS screening_role_recommendations (
+            screening_id INTEGER NOT NULL,
+            role VARCHAR(100) NOT NULL,
+            PRIMARY KEY (screening_id, role),
+            FOREIGN KEY (screening_id) REFERENCES mb_multimodal_screenings(screening_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_screening_roles_role
+        ON screening_role_recommendations(role, screening_id)
+    """)
+
+
+def backfill_role_recommendations(conn) -> int:
+    """
+    Populate screening_role_recommendations from the role_recommendations JSON column
+    for screenings that have no child rows yet. Safe to re-run.
+    """
+    cursor = conn.cursor()
+    init_role_recommendation_index(cursor)
+    
+    cursor.execute("""
+        SELECT s.screening_id, s.role_recommendations
+        FROM mb_multimodal_screenings s
+        WHERE s.role_recommendations IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM screening_role_recommendations r WHERE r.screening_id = s.screening_id
+          )
+    """)
+    
+    rows = []
+    for screening_id, roles_json in cursor.fetchall():
+        try:
+            roles = json.loads(roles_json) if isinstance(roles_json, str) else roles_json
+        except (TypeError, ValueError):
+            continue
+        rows.extend((screening_id, role) for role in set(roles or []) if role)
+    
+    cursor.executemany(
+        "INSERT OR IGNORE INTO screening_role_recommendations (screening_id, role) VALUES (?, ?)",
+        rows
+    )
+    conn.commit()
+    if rows:
+        logger.info(f"Backfilled {len(rows)} screening role recommendations")
+    return len(rows)
+
+
+# Rollup column suffix -> mb_multimodal_screenings score column
+SCREENING_KPI_SCORES = {
+    "overall": "overall_soft_skill_score",
+    "communication": "communication_confidence",
+    "cultural_fit": "cultural_fit_score",
+    "problem_solving": "problem_solving_score",
+    "emotional_intelligence": "emotional_intelligence",
+    "leadership": "leadership_potential",
+    "marginalized": "marginalized_score",
+}
+
+
+def _screening_kpi_deltas(row: str, sign: str) -> str:
+    """SET-clause terms that add (sign '+') or remove (sign '-') one screening row"""
+    terms = [
+        f"total_screenings = total_screenings {sign} 1",
+        f"fit_high = fit_high {sign} ({row}.personality_fit_level IS 'High')",
+        f"fit_medium = fit_medium {sign} ({row}.personality_fit_level IS 'Medium')",
+        f"fit_low = fit_low {sign} ({row}.personality_fit_level IS 'Low')",
+        f"fit_other = fit_other {sign} COALESCE({row}.personality_fit_level NOT IN ('High', 'Medium', 'Low'), 1)",
+    ]
+    for name, column in SCREENING_KPI_SCORES.items():
+        terms.append(f"sum_{name} = sum_{name} {sign} COALESCE({row}.{column}, 0)")
+        terms.append(f"n_{name} = n_{name} {sign} ({row}.{column} IS NOT NULL)")
+    return ",\n                ".join(terms)
+
+
+def init_screening_kpi_rollup(cursor):
+    """
+    Create the single-row screening KPI rollup and the triggers that keep it
+    in step with mb_multimodal_screenings (running sums, counts, fit tallies).
+    """
+    score_columns = ",\n            ".join(
+        f"sum_{name} REAL DEFAULT 0,\n            n_{name} INTEGER DEFAULT 0" for name in SCREENING_KPI_SCORES
+    )
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS screening_kpi_rollup (
+            rollup_id INTEGER PRIMARY KEY CHECK (rollup_id = 1),
+            total_screenings INTEGER DEFAULT 0,
+            unique_students INTEGER DEFAULT 0,
+            marginalized_students INTEGER DEFAULT 0,
+            fit_high INTEGER DEFAULT 0,
+            fit_medium INTEGER DEFAULT 0,
+            fit_low INTEGER DEFAULT 0,
+            fit_other INTEGER DEFAULT 0,
+            {score_columns},
+            rebuilt_at TIMESTAMP
+        )
+    """)
+    
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_screening_kpi_insert
+        AFTER INSERT ON mb_multimodal_screenings
+        BEGIN
+            UPDATE screening_kpi_rollup SET
+                {_screening_kpi_deltas('NEW', '+')},
+                unique_students = unique_students + (
+                    SELECT COUNT(*) = 1 FROM mb_multimodal_screenings WHERE student_id = NEW.student_id
+                ),
+                marginalized_students = marginalized_students + (
+                    (NEW.marginalized_score > 0) IS 1 AND (
+                        SELECT COUNT(*) = 1 FROM mb_multimodal_screenings
+                        WHERE student_id = NEW.student_id AND marginalized_score > 0
+                    )
+                )
+            WHERE rollup_id = 1;
+        END
+    """)
+    
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_screening_kpi_delete
+        AFTER DELETE ON mb_multimodal_screenings
+        BEGIN
+            UPDATE screening_kpi_rollup SET
+                {_screening_kpi_deltas('OLD', '-')},
+                unique_students = unique_students - NOT EXISTS (
+                    SELECT 1 FROM mb_multimodal_screenings WHERE student_id = OLD.student_id
+                ),
+                marginalized_students = marginalized_students - (
+                    (OLD.marginalized_score > 0) IS 1 AND NOT EXISTS (
+                        SELECT 1 FROM mb_multimodal_screenings
+                        WHERE student_id = OLD.student_id AND marginalized_score > 0
+                    )
+                )
+            WHERE rollup_id = 1;
+        END
+    """)
+    
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_screening_kpi_update
+        AFTER UPDATE ON mb_multimodal_screenings
+        BEGIN
+            UPDATE screening_kpi_rollup SET
+                {_screening_kpi_deltas('OLD', '-')}
+            WHERE rollup_id = 1;
+            UPDATE screening_kpi_rollup SET
+                {_screening_kpi_deltas('NEW', '+')}
+            WHERE rollup_id = 1;
+        END
+    """)
+    
+    # Distinct-student counts only move when the student or marginalized flag changes
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_screening_kpi_update_students
+        AFTER UPDATE OF student_id, marginalized_score ON mb_multimodal_screenings
+        WHEN OLD.student_id IS NOT NEW.student_id
+          OR ((OLD.marginalized_score > 0) IS 1) IS NOT ((NEW.marginalized_score > 0) IS 1)
+        BEGIN
+            UPDATE screening_kpi_rollup SET
+                unique_students = (SELECT COUNT(DISTINCT student_id) FROM mb_multimodal_screenings),
+                marginalized_students = (
+                    SELECT COUNT(DISTINCT student_id) FROM mb_multimodal_screenings WHERE marginalized_score > 0
+                )
+            WHERE rollup_id = 1;
+        END
+    """)
+
+
+def rebuild_screening_kpi_rollup(conn) -> Dict:
+    """Reconcile: recompute the screening KPI rollup from scratch"""
+    cursor = conn.cursor()
+    init_screening_kpi_rollup(cursor)
+    
+    score_names = ", ".join(f"sum_{name}, n_{name}" for name in SCREENING_KPI_SCORES)
+    score_aggregates = ",\n                ".join(
+        f"COALESCE(SUM({column}), 0), COUNT({column})" for column in SCREENING_KPI_SCORES.values()
+    )
+    cursor.execute("DELETE FROM screening_kpi_rollup")
+    cursor.execute(f"""
+        INSERT INTO screening_kpi_rollup (
+            rollup_id, total_screenings, unique_students, marginalized_students,
+            fit_high, fit_medium, fit_low, fit_other, {score_names}, rebuilt_at
+        )
+        SELECT
+            1,
+            COUNT(*),
+            COUNT(DISTINCT student_id),
+            COUNT(DISTINCT CASE WHEN marginalized_score > 0 THEN student_id END),
+            COALESCE(SUM(personality_fit_level IS 'High'), 0),
+            COALESCE(SUM(personality_fit_level IS 'Medium'), 0),
+            COALESCE(SUM(personality_fit_level IS 'Low'), 0),
+            COALESCE(SUM(COALESCE(personality_fit_level NOT IN ('High', 'Medium', 'Low'), 1)), 0),
+            {score_aggregates},
+            CURRENT_TIMESTAMP
+        FROM mb_multimodal_screenings
+    """)
+    conn.commit()
+    
+    cursor.execute("SELECT total_screenings, unique_students FROM screening_kpi_rollup WHERE rollup_id = 1")
+    total, unique = cursor.fetchone()
+    logger.info(f"Screening KPI rollup rebuilt: {total} screenings, {unique} students")
+    return {"total_screenings": total, "unique_students": unique}
+
+
 class SoftSkillsExtractor:
     """Extracts soft skills from speech transcripts using AI analysis"""
     
@@ -166,12 +375,22 @@ Return ONLY a JSON object like:
 class AzureSpeechToTextService:
     """Integrates Azure Speech-to-Text for voice transcription"""
     
-    def __init__(self):
+    # Azure reports offsets/durations in 100-nanosecond ticks
+    TICKS_PER_SECOND = 10_000_000
+    
+    def __init__(self, recognizer_factory: Optional[Callable] = None, recognition_timeout: float = 600):
+        """
+        recognizer_factory: optional callable(audio_file_path) returning an object with the
+        Azure SpeechRecognizer continuous-recognition interface (recognized / session_stopped /
+        canceled signals, start/stop_continuous_recognition). Lets tests plug in a stub recognizer.
+        """
         self.api_key = os.getenv("AZURE_SPEECH_KEY")
         self.region = os.getenv("AZURE_SPEECH_REGION", "southeastasia")
         self.speech_config = None
+        self.recognizer_factory = recognizer_factory
+        self.recognition_timeout = recognition_timeout
         
-        if self.api_key and not self.api_key.startswith("<"):
+        if recognizer_factory is None and self.api_key and not self.api_key.startswith("<"):
             try:
                 import azure.cognitiveservices.speech as speechsdk
                 self.speech_config = speechsdk.SpeechConfig(
@@ -184,47 +403,131 @@ class AzureSpeechToTextService:
             except Exception as e:
                 logger.warning(f"Azure Speech-to-Text initialization failed: {e}")
     
-    def transcribe_audio_file(self, audio_file_path: str) -> Optional[str]:
-        """Transcribe audio file using Azure Speech-to-Text"""
+    @property
+    def is_configured(self) -> bool:
+        return self.recognizer_factory is not None or self.speech_config is not None
+    
+    def _create_recognizer(self, audio_file_path: str):
+        """Create a file recognizer from the plugged-in factory or the Azure SDK"""
+        if self.recognizer_factory is not None:
+            return self.recognizer_factory(audio_file_path)
+        
+        import azure.cognitiveservices.speech as speechsdk
+        audio_config = speechsdk.AudioConfig(filename=audio_file_path)
+        return speechsdk.SpeechRecognizer(
+            speech_config=self.speech_config,
+            audio_config=audio_config
+        )
+    
+    def _recognize_continuous(self, recognizer) -> Tuple[List, Optional[str]]:
+        """Run continuous recognition until the stream ends; returns (segments, error)"""
+        done = threading.Event()
+        segments = []
+        errors = []
+        
+        def on_recognized(evt):
+            if getattr(evt.result, "text", ""):
+                segments.append(evt.result)
+        
+        def on_canceled(evt):
+            # End-of-stream also arrives as a cancellation, but without error details
+            details = getattr(evt, "cancellation_details", None) or getattr(evt.result, "cancellation_details", None)
+            error_details = getattr(details, "error_details", None)
+            if error_details:
+                errors.append(f"{details.reason} - {error_details}")
+            done.set()
+        
+        recognizer.recognized.connect(on_recognized)
+        recognizer.session_stopped.connect(lambda evt: done.set())
+        recognizer.canceled.connect(on_canceled)
+        
+        recognizer.start_continuous_recognition()
+        finished = done.wait(self.recognition_timeout)
+        recognizer.stop_continuous_recognition()
+        
+        if not finished:
+            errors.append(f"Recognition timed out after {self.recognition_timeout}s")
+        
+        return segments, (errors[0] if errors else None)
+    
+    @staticmethod
+    def _wav_duration_seconds(audio_file_path: str) -> Optional[float]:
+        """Read duration from a WAV header; other containers fall back to recognizer offsets"""
         try:
-            if not self.speech_config:
+            with wave.open(audio_file_path, "rb") as wav:
+                return wav.getnframes() / float(wav.getframerate())
+        except Exception:
+            return None
+    
+    def transcribe_audio_file_with_stats(self, audio_file_path: str) -> Dict:
+        """
+        Transcribe the full audio file with continuous recognition.
+        Returns transcript plus latency, audio duration and real-time factor.
+        """
+        stats = {
+            "audio_file_path": audio_file_path,
+            "transcript": None,
+            "segments": 0,
+            "latency_seconds": 0.0,
+            "audio_duration_seconds": None,
+            "real_time_factor": None,
+            "error": None
+        }
+        started = time.perf_counter()
+        
+        try:
+            if not self.is_configured:
                 logger.warning("Azure Speech-to-Text not configured, skipping transcription")
-                return None
-            
-            import azure.cognitiveservices.speech as speechsdk
+                stats["error"] = "Speech service not configured"
+                return stats
             
             # Validate file exists
             if not Path(audio_file_path).exists():
                 logger.error(f"Audio file not found: {audio_file_path}")
-                return None
+                stats["error"] = "Audio file not found"
+                return stats
             
-            # Create recognizer with audio file
-            audio_config = speechsdk.AudioConfig(filename=audio_file_path)
-            recognizer = speechsdk.SpeechRecognizer(
-                speech_config=self.speech_config,
-                audio_config=audio_config
-            )
+            recognizer = self._create_recognizer(audio_file_path)
             
             logger.info(f"Transcribing audio file: {audio_file_path}")
-            result = recognizer.recognize_once()
-            
-            if result.reason == speechsdk.ResultReason.RecognizedFromFile:
-                transcript = result.text
-                logger.info(f"Transcription successful: {len(transcript)} characters")
-                return transcript
-            elif result.reason == speechsdk.ResultReason.NoMatch:
+            segments, error = self._recognize_continuous(recognizer)
+            
+            transcript = " ".join(seg.text.strip() for seg in segments if seg.text.strip())
+            stats["segments"] = len(segments)
+            stats["transcript"] = transcript or None
+            
+            duration = self._wav_duration_seconds(audio_file_path)
+            if duration is None and segments:
+                last = segments[-1]
+                end_ticks = (getattr(last, "offset", 0) or 0) + (getattr(last, "duration", 0) or 0)
+                duration = end_ticks / self.TICKS_PER_SECOND if end_ticks else None
+            stats["audio_duration_seconds"] = round(duration, 3) if duration else None
+            
+            if error:
+                logger.error(f"Speech recognition canceled: {error}")
+                stats["error"] = error
+            elif not transcript:
                 logger.warning("No speech detected in audio file")
-                return None
-            elif result.reason == speechsdk.ResultReason.Canceled:
-                error = result.cancellation_details
-                logger.error(f"Speech recognition canceled: {error.reason} - {error.error_details}")
-                return None
+                stats["error"] = "No speech detected"
+            else:
+                logger.info(f"Transcription successful: {len(transcript)} characters, {len(segments)} segments")
         except ImportError:
             logger.warning("Azure Speech SDK not available")
-            return None
+            stats["error"] = "Azure Speech SDK not available"
         except Exception as e:
             logger.error(f"Transcription failed: {e}")
-            return None
+            stats["error"] = str(e)
+        finally:
+            stats["latency_seconds"] = round(time.perf_counter() - started, 3)
+            if stats["audio_duration_seconds"]:
+                stats["real_time_factor"] = round(stats["latency_seconds"] / stats["audio_duration_seconds"], 3)
+        
+        return stats
+    
+    def transcribe_audio_file(self, audio_file_path: str) -> Optional[str]:
+        """Transcribe audio file using Azure Speech-to-Text"""
+        stats = self.transcribe_audio_file_with_stats(audio_file_path)
+        return stats["transcript"] if not stats["error"] else None
     
     def transcribe_from_microphone(self, duration_seconds: int = 30) -> Optional[str]:
         """Transcribe speech from microphone (real-time)"""
@@ -259,6 +562,71 @@ class AzureSpeechToTextService:
             return None
 
 
+class TranscriptionPipeline:
+    """Transcribes a queue of audio files on a bounded worker pool"""
+    
+    def __init__(self, speech_service: AzureSpeechToTextService = None, max_workers: int = 4):
+        self.speech_service = speech_service or AzureSpeechToTextService()
+        self.max_workers = max(1, max_workers)
+    
+    def run(self, audio_files: List[str], handler: Optional[Callable[[str, str], Dict]] = None) -> List[Dict]:
+        """
+        Transcribe every file in audio_files, at most max_workers at a time.
+        handler(audio_file_path, transcript) runs in the worker after a successful
+        transcription and its return value is stored under "handler_result".
+        Results come back in input order, one stats dict per file.
+        """
+        def work(audio_file_path):
+            stats = self.speech_service.transcribe_audio_file_with_stats(audio_file_path)
+            if handler and stats["transcript"] and not stats["error"]:
+                try:
+                    stats["handler_result"] = handler(audio_file_path, stats["transcript"])
+                except Exception as e:
+                    logger.error(f"Post-transcription handler failed for {audio_file_path}: {e}")
+                    stats["handler_result"] = {"error": str(e)}
+            return stats
+        
+        results: List[Optional[Dict]] = [None] * len(audio_files)
+        started = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="transcribe") as pool:
+            futures = {pool.submit(work, path): idx for idx, path in enumerate(audio_files)}
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    results[idx] = future.result()
+                except Exception as e:
+                    logger.error(f"Transcription worker failed for {audio_files[idx]}: {e}")
+                    results[idx] = {"audio_file_path": audio_files[idx], "transcript": None, "error": str(e)}
+        
+        ok = sum(1 for r in results if not r.get("error"))
+        logger.info(
+            f"Transcribed {ok}/{len(audio_files)} files in {time.perf_counter() - started:.1f}s "
+            f"with {self.max_workers} workers"
+        )
+        return results
+    
+    @staticmethod
+    def summarize(results: List[Dict]) -> Dict:
+        """Aggregate latency and real-time factor across a batch"""
+        latencies = sorted(r["latency_seconds"] for r in results if r.get("latency_seconds") is not None)
+        rtfs = [r["real_time_factor"] for r in results if r.get("real_time_factor") is not None]
+        
+        def percentile(values, pct):
+            if not values:
+                return None
+            return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+        
+        return {
+            "files": len(results),
+            "succeeded": sum(1 for r in results if not r.get("error")),
+            "failed": sum(1 for r in results if r.get("error")),
+            "p50_latency_seconds": percentile(latencies, 50),
+            "p95_latency_seconds": percentile(latencies, 95),
+            "avg_real_time_factor": round(sum(rtfs) / len(rtfs), 3) if rtfs else None,
+            "total_audio_seconds": round(sum(r.get("audio_duration_seconds") or 0 for r in results), 1)
+        }
+
 
 class MultiModalScreeningService:
     """Complete multi-modal screening pipeline"""
@@ -321,6 +689,22 @@ class MultiModalScreeningService:
                 conn.commit()
                 logger.info("Screening table initialized")
             
+            # Role index table; backfill screenings saved before it existed
+            cursor.execute("""
+                SELECT name FROM sqlite_master 
+                WHERE type='table' AND name='screening_role_recommendations'
+            """)
+            if not cursor.fetchone():
+                backfill_role_recommendations(conn)
+            
+            # KPI rollup maintained by triggers; seed it from existing rows on first run
+            cursor.execute("""
+                SELECT name FROM sqlite_master 
+                WHERE type='table' AND name='screening_kpi_rollup'
+            """)
+            if not cursor.fetchone():
+                rebuild_screening_kpi_rollup(conn)
+            
             conn.close()
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
@@ -380,19 +764,77 @@ class MultiModalScreeningService:
             
             logger.info(f"Transcription complete: {len(transcript)} characters")
             
-            # Screen using transcript
-            result = self.screen_candidate_voice(student_id, transcript)
-            
-            # Add media path to result
-            if "error" not in result:
-                result["media_path"] = audio_file_path
-                result["submission_type"] = "whatsapp_voice" if "whatsapp" in audio_file_path.lower() else "voice_note"
-            
-            return result
+            return self._screen_transcribed_audio(student_id, audio_file_path, transcript)
         except Exception as e:
             logger.error(f"Audio screening failed: {e}")
             return {"error": str(e)}
     
+    def screen_candidates_from_audio_batch(self, submissions: List[Tuple[int, str]], max_workers: int = 8) -> Dict:
+        """
+        Screen an intake batch of (student_id, audio_file_path) submissions in parallel.
+        Each file is transcribed in full once and screened on a bounded worker pool; when several
+        students submitted the same file, every one of them is screened on its transcript.
+        Returns per-submission results (with latency / real-time factor) and a batch summary.
+        """
+        students_by_path = {}
+        for student_id, audio_file_path in submissions:
+            students = students_by_path.setdefault(audio_file_path, [])
+            if student_id not in students:
+                students.append(student_id)
+        
+        def screen_students(path, transcript):
+            return {
+                student_id: self._screen_transcribed_audio(student_id, path, transcript)
+                for student_id in students_by_path[path]
+            }
+        
+        pipeline = TranscriptionPipeline(self.speech_service, max_workers=max_workers)
+        transcriptions = pipeline.run(list(students_by_path), handler=screen_students)
+        
+        results = []
+        for stats in transcriptions:
+            path = stats["audio_file_path"]
+            screenings = stats.get("handler_result") or {}
+            failure = {"error": stats.get("error") or screenings.get("error") or "Audio transcription failed"}
+            for student_id in students_by_path[path]:
+                results.append({
+                    "student_id": student_id,
+                    "audio_file_path": path,
+                    "latency_seconds": stats.get("latency_seconds"),
+                    "audio_duration_seconds": stats.get("audio_duration_seconds"),
+                    "real_time_factor": stats.get("real_time_factor"),
+                    "screening": screenings.get(student_id, failure)
+                })
+        
+        summary = TranscriptionPipeline.summarize(transcriptions)
+        summary["screened"] = sum(1 for r in results if "error" not in r["screening"])
+        logger.info(f"Audio batch screening: {summary['screened']}/{len(results)} screened")
+        
+        return {"results": results, "summary": summary}
+    
+    def enqueue_voice_screening(self, student_id: int, transcript: str, priority: int = None) -> int:
+        """Queue a transcript for background screening; returns the job_id to poll"""
+        from mb.job_queue import JobQueue, PRIORITY_NORMAL
+        payload = {"student_id": student_id, "transcript": transcript, "db_path": self.db_path}
+        return JobQueue(self.db_path).enqueue("screen_voice", payload, priority=PRIORITY_NORMAL if priority is None else priority)
+    
+    def enqueue_audio_screening(self, student_id: int, audio_file_path: str, priority: int = None) -> int:
+        """Queue an audio submission for background transcription + screening; returns the job_id"""
+        from mb.job_queue import JobQueue, PRIORITY_NORMAL
+        payload = {"student_id": student_id, "audio_file_path": audio_file_path, "db_path": self.db_path}
+        return JobQueue(self.db_path).enqueue("screen_audio", payload, priority=PRIORITY_NORMAL if priority is None else priority)
+    
+    def _screen_transcribed_audio(self, student_id: int, audio_file_path: str, transcript: str) -> Dict:
+        """Screen a transcribed audio submission and tag it with its media details"""
+        result = self.screen_candidate_voice(student_id, transcript)
+        
+        # Add media path to result
+        if "error" not in result:
+            result["media_path"] = audio_file_path
+            result["submission_type"] = "whatsapp_voice" if "whatsapp" in audio_file_path.lower() else "voice_note"
+        
+        return result
+    
     def _calculate_fit_scores(self, soft_skills: Dict, student_id: int) -> Tuple[str, float, List[str]]:
         """Calculate personality fit scores and recommended roles"""
         try:
@@ -459,6 +901,17 @@ class MultiModalScreeningService:
                 datetime.now()
             ))
             
+            # Index recommended roles in the same transaction
+            screening_id = cursor.lastrowid
+            try:
+                roles = json.loads(result.get("role_recommendations") or "[]")
+            except (TypeError, ValueError):
+                roles = []
+            cursor.executemany(
+                "INSERT OR IGNORE INTO screening_role_recommendations (screening_id, role) VALUES (?, ?)",
+                [(screening_id, role) for role in set(roles) if role]
+            )
+            
             conn.commit()
             conn.close()
             logger.info(f"Screening saved for student {result.get('student_id')}")
@@ -4,17 +4,53 @@ Provides charity staff with actionable insights for intervention, funding propos
 """
 
 import streamlit as st
+import sys
 import sqlite3
+import threading
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime, timedelta
 import logging
-import json
 
 logger = logging.getLogger(__name__)
 
-DB_PATH = Path(__file__).parent.parent / "data" / "mb_compass.db"
+PROJECT_ROOT = Path(__file__).parent.parent
+DB_PATH = PROJECT_ROOT / "data" / "mb_compass.db"
+
+# Databases whose screening rollup tables were verified in this process
+_screening_rollups_ready = set()
+_screening_rollups_lock = threading.Lock()
+
+
+def ensure_screening_rollups(db_path=DB_PATH):
+    """
+    Create and seed the screening KPI rollup and role index (normally built by
+    MultiModalScreeningService) on a database where screenings exist but the
+    screening service never ran. Checked once per database per process.
+    """
+    db_key = str(db_path)
+    if db_key in _screening_rollups_ready:
+        return
+    with _screening_rollups_lock:
+        if db_key in _screening_rollups_ready:
+            return
+        conn = sqlite3.connect(db_key, timeout=30)
+        try:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if "mb_multimodal_screenings" in tables and not (
+                {"screening_kpi_rollup", "screening_role_recommendations"} <= tables
+            ):
+                if str(PROJECT_ROOT) not in sys.path:
+                    sys.path.insert(0, str(PROJECT_ROOT))
+                from mb import backfill_role_recommendations, rebuild_screening_kpi_rollup
+                if "screening_role_recommendations" not in tables:
+                    backfill_role_recommendations(conn)
+                if "screening_kpi_rollup" not in tables:
+                    rebuild_screening_kpi_rollup(conn)
+        finally:
+            conn.close()
+        _screening_rollups_ready.add(db_key)
 
 
 class DecisionDashboard:
@@ -22,6 +58,10 @@ class DecisionDashboard:
     
     def __init__(self, db_path=DB_PATH):
         self.db_path = db_path
+        try:
+            ensure_screening_rollups(db_path)
+        except Exception as e:
+            logger.error(f"Screening rollup initialization failed: {e}")
     
     def get_connection(self):
         return sqlite3.connect(str(self.db_path))
@@ -318,84 +358,76 @@ class DecisionDashboard:
     # ========================
     # MULTI-MODAL SCREENING ANALYTICS
     # ========================
+    def _get_screening_rollup(self, conn):
+        """Read the single-row screening KPI rollup (maintained by triggers)"""
+        df = pd.read_sql_query("SELECT * FROM screening_kpi_rollup WHERE rollup_id = 1", conn)
+        return df.iloc[0].to_dict() if not df.empty else {}
+    
     def get_screening_analytics(self):
         """Get multi-modal screening KPIs and funnel"""
+        empty = {
+            'total_screenings': 0,
+            'unique_students': 0,
+            'fit_distribution': {},
+            'avg_scores': {},
+            'top_roles': [],
+            'marginalized_count': 0
+        }
         conn = self.get_connection()
         
         try:
+            # No rollup only when no screening was ever stored (see ensure_screening_rollups)
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'screening_kpi_rollup'"
+            ).fetchone():
+                return empty
+            
+            rollup = self._get_screening_rollup(conn)
+            
             # Total screenings
-            df_screenings = pd.read_sql_query(
-                "SELECT COUNT(*) as total_screenings FROM mb_multimodal_screenings",
-                conn
-            )
-            total_screenings = df_screenings['total_screenings'].iloc[0] or 0
+            total_screenings = int(rollup.get('total_screenings') or 0)
             
             # Personality fit distribution
-            df_fit = pd.read_sql_query(
-                """SELECT personality_fit_level, COUNT(*) as count 
-                   FROM mb_multimodal_screenings 
-                   GROUP BY personality_fit_level""",
-                conn
-            )
+            fit_distribution = {
+                level: int(rollup.get(column) or 0)
+                for level, column in [('High', 'fit_high'), ('Medium', 'fit_medium'),
+                                      ('Low', 'fit_low'), ('Unknown', 'fit_other')]
+                if rollup.get(column)
+            }
             
-            fit_distribution = dict(zip(df_fit['personality_fit_level'], df_fit['count']))
-            
-            # Average scores
-            df_scores = pd.read_sql_query(
-                """SELECT 
-                   AVG(overall_soft_skill_score) as avg_soft_skill,
-                   AVG(communication_confidence) as avg_communication,
-                   AVG(cultural_fit_score) as avg_cultural_fit,
-                   AVG(problem_solving_score) as avg_problem_solving,
-                   AVG(emotional_intelligence) as avg_emotional_intelligence,
-                   AVG(leadership_potential) as avg_leadership,
-                   AVG(marginalized_score) as avg_marginalized_score
-                   FROM mb_multimodal_screenings""",
-                conn
-            )
+            # Average scores (running sum / non-null count)
+            def avg(name):
+                n = rollup.get(f'n_{name}') or 0
+                return (rollup.get(f'sum_{name}') or 0) / n if n else 0
             
             avg_scores = {
-                'overall': df_scores['avg_soft_skill'].iloc[0] or 0,
-                'communication': df_scores['avg_communication'].iloc[0] or 0,
-                'cultural_fit': df_scores['avg_cultural_fit'].iloc[0] or 0,
-                'problem_solving': df_scores['avg_problem_solving'].iloc[0] or 0,
-                'emotional_intelligence': df_scores['avg_emotional_intelligence'].iloc[0] or 0,
-                'leadership': df_scores['avg_leadership'].iloc[0] or 0,
-                'marginalized': df_scores['avg_marginalized_score'].iloc[0] or 0
+                'overall': avg('overall'),
+                'communication': avg('communication'),
+                'cultural_fit': avg('cultural_fit'),
+                'problem_solving': avg('problem_solving'),
+                'emotional_intelligence': avg('emotional_intelligence'),
+                'leadership': avg('leadership'),
+                'marginalized': avg('marginalized')
             }
             
             # Unique candidates screened
-            df_unique = pd.read_sql_query(
-                "SELECT COUNT(DISTINCT student_id) as unique_students FROM mb_multimodal_screenings",
-                conn
-            )
-            unique_students = df_unique['unique_students'].iloc[0] or 0
+            unique_students = int(rollup.get('unique_students') or 0)
             
-            # Role recommendations
+            # Role recommendations (indexed child table, counted in SQL)
             df_roles = pd.read_sql_query(
-                """SELECT role_recommendations FROM mb_multimodal_screenings 
-                   WHERE role_recommendations IS NOT NULL""",
+                """SELECT role, COUNT(*) as count
+                   FROM screening_role_recommendations
+                   GROUP BY role
+                   ORDER BY count DESC, role
+                   LIMIT 5""",
                 conn
             )
             
-            role_counts = {}
-            for roles_json in df_roles['role_recommendations']:
-                try:
-                    roles = json.loads(roles_json) if isinstance(roles_json, str) else roles_json
-                    for role in roles:
-                        role_counts[role] = role_counts.get(role, 0) + 1
-                except:
-                    pass
-            
             # Top roles
-            top_roles = sorted(role_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+            top_roles = list(zip(df_roles['role'], df_roles['count'].astype(int)))
             
             # Marginalized youth screened
-            df_marginalized = pd.read_sql_query(
-                "SELECT COUNT(DISTINCT student_id) as marginalized_count FROM mb_multimodal_screenings WHERE marginalized_score > 0",
-                conn
-            )
-            marginalized_count = df_marginalized['marginalized_count'].iloc[0] or 0
+            marginalized_count = int(rollup.get('marginalized_students') or 0)
             
             return {
                 'total_screenings': total_screenings,
@@ -407,14 +439,7 @@ class DecisionDashboard:
             }
         except Exception as e:
             logger.error(f"Error getting screening analytics: {e}")
-            return {
-                'total_screenings': 0,
-                'unique_students': 0,
-                'fit_distribution': {},
-                'avg_scores': {},
-                'top_roles': [],
-                'marginalized_count': 0
-            }
+            return empty
         finally:
             conn.close()
     
@@ -423,26 +448,16 @@ class DecisionDashboard:
         conn = self.get_connection()
         
         try:
+            rollup = self._get_screening_rollup(conn)
+            
             # Screenings submitted (in database)
-            df_submitted = pd.read_sql_query(
-                "SELECT COUNT(*) as submitted FROM mb_multimodal_screenings",
-                conn
-            )
-            submitted = df_submitted['submitted'].iloc[0] or 0
+            submitted = int(rollup.get('total_screenings') or 0)
             
             # High personality fit (likely to match roles)
-            df_high_fit = pd.read_sql_query(
-                "SELECT COUNT(*) as high_fit FROM mb_multimodal_screenings WHERE personality_fit_level = 'High'",
-                conn
-            )
-            high_fit = df_high_fit['high_fit'].iloc[0] or 0
+            high_fit = int(rollup.get('fit_high') or 0)
             
             # Medium fit (potential matches)
-            df_medium_fit = pd.read_sql_query(
-                "SELECT COUNT(*) as medium_fit FROM mb_multimodal_screenings WHERE personality_fit_level = 'Medium'",
-                conn
-            )
-            medium_fit = df_medium_fit['medium_fit'].iloc[0] or 0
+            medium_fit = int(rollup.get('fit_medium') or 0)
             
             # Calculate conversion rates
             high_fit_rate = round(100.0 * high_fit / submitted, 1) if submitted > 0 else 0
@@ -478,14 +493,15 @@ class DecisionDashboard:
             if role:
                 # Get candidates matching specific role
                 df = pd.read_sql_query(
-                    """SELECT student_id, overall_soft_skill_score, personality_fit_level,
-                              marginalized_score, communication_confidence, cultural_fit_score,
-                              emotional_intelligence, leadership_potential
-                       FROM mb_multimodal_screenings
-                       WHERE role_recommendations LIKE ?
-                       ORDER BY overall_soft_skill_score DESC""",
+                    """SELECT s.student_id, s.overall_soft_skill_score, s.personality_fit_level,
+                              s.marginalized_score, s.communication_confidence, s.cultural_fit_score,
+                              s.emotional_intelligence, s.leadership_potential
+                       FROM screening_role_recommendations r
+                       JOIN mb_multimodal_screenings s ON s.screening_id = r.screening_id
+                       WHERE r.role = ?
+                       ORDER BY s.overall_soft_skill_score DESC""",
                     conn,
-                    params=(f'%{role}%',)
+                    params=(role,)
                 )
             else:
                 # Get top candidates across all roles
@@ -0,0 +1,383 @@
+"""
+Email Outbox Module
+Transactional outbox for survey emails.
+
+Survey rows and their email are written in the same transaction
+(`enqueue_email(conn, ...)`), so a campaign never loses messages when the
+admin tab closes mid-batch. The `deliver_email_outbox` job drains the outbox
+in batches over pooled SMTP sessions, retries temporary failures with
+exponential backoff and moves exhausted or permanently rejected messages to
+the dead-letter state. Each message carries an idempotency key: enqueueing the
+same key twice is a no-op, and the key doubles as the Message-ID so a resend
+after a crash can be recognised downstream.
+"""
+
+import json
+import sqlite3
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from services.schema_registry import register_schema, ensure_schema
+except ImportError:
+    from mb.services.schema_registry import register_schema, ensure_schema
+
+try:
+    from survey_lifecycle import record_survey_events
+except ImportError:
+    from mb.survey_lifecycle import record_survey_events
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = Path(__file__).parent.parent / "data" / "mb_compass.db"
+
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_BASE_BACKOFF_SECONDS = 60
+OUTBOX_MAX_BACKOFF_SECONDS = 3600
+OUTBOX_STALE_CLAIM_SECONDS = 600  # 'sending' rows older than this belonged to a dead worker
+
+register_schema("email_outbox", [
+    '''
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key VARCHAR(255) NOT NULL UNIQUE,
+            campaign_id VARCHAR(100),
+            message_type VARCHAR(50) NOT NULL,
+            recipient VARCHAR(255),
+            payload TEXT NOT NULL,
+            status VARCHAR(20) DEFAULT 'queued',
+            attempts INTEGER DEFAULT 0,
+            max_attempts INTEGER DEFAULT 5,
+            next_attempt_at TIMESTAMP,
+            claimed_at TIMESTAMP,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP
+        )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_email_outbox_ready ON email_outbox(status, next_attempt_at, outbox_id)',
+    'CREATE INDEX IF NOT EXISTS idx_email_outbox_campaign ON email_outbox(campaign_id, status)',
+])
+
+# message_type -> (survey type for distribution logs, email_service builder name)
+MESSAGE_TYPES = {
+    "employer_survey": ("employer", "_build_employer_survey_message"),
+    "youth_survey": ("youth", "_build_youth_survey_message"),
+}
+
+
+def _email_service():
+    try:
+        import email_service
+    except ImportError:
+        from mb import email_service
+    return email_service
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def new_campaign_id(prefix: str = "campaign") -> str:
+    """Identifier grouping the messages of one bulk send"""
+    return f"{prefix}-{datetime.now():%Y%m%d-%H%M%S-%f}"
+
+
+def enqueue_email(
+    conn: sqlite3.Connection,
+    message_type: str,
+    recipient: str,
+    payload: Dict,
+    idempotency_key: str,
+    campaign_id: str = None,
+    max_attempts: int = OUTBOX_MAX_ATTEMPTS
+) -> bool:
+    """
+    Queue an email on the caller's connection, inside the caller's transaction
+    payload holds the message builder's arguments (plus an optional student_id for the
+    distribution log). Returns False when a message with this idempotency key already exists.
+    Call ensure_schema("email_outbox") before opening the transaction.
+    """
+    if message_type not in MESSAGE_TYPES:
+        raise ValueError(f"Unknown message type: {message_type}")
+    cursor = conn.execute('''
+        INSERT OR IGNORE INTO email_outbox (
+            idempotency_key, campaign_id, message_type, recipient, payload,
+            status, max_attempts, next_attempt_at, created_at
+        ) VALUES (?, ?, ?, ?, ?, 'queued', ?, ?, ?)
+    ''', (idempotency_key, campaign_id, message_type, recipient, json.dumps(payload, default=str),
+          max_attempts, _now(), _now()))
+    return cursor.rowcount > 0
+
+
+def enqueue_emails(
+    conn: sqlite3.Connection,
+    message_type: str,
+    emails: List[Dict],
+    campaign_id: str = None,
+    max_attempts: int = OUTBOX_MAX_ATTEMPTS
+) -> int:
+    """
+    Batch form of enqueue_email: emails are {"recipient", "payload", "idempotency_key"} dicts
+    Returns how many were newly queued.
+    """
+    if message_type not in MESSAGE_TYPES:
+        raise ValueError(f"Unknown message type: {message_type}")
+    now = _now()
+    before = conn.total_changes
+    conn.executemany('''
+        INSERT OR IGNORE INTO email_outbox (
+            idempotency_key, campaign_id, message_type, recipient, payload,
+            status, max_attempts, next_attempt_at, created_at
+        ) VALUES (?, ?, ?, ?, ?, 'queued', ?, ?, ?)
+    ''', [
+        (email["idempotency_key"], campaign_id, message_type, email["recipient"],
+         json.dumps(email["payload"], default=str), max_attempts, now, now)
+        for email in emails
+    ])
+    return conn.total_changes - before
+
+
+def _backoff_seconds(attempts: int) -> int:
+    return min(OUTBOX_BASE_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0), OUTBOX_MAX_BACKOFF_SECONDS)
+
+
+def _claim(conn, batch_size):
+    """Atomically move up to batch_size ready messages to 'sending'"""
+    conn.execute("BEGIN IMMEDIATE")
+    rows = conn.execute('''
+        SELECT outbox_id FROM email_outbox
+        WHERE status = 'queued' AND next_attempt_at <= ?
+        ORDER BY outbox_id
+        LIMIT ?
+    ''', (_now(), batch_size)).fetchall()
+    ids = [row["outbox_id"] for row in rows]
+    if ids:
+        conn.executemany('''
+            UPDATE email_outbox SET status = 'sending', attempts = attempts + 1, claimed_at = ?
+            WHERE outbox_id = ? AND status = 'queued'
+        ''', [(_now(), outbox_id) for outbox_id in ids])
+    conn.commit()
+    if not ids:
+        return []
+    return [
+        dict(row) for row in conn.execute(
+            f"SELECT * FROM email_outbox WHERE outbox_id IN ({','.join('?' * len(ids))}) AND status = 'sending'",
+            ids
+        )
+    ]
+
+
+def requeue_stale_claims(conn, older_than_seconds: int = OUTBOX_STALE_CLAIM_SECONDS) -> int:
+    """Return messages left in 'sending' by a worker that died mid-batch"""
+    cutoff = (datetime.now() - timedelta(seconds=older_than_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+    cursor = conn.execute('''
+        UPDATE email_outbox SET status = 'queued', next_attempt_at = ?
+        WHERE status = 'sending' AND claimed_at < ?
+    ''', (_now(), cutoff))
+    conn.commit()
+    return cursor.rowcount
+
+
+def deliver_outbox(
+    db_path=DB_PATH,
+    batch_size: int = OUTBOX_BATCH_SIZE,
+    max_batches: int = 20,
+    pool=None
+) -> Dict:
+    """
+    Drain ready outbox messages in batches over one pool of SMTP sessions
+    Returns counts plus how many messages are ready now and how many wait on backoff.
+    """
+    email_service = _email_service()
+    ensure_schema("email_outbox", "feedback_surveys", "survey_lifecycle", db_path=db_path)
+
+    # Built before anything is claimed: an unconfigured sender raises here and leaves the outbox untouched
+    own_pool = pool is None
+    pool = pool or email_service.SMTPSessionPool()
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    sent = retried = dead = 0
+    try:
+        requeue_stale_claims(conn)
+        for _ in range(max_batches):
+            batch = _claim(conn, batch_size)
+            if not batch:
+                break
+
+            messages, unbuildable = [], []
+            for row in batch:
+                try:
+                    builder = getattr(email_service, MESSAGE_TYPES[row["message_type"]][1])
+                    kwargs = json.loads(row["payload"])
+                    student_id = kwargs.pop("student_id", None)
+                    msg, survey_link = builder(**kwargs)
+                    msg['Message-ID'] = f"<{row['idempotency_key']}@magicbus-compass>"
+                    messages.append({"recipient": row["recipient"], "row": row, "student_id": student_id,
+                                     "survey_id": kwargs.get("survey_id"), "survey_link": survey_link,
+                                     "reminder": kwargs.get("reminder", 0), "message": msg})
+                except Exception as e:
+                    unbuildable.append((row, str(e)))
+
+            outcomes = email_service.send_bulk_messages(messages, pool=pool)
+
+            # Record the whole batch (and its survey lifecycle events) in one transaction
+            now = _now()
+            events = []
+            conn.execute("BEGIN IMMEDIATE")
+            for row, error in unbuildable:
+                conn.execute(
+                    "UPDATE email_outbox SET status = 'dead', last_error = ? WHERE outbox_id = ?",
+                    (f"Could not build message: {error}", row["outbox_id"])
+                )
+                dead += 1
+            for outcome in outcomes:
+                row = outcome["row"]
+                if outcome["success"]:
+                    conn.execute('''
+                        UPDATE email_outbox SET status = 'sent', sent_at = ?, last_error = NULL
+                        WHERE outbox_id = ?
+                    ''', (now, row["outbox_id"]))
+                    survey_type = MESSAGE_TYPES[row["message_type"]][0]
+                    if outcome["reminder"]:
+                        # A reminder is not a new distribution: only the survey's lifecycle records it
+                        events.append({"survey_type": survey_type, "survey_id": outcome["survey_id"],
+                                       "event_type": "reminded", "campaign_id": row["campaign_id"],
+                                       "recipient": row["recipient"], "occurred_at": now,
+                                       "detail": f"reminder {outcome['reminder']}"})
+                    else:
+                        conn.execute('''
+                            INSERT INTO survey_distribution_logs (
+                                survey_type, recipient_email, recipient_type,
+                                survey_id, student_id, sent_date, survey_link
+                            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ''', (survey_type, row["recipient"], survey_type, outcome["survey_id"],
+                              outcome["student_id"], now, outcome["survey_link"]))
+                        events.append({"survey_type": survey_type, "survey_id": outcome["survey_id"],
+                                       "event_type": "sent", "campaign_id": row["campaign_id"],
+                                       "recipient": row["recipient"], "occurred_at": now})
+                    sent += 1
+                elif outcome["retryable"] and row["attempts"] < row["max_attempts"]:
+                    retry_at = datetime.now() + timedelta(seconds=_backoff_seconds(row["attempts"]))
+                    conn.execute('''
+                        UPDATE email_outbox SET status = 'queued', next_attempt_at = ?, last_error = ?
+                        WHERE outbox_id = ?
+                    ''', (retry_at.strftime("%Y-%m-%d %H:%M:%S"), outcome["detail"], row["outbox_id"]))
+                    retried += 1
+                else:
+                    conn.execute(
+                        "UPDATE email_outbox SET status = 'dead', last_error = ? WHERE outbox_id = ?",
+                        (outcome["detail"], row["outbox_id"])
+                    )
+                    events.append({"survey_type": MESSAGE_TYPES[row["message_type"]][0],
+                                   "survey_id": outcome["survey_id"], "event_type": "failed",
+                                   "campaign_id": row["campaign_id"], "recipient": row["recipient"],
+                                   "occurred_at": now, "detail": outcome["detail"]})
+                    dead += 1
+            record_survey_events(conn, events)
+            conn.commit()
+
+        ready, next_attempt_at = conn.execute('''
+            SELECT SUM(next_attempt_at <= ?), MIN(next_attempt_at) FROM email_outbox WHERE status = 'queued'
+        ''', (_now(),)).fetchone()
+    finally:
+        conn.close()
+        if own_pool:
+            pool.close()
+
+    logger.info(f"📬 Outbox: {sent} sent, {retried} to retry, {dead} dead-lettered")
+    return {
+        "sent": sent,
+        "retried": retried,
+        "dead_lettered": dead,
+        "ready": ready or 0,
+        "next_attempt_at": next_attempt_at
+    }
+
+
+def requeue_dead_letters(campaign_id: Optional[str] = None, db_path=DB_PATH) -> int:
+    """Give dead-lettered messages (optionally of one campaign) a fresh set of attempts"""
+    try:
+        ensure_schema("email_outbox", db_path=db_path)
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        try:
+            cursor = conn.execute('''
+                UPDATE email_outbox SET status = 'queued', attempts = 0, next_attempt_at = ?
+                WHERE status = 'dead' AND (? IS NULL OR campaign_id = ?)
+            ''', (_now(), campaign_id, campaign_id))
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.error(f"❌ Error requeueing dead letters: {e}")
+        return 0
+
+
+def get_outbox_progress(campaign_id: Optional[str] = None, limit: int = 10, db_path=DB_PATH) -> List[Dict]:
+    """Per-campaign message counts by status, newest campaigns first"""
+    try:
+        ensure_schema("email_outbox", db_path=db_path)
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute('''
+                SELECT campaign_id,
+                       COUNT(*) as total,
+                       SUM(status = 'sent') as sent,
+                       SUM(status IN ('queued', 'sending')) as pending,
+                       SUM(status = 'queued' AND attempts > 0) as retrying,
+                       SUM(status = 'dead') as dead,
+                       MIN(created_at) as created_at,
+                       MAX(sent_at) as last_sent_at
+                FROM email_outbox
+                WHERE (? IS NULL OR campaign_id = ?)
+                GROUP BY campaign_id
+                ORDER BY MAX(outbox_id) DESC
+                LIMIT ?
+            ''', (campaign_id, campaign_id, limit)).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+    except Exception as e:
+        logger.error(f"❌ Error getting outbox progress: {e}")
+        return []
+
+
+def get_dead_letters(campaign_id: Optional[str] = None, limit: int = 100, db_path=DB_PATH) -> List[Dict]:
+    """Dead-lettered messages with their last error"""
+    try:
+        ensure_schema("email_outbox", db_path=db_path)
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute('''
+                SELECT outbox_id, campaign_id, message_type, recipient, attempts, last_error, created_at
+                FROM email_outbox
+                WHERE status = 'dead' AND (? IS NULL OR campaign_id = ?)
+                ORDER BY outbox_id DESC
+                LIMIT ?
+            ''', (campaign_id, campaign_id, limit)).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+    except Exception as e:
+        logger.error(f"❌ Error getting dead letters: {e}")
+        return []
+
+
+def enqueue_outbox_delivery(db_path=DB_PATH, delay_seconds: float = 0) -> int:
+    """Queue a background job that drains the outbox, reusing one already due by then"""
+    try:
+        from job_queue import JobQueue
+    except ImportError:
+        from mb.job_queue import JobQueue
+    job_queue = JobQueue(db_path)
+    due = (datetime.now() + timedelta(seconds=delay_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+    for job in job_queue.get_jobs(["deliver_email_outbox"], status="queued", limit=5):
+        if job["run_after"] <= due:
+            return job["job_id"]
+    return job_queue.enqueue("deliver_email_outbox", {"db_path": str(db_path)}, delay_seconds=delay_seconds)
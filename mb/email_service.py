@@ -6,19 +6,32 @@ Handles sending feedback surveys to employers and youths
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.utils import parseaddr
 from pathlib import Path
 import logging
-from typing import Tuple, List
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple, List, Optional
 from datetime import datetime
+from urllib.parse import urlencode
 import os
 from dotenv import load_dotenv
 import sqlite3
 
+try:
+    from services.schema_registry import ensure_schema
+    from survey_lifecycle import record_survey_events
+except ImportError:
+    from mb.services.schema_registry import ensure_schema
+    from mb.survey_lifecycle import record_survey_events
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
+DB_PATH = Path(__file__).parent.parent / "data" / "mb_compass.db"
 
 # Email configuration - using environment variables for security
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -28,28 +41,62 @@ SENDER_PASSWORD = os.getenv("SENDER_PASSWORD", "")
 MAGICBUS_NAME = "MagicBus Compass 360"
 MAGICBUS_CONTACT = os.getenv("MAGICBUS_CONTACT_EMAIL", "support@magicbus.com")
 
+# Public address of the Streamlit app; Streamlit serves pages/5_feedback_survey.py at /feedback_survey
+APP_BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:8501")
+SURVEY_PAGE_PATH = "feedback_survey"
 
-def send_employer_survey_email(
+# Bulk sending: persistent sessions shared by a few worker threads
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() != "false"
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_RATE_LIMIT_PER_MINUTE = int(os.getenv("SMTP_RATE_LIMIT_PER_MINUTE", "300"))  # 0 = unlimited
+SMTP_MAX_MESSAGES_PER_SESSION = int(os.getenv("SMTP_MAX_MESSAGES_PER_SESSION", "100"))
+SMTP_SESSION_IDLE_SECONDS = 60  # Idle sessions are probed with NOOP before reuse
+SMTP_SEND_ATTEMPTS = 3
+SMTP_TIMEOUT_SECONDS = 30
+
+
+def build_survey_link(survey_type: str, survey_id: int, survey_token: str = None) -> str:
+    """Link to the feedback survey page for an emailed survey (the token authorises in-place completion)"""
+    params = {"type": survey_type, "survey_id": survey_id}
+    if survey_token:
+        params["token"] = survey_token
+    return f"{APP_BASE_URL.rstrip('/')}/{SURVEY_PAGE_PATH}?{urlencode(params)}"
+
+
+def _build_employer_survey_message(
     employer_email: str,
     employer_name: str,
     student_name: str,
     job_title: str,
     survey_id: int,
-    survey_link: str = None
-) -> Tuple[bool, str]:
-    """Send feedback survey to employer"""
+    survey_link: str = None,
+    survey_token: str = None,
+    reminder: int = 0
+) -> Tuple[MIMEMultipart, str]:
+    """Employer survey email and the survey link it points to (reminder > 0: the n-th reminder)"""
+    subject = f"MagicBus: Feedback Survey for {student_name}"
     
-    if not SENDER_EMAIL or not SENDER_PASSWORD:
-        logger.warning("⚠️ Email credentials not configured in .env")
-        return False, "❌ Email service not configured. Please set SENDER_EMAIL and SENDER_PASSWORD in .env"
+    # Generate survey link if not provided
+    if not survey_link:
+        survey_link = build_survey_link("employer", survey_id, survey_token)
     
-    try:
-        subject = f"MagicBus: Feedback Survey for {student_name}"
-        
-        # Generate survey link if not provided
-        if not survey_link:
-            survey_link = f"http://localhost:8501/feedback?type=employer&survey_id={survey_id}"
-        
+    if reminder:
+        subject = f"Reminder: {subject}"
+        body = f"""
+Dear {employer_name},
+
+A quick reminder: we have not yet received your feedback on {student_name}'s placement as {job_title}.
+
+The survey takes 5-10 minutes and your insights directly shape how we prepare future students:
+{survey_link}
+
+If you have already completed it, thank you - please ignore this reminder.
+
+Best regards,
+{MAGICBUS_NAME} Team
+{MAGICBUS_CONTACT}
+    """
+    else:
         body = f"""
 Dear {employer_name},
 
@@ -78,75 +125,51 @@ Best regards,
 
 ---
 This feedback is confidential and will be used solely for program improvement.
-        """
-
-        # Create email message
-        msg = MIMEMultipart()
-        msg['From'] = SENDER_EMAIL
-        msg['To'] = employer_email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain'))
-
-        # Send email
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        server.send_message(msg)
-        server.quit()
-
-        # Log the distribution
-        try:
-            conn = sqlite3.connect(str(DB_PATH))
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO survey_distribution_logs (
-                    survey_type, recipient_email, recipient_type,
-                    survey_id, sent_date, survey_link
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            ''', ('employer', employer_email, 'employer', survey_id, datetime.now(), survey_link))
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            logger.warning(f"⚠️ Could not log distribution: {e}")
+    """
 
-        logger.info(f"✅ Employer survey sent to {employer_email}")
-        return True, f"✅ Survey sent to {employer_email}"
-    
-    except smtplib.SMTPAuthenticationError:
-        error_msg = "❌ Email authentication failed. Check SENDER_EMAIL and SENDER_PASSWORD in .env"
-        logger.error(error_msg)
-        return False, error_msg
-    except smtplib.SMTPException as e:
-        error_msg = f"❌ SMTP Error: {str(e)}"
-        logger.error(error_msg)
-        return False, error_msg
-    except Exception as e:
-        error_msg = f"❌ Error sending email: {str(e)}"
-        logger.error(error_msg)
-        return False, error_msg
+    # Create email message
+    msg = MIMEMultipart()
+    msg['From'] = SENDER_EMAIL
+    msg['To'] = employer_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+    return msg, survey_link
 
 
-def send_youth_survey_email(
+def _build_youth_survey_message(
     youth_email: str,
     youth_name: str,
     placement_company: str,
     job_title: str,
     survey_id: int,
-    survey_link: str = None
-) -> Tuple[bool, str]:
-    """Send post-placement feedback survey to youth"""
+    survey_link: str = None,
+    survey_token: str = None,
+    reminder: int = 0
+) -> Tuple[MIMEMultipart, str]:
+    """Youth survey email and the survey link it points to (reminder > 0: the n-th reminder)"""
+    subject = "Your MagicBus Post-Placement Feedback Survey"
     
-    if not SENDER_EMAIL or not SENDER_PASSWORD:
-        logger.warning("⚠️ Email credentials not configured in .env")
-        return False, "❌ Email service not configured. Please set SENDER_EMAIL and SENDER_PASSWORD in .env"
+    # Generate survey link if not provided
+    if not survey_link:
+        survey_link = build_survey_link("youth", survey_id, survey_token)
     
-    try:
-        subject = "Your MagicBus Post-Placement Feedback Survey"
-        
-        # Generate survey link if not provided
-        if not survey_link:
-            survey_link = f"http://localhost:8501/feedback?type=youth&survey_id={survey_id}"
-        
+    if reminder:
+        subject = f"Reminder: {subject}"
+        body = f"""
+Hi {youth_name},
+
+Just a reminder that we would still love to hear how your role as a {job_title} at {placement_company} is going.
+
+The survey takes 10-15 minutes and your answers are completely confidential:
+{survey_link}
+
+If you have already completed it, thank you - please ignore this reminder.
+
+Best regards,
+{MAGICBUS_NAME} Team
+{MAGICBUS_CONTACT}
+    """
+    else:
         body = f"""
 Hi {youth_name},
 
@@ -175,14 +198,36 @@ Best regards,
 
 ---
 If you have any questions, please reach out to us at {MAGICBUS_CONTACT}
-        """
+    """
 
-        # Create email message
-        msg = MIMEMultipart()
-        msg['From'] = SENDER_EMAIL
-        msg['To'] = youth_email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain'))
+    # Create email message
+    msg = MIMEMultipart()
+    msg['From'] = SENDER_EMAIL
+    msg['To'] = youth_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+    return msg, survey_link
+
+
+def send_employer_survey_email(
+    employer_email: str,
+    employer_name: str,
+    student_name: str,
+    job_title: str,
+    survey_id: int,
+    survey_link: str = None,
+    survey_token: str = None
+) -> Tuple[bool, str]:
+    """Send feedback survey to employer"""
+    
+    if not SENDER_EMAIL or not SENDER_PASSWORD:
+        logger.warning("⚠️ Email credentials not configured in .env")
+        return False, "❌ Email service not configured. Please set SENDER_EMAIL and SENDER_PASSWORD in .env"
+    
+    try:
+        msg, survey_link = _build_employer_survey_message(
+            employer_email, employer_name, student_name, job_title, survey_id, survey_link, survey_token
+        )
 
         # Send email
         server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
@@ -191,24 +236,58 @@ If you have any questions, please reach out to us at {MAGICBUS_CONTACT}
         server.send_message(msg)
         server.quit()
 
-        # Log the distribution
-        try:
-            conn = sqlite3.connect(str(DB_PATH))
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO survey_distribution_logs (
-                    survey_type, recipient_email, recipient_type,
-                    survey_id, sent_date, survey_link
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            ''', ('youth', youth_email, 'youth', survey_id, datetime.now(), survey_link))
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            logger.warning(f"⚠️ Could not log distribution: {e}")
+    except smtplib.SMTPAuthenticationError:
+        error_msg = "❌ Email authentication failed. Check SENDER_EMAIL and SENDER_PASSWORD in .env"
+        logger.error(error_msg)
+        return False, error_msg
+    except smtplib.SMTPException as e:
+        error_msg = f"❌ SMTP Error: {str(e)}"
+        logger.error(error_msg)
+        return False, error_msg
+    except Exception as e:
+        error_msg = f"❌ Error sending email: {str(e)}"
+        logger.error(error_msg)
+        return False, error_msg
+
+    # Log the distribution (the email is already out, so a failure here is reported as unrecorded)
+    try:
+        _log_distributions([('employer', employer_email, 'employer', survey_id, datetime.now(), survey_link)])
+    except Exception as e:
+        error_msg = f"⚠️ Survey sent to {employer_email} but not recorded in the distribution log: {e}"
+        logger.error(error_msg)
+        return False, error_msg
+
+    logger.info(f"✅ Employer survey sent to {employer_email}")
+    return True, f"✅ Survey sent to {employer_email}"
 
-        logger.info(f"✅ Youth survey sent to {youth_email}")
-        return True, f"✅ Survey sent to {youth_name}"
+
+def send_youth_survey_email(
+    youth_email: str,
+    youth_name: str,
+    placement_company: str,
+    job_title: str,
+    survey_id: int,
+    survey_link: str = None,
+    survey_token: str = None
+) -> Tuple[bool, str]:
+    """Send post-placement feedback survey to youth"""
     
+    if not SENDER_EMAIL or not SENDER_PASSWORD:
+        logger.warning("⚠️ Email credentials not configured in .env")
+        return False, "❌ Email service not configured. Please set SENDER_EMAIL and SENDER_PASSWORD in .env"
+    
+    try:
+        msg, survey_link = _build_youth_survey_message(
+            youth_email, youth_name, placement_company, job_title, survey_id, survey_link, survey_token
+        )
+
+        # Send email
+        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+        server.starttls()
+        server.login(SENDER_EMAIL, SENDER_PASSWORD)
+        server.send_message(msg)
+        server.quit()
+
     except smtplib.SMTPAuthenticationError:
         error_msg = "❌ Email authentication failed. Check SENDER_EMAIL and SENDER_PASSWORD in .env"
         logger.error(error_msg)
@@ -222,12 +301,347 @@ If you have any questions, please reach out to us at {MAGICBUS_CONTACT}
         logger.error(error_msg)
         return False, error_msg
 
+    # Log the distribution (the email is already out, so a failure here is reported as unrecorded)
+    try:
+        _log_distributions([('youth', youth_email, 'youth', survey_id, datetime.now(), survey_link)])
+    except Exception as e:
+        error_msg = f"⚠️ Survey sent to {youth_email} but not recorded in the distribution log: {e}"
+        logger.error(error_msg)
+        return False, error_msg
+
+    logger.info(f"✅ Youth survey sent to {youth_email}")
+    return True, f"✅ Survey sent to {youth_name}"
+
+
+# ========================
+# BULK SENDING
+# ========================
+class SMTPRateLimiter:
+    """Token bucket per SMTP server, shared by every pool in the process"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, server: str, per_minute: int):
+        """Block until the server may take one more message"""
+        if not per_minute:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, updated = self._buckets.get(server, (float(per_minute), now))
+                tokens = min(per_minute, tokens + (now - updated) * per_minute / 60.0)
+                if tokens >= 1:
+                    self._buckets[server] = (tokens - 1, now)
+                    return
+                self._buckets[server] = (tokens, now)
+                wait = (1 - tokens) * 60.0 / per_minute
+            time.sleep(wait)
+
+
+_rate_limiter = SMTPRateLimiter()
+
+
+class _Session:
+    """One authenticated SMTP connection plus the bookkeeping for recycling it"""
+
+    def __init__(self):
+        self.smtp = None
+        self.messages_sent = 0
+        self.last_used = 0.0
+
+
+class SMTPSessionPool:
+    """
+    Small pool of persistent, authenticated SMTP sessions
+    Sessions are opened lazily, probed with NOOP after idling, recycled after
+    max_messages, and reopened transparently when the server drops them.
+    Credentials are optional so the pool can talk to a local test server, but
+    a sender address is required: it is the envelope sender of every message
+    and fills in a missing From header.
+    """
+
+    def __init__(self, host: str = None, port: int = None, username: str = None, password: str = None,
+                 size: int = None, rate_limit_per_minute: int = None, starttls: bool = None,
+                 max_messages: int = None, timeout: float = SMTP_TIMEOUT_SECONDS, sender: str = None):
+        self.sender = SENDER_EMAIL if sender is None else sender
+        if "@" not in parseaddr(self.sender or "")[1]:
+            raise ValueError(f"SMTP sender address is not configured or invalid: {self.sender!r} (set SENDER_EMAIL)")
+        self.host = host or SMTP_SERVER
+        self.port = port or SMTP_PORT
+        self.username = SENDER_EMAIL if username is None else username
+        self.password = SENDER_PASSWORD if password is None else password
+        self.size = max(1, size or SMTP_POOL_SIZE)
+        self.rate_limit_per_minute = SMTP_RATE_LIMIT_PER_MINUTE if rate_limit_per_minute is None else rate_limit_per_minute
+        self.starttls = SMTP_STARTTLS if starttls is None else starttls
+        self.max_messages = max_messages or SMTP_MAX_MESSAGES_PER_SESSION
+        self.timeout = timeout
+        self.connects = 0
+
+        self._idle = queue.Queue()
+        for _ in range(self.size):
+            self._idle.put(_Session())
+
+    @property
+    def server_key(self):
+        return f"{self.host}:{self.port}"
+
+    def _connect(self, session: _Session):
+        self._disconnect(session)
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        session.smtp = smtp
+        session.messages_sent = 0
+        self.connects += 1
+
+    @staticmethod
+    def _disconnect(session: _Session):
+        if session.smtp is None:
+            return
+        try:
+            session.smtp.quit()
+        except Exception:
+            session.smtp.close()
+        session.smtp = None
+
+    def _ready(self, session: _Session):
+        """Make sure the session is connected and usable before sending on it"""
+        if session.smtp is None or session.messages_sent >= self.max_messages:
+            self._connect(session)
+        elif time.monotonic() - session.last_used > SMTP_SESSION_IDLE_SECONDS:
+            try:
+                if session.smtp.noop()[0] != 250:
+                    self._connect(session)
+            except (smtplib.SMTPException, OSError):
+                self._connect(session)
+
+    def send(self, msg) -> Tuple[bool, str, int, bool]:
+        """
+        Send one message on a pooled session
+        Returns (success, detail, attempts, retryable). Dropped connections and temporary
+        (4xx) server errors are retried on a fresh session; permanent rejections are not,
+        and come back with retryable=False.
+        """
+        if not msg.get("From"):
+            del msg["From"]
+            msg["From"] = self.sender
+        session = self._idle.get()
+        try:
+            attempts = 0
+            while True:
+                attempts += 1
+                try:
+                    self._ready(session)
+                    _rate_limiter.acquire(self.server_key, self.rate_limit_per_minute)
+                    refused = session.smtp.send_message(msg, from_addr=self.sender)
+                    session.messages_sent += 1
+                    session.last_used = time.monotonic()
+                    if refused:
+                        return False, f"Recipient refused: {refused}", attempts, False
+                    return True, "sent", attempts, False
+                except smtplib.SMTPAuthenticationError:
+                    self._disconnect(session)
+                    return False, "Email authentication failed", attempts, True
+                except smtplib.SMTPRecipientsRefused as e:
+                    self._reset(session)
+                    temporary = all(400 <= code < 500 for code, _ in e.recipients.values())
+                    return False, f"Recipient refused: {e.recipients}", attempts, temporary
+                except smtplib.SMTPResponseException as e:
+                    temporary = 400 <= e.smtp_code < 500
+                    if not temporary or attempts >= SMTP_SEND_ATTEMPTS:
+                        self._reset(session)
+                        return False, f"SMTP {e.smtp_code}: {e.smtp_error!r}", attempts, temporary
+                    self._disconnect(session)
+                except smtplib.SMTPServerDisconnected as e:
+                    self._disconnect(session)
+                    if attempts >= SMTP_SEND_ATTEMPTS:
+                        return False, f"Connection failed: {e}", attempts, True
+                # SMTPException subclasses OSError, so the remaining SMTP errors must be caught first
+                except smtplib.SMTPException as e:
+                    self._reset(session)
+                    return False, f"SMTP Error: {e}", attempts, True
+                except OSError as e:
+                    self._disconnect(session)
+                    if attempts >= SMTP_SEND_ATTEMPTS:
+                        return False, f"Connection failed: {e}", attempts, True
+                time.sleep(0.5 * 2 ** (attempts - 1))
+        finally:
+            self._idle.put(session)
+
+    def _reset(self, session: _Session):
+        """Clear a half-finished transaction so the session can carry the next message"""
+        try:
+            session.smtp.rset()
+        except Exception:
+            self._disconnect(session)
+
+    def close(self):
+        """Quit every open session"""
+        for _ in range(self.size):
+            self._disconnect(self._idle.get())
+        for _ in range(self.size):
+            self._idle.put(_Session())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _log_distributions(rows: List[tuple]):
+    """
+    Record successful sends in survey_distribution_logs, with their 'sent' lifecycle events, in one transaction
+    rows: (survey_type, recipient_email, recipient_type, survey_id, sent_date, survey_link)
+    Raises if the rows cannot be written: callers report the sends as unrecorded.
+    """
+    if not rows:
+        return
+    ensure_schema("survey_lifecycle", db_path=DB_PATH)
+    conn = sqlite3.connect(str(DB_PATH), timeout=30)
+    try:
+        conn.executemany('''
+            INSERT INTO survey_distribution_logs (
+                survey_type, recipient_email, recipient_type,
+                survey_id, sent_date, survey_link
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+        record_survey_events(conn, [
+            {"survey_type": survey_type, "survey_id": survey_id, "event_type": "sent",
+             "recipient": recipient, "occurred_at": sent_date}
+            for survey_type, recipient, _, survey_id, sent_date, _ in rows
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def send_bulk_messages(
+    messages: List[Dict],
+    pool: Optional[SMTPSessionPool] = None,
+    progress_callback=None
+) -> List[Dict]:
+    """
+    Send many prepared messages over a pool of persistent sessions
+
+    messages: [{"recipient": str, "message": email.message.Message, **extra}, ...]
+    Returns one outcome per message, in input order:
+    {"recipient", "success", "detail", "attempts", "retryable", **extra}
+    progress_callback(done, total) is called from worker threads as messages finish.
+    """
+    own_pool = pool is None
+    pool = pool or SMTPSessionPool()
+    outcomes = [None] * len(messages)
+    done = [0]
+    done_lock = threading.Lock()
+
+    def deliver(position):
+        item = messages[position]
+        extra = {key: value for key, value in item.items() if key != "message"}
+        try:
+            success, detail, attempts, retryable = pool.send(item["message"])
+        except Exception as e:
+            success, detail, attempts, retryable = False, f"Error sending email: {e}", 1, True
+        outcomes[position] = {
+            **extra, "success": success, "detail": detail, "attempts": attempts, "retryable": retryable
+        }
+        if progress_callback:
+            with done_lock:
+                done[0] += 1
+                progress_callback(done[0], len(messages))
+
+    try:
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            list(executor.map(deliver, range(len(messages))))
+    finally:
+        if own_pool:
+            pool.close()
+    return outcomes
+
+
+def send_bulk_surveys(
+    survey_type: str,
+    survey_list: List[dict],
+    pool: Optional[SMTPSessionPool] = None,
+    progress_callback=None
+) -> List[Dict]:
+    """
+    Send employer or youth surveys in bulk over pooled sessions
+    Returns per-recipient outcomes ({"recipient", "survey_id", "success", "detail", "attempts"});
+    successful sends are logged to survey_distribution_logs in one batch (if that write fails, the
+    successful outcomes' detail says so).
+    """
+    if pool is None and (not SENDER_EMAIL or not SENDER_PASSWORD):
+        logger.warning("⚠️ Email credentials not configured in .env")
+        detail = "Email service not configured. Please set SENDER_EMAIL and SENDER_PASSWORD in .env"
+        return [
+            {"recipient": survey.get(f"{survey_type}_email"), "survey_id": survey.get("survey_id"),
+             "success": False, "detail": detail, "attempts": 0, "retryable": True}
+            for survey in survey_list
+        ]
+
+    messages = []
+    for survey in survey_list:
+        if survey_type == "employer":
+            msg, survey_link = _build_employer_survey_message(
+                survey['employer_email'], survey['employer_name'], survey['student_name'],
+                survey['job_title'], survey['survey_id'], survey.get('survey_link'), survey.get('survey_token')
+            )
+        else:
+            msg, survey_link = _build_youth_survey_message(
+                survey['youth_email'], survey['youth_name'], survey['placement_company'],
+                survey['job_title'], survey['survey_id'], survey.get('survey_link'), survey.get('survey_token')
+            )
+        messages.append({
+            "recipient": survey[f"{survey_type}_email"],
+            "survey_id": survey['survey_id'],
+            "survey_link": survey_link,
+            "message": msg
+        })
+
+    started = time.perf_counter()
+    outcomes = send_bulk_messages(messages, pool=pool, progress_callback=progress_callback)
+
+    sent_date = datetime.now()
+    try:
+        _log_distributions([
+            (survey_type, outcome["recipient"], survey_type, outcome["survey_id"], sent_date, outcome["survey_link"])
+            for outcome in outcomes if outcome["success"]
+        ])
+    except Exception as e:
+        # The emails are out: keep them successful (a resend would duplicate them) but say they are unrecorded
+        logger.error(f"❌ Bulk {survey_type} sends not recorded in the distribution log: {e}")
+        for outcome in outcomes:
+            if outcome["success"]:
+                outcome["detail"] = f"Sent but not recorded in the distribution log: {e}"
+    successful = sum(1 for outcome in outcomes if outcome["success"])
+    logger.info(
+        f"📊 Bulk {survey_type} send: {successful} successful, {len(outcomes) - successful} failed "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return outcomes
+
+
+def _summarize_outcomes(outcomes: List[Dict]) -> Tuple[int, int, List[str]]:
+    successful = sum(1 for outcome in outcomes if outcome["success"])
+    errors = [f"{outcome['recipient']}: {outcome['detail']}" for outcome in outcomes if not outcome["success"]]
+    return successful, len(outcomes) - successful, errors
+
 
 def send_bulk_employer_surveys(
-    survey_list: List[dict]
+    survey_list: List[dict],
+    pool: Optional[SMTPSessionPool] = None
 ) -> Tuple[int, int, List[str]]:
     """
-    Send bulk employer surveys
+    Send bulk employer surveys over pooled SMTP sessions
     
     survey_list format:
     [
@@ -240,38 +654,17 @@ def send_bulk_employer_surveys(
         },
         ...
     ]
+    Use send_bulk_surveys("employer", ...) for per-recipient outcomes.
     """
-    successful = 0
-    failed = 0
-    errors = []
-    
-    for survey in survey_list:
-        try:
-            success, message = send_employer_survey_email(
-                employer_email=survey['employer_email'],
-                employer_name=survey['employer_name'],
-                student_name=survey['student_name'],
-                job_title=survey['job_title'],
-                survey_id=survey['survey_id']
-            )
-            if success:
-                successful += 1
-            else:
-                failed += 1
-                errors.append(f"{survey['employer_email']}: {message}")
-        except Exception as e:
-            failed += 1
-            errors.append(f"{survey['employer_email']}: {str(e)}")
-    
-    logger.info(f"📊 Bulk send: {successful} successful, {failed} failed")
-    return successful, failed, errors
+    return _summarize_outcomes(send_bulk_surveys("employer", survey_list, pool=pool))
 
 
 def send_bulk_youth_surveys(
-    survey_list: List[dict]
+    survey_list: List[dict],
+    pool: Optional[SMTPSessionPool] = None
 ) -> Tuple[int, int, List[str]]:
     """
-    Send bulk youth surveys
+    Send bulk youth surveys over pooled SMTP sessions
     
     survey_list format:
     [
@@ -284,31 +677,9 @@ def send_bulk_youth_surveys(
         },
         ...
     ]
+    Use send_bulk_surveys("youth", ...) for per-recipient outcomes.
     """
-    successful = 0
-    failed = 0
-    errors = []
-    
-    for survey in survey_list:
-        try:
-            success, message = send_youth_survey_email(
-                youth_email=survey['youth_email'],
-                youth_name=survey['youth_name'],
-                placement_company=survey['placement_company'],
-                job_title=survey['job_title'],
-                survey_id=survey['survey_id']
-            )
-            if success:
-                successful += 1
-            else:
-                failed += 1
-                errors.append(f"{survey['youth_email']}: {message}")
-        except Exception as e:
-            failed += 1
-            errors.append(f"{survey['youth_email']}: {str(e)}")
-    
-    logger.info(f"📊 Bulk send: {successful} successful, {failed} failed")
-    return successful, failed, errors
+    return _summarize_outcomes(send_bulk_surveys("youth", survey_list, pool=pool))
 
 
 def verify_email_configuration() -> Tuple[bool, str]:
@@ -2,23 +2,28 @@
 Feedback Survey Database Module
 Handles creation and management of feedback survey tables
 """
+import json
 import sqlite3
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Iterable, List, Optional
 import logging
 
+try:
+    from services.schema_registry import register_schema, ensure_schema
+except ImportError:
+    from mb.services.schema_registry import register_schema, ensure_schema
+
 logger = logging.getLogger(__name__)
 
-DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
+DB_PATH = Path(__file__).parent.parent / "data" / "mb_compass.db"
 
 
-def init_feedback_tables():
-    """Initialize all feedback survey tables"""
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
-    
+register_schema("placement_feedback", [
     # Employer Feedback Survey (for employers who interviewed youths)
-    cursor.execute('''
+    '''
         CREATE TABLE IF NOT EXISTS employer_interview_feedback (
             feedback_id INTEGER PRIMARY KEY AUTOINCREMENT,
             employer_email TEXT NOT NULL,
@@ -28,28 +33,27 @@ def init_feedback_tables():
             student_name TEXT,
             position_applied TEXT,
             interview_date TIMESTAMP,
-            
+
             -- Interview Experience (1-5 scale)
             technical_skills_rating INTEGER,
             communication_rating INTEGER,
             problem_solving_rating INTEGER,
             cultural_fit_rating INTEGER,
             overall_impression_rating INTEGER,
-            
+
             -- Feedback
             strengths TEXT,
             areas_for_improvement TEXT,
             would_hire_again TEXT,
             feedback_comments TEXT,
-            
+
             -- Meta
             survey_completed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             survey_url TEXT
         )
-    ''')
-    
+    ''',
     # Employer Placement Feedback (for companies where students are placed)
-    cursor.execute('''
+    '''
         CREATE TABLE IF NOT EXISTS employer_placement_feedback (
             feedback_id INTEGER PRIMARY KEY AUTOINCREMENT,
             employer_email TEXT NOT NULL,
@@ -60,32 +64,31 @@ def init_feedback_tables():
             position_title TEXT,
             placement_date TIMESTAMP,
             feedback_date TIMESTAMP,
-            
+
             -- Performance (1-5 scale)
             job_performance_rating INTEGER,
             teamwork_rating INTEGER,
             reliability_rating INTEGER,
             learning_ability_rating INTEGER,
             professional_conduct_rating INTEGER,
-            
+
             -- Outcomes
             retention_likelihood TEXT,
             promotion_potential TEXT,
-            
+
             -- Feedback
             what_went_well TEXT,
             challenges_faced TEXT,
             recommendations TEXT,
             overall_feedback TEXT,
-            
+
             -- Meta
             survey_completed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             survey_url TEXT
         )
-    ''')
-    
+    ''',
     # Youth Post-Placement Survey (for students after placement)
-    cursor.execute('''
+    '''
         CREATE TABLE IF NOT EXISTS youth_placement_survey (
             feedback_id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
@@ -95,38 +98,37 @@ def init_feedback_tables():
             company_name TEXT,
             position_title TEXT,
             placement_date TIMESTAMP,
-            
+
             -- Job Experience (1-5 scale)
             job_satisfaction_rating INTEGER,
             role_clarity_rating INTEGER,
             work_environment_rating INTEGER,
             manager_support_rating INTEGER,
             growth_opportunity_rating INTEGER,
-            
+
             -- Career Development
             skill_development TEXT,
             achievements TEXT,
-            
+
             -- Support from MagicBus
             magicbus_support_rating INTEGER,
             additional_support_needed TEXT,
-            
+
             -- Feedback
             what_went_well TEXT,
             challenges_faced TEXT,
             suggestions_for_improvement TEXT,
             would_recommend TEXT,
             overall_feedback TEXT,
-            
+
             -- Meta
             survey_completed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             survey_url TEXT,
             FOREIGN KEY (user_id) REFERENCES mb_users(user_id)
         )
-    ''')
-    
+    ''',
     # Survey Distribution Tracking
-    cursor.execute('''
+    '''
         CREATE TABLE IF NOT EXISTS survey_distribution (
             distribution_id INTEGER PRIMARY KEY AUTOINCREMENT,
             survey_type TEXT,
@@ -139,23 +141,576 @@ def init_feedback_tables():
             completed_date TIMESTAMP,
             status TEXT DEFAULT 'pending'
         )
-    ''')
-    
-    # Feedback Analytics Cache
-    cursor.execute('''
+    ''',
+])
+
+register_schema("feedback_analytics", [
+    # The original feedback_analytics_cache (cache_id, metric_name, metric_value, ...) was never
+    # written; it is replaced by a keyed rollup. Everything in it can be rebuilt from the sources.
+    'DROP TABLE IF EXISTS feedback_analytics_cache',
+    '''
         CREATE TABLE IF NOT EXISTS feedback_analytics_cache (
-            cache_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            metric_name TEXT,
+            metric_category TEXT NOT NULL,
+            metric_name TEXT NOT NULL,
+            data_period TEXT NOT NULL,
+            metric_sum REAL NOT NULL DEFAULT 0,
+            metric_count INTEGER NOT NULL DEFAULT 0,
             metric_value REAL,
-            metric_category TEXT,
-            data_period TEXT,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            last_updated TIMESTAMP,
+            PRIMARY KEY (metric_category, metric_name, data_period)
+        )
+    ''',
+])
+
+# Rollup sources: category -> source table, key column, period timestamp and metrics.
+# Each metric is an expression summed and counted over rows (NULLs are skipped, as AVG does),
+# so averages are sum / count. The "rows" metric sums the key column: its count and sum
+# together let the staleness check spot missed inserts or deletes.
+# A category with "group" buckets rows by that expression instead of by month (its data_period
+# holds the group value); "breakdowns" lists such categories over the same table, which
+# update_feedback_rollup keeps in step with their parent.
+FEEDBACK_ROLLUPS = {
+    "employer_interview": {
+        "table": "employer_interview_feedback",
+        "key": "feedback_id",
+        "period": "survey_completed_date",
+        "metrics": {
+            "rows": "feedback_id",
+            "technical_skills": "technical_skills_rating",
+            "communication": "communication_rating",
+            "problem_solving": "problem_solving_rating",
+            "cultural_fit": "cultural_fit_rating",
+            "overall_impression": "overall_impression_rating",
+        },
+    },
+    "employer_placement": {
+        "table": "employer_placement_feedback",
+        "key": "feedback_id",
+        "period": "survey_completed_date",
+        "metrics": {
+            "rows": "feedback_id",
+            "job_performance": "job_performance_rating",
+            "teamwork": "teamwork_rating",
+            "reliability": "reliability_rating",
+            "learning_ability": "learning_ability_rating",
+            "professional_conduct": "professional_conduct_rating",
+        },
+    },
+    "youth_placement": {
+        "table": "youth_placement_survey",
+        "key": "feedback_id",
+        "period": "survey_completed_date",
+        "metrics": {
+            "rows": "feedback_id",
+            "job_satisfaction": "job_satisfaction_rating",
+            "role_clarity": "role_clarity_rating",
+            "work_environment": "work_environment_rating",
+            "manager_support": "manager_support_rating",
+            "growth_opportunity": "growth_opportunity_rating",
+            "magicbus_support": "magicbus_support_rating",
+        },
+    },
+    "employer_survey": {
+        "table": "employer_feedback_surveys",
+        "key": "survey_id",
+        "period": "COALESCE(survey_date, created_at)",
+        "breakdowns": ["employer_survey_students"],
+        "metrics": {
+            "rows": "survey_id",
+            "completed": "CASE WHEN completion_status = 'completed' THEN 1 END",
+            "pending": "CASE WHEN completion_status = 'pending' THEN 1 END",
+            "overall_performance": "overall_performance",
+            "technical_skills": "technical_skills",
+            "communication_skills": "communication_skills",
+            "teamwork": "teamwork",
+            "work_ethic": "work_ethic",
+            "punctuality": "punctuality",
+            "reliability": "reliability",
+            "problem_solving": "problem_solving",
+            "would_rehire": "CASE WHEN would_rehire = 1 THEN 1 END",
+            "recommendation_score": "recommendation_score",
+        },
+    },
+    "employer_survey_students": {
+        "table": "employer_feedback_surveys",
+        "key": "survey_id",
+        "group": "COALESCE(student_id, '')",
+        "metrics": {
+            "rows": "survey_id",
+            "completed": "CASE WHEN completion_status = 'completed' THEN 1 END",
+            "overall_performance": "CASE WHEN completion_status = 'completed' THEN overall_performance END",
+            "would_rehire": "CASE WHEN completion_status = 'completed' AND would_rehire = 1 THEN 1 END",
+        },
+    },
+    "youth_survey": {
+        "table": "youth_feedback_surveys",
+        "key": "survey_id",
+        "period": "COALESCE(survey_date, created_at)",
+        "breakdowns": ["youth_survey_students"],
+        "metrics": {
+            "rows": "survey_id",
+            "completed": "CASE WHEN completion_status = 'completed' THEN 1 END",
+            "pending": "CASE WHEN completion_status = 'pending' THEN 1 END",
+            "overall_satisfaction": "overall_satisfaction",
+            "role_expectation_match": "role_expectation_match",
+            "work_environment_satisfaction": "work_environment_satisfaction",
+            "team_collaboration_satisfaction": "team_collaboration_satisfaction",
+            "career_growth_opportunity": "career_growth_opportunity",
+            "compensation_satisfaction": "compensation_satisfaction",
+            "magicbus_preparation_rating": "magicbus_preparation_rating",
+            "would_recommend_magicbus": "CASE WHEN would_recommend_magicbus = 1 THEN 1 END",
+            "manager_support_rating": "manager_support_rating",
+            "skill_application_rating": "skill_application_rating",
+        },
+    },
+    "youth_survey_students": {
+        "table": "youth_feedback_surveys",
+        "key": "survey_id",
+        "group": "COALESCE(student_id, '')",
+        "metrics": {
+            "rows": "survey_id",
+            "completed": "CASE WHEN completion_status = 'completed' THEN 1 END",
+            "overall_satisfaction": "CASE WHEN completion_status = 'completed' THEN overall_satisfaction END",
+            "magicbus_preparation_rating":
+                "CASE WHEN completion_status = 'completed' THEN magicbus_preparation_rating END",
+        },
+    },
+}
+
+FEEDBACK_ROLLUP_CHECK_SECONDS = 300  # How often readers verify the rollup against its source
+
+_rollup_checked = {}  # (db path, category) -> time.monotonic() of the last staleness check
+_rollup_lock = threading.Lock()
+
+
+def init_feedback_tables():
+    """Initialize all feedback survey tables (no-op once applied in this process)"""
+    ensure_schema("placement_feedback", "feedback_analytics", "feedback_listings", db_path=DB_PATH)
+
+
+# ========================
+# ANALYTICS ROLLUP
+# ========================
+def _contributions_sql(category: str, where: str) -> str:
+    source = FEEDBACK_ROLLUPS[category]
+    columns = ", ".join(f"SUM({expr}), COUNT({expr})" for expr in source["metrics"].values())
+    bucket = source.get("group") or f"COALESCE(strftime('%Y-%m', {source['period']}), 'unknown')"
+    return f"""
+        SELECT {bucket} as period, {columns}
+        FROM {source['table']}
+        {where}
+        GROUP BY period
+    """
+
+
+def _apply_contributions(conn, category: str, rows, sign: int):
+    now = datetime.now().isoformat()
+    metrics = list(FEEDBACK_ROLLUPS[category]["metrics"])
+    conn.executemany('''
+        INSERT INTO feedback_analytics_cache (
+            metric_category, metric_name, data_period, metric_sum, metric_count, metric_value, last_updated
+        ) VALUES (?, ?, ?, ?, ?, CASE WHEN ? > 0 THEN ? * 1.0 / ? END, ?)
+        ON CONFLICT(metric_category, metric_name, data_period) DO UPDATE SET
+            metric_sum = metric_sum + excluded.metric_sum,
+            metric_count = metric_count + excluded.metric_count,
+            metric_value = CASE WHEN metric_count + excluded.metric_count > 0
+                THEN (metric_sum + excluded.metric_sum) / (metric_count + excluded.metric_count) END,
+            last_updated = excluded.last_updated
+    ''', [
+        (category, metric, period, sign * (total or 0), sign * count, sign * count, sign * (total or 0), sign * count, now)
+        for period, *values in rows
+        for metric, total, count in zip(metrics, values[0::2], values[1::2])
+    ])
+
+
+def update_feedback_rollup(conn, category: str, keys: Iterable[int], sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) source rows' contributions, on the caller's connection
+    Call inside the transaction that inserted the rows (or, with sign=-1, before updating or
+    deleting them) so the rollup commits together with the feedback.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+    for name in [category] + FEEDBACK_ROLLUPS[category].get("breakdowns", []):
+        source = FEEDBACK_ROLLUPS[name]
+        rows = conn.execute(
+            _contributions_sql(name, f"WHERE {source['key']} IN (SELECT value FROM json_each(?))"),
+            (json.dumps(keys),)
+        ).fetchall()
+        _apply_contributions(conn, name, rows, sign)
+
+
+def _table_exists(conn, table: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def rebuild_feedback_rollup(db_path=DB_PATH, categories: Optional[List[str]] = None) -> Dict:
+    """Reconcile: recompute the rollup for the given categories (default all) from the source tables"""
+    ensure_schema("feedback_analytics", db_path=db_path)
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        rebuilt = {}
+        conn.execute("BEGIN IMMEDIATE")
+        for category in categories or FEEDBACK_ROLLUPS:
+            conn.execute("DELETE FROM feedback_analytics_cache WHERE metric_category = ?", (category,))
+            if not _table_exists(conn, FEEDBACK_ROLLUPS[category]["table"]):
+                continue
+            rows = conn.execute(_contributions_sql(category, "")).fetchall()
+            _apply_contributions(conn, category, rows, 1)
+            rebuilt[category] = len(rows)
+        conn.commit()
+    finally:
+        conn.close()
+    with _rollup_lock:
+        for category in rebuilt:
+            _rollup_checked[(str(db_path), category)] = time.monotonic()
+    logger.info(f"Feedback analytics rollup rebuilt: {rebuilt}")
+    return {"periods_rebuilt": rebuilt}
+
+
+def feedback_rollup_status(db_path=DB_PATH, categories: Optional[List[str]] = None) -> Dict:
+    """Staleness check: compare each category's row count and key sum with its source table"""
+    ensure_schema("feedback_analytics", db_path=db_path)
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        status = {}
+        for category in categories or FEEDBACK_ROLLUPS:
+            source = FEEDBACK_ROLLUPS[category]
+            rollup = conn.execute('''
+                SELECT SUM(metric_count), SUM(metric_sum), MAX(last_updated) FROM feedback_analytics_cache
+                WHERE metric_category = ? AND metric_name = 'rows'
+            ''', (category,)).fetchone()
+            if _table_exists(conn, source["table"]):
+                actual = conn.execute(f"SELECT COUNT(*), SUM({source['key']}) FROM {source['table']}").fetchone()
+            else:
+                actual = (0, None)
+            status[category] = {
+                "source_rows": actual[0],
+                "rollup_rows": rollup[0] or 0,
+                "last_updated": rollup[2],
+                "stale": (actual[0], actual[1] or 0) != (rollup[0] or 0, int(rollup[1] or 0))
+            }
+        return status
+    finally:
+        conn.close()
+
+
+def _reconcile_rollup(category: str, db_path):
+    """Check the rollup against its source at most every FEEDBACK_ROLLUP_CHECK_SECONDS; rebuild when stale"""
+    check_key = (str(db_path), category)
+    with _rollup_lock:
+        due = time.monotonic() - _rollup_checked.get(check_key, float("-inf")) >= FEEDBACK_ROLLUP_CHECK_SECONDS
+        if due:
+            _rollup_checked[check_key] = time.monotonic()
+    if due and feedback_rollup_status(db_path, [category])[category]["stale"]:
+        logger.warning(f"Feedback analytics rollup for {category} is stale, rebuilding")
+        rebuild_feedback_rollup(db_path, [category])
+
+
+def read_feedback_rollup(category: str, db_path=DB_PATH, periods: Optional[List[str]] = None,
+                         reconcile: bool = True) -> Dict[str, Dict]:
+    """
+    Metrics for one category from the rollup: {metric: {"sum", "count", "avg"}}
+    Optionally restricted to data periods ('YYYY-MM'). With reconcile, the rollup is checked
+    against its source at most every FEEDBACK_ROLLUP_CHECK_SECONDS and rebuilt when stale.
+    """
+    ensure_schema("feedback_analytics", db_path=db_path)
+    if reconcile:
+        _reconcile_rollup(category, db_path)
+
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        rows = conn.execute('''
+            SELECT metric_name, SUM(metric_sum), SUM(metric_count) FROM feedback_analytics_cache
+            WHERE metric_category = ? AND (? IS NULL OR data_period IN (SELECT value FROM json_each(?)))
+            GROUP BY metric_name
+        ''', (category, json.dumps(periods) if periods else None, json.dumps(periods or []))).fetchall()
+    finally:
+        conn.close()
+
+    metrics = {metric: {"sum": 0, "count": 0, "avg": 0} for metric in FEEDBACK_ROLLUPS[category]["metrics"]}
+    for metric, total, count in rows:
+        if metric in metrics:
+            metrics[metric] = {"sum": total or 0, "count": count or 0, "avg": (total / count) if count else 0}
+    return metrics
+
+
+def read_feedback_rollup_groups(category: str, order_by: str, db_path=DB_PATH, having: str = "completed",
+                                limit: int = 50, reconcile: bool = True) -> List[Dict]:
+    """
+    Per-group metrics of a grouped category (see "group" in FEEDBACK_ROLLUPS), best average of
+    order_by first: [{"group": value, metric: {"sum", "count", "avg"}}]. Only groups with a
+    non-zero count of `having` are returned. Reads the rollup rows, never the source table.
+    """
+    ensure_schema("feedback_analytics", db_path=db_path)
+    if reconcile:
+        _reconcile_rollup(category, db_path)
+
+    metrics = list(FEEDBACK_ROLLUPS[category]["metrics"])
+    columns = ", ".join(
+        f"SUM(CASE WHEN metric_name = '{metric}' THEN metric_sum END), "
+        f"SUM(CASE WHEN metric_name = '{metric}' THEN metric_count END)"
+        for metric in metrics
+    )
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        rows = conn.execute(f'''
+            SELECT data_period, {columns} FROM feedback_analytics_cache
+            WHERE metric_category = ?
+            GROUP BY data_period
+            HAVING SUM(CASE WHEN metric_name = ? THEN metric_count END) > 0
+            ORDER BY SUM(CASE WHEN metric_name = ? THEN metric_sum END)
+                     / SUM(CASE WHEN metric_name = ? THEN metric_count END) DESC, data_period
+            LIMIT ?
+        ''', (category, having, order_by, order_by, limit)).fetchall()
+    finally:
+        conn.close()
+
+    groups = []
+    for group, *values in rows:
+        entry = {"group": group or None}
+        for metric, total, count in zip(metrics, values[0::2], values[1::2]):
+            entry[metric] = {"sum": total or 0, "count": count or 0, "avg": (total / count) if count else None}
+        groups.append(entry)
+    return groups
+
+
+# ========================
+# LISTINGS
+# ========================
+
+# Paginated listings: name -> source table, key and date columns, the column filtered as "scope"
+# (employer, survey type) and the default projection. "status" optionally derives a status from
+# "{row}" (NEW/OLD in triggers, the table otherwise); "statuses" maps each status to an indexed
+# filter on "status_columns". Pages are keyset-ordered newest first on (date, key); totals come
+# from feedback_listing_counts, which triggers keep per (scope, status).
+FEEDBACK_LISTINGS = {
+    "interview": {
+        "table": "employer_interview_feedback",
+        "key": "feedback_id",
+        "date": "survey_completed_date",
+        "scope": "company_name",
+        "columns": [
+            "company_name", "employer_name", "student_id", "student_name", "position_applied",
+            "interview_date", "overall_impression_rating", "would_hire_again"
+        ],
+    },
+    "placement": {
+        "table": "employer_placement_feedback",
+        "key": "feedback_id",
+        "date": "survey_completed_date",
+        "scope": "company_name",
+        "columns": [
+            "company_name", "employer_name", "student_id", "student_name", "position_title",
+            "placement_date", "job_performance_rating", "retention_likelihood"
+        ],
+    },
+    "youth": {
+        "table": "youth_placement_survey",
+        "key": "feedback_id",
+        "date": "survey_completed_date",
+        "scope": "company_name",
+        "columns": [
+            "student_id", "student_name", "company_name", "position_title",
+            "job_satisfaction_rating", "magicbus_support_rating", "would_recommend"
+        ],
+    },
+    # Survey distribution log (table owned by feedback_survey's "feedback_surveys" schema):
+    # status from the opened / completed flags, filtered by survey type
+    "distribution": {
+        "table": "survey_distribution_logs",
+        "key": "log_id",
+        "date": "sent_date",
+        "scope": "survey_type",
+        "status": "CASE WHEN {row}.completed THEN 'completed' WHEN {row}.opened THEN 'opened' ELSE 'sent' END",
+        "status_columns": ["completed", "opened"],
+        "statuses": {
+            "completed": "completed = 1",
+            "opened": "completed = 0 AND opened = 1",
+            "sent": "completed = 0 AND opened = 0",
+        },
+        "columns": [
+            "survey_type", "recipient_email", "recipient_type", "survey_id", "student_id",
+            "opened", "completed", "completion_date"
+        ],
+    },
+}
+
+
+def _listing_counter_keys(listing: str, row: str):
+    """SQL for a row's (scope, status) counter key; row is NEW, OLD or the table name"""
+    config = FEEDBACK_LISTINGS[listing]
+    status = config["status"].format(row=row) if config.get("status") else "''"
+    return f"COALESCE({row}.{config['scope']}, '')", f"COALESCE({status}, '')"
+
+
+def _listing_backfill(listing: str) -> List[str]:
+    config = FEEDBACK_LISTINGS[listing]
+    scope, status = _listing_counter_keys(listing, config["table"])
+    return [
+        f"DELETE FROM feedback_listing_counts WHERE listing = '{listing}'",
+        f'''
+            INSERT INTO feedback_listing_counts (listing, scope_value, status, row_count)
+            SELECT '{listing}', {scope}, {status}, COUNT(*) FROM {config['table']} GROUP BY 2, 3
+        ''',
+    ]
+
+
+def listing_schema(*listings: str) -> List[str]:
+    """DDL for listings: keyset indexes, the counter table, its triggers and a counter backfill"""
+    statements = ['''
+        CREATE TABLE IF NOT EXISTS feedback_listing_counts (
+            listing TEXT NOT NULL,
+            scope_value TEXT NOT NULL,
+            status TEXT NOT NULL,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (listing, scope_value, status)
         )
-    ''')
-    
-    conn.commit()
-    conn.close()
-    logger.info("Feedback tables initialized successfully")
+    ''']
+    for listing in listings:
+        config = FEEDBACK_LISTINGS[listing]
+        table, key, date, scope = config["table"], config["key"], config["date"], config["scope"]
+        statements.append(f"CREATE INDEX IF NOT EXISTS idx_{table}_keyset ON {table}({date}, {key})")
+        statements.append(f"CREATE INDEX IF NOT EXISTS idx_{table}_keyset_scope ON {table}({scope}, {date}, {key})")
+        if config.get("status_columns"):
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_keyset_status "
+                f"ON {table}({', '.join(config['status_columns'])}, {date}, {key})"
+            )
+
+        new_scope, new_status = _listing_counter_keys(listing, "NEW")
+        old_scope, old_status = _listing_counter_keys(listing, "OLD")
+        increment = f'''
+            INSERT OR IGNORE INTO feedback_listing_counts (listing, scope_value, status, row_count)
+            VALUES ('{listing}', {new_scope}, {new_status}, 0);
+            UPDATE feedback_listing_counts SET row_count = row_count + 1
+            WHERE listing = '{listing}' AND scope_value = {new_scope} AND status = {new_status};
+        '''
+        decrement = f'''
+            UPDATE feedback_listing_counts SET row_count = row_count - 1
+            WHERE listing = '{listing}' AND scope_value = {old_scope} AND status = {old_status};
+        '''
+        watched = ", ".join([scope] + config.get("status_columns", []))
+        statements += [
+            f"DROP TRIGGER IF EXISTS trg_{listing}_listing_insert",
+            f"DROP TRIGGER IF EXISTS trg_{listing}_listing_delete",
+            f"DROP TRIGGER IF EXISTS trg_{listing}_listing_update",
+            f"CREATE TRIGGER trg_{listing}_listing_insert AFTER INSERT ON {table} BEGIN {increment} END",
+            f"CREATE TRIGGER trg_{listing}_listing_delete AFTER DELETE ON {table} BEGIN {decrement} END",
+            f'''
+                CREATE TRIGGER trg_{listing}_listing_update AFTER UPDATE OF {watched} ON {table}
+                WHEN {old_scope} IS NOT {new_scope} OR {old_status} IS NOT {new_status}
+                BEGIN {decrement} {increment} END
+            ''',
+        ]
+        statements += _listing_backfill(listing)
+    return statements
+
+
+register_schema("feedback_listings", listing_schema("interview", "placement", "youth"))
+# Apply after "feedback_surveys", which creates survey_distribution_logs
+register_schema("distribution_listing", listing_schema("distribution"))
+
+
+def rebuild_listing_counts(db_path=DB_PATH, listings: Optional[List[str]] = None) -> Dict:
+    """Reconcile: recount feedback_listing_counts for the given listings (default all) from the source tables"""
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        rebuilt = {}
+        conn.execute("BEGIN IMMEDIATE")
+        for listing in listings or FEEDBACK_LISTINGS:
+            if not _table_exists(conn, FEEDBACK_LISTINGS[listing]["table"]):
+                continue
+            for statement in _listing_backfill(listing):
+                conn.execute(statement)
+            rebuilt[listing] = conn.execute(
+                "SELECT COALESCE(SUM(row_count), 0) FROM feedback_listing_counts WHERE listing = ?", (listing,)
+            ).fetchone()[0]
+        conn.commit()
+    finally:
+        conn.close()
+    return {"rows_counted": rebuilt}
+
+
+def get_listing_counts(listing: str, by: str = "status", db_path=DB_PATH) -> Dict[str, int]:
+    """Row counts of a listing grouped by "status" or "scope", from feedback_listing_counts"""
+    column = "status" if by == "status" else "scope_value"
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        return dict(conn.execute(f'''
+            SELECT {column}, SUM(row_count) FROM feedback_listing_counts
+            WHERE listing = ? GROUP BY {column} HAVING SUM(row_count) > 0 ORDER BY {column}
+        ''', (listing,)).fetchall())
+    finally:
+        conn.close()
+
+
+def list_feedback_page(listing: str, columns: Optional[List[str]] = None, limit: int = 50,
+                       cursor: Optional[List] = None, scope: Optional[str] = None, status: Optional[str] = None,
+                       date_from: Optional[str] = None, date_to: Optional[str] = None, db_path=DB_PATH) -> Dict:
+    """
+    One page of a listing, newest first: {"rows": [dict], "next_cursor": [date, key] or None, "total": int}
+    Pass next_cursor back to get the following page. columns projects the rows (unknown names are
+    ignored; key and date are always included). scope/status/date filters use the listing indexes;
+    total is read from feedback_listing_counts, or counted over the index when a date range is given.
+    Rows without a date come after all dated rows.
+    """
+    config = FEEDBACK_LISTINGS[listing]
+    table, key, date = config["table"], config["key"], config["date"]
+
+    filters, params = [], []
+    if scope is not None:
+        filters.append(f"{config['scope']} = ?")
+        params.append(scope)
+    if status is not None:
+        filters.append(config["statuses"][status])
+    if date_from:
+        filters.append(f"{date} >= ?")
+        params.append(str(date_from))
+    if date_to:
+        filters.append(f"{date} < date(?, '+1 day')")
+        params.append(str(date_to))
+
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        available = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        projection = ", ".join(dict.fromkeys(
+            [key, date] + [column for column in (columns or config["columns"]) if column in available]
+        ))
+
+        def fetch(condition, condition_params, size):
+            where = " AND ".join(filters + [condition])
+            return conn.execute(
+                f"SELECT {projection} FROM {table} WHERE {where} ORDER BY {date} DESC, {key} DESC LIMIT ?",
+                params + condition_params + [size]
+            ).fetchall()
+
+        # One extra row tells whether another page follows
+        if cursor is None:
+            rows = fetch(f"{date} IS NOT NULL", [], limit + 1)
+        elif cursor[0] is not None:
+            rows = fetch(f"({date}, {key}) < (?, ?)", list(cursor), limit + 1)
+        else:
+            rows = []
+        if len(rows) <= limit:
+            after_key = cursor[1] if cursor is not None and cursor[0] is None else None
+            rows += fetch(f"{date} IS NULL AND (? IS NULL OR {key} < ?)", [after_key, after_key], limit + 1 - len(rows))
+
+        if date_from or date_to:
+            total = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {' AND '.join(filters)}", params).fetchone()[0]
+        else:
+            total = conn.execute('''
+                SELECT COALESCE(SUM(row_count), 0) FROM feedback_listing_counts
+                WHERE listing = ? AND (? IS NULL OR scope_value = ?) AND (? IS NULL OR status = ?)
+            ''', (listing, scope, scope, status, status)).fetchone()[0]
+    finally:
+        conn.close()
+
+    page = [dict(row) for row in rows[:limit]]
+    next_cursor = [page[-1][date], page[-1][key]] if len(rows) > limit else None
+    return {"rows": page, "next_cursor": next_cursor, "total": total}
 
 
 def submit_employer_interview_feedback(feedback_data):
@@ -192,6 +747,7 @@ def submit_employer_interview_feedback(feedback_data):
             feedback_data.get('feedback_comments')
         ))
         
+        update_feedback_rollup(conn, "employer_interview", [cursor.lastrowid])
         conn.commit()
         conn.close()
         logger.info(f"Employer interview feedback submitted for {feedback_data.get('student_id')}")
@@ -239,6 +795,7 @@ def submit_employer_placement_feedback(feedback_data):
             feedback_data.get('overall_feedback')
         ))
         
+        update_feedback_rollup(conn, "employer_placement", [cursor.lastrowid])
         conn.commit()
         conn.close()
         logger.info(f"Employer placement feedback submitted for {feedback_data.get('student_id')}")
@@ -289,6 +846,7 @@ def submit_youth_placement_feedback(feedback_data):
             feedback_data.get('overall_feedback')
         ))
         
+        update_feedback_rollup(conn, "youth_placement", [cursor.lastrowid])
         conn.commit()
         conn.close()
         logger.info(f"Youth placement feedback submitted for {feedback_data.get('student_id')}")
@@ -298,119 +856,50 @@ def submit_youth_placement_feedback(feedback_data):
         return False
 
 
-def get_feedback_analytics():
-    """Get analytics from all feedback surveys"""
+def get_feedback_analytics(periods: Optional[List[str]] = None):
+    """Get analytics from all feedback surveys (served from feedback_analytics_cache)"""
     try:
         init_feedback_tables()
-        conn = sqlite3.connect(str(DB_PATH))
-        cursor = conn.cursor()
-        
         analytics = {}
         
-        # Employer Interview Feedback Average Ratings
-        cursor.execute('''
-            SELECT 
-                AVG(technical_skills_rating) as avg_technical,
-                AVG(communication_rating) as avg_communication,
-                AVG(problem_solving_rating) as avg_problem_solving,
-                AVG(cultural_fit_rating) as avg_cultural_fit,
-                AVG(overall_impression_rating) as avg_overall,
-                COUNT(*) as total_interviews
-            FROM employer_interview_feedback
-        ''')
-        
-        interview_data = cursor.fetchone()
-        if interview_data:
-            analytics['employer_interview'] = {
-                'technical_skills': interview_data[0] or 0,
-                'communication': interview_data[1] or 0,
-                'problem_solving': interview_data[2] or 0,
-                'cultural_fit': interview_data[3] or 0,
-                'overall_impression': interview_data[4] or 0,
-                'total_feedbacks': interview_data[5] or 0
-            }
-        
-        # Employer Placement Feedback Average Ratings
-        cursor.execute('''
-            SELECT 
-                AVG(job_performance_rating) as avg_performance,
-                AVG(teamwork_rating) as avg_teamwork,
-                AVG(reliability_rating) as avg_reliability,
-                AVG(learning_ability_rating) as avg_learning,
-                AVG(professional_conduct_rating) as avg_conduct,
-                COUNT(*) as total_placements
-            FROM employer_placement_feedback
-        ''')
-        
-        placement_data = cursor.fetchone()
-        if placement_data:
-            analytics['employer_placement'] = {
-                'job_performance': placement_data[0] or 0,
-                'teamwork': placement_data[1] or 0,
-                'reliability': placement_data[2] or 0,
-                'learning_ability': placement_data[3] or 0,
-                'professional_conduct': placement_data[4] or 0,
-                'total_feedbacks': placement_data[5] or 0
+        for category in ("employer_interview", "employer_placement", "youth_placement"):
+            metrics = read_feedback_rollup(category, db_path=DB_PATH, periods=periods)
+            analytics[category] = {
+                metric: values["avg"] for metric, values in metrics.items() if metric != "rows"
             }
+            analytics[category]["total_feedbacks"] = metrics["rows"]["count"]
         
-        # Youth Placement Feedback Average Ratings
-        cursor.execute('''
-            SELECT 
-                AVG(job_satisfaction_rating) as avg_satisfaction,
-                AVG(role_clarity_rating) as avg_clarity,
-                AVG(work_environment_rating) as avg_environment,
-                AVG(manager_support_rating) as avg_manager,
-                AVG(growth_opportunity_rating) as avg_growth,
-                AVG(magicbus_support_rating) as avg_magicbus,
-                COUNT(*) as total_feedbacks
-            FROM youth_placement_survey
-        ''')
-        
-        youth_data = cursor.fetchone()
-        if youth_data:
-            analytics['youth_placement'] = {
-                'job_satisfaction': youth_data[0] or 0,
-                'role_clarity': youth_data[1] or 0,
-                'work_environment': youth_data[2] or 0,
-                'manager_support': youth_data[3] or 0,
-                'growth_opportunity': youth_data[4] or 0,
-                'magicbus_support': youth_data[5] or 0,
-                'total_feedbacks': youth_data[6] or 0
-            }
-        
-        conn.close()
         return analytics
     except Exception as e:
         logger.error(f"Error getting feedback analytics: {e}")
         return {}
 
 
-def get_all_feedback_surveys():
-    """Get all feedback surveys for admin dashboard"""
+def list_feedback_surveys(kind: str, columns: Optional[List[str]] = None, limit: int = 50,
+                          cursor: Optional[List] = None, employer: Optional[str] = None,
+                          date_from: Optional[str] = None, date_to: Optional[str] = None) -> Dict:
+    """Page of 'interview', 'placement' or 'youth' feedback for the admin dashboard (see list_feedback_page)"""
     try:
         init_feedback_tables()
-        conn = sqlite3.connect(str(DB_PATH))
-        cursor = conn.cursor()
-        
-        # Get employer interview feedbacks
-        cursor.execute('SELECT * FROM employer_interview_feedback ORDER BY survey_completed_date DESC')
-        interview_feedbacks = cursor.fetchall()
-        
-        # Get employer placement feedbacks
-        cursor.execute('SELECT * FROM employer_placement_feedback ORDER BY survey_completed_date DESC')
-        placement_feedbacks = cursor.fetchall()
-        
-        # Get youth feedbacks
-        cursor.execute('SELECT * FROM youth_placement_survey ORDER BY survey_completed_date DESC')
-        youth_feedbacks = cursor.fetchall()
-        
-        conn.close()
-        
-        return {
-            'interview': interview_feedbacks,
-            'placement': placement_feedbacks,
-            'youth': youth_feedbacks
-        }
+        return list_feedback_page(
+            kind, columns=columns, limit=limit, cursor=cursor, scope=employer,
+            date_from=date_from, date_to=date_to, db_path=DB_PATH
+        )
+    except Exception as e:
+        logger.error(f"Error listing {kind} feedback: {e}")
+        return {"rows": [], "next_cursor": None, "total": 0}
+
+
+def get_all_feedback_surveys(limit: int = 50):
+    """Latest feedback of each kind for the admin dashboard (page further with list_feedback_surveys)"""
+    return {kind: list_feedback_surveys(kind, limit=limit)["rows"] for kind in ("interview", "placement", "youth")}
+
+
+def get_feedback_company_counts(kind: str) -> Dict[str, int]:
+    """Responses per company for one feedback kind, from the listing counters"""
+    try:
+        init_feedback_tables()
+        return get_listing_counts(kind, by="scope", db_path=DB_PATH)
     except Exception as e:
-        logger.error(f"Error getting feedback surveys: {e}")
-        return {'interview': [], 'placement': [], 'youth': []}
+        logger.error(f"Error getting {kind} feedback counts: {e}")
+        return {}
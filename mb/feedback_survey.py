@@ -3,6 +3,8 @@ Feedback Survey Module
 Manages employer feedback surveys, youth post-placement surveys, and analytics
 """
 
+import hmac
+import secrets
 import sqlite3
 import pandas as pd
 from datetime import datetime
@@ -10,125 +12,313 @@ from pathlib import Path
 import logging
 from typing import Dict, List, Optional, Tuple
 
+try:
+    from services.schema_registry import register_schema, ensure_schema
+except ImportError:
+    from mb.services.schema_registry import register_schema, ensure_schema
+
+try:
+    from email_outbox import enqueue_email, enqueue_emails
+    from survey_lifecycle import record_survey_events
+    from feedback_db import (
+        update_feedback_rollup, read_feedback_rollup, read_feedback_rollup_groups,
+        list_feedback_page, get_listing_counts
+    )
+except ImportError:
+    from mb.email_outbox import enqueue_email, enqueue_emails
+    from mb.survey_lifecycle import record_survey_events
+    from mb.feedback_db import (
+        update_feedback_rollup, read_feedback_rollup, read_feedback_rollup_groups,
+        list_feedback_page, get_listing_counts
+    )
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).parent.parent / "data" / "mb_compass.db"
 
 
+register_schema("feedback_surveys", [
+    # Employer Feedback Survey Table
+    '''
+        CREATE TABLE IF NOT EXISTS employer_feedback_surveys (
+            survey_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id VARCHAR(50),
+            employer_name VARCHAR(255) NOT NULL,
+            employer_email VARCHAR(255) NOT NULL,
+            job_title VARCHAR(255),
+            survey_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_date TIMESTAMP,
+            completed_date TIMESTAMP,
+            completion_status VARCHAR(20) DEFAULT 'pending',
+            overall_performance FLOAT,
+            technical_skills FLOAT,
+            communication_skills FLOAT,
+            teamwork FLOAT,
+            work_ethic FLOAT,
+            punctuality FLOAT,
+            reliability FLOAT,
+            problem_solving FLOAT,
+            strengths TEXT,
+            areas_for_improvement TEXT,
+            would_rehire BOOLEAN,
+            feedback_comments TEXT,
+            recommendation_score FLOAT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    # Youth Post-Placement Feedback Table
+    '''
+        CREATE TABLE IF NOT EXISTS youth_feedback_surveys (
+            survey_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id VARCHAR(50) NOT NULL,
+            user_id INTEGER,
+            placement_company VARCHAR(255),
+            job_title VARCHAR(255),
+            survey_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_date TIMESTAMP,
+            completed_date TIMESTAMP,
+            completion_status VARCHAR(20) DEFAULT 'pending',
+            role_expectation_match FLOAT,
+            work_environment_satisfaction FLOAT,
+            team_collaboration_satisfaction FLOAT,
+            career_growth_opportunity FLOAT,
+            compensation_satisfaction FLOAT,
+            overall_satisfaction FLOAT,
+            what_went_well TEXT,
+            what_could_improve TEXT,
+            manager_support_rating FLOAT,
+            skill_application_rating FLOAT,
+            magicbus_preparation_rating FLOAT,
+            would_recommend_magicbus BOOLEAN,
+            suggestions_for_improvement TEXT,
+            challenges_faced TEXT,
+            additional_training_needed TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    # Survey Template Versions (for tracking changes)
+    '''
+        CREATE TABLE IF NOT EXISTS survey_templates (
+            template_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            template_type VARCHAR(50) NOT NULL,
+            template_name VARCHAR(255),
+            questions_json TEXT,
+            version INTEGER DEFAULT 1,
+            is_active BOOLEAN DEFAULT true,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    # Survey Distribution Log (for tracking email sends)
+    '''
+        CREATE TABLE IF NOT EXISTS survey_distribution_logs (
+            log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            survey_type VARCHAR(50),
+            recipient_email VARCHAR(255) NOT NULL,
+            recipient_type VARCHAR(50),
+            survey_id INTEGER,
+            student_id VARCHAR(50),
+            sent_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            opened BOOLEAN DEFAULT false,
+            opened_date TIMESTAMP,
+            completed BOOLEAN DEFAULT false,
+            completion_date TIMESTAMP,
+            survey_link VARCHAR(500)
+        )
+    ''',
+    # Unguessable per-survey token carried by emailed links (survey ids are sequential)
+    '''
+        CREATE TABLE IF NOT EXISTS survey_link_tokens (
+            survey_type VARCHAR(20) NOT NULL,
+            survey_id INTEGER NOT NULL,
+            token VARCHAR(64) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (survey_type, survey_id)
+        )
+    ''',
+    # Create indices for better query performance
+    'CREATE INDEX IF NOT EXISTS idx_employer_survey_student ON employer_feedback_surveys(student_id)',
+    'CREATE INDEX IF NOT EXISTS idx_employer_survey_date ON employer_feedback_surveys(survey_date)',
+    'CREATE INDEX IF NOT EXISTS idx_employer_survey_status ON employer_feedback_surveys(completion_status)',
+    'CREATE INDEX IF NOT EXISTS idx_youth_survey_student ON youth_feedback_surveys(student_id)',
+    'CREATE INDEX IF NOT EXISTS idx_youth_survey_date ON youth_feedback_surveys(survey_date)',
+    'CREATE INDEX IF NOT EXISTS idx_youth_survey_status ON youth_feedback_surveys(completion_status)',
+    'CREATE INDEX IF NOT EXISTS idx_distribution_email ON survey_distribution_logs(recipient_email)',
+    'CREATE INDEX IF NOT EXISTS idx_distribution_date ON survey_distribution_logs(sent_date)',
+    'CREATE INDEX IF NOT EXISTS idx_distribution_survey ON survey_distribution_logs(survey_id, survey_type)',
+], version=3)
+
+
 def init_feedback_tables():
-    """Initialize feedback survey tables in database"""
+    """Initialize feedback survey tables in database (no-op once applied in this process)"""
     try:
-        conn = sqlite3.connect(str(DB_PATH))
-        cursor = conn.cursor()
+        ensure_schema("feedback_surveys", "distribution_listing", db_path=DB_PATH)
+        return True
+    except Exception as e:
+        logger.error(f"❌ Error initializing feedback tables: {e}")
+        return False
 
-        # Employer Feedback Survey Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS employer_feedback_surveys (
-                survey_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id VARCHAR(50),
-                employer_name VARCHAR(255) NOT NULL,
-                employer_email VARCHAR(255) NOT NULL,
-                job_title VARCHAR(255),
-                survey_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                sent_date TIMESTAMP,
-                completed_date TIMESTAMP,
-                completion_status VARCHAR(20) DEFAULT 'pending',
-                overall_performance FLOAT,
-                technical_skills FLOAT,
-                communication_skills FLOAT,
-                teamwork FLOAT,
-                work_ethic FLOAT,
-                punctuality FLOAT,
-                reliability FLOAT,
-                problem_solving FLOAT,
-                strengths TEXT,
-                areas_for_improvement TEXT,
-                would_rehire BOOLEAN,
-                feedback_comments TEXT,
-                recommendation_score FLOAT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
 
-        # Youth Post-Placement Feedback Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS youth_feedback_surveys (
-                survey_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id VARCHAR(50) NOT NULL,
-                user_id INTEGER,
-                placement_company VARCHAR(255),
-                job_title VARCHAR(255),
-                survey_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                sent_date TIMESTAMP,
-                completed_date TIMESTAMP,
-                completion_status VARCHAR(20) DEFAULT 'pending',
-                role_expectation_match FLOAT,
-                work_environment_satisfaction FLOAT,
-                team_collaboration_satisfaction FLOAT,
-                career_growth_opportunity FLOAT,
-                compensation_satisfaction FLOAT,
-                overall_satisfaction FLOAT,
-                what_went_well TEXT,
-                what_could_improve TEXT,
-                manager_support_rating FLOAT,
-                skill_application_rating FLOAT,
-                magicbus_preparation_rating FLOAT,
-                would_recommend_magicbus BOOLEAN,
-                suggestions_for_improvement TEXT,
-                challenges_faced TEXT,
-                additional_training_needed TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+# Survey type -> (survey table, feedback rollup category)
+SURVEY_TABLES = {
+    "employer": ("employer_feedback_surveys", "employer_survey"),
+    "youth": ("youth_feedback_surveys", "youth_survey"),
+}
 
-        # Survey Template Versions (for tracking changes)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS survey_templates (
-                template_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                template_type VARCHAR(50) NOT NULL,
-                template_name VARCHAR(255),
-                questions_json TEXT,
-                version INTEGER DEFAULT 1,
-                is_active BOOLEAN DEFAULT true,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+SURVEY_TOKEN_BYTES = 24
 
-        # Survey Distribution Log (for tracking email sends)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS survey_distribution_logs (
-                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                survey_type VARCHAR(50),
-                recipient_email VARCHAR(255) NOT NULL,
-                recipient_type VARCHAR(50),
-                survey_id INTEGER,
-                student_id VARCHAR(50),
-                sent_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                opened BOOLEAN DEFAULT false,
-                opened_date TIMESTAMP,
-                completed BOOLEAN DEFAULT false,
-                completion_date TIMESTAMP,
-                survey_link VARCHAR(500)
-            )
-        ''')
 
-        # Create indices for better query performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_employer_survey_student ON employer_feedback_surveys(student_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_employer_survey_date ON employer_feedback_surveys(survey_date)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_employer_survey_status ON employer_feedback_surveys(completion_status)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_youth_survey_student ON youth_feedback_surveys(student_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_youth_survey_date ON youth_feedback_surveys(survey_date)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_youth_survey_status ON youth_feedback_surveys(completion_status)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_distribution_email ON survey_distribution_logs(recipient_email)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_distribution_date ON survey_distribution_logs(sent_date)')
+def _issue_survey_tokens(conn, survey_type: str, survey_ids: List[int]) -> List[str]:
+    """Create the link tokens of new surveys (inside the caller's transaction), in survey_ids order"""
+    tokens = [secrets.token_urlsafe(SURVEY_TOKEN_BYTES) for _ in survey_ids]
+    conn.executemany(
+        "INSERT INTO survey_link_tokens (survey_type, survey_id, token) VALUES (?, ?, ?)",
+        [(survey_type, survey_id, token) for survey_id, token in zip(survey_ids, tokens)]
+    )
+    return tokens
+
+
+def _valid_survey_token(conn, survey_type: str, survey_id: int, survey_token: Optional[str]) -> bool:
+    row = conn.execute(
+        "SELECT token FROM survey_link_tokens WHERE survey_type = ? AND survey_id = ?", (survey_type, survey_id)
+    ).fetchone()
+    return bool(row and survey_token) and hmac.compare_digest(row[0], str(survey_token))
+
+
+def get_survey_token(survey_type: str, survey_id: int) -> Optional[str]:
+    """Link token of an emailed survey (None for surveys created without one)"""
+    ensure_schema("feedback_surveys", db_path=DB_PATH)
+    conn = sqlite3.connect(str(DB_PATH))
+    try:
+        row = conn.execute(
+            "SELECT token FROM survey_link_tokens WHERE survey_type = ? AND survey_id = ?", (survey_type, survey_id)
+        ).fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def verify_survey_link(survey_type: str, survey_id: int, survey_token: Optional[str]) -> bool:
+    """True when the link's token matches the survey's, i.e. the link may open and complete it"""
+    if survey_type not in SURVEY_TABLES:
+        return False
+    try:
+        ensure_schema("feedback_surveys", db_path=DB_PATH)
+        conn = sqlite3.connect(str(DB_PATH))
+        try:
+            return _valid_survey_token(conn, survey_type, survey_id, survey_token)
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.error(f"❌ Error verifying survey link: {e}")
+        return False
+
 
+def _complete_pending_survey(conn, survey_type: str, survey_id: int, answers: Dict, completed_date) -> Optional[str]:
+    """
+    Complete an emailed survey row in place with the submitted answers (inside the caller's transaction)
+    The row's rollup contribution is removed before the update and re-added after it, and its
+    distribution logs are flagged completed. None-valued answers keep the stored value.
+    Returns the row's previous completion status (None if the survey does not exist).
+    """
+    table, category = SURVEY_TABLES[survey_type]
+    row = conn.execute(f"SELECT completion_status FROM {table} WHERE survey_id = ?", (survey_id,)).fetchone()
+    if row is None or row[0] != 'pending':
+        return row[0] if row else None
+
+    update_feedback_rollup(conn, category, [survey_id], sign=-1)
+    assignments = ", ".join(f"{column} = COALESCE(?, {column})" for column in answers)
+    conn.execute(f'''
+        UPDATE {table} SET {assignments}, completed_date = ?, completion_status = 'completed'
+        WHERE survey_id = ?
+    ''', (*answers.values(), completed_date, survey_id))
+    update_feedback_rollup(conn, category, [survey_id], sign=1)
+    conn.execute('''
+        UPDATE survey_distribution_logs SET completed = 1, completion_date = ?
+        WHERE survey_id = ? AND survey_type = ? AND NOT completed
+    ''', (completed_date, survey_id, survey_type))
+    return 'pending'
+
+
+def _submit_survey(survey_type: str, survey_id: Optional[int], answers: Dict,
+                   survey_token: Optional[str] = None) -> Tuple[bool, str]:
+    """
+    Store a completed survey: in place for an emailed survey (survey_id and token from the link),
+    otherwise as a new row. Records the 'completed' lifecycle event in the same transaction.
+    """
+    table, category = SURVEY_TABLES[survey_type]
+    ensure_schema("feedback_surveys", "feedback_analytics", "survey_lifecycle", db_path=DB_PATH)
+    completed_date = datetime.now()
+    conn = sqlite3.connect(str(DB_PATH), timeout=30)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        if survey_id and not _valid_survey_token(conn, survey_type, survey_id, survey_token):
+            conn.rollback()
+            return False, "❌ This survey link is not valid"
+        previous = _complete_pending_survey(conn, survey_type, survey_id, answers, completed_date) if survey_id else None
+        if previous == 'completed':
+            conn.rollback()
+            return False, "❌ This survey has already been submitted"
+        if previous is None:
+            columns = [column for column, value in answers.items() if value is not None]
+            cursor = conn.execute(f'''
+                INSERT INTO {table} ({', '.join(columns)}, completed_date, completion_status)
+                VALUES ({', '.join('?' * len(columns))}, ?, 'completed')
+            ''', (*(answers[column] for column in columns), completed_date))
+            survey_id = cursor.lastrowid
+            update_feedback_rollup(conn, category, [survey_id])
+        record_survey_events(conn, [{
+            "survey_type": survey_type, "survey_id": survey_id, "event_type": "completed",
+            "occurred_at": completed_date
+        }])
         conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
         conn.close()
-        logger.info("✅ Feedback survey tables initialized")
-        return True
+    return True, survey_id
+
+
+def mark_survey_opened(survey_type: str, survey_id: int, survey_token: Optional[str]) -> bool:
+    """
+    Record the first open of an emailed survey link: flags its distribution logs and appends the
+    'opened' lifecycle event. Returns False for invalid links and already opened or completed surveys.
+    """
+    try:
+        ensure_schema("feedback_surveys", "distribution_listing", "survey_lifecycle", db_path=DB_PATH)
+        table, _ = SURVEY_TABLES[survey_type]
+        conn = sqlite3.connect(str(DB_PATH), timeout=30)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if not _valid_survey_token(conn, survey_type, survey_id, survey_token):
+                conn.rollback()
+                return False
+            pending = conn.execute(
+                f"SELECT 1 FROM {table} WHERE survey_id = ? AND completion_status = 'pending'", (survey_id,)
+            ).fetchone()
+            state = conn.execute('''
+                SELECT opened_date FROM survey_lifecycle_state WHERE survey_type = ? AND survey_id = ?
+            ''', (survey_type, survey_id)).fetchone()
+            if not pending or (state and state[0]):
+                conn.rollback()
+                return False
+
+            opened_date = datetime.now()
+            conn.execute('''
+                UPDATE survey_distribution_logs SET opened = 1, opened_date = ?
+                WHERE survey_id = ? AND survey_type = ? AND NOT opened
+            ''', (opened_date, survey_id, survey_type))
+            record_survey_events(conn, [{
+                "survey_type": survey_type, "survey_id": survey_id, "event_type": "opened",
+                "occurred_at": opened_date
+            }])
+            conn.commit()
+            return True
+        finally:
+            conn.close()
     except Exception as e:
-        logger.error(f"❌ Error initializing feedback tables: {e}")
+        logger.error(f"❌ Error recording survey open: {e}")
         return False
 
 
@@ -149,31 +339,38 @@ def submit_employer_feedback(
     areas_for_improvement: str,
     would_rehire: bool,
     feedback_comments: str,
-    recommendation_score: float
+    recommendation_score: float,
+    survey_id: Optional[int] = None,
+    survey_token: Optional[str] = None
 ) -> Tuple[bool, str]:
-    """Submit employer feedback survey"""
+    """
+    Submit employer feedback survey
+    With the survey_id and token of an emailed survey link the pending survey is completed in place.
+    """
     try:
-        conn = sqlite3.connect(str(DB_PATH))
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            INSERT INTO employer_feedback_surveys (
-                student_id, employer_name, employer_email, job_title,
-                overall_performance, technical_skills, communication_skills,
-                teamwork, work_ethic, punctuality, reliability, problem_solving,
-                strengths, areas_for_improvement, would_rehire,
-                feedback_comments, recommendation_score, completed_date, completion_status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            student_id, employer_name, employer_email, job_title,
-            overall_performance, technical_skills, communication_skills,
-            teamwork, work_ethic, punctuality, reliability, problem_solving,
-            strengths, areas_for_improvement, would_rehire,
-            feedback_comments, recommendation_score, datetime.now(), 'completed'
-        ))
-
-        conn.commit()
-        conn.close()
+        # An emailed survey already records its student; the form's placeholder must not overwrite it
+        known_student_id = None if survey_id and student_id in (None, "", "UNKNOWN") else student_id
+        success, result = _submit_survey("employer", survey_id, {
+            "student_id": known_student_id,
+            "employer_name": employer_name,
+            "employer_email": employer_email,
+            "job_title": job_title,
+            "overall_performance": overall_performance,
+            "technical_skills": technical_skills,
+            "communication_skills": communication_skills,
+            "teamwork": teamwork,
+            "work_ethic": work_ethic,
+            "punctuality": punctuality,
+            "reliability": reliability,
+            "problem_solving": problem_solving,
+            "strengths": strengths,
+            "areas_for_improvement": areas_for_improvement,
+            "would_rehire": would_rehire,
+            "feedback_comments": feedback_comments,
+            "recommendation_score": recommendation_score
+        }, survey_token)
+        if not success:
+            return False, result
         logger.info(f"✅ Employer feedback submitted for {student_id}")
         return True, "✅ Feedback submitted successfully!"
     except Exception as e:
@@ -200,39 +397,38 @@ def submit_youth_feedback(
     would_recommend_magicbus: bool,
     suggestions_for_improvement: str,
     challenges_faced: str,
-    additional_training_needed: str
+    additional_training_needed: str,
+    survey_id: Optional[int] = None,
+    survey_token: Optional[str] = None
 ) -> Tuple[bool, str]:
-    """Submit youth post-placement feedback survey"""
+    """
+    Submit youth post-placement feedback survey
+    With the survey_id and token of an emailed survey link the pending survey is completed in place.
+    """
     try:
-        conn = sqlite3.connect(str(DB_PATH))
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            INSERT INTO youth_feedback_surveys (
-                student_id, user_id, placement_company, job_title,
-                role_expectation_match, work_environment_satisfaction,
-                team_collaboration_satisfaction, career_growth_opportunity,
-                compensation_satisfaction, overall_satisfaction,
-                what_went_well, what_could_improve,
-                manager_support_rating, skill_application_rating,
-                magicbus_preparation_rating, would_recommend_magicbus,
-                suggestions_for_improvement, challenges_faced,
-                additional_training_needed, completed_date, completion_status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            student_id, user_id, placement_company, job_title,
-            role_expectation_match, work_environment_satisfaction,
-            team_collaboration_satisfaction, career_growth_opportunity,
-            compensation_satisfaction, overall_satisfaction,
-            what_went_well, what_could_improve,
-            manager_support_rating, skill_application_rating,
-            magicbus_preparation_rating, would_recommend_magicbus,
-            suggestions_for_improvement, challenges_faced,
-            additional_training_needed, datetime.now(), 'completed'
-        ))
-
-        conn.commit()
-        conn.close()
+        success, result = _submit_survey("youth", survey_id, {
+            "student_id": student_id,
+            "user_id": user_id,
+            "placement_company": placement_company,
+            "job_title": job_title,
+            "role_expectation_match": role_expectation_match,
+            "work_environment_satisfaction": work_environment_satisfaction,
+            "team_collaboration_satisfaction": team_collaboration_satisfaction,
+            "career_growth_opportunity": career_growth_opportunity,
+            "compensation_satisfaction": compensation_satisfaction,
+            "overall_satisfaction": overall_satisfaction,
+            "what_went_well": what_went_well,
+            "what_could_improve": what_could_improve,
+            "manager_support_rating": manager_support_rating,
+            "skill_application_rating": skill_application_rating,
+            "magicbus_preparation_rating": magicbus_preparation_rating,
+            "would_recommend_magicbus": would_recommend_magicbus,
+            "suggestions_for_improvement": suggestions_for_improvement,
+            "challenges_faced": challenges_faced,
+            "additional_training_needed": additional_training_needed
+        }, survey_token)
+        if not success:
+            return False, result
         logger.info(f"✅ Youth feedback submitted for {student_id}")
         return True, "✅ Your feedback has been recorded successfully!"
     except Exception as e:
@@ -244,10 +440,17 @@ def create_employer_survey_entry(
     student_id: str,
     employer_name: str,
     employer_email: str,
-    job_title: str
+    job_title: str,
+    queue_email: bool = False,
+    campaign_id: str = None,
+    student_name: str = None
 ) -> Tuple[bool, str, int]:
-    """Create pending employer survey entry for sending via email"""
+    """
+    Create pending employer survey entry for sending via email
+    With queue_email the survey email is added to email_outbox in the same transaction.
+    """
     try:
+        ensure_schema("feedback_surveys", "feedback_analytics", "survey_lifecycle", *(["email_outbox"] if queue_email else []), db_path=DB_PATH)
         conn = sqlite3.connect(str(DB_PATH))
         cursor = conn.cursor()
 
@@ -259,6 +462,27 @@ def create_employer_survey_entry(
         ''', (student_id, employer_name, employer_email, job_title, 'pending', datetime.now()))
 
         survey_id = cursor.lastrowid
+        survey_token = _issue_survey_tokens(conn, "employer", [survey_id])[0]
+        update_feedback_rollup(conn, "employer_survey", [survey_id])
+        record_survey_events(conn, [{
+            "survey_type": "employer", "survey_id": survey_id, "event_type": "created",
+            "campaign_id": campaign_id, "recipient": employer_email
+        }])
+        if queue_email:
+            enqueue_email(
+                conn, "employer_survey", employer_email,
+                {
+                    "employer_email": employer_email,
+                    "employer_name": employer_name,
+                    "student_name": student_name or student_id,
+                    "job_title": job_title,
+                    "survey_id": survey_id,
+                    "survey_token": survey_token,
+                    "student_id": student_id
+                },
+                idempotency_key=f"employer_survey:{survey_id}",
+                campaign_id=campaign_id
+            )
         conn.commit()
         conn.close()
         logger.info(f"✅ Employer survey created for {employer_email}")
@@ -272,10 +496,17 @@ def create_youth_survey_entry(
     student_id: str,
     user_id: int,
     placement_company: str,
-    job_title: str
+    job_title: str,
+    youth_email: str = None,
+    youth_name: str = None,
+    campaign_id: str = None
 ) -> Tuple[bool, str]:
-    """Create pending youth survey entry for sending via email"""
+    """
+    Create pending youth survey entry for sending via email
+    When youth_email is given the survey email is added to email_outbox in the same transaction.
+    """
     try:
+        ensure_schema("feedback_surveys", "feedback_analytics", "survey_lifecycle", *(["email_outbox"] if youth_email else []), db_path=DB_PATH)
         conn = sqlite3.connect(str(DB_PATH))
         cursor = conn.cursor()
 
@@ -287,6 +518,27 @@ def create_youth_survey_entry(
         ''', (student_id, user_id, placement_company, job_title, 'pending', datetime.now()))
 
         survey_id = cursor.lastrowid
+        survey_token = _issue_survey_tokens(conn, "youth", [survey_id])[0]
+        update_feedback_rollup(conn, "youth_survey", [survey_id])
+        record_survey_events(conn, [{
+            "survey_type": "youth", "survey_id": survey_id, "event_type": "created",
+            "campaign_id": campaign_id, "recipient": youth_email
+        }])
+        if youth_email:
+            enqueue_email(
+                conn, "youth_survey", youth_email,
+                {
+                    "youth_email": youth_email,
+                    "youth_name": youth_name or student_id,
+                    "placement_company": placement_company,
+                    "job_title": job_title,
+                    "survey_id": survey_id,
+                    "survey_token": survey_token,
+                    "student_id": student_id
+                },
+                idempotency_key=f"youth_survey:{survey_id}",
+                campaign_id=campaign_id
+            )
         conn.commit()
         conn.close()
         logger.info(f"✅ Youth survey created for student {student_id}")
@@ -296,6 +548,200 @@ def create_youth_survey_entry(
         return False, f"❌ Error: {str(e)}", -1
 
 
+# ========================
+# BULK SURVEY CREATION
+# ========================
+EMAIL_PATTERN = r"[^@\s]+@[^@\s]+\.[^@\s]+"
+
+EMPLOYER_BULK_COLUMNS = ["employer_name", "employer_email", "student_id", "job_title"]
+YOUTH_BULK_COLUMNS = ["youth_name", "youth_email", "student_id", "user_id", "company_name", "position"]
+
+
+def _validate_survey_frame(
+    df: pd.DataFrame,
+    required: List[str],
+    email_column: str,
+    key_columns: List[str],
+    integer_columns: List[str] = ()
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Column-wise validation of an uploaded survey CSV
+    Returns (valid rows, rejected rows with an `error` column); the row index is kept for reporting.
+    """
+    missing_columns = [column for column in required if column not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+
+    clean = df[required].copy()
+    for column in required:
+        if column not in integer_columns:
+            clean[column] = clean[column].astype("string").str.strip()
+
+    error = pd.Series(pd.NA, index=clean.index, dtype="string")
+
+    def reject(mask, reason):
+        error[mask & error.isna()] = reason
+
+    for column in required:
+        reject(clean[column].isna() | (clean[column].astype("string") == ""), f"missing {column}")
+    for column in integer_columns:
+        numeric = pd.to_numeric(clean[column], errors="coerce")
+        reject(numeric.isna() | (numeric % 1 != 0), f"{column} must be an integer")
+        clean[column] = numeric
+    reject(~clean[email_column].str.fullmatch(EMAIL_PATTERN).fillna(False).astype(bool), f"invalid {email_column}")
+    reject(clean.duplicated(subset=key_columns, keep="first"), "duplicate row in file")
+
+    rejected = df.loc[error.notna()].assign(error=error[error.notna()])
+    valid = clean.loc[error.isna()]
+    for column in integer_columns:
+        valid = valid.astype({column: "int64"})
+    return valid, rejected
+
+
+def _insert_survey_rows(conn, table: str, columns: List[str], rows: List[tuple]) -> List[int]:
+    """
+    Insert rows with explicitly assigned survey_ids under the write lock (call inside BEGIN IMMEDIATE)
+    Returns the assigned ids in row order.
+    """
+    next_id = conn.execute(f'''
+        SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0),
+                   COALESCE((SELECT MAX(survey_id) FROM {table}), 0)) + 1
+    ''', (table,)).fetchone()[0]
+    survey_ids = list(range(next_id, next_id + len(rows)))
+    conn.executemany(
+        f"INSERT INTO {table} (survey_id, {', '.join(columns)}) VALUES ({', '.join('?' * (len(columns) + 1))})",
+        [(survey_id, *row) for survey_id, row in zip(survey_ids, rows)]
+    )
+    return survey_ids
+
+
+def create_employer_survey_entries(
+    df: pd.DataFrame,
+    queue_email: bool = False,
+    campaign_id: str = None
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Bulk create pending employer surveys from an uploaded CSV (EMPLOYER_BULK_COLUMNS)
+    Valid rows are inserted in one transaction (with their outbox emails when queue_email).
+    Returns (created rows with survey_id, rejected rows with error).
+    """
+    valid, rejected = _validate_survey_frame(
+        df, EMPLOYER_BULK_COLUMNS, "employer_email", ["student_id", "employer_email", "job_title"]
+    )
+    if valid.empty:
+        return valid.assign(survey_id=pd.Series(dtype="int64")), rejected
+
+    ensure_schema("feedback_surveys", "feedback_analytics", "survey_lifecycle", *(["email_outbox"] if queue_email else []), db_path=DB_PATH)
+    sent_date = datetime.now()
+    records = list(valid.itertuples(index=False))
+    conn = sqlite3.connect(str(DB_PATH), timeout=30)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        survey_ids = _insert_survey_rows(
+            conn, "employer_feedback_surveys",
+            ["student_id", "employer_name", "employer_email", "job_title", "completion_status", "sent_date"],
+            [(row.student_id, row.employer_name, row.employer_email, row.job_title, 'pending', sent_date)
+             for row in records]
+        )
+        survey_tokens = _issue_survey_tokens(conn, "employer", survey_ids)
+        update_feedback_rollup(conn, "employer_survey", survey_ids)
+        record_survey_events(conn, [
+            {"survey_type": "employer", "survey_id": survey_id, "event_type": "created",
+             "campaign_id": campaign_id, "recipient": row.employer_email}
+            for survey_id, row in zip(survey_ids, records)
+        ])
+        if queue_email:
+            enqueue_emails(conn, "employer_survey", [
+                {
+                    "recipient": row.employer_email,
+                    "idempotency_key": f"employer_survey:{survey_id}",
+                    "payload": {
+                        "employer_email": row.employer_email,
+                        "employer_name": row.employer_name,
+                        "student_name": row.student_id,
+                        "job_title": row.job_title,
+                        "survey_id": survey_id,
+                        "survey_token": survey_token,
+                        "student_id": row.student_id
+                    }
+                }
+                for survey_id, survey_token, row in zip(survey_ids, survey_tokens, records)
+            ], campaign_id=campaign_id)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    logger.info(f"✅ {len(survey_ids)} employer surveys created, {len(rejected)} rows rejected")
+    return valid.assign(survey_id=survey_ids), rejected
+
+
+def create_youth_survey_entries(
+    df: pd.DataFrame,
+    queue_email: bool = False,
+    campaign_id: str = None
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Bulk create pending youth surveys from an uploaded CSV (YOUTH_BULK_COLUMNS)
+    Valid rows are inserted in one transaction (with their outbox emails when queue_email).
+    Returns (created rows with survey_id, rejected rows with error).
+    """
+    valid, rejected = _validate_survey_frame(
+        df, YOUTH_BULK_COLUMNS, "youth_email", ["student_id", "company_name", "position"],
+        integer_columns=["user_id"]
+    )
+    if valid.empty:
+        return valid.assign(survey_id=pd.Series(dtype="int64")), rejected
+
+    ensure_schema("feedback_surveys", "feedback_analytics", "survey_lifecycle", *(["email_outbox"] if queue_email else []), db_path=DB_PATH)
+    sent_date = datetime.now()
+    records = list(valid.itertuples(index=False))
+    conn = sqlite3.connect(str(DB_PATH), timeout=30)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        survey_ids = _insert_survey_rows(
+            conn, "youth_feedback_surveys",
+            ["student_id", "user_id", "placement_company", "job_title", "completion_status", "sent_date"],
+            [(row.student_id, int(row.user_id), row.company_name, row.position, 'pending', sent_date)
+             for row in records]
+        )
+        survey_tokens = _issue_survey_tokens(conn, "youth", survey_ids)
+        update_feedback_rollup(conn, "youth_survey", survey_ids)
+        record_survey_events(conn, [
+            {"survey_type": "youth", "survey_id": survey_id, "event_type": "created",
+             "campaign_id": campaign_id, "recipient": row.youth_email}
+            for survey_id, row in zip(survey_ids, records)
+        ])
+        if queue_email:
+            enqueue_emails(conn, "youth_survey", [
+                {
+                    "recipient": row.youth_email,
+                    "idempotency_key": f"youth_survey:{survey_id}",
+                    "payload": {
+                        "youth_email": row.youth_email,
+                        "youth_name": row.youth_name,
+                        "placement_company": row.company_name,
+                        "job_title": row.position,
+                        "survey_id": survey_id,
+                        "survey_token": survey_token,
+                        "student_id": row.student_id
+                    }
+                }
+                for survey_id, survey_token, row in zip(survey_ids, survey_tokens, records)
+            ], campaign_id=campaign_id)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    logger.info(f"✅ {len(survey_ids)} youth surveys created, {len(rejected)} rows rejected")
+    return valid.assign(survey_id=survey_ids), rejected
+
+
 def log_survey_distribution(
     survey_type: str,
     recipient_email: str,
@@ -306,15 +752,21 @@ def log_survey_distribution(
 ) -> bool:
     """Log survey distribution for tracking"""
     try:
+        ensure_schema("survey_lifecycle", db_path=DB_PATH)
         conn = sqlite3.connect(str(DB_PATH))
         cursor = conn.cursor()
 
+        sent_date = datetime.now()
         cursor.execute('''
             INSERT INTO survey_distribution_logs (
                 survey_type, recipient_email, recipient_type,
                 survey_id, student_id, sent_date, survey_link
             ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (survey_type, recipient_email, recipient_type, survey_id, student_id, datetime.now(), survey_link))
+        ''', (survey_type, recipient_email, recipient_type, survey_id, student_id, sent_date, survey_link))
+        record_survey_events(conn, [{
+            "survey_type": survey_type, "survey_id": survey_id, "event_type": "sent",
+            "recipient": recipient_email, "occurred_at": sent_date
+        }])
 
         conn.commit()
         conn.close()
@@ -324,78 +776,61 @@ def log_survey_distribution(
         return False
 
 
-def get_employer_feedback_analytics() -> Dict:
-    """Get analytics from employer feedback surveys"""
+def get_employer_feedback_analytics(student_limit: int = 50) -> Dict:
+    """Get analytics from employer feedback surveys (student_performance: the best student_limit students)"""
     try:
         conn = sqlite3.connect(str(DB_PATH))
         cursor = conn.cursor()
 
-        # Overall statistics
-        cursor.execute('''
-            SELECT
-                COUNT(*) as total_surveys,
-                SUM(CASE WHEN completion_status = 'completed' THEN 1 ELSE 0 END) as completed,
-                SUM(CASE WHEN completion_status = 'pending' THEN 1 ELSE 0 END) as pending,
-                AVG(overall_performance) as avg_performance,
-                AVG(technical_skills) as avg_technical,
-                AVG(communication_skills) as avg_communication,
-                AVG(teamwork) as avg_teamwork,
-                AVG(work_ethic) as avg_work_ethic,
-                AVG(punctuality) as avg_punctuality,
-                AVG(reliability) as avg_reliability,
-                AVG(problem_solving) as avg_problem_solving,
-                SUM(CASE WHEN would_rehire = 1 THEN 1 ELSE 0 END) as rehire_count,
-                AVG(recommendation_score) as avg_recommendation
-            FROM employer_feedback_surveys
-        ''')
-
-        stats = cursor.fetchone()
+        # Overall statistics from the analytics rollup
+        stats = read_feedback_rollup("employer_survey", db_path=DB_PATH)
         
-        # Top strengths mentioned
+        # Most recent strengths mentioned (ranked themes come from services.feedback_themes)
         cursor.execute('''
             SELECT strengths FROM employer_feedback_surveys
             WHERE strengths IS NOT NULL AND completion_status = 'completed'
+            ORDER BY survey_id DESC
+            LIMIT 10
         ''')
         
         strengths_list = [row[0] for row in cursor.fetchall()]
         
-        # Areas for improvement mentioned
+        # Most recent areas for improvement mentioned
         cursor.execute('''
             SELECT areas_for_improvement FROM employer_feedback_surveys
             WHERE areas_for_improvement IS NOT NULL AND completion_status = 'completed'
+            ORDER BY survey_id DESC
+            LIMIT 10
         ''')
         
         improvements_list = [row[0] for row in cursor.fetchall()]
 
-        # By student performance
-        cursor.execute('''
-            SELECT student_id, COUNT(*) as feedback_count,
-                   AVG(overall_performance) as avg_perf,
-                   SUM(CASE WHEN would_rehire = 1 THEN 1 ELSE 0 END) as rehire_count
-            FROM employer_feedback_surveys
-            WHERE completion_status = 'completed'
-            GROUP BY student_id
-            ORDER BY avg_perf DESC
-        ''')
-        
-        student_performance = cursor.fetchall()
-        
         conn.close()
+
+        # By student performance, from the per-student rollup:
+        # (student_id, feedback_count, avg_perf, rehire_count)
+        student_performance = [
+            (student["group"], student["completed"]["count"], student["overall_performance"]["avg"],
+             student["would_rehire"]["count"])
+            for student in read_feedback_rollup_groups(
+                "employer_survey_students", "overall_performance", db_path=DB_PATH, limit=student_limit
+            )
+        ]
         
         return {
-            'total_surveys': stats[0] or 0,
-            'completed_surveys': stats[1] or 0,
-            'pending_surveys': stats[2] or 0,
-            'avg_overall_performance': round(stats[3] or 0, 2),
-            'avg_technical_skills': round(stats[4] or 0, 2),
-            'avg_communication_skills': round(stats[5] or 0, 2),
-            'avg_teamwork': round(stats[6] or 0, 2),
-            'avg_work_ethic': round(stats[7] or 0, 2),
-            'avg_punctuality': round(stats[8] or 0, 2),
-            'avg_reliability': round(stats[9] or 0, 2),
-            'avg_problem_solving': round(stats[10] or 0, 2),
-            'rehire_count': stats[11] or 0,
-            'avg_recommendation': round(stats[12] or 0, 2),
+            'total_surveys': stats['rows']['count'],
+            'completed_surveys': stats['completed']['count'],
+            'pending_surveys': stats['pending']['count'],
+            'avg_overall_performance': round(stats['overall_performance']['avg'], 2),
+            'avg_technical_skills': round(stats['technical_skills']['avg'], 2),
+            'avg_communication_skills': round(stats['communication_skills']['avg'], 2),
+            'avg_teamwork': round(stats['teamwork']['avg'], 2),
+            'avg_work_ethic': round(stats['work_ethic']['avg'], 2),
+            'avg_punctuality': round(stats['punctuality']['avg'], 2),
+            'avg_reliability': round(stats['reliability']['avg'], 2),
+            'avg_problem_solving': round(stats['problem_solving']['avg'], 2),
+            'rehire_count': stats['would_rehire']['count'],
+            'avg_recommendation': round(stats['recommendation_score']['avg'], 2),
             'top_strengths': strengths_list[:10],
             'areas_for_improvement': improvements_list[:10],
             'student_performance': student_performance
@@ -405,37 +840,20 @@ def get_employer_feedback_analytics() -> Dict:
         return {}
 
 
-def get_youth_feedback_analytics() -> Dict:
-    """Get analytics from youth post-placement feedback surveys"""
+def get_youth_feedback_analytics(student_limit: int = 50) -> Dict:
+    """Get analytics from youth post-placement feedback surveys (student_satisfaction: the best student_limit students)"""
     try:
         conn = sqlite3.connect(str(DB_PATH))
         cursor = conn.cursor()
 
-        # Overall statistics
-        cursor.execute('''
-            SELECT
-                COUNT(*) as total_surveys,
-                SUM(CASE WHEN completion_status = 'completed' THEN 1 ELSE 0 END) as completed,
-                SUM(CASE WHEN completion_status = 'pending' THEN 1 ELSE 0 END) as pending,
-                AVG(overall_satisfaction) as avg_satisfaction,
-                AVG(role_expectation_match) as avg_role_match,
-                AVG(work_environment_satisfaction) as avg_work_env,
-                AVG(team_collaboration_satisfaction) as avg_team_collab,
-                AVG(career_growth_opportunity) as avg_career_growth,
-                AVG(compensation_satisfaction) as avg_compensation,
-                AVG(magicbus_preparation_rating) as avg_magicbus_prep,
-                SUM(CASE WHEN would_recommend_magicbus = 1 THEN 1 ELSE 0 END) as recommend_count,
-                AVG(manager_support_rating) as avg_manager_support,
-                AVG(skill_application_rating) as avg_skill_application
-            FROM youth_feedback_surveys
-        ''')
-
-        stats = cursor.fetchone()
+        # Overall statistics from the analytics rollup
+        stats = read_feedback_rollup("youth_survey", db_path=DB_PATH)
         
         # What went well
         cursor.execute('''
             SELECT what_went_well FROM youth_feedback_surveys
             WHERE what_went_well IS NOT NULL AND completion_status = 'completed'
+            LIMIT 10
         ''')
         
         went_well_list = [row[0] for row in cursor.fetchall()]
@@ -444,6 +862,7 @@ def get_youth_feedback_analytics() -> Dict:
         cursor.execute('''
             SELECT what_could_improve FROM youth_feedback_surveys
             WHERE what_could_improve IS NOT NULL AND completion_status = 'completed'
+            LIMIT 10
         ''')
         
         improve_list = [row[0] for row in cursor.fetchall()]
@@ -452,6 +871,7 @@ def get_youth_feedback_analytics() -> Dict:
         cursor.execute('''
             SELECT challenges_faced FROM youth_feedback_surveys
             WHERE challenges_faced IS NOT NULL AND completion_status = 'completed'
+            LIMIT 10
         ''')
         
         challenges_list = [row[0] for row in cursor.fetchall()]
@@ -460,39 +880,37 @@ def get_youth_feedback_analytics() -> Dict:
         cursor.execute('''
             SELECT additional_training_needed FROM youth_feedback_surveys
             WHERE additional_training_needed IS NOT NULL AND completion_status = 'completed'
+            LIMIT 10
         ''')
         
         training_needs = [row[0] for row in cursor.fetchall()]
 
-        # By student satisfaction
-        cursor.execute('''
-            SELECT student_id, COUNT(*) as feedback_count,
-                   AVG(overall_satisfaction) as avg_satisfaction,
-                   AVG(magicbus_preparation_rating) as magicbus_prep
-            FROM youth_feedback_surveys
-            WHERE completion_status = 'completed'
-            GROUP BY student_id
-            ORDER BY avg_satisfaction DESC
-        ''')
-        
-        student_satisfaction = cursor.fetchall()
-        
         conn.close()
+
+        # By student satisfaction, from the per-student rollup:
+        # (student_id, feedback_count, avg_satisfaction, magicbus_prep)
+        student_satisfaction = [
+            (student["group"], student["completed"]["count"], student["overall_satisfaction"]["avg"],
+             student["magicbus_preparation_rating"]["avg"])
+            for student in read_feedback_rollup_groups(
+                "youth_survey_students", "overall_satisfaction", db_path=DB_PATH, limit=student_limit
+            )
+        ]
         
         return {
-            'total_surveys': stats[0] or 0,
-            'completed_surveys': stats[1] or 0,
-            'pending_surveys': stats[2] or 0,
-            'avg_satisfaction': round(stats[3] or 0, 2),
-            'avg_role_match': round(stats[4] or 0, 2),
-            'avg_work_environment': round(stats[5] or 0, 2),
-            'avg_team_collaboration': round(stats[6] or 0, 2),
-            'avg_career_growth': round(stats[7] or 0, 2),
-            'avg_compensation': round(stats[8] or 0, 2),
-            'avg_magicbus_prep': round(stats[9] or 0, 2),
-            'recommend_count': stats[10] or 0,
-            'avg_manager_support': round(stats[11] or 0, 2),
-            'avg_skill_application': round(stats[12] or 0, 2),
+            'total_surveys': stats['rows']['count'],
+            'completed_surveys': stats['completed']['count'],
+            'pending_surveys': stats['pending']['count'],
+            'avg_satisfaction': round(stats['overall_satisfaction']['avg'], 2),
+            'avg_role_match': round(stats['role_expectation_match']['avg'], 2),
+            'avg_work_environment': round(stats['work_environment_satisfaction']['avg'], 2),
+            'avg_team_collaboration': round(stats['team_collaboration_satisfaction']['avg'], 2),
+            'avg_career_growth': round(stats['career_growth_opportunity']['avg'], 2),
+            'avg_compensation': round(stats['compensation_satisfaction']['avg'], 2),
+            'avg_magicbus_prep': round(stats['magicbus_preparation_rating']['avg'], 2),
+            'recommend_count': stats['would_recommend_magicbus']['count'],
+            'avg_manager_support': round(stats['manager_support_rating']['avg'], 2),
+            'avg_skill_application': round(stats['skill_application_rating']['avg'], 2),
             'what_went_well': went_well_list[:10],
             'areas_to_improve': improve_list[:10],
             'challenges_faced': challenges_list[:10],
@@ -516,11 +934,11 @@ def get_pending_surveys() -> Dict:
         cursor.execute('SELECT COUNT(*) FROM youth_feedback_surveys WHERE completion_status = "pending"')
         youth_pending = cursor.fetchone()[0]
 
-        cursor.execute('SELECT COUNT(*) FROM survey_distribution_logs WHERE completed = 0')
-        distribution_pending = cursor.fetchone()[0]
-
         conn.close()
 
+        distribution = get_distribution_counts()
+        distribution_pending = distribution['sent'] + distribution['opened']
+
         return {
             'employer_pending': employer_pending,
             'youth_pending': youth_pending,
@@ -531,25 +949,50 @@ def get_pending_surveys() -> Dict:
         return {'employer_pending': 0, 'youth_pending': 0, 'distribution_pending': 0}
 
 
-def get_survey_distribution_status() -> pd.DataFrame:
-    """Get status of all survey distributions"""
+def list_survey_distributions(
+    limit: int = 50,
+    cursor: Optional[List] = None,
+    columns: Optional[List[str]] = None,
+    status: Optional[str] = None,
+    survey_type: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+) -> Dict:
+    """
+    Page of survey distribution logs, newest first (see feedback_db.list_feedback_page)
+    status: 'sent', 'opened' or 'completed'
+    """
     try:
-        conn = sqlite3.connect(str(DB_PATH))
-        
-        query = '''
-            SELECT log_id, survey_type, recipient_email, recipient_type,
-                   sent_date, opened, completed, student_id
-            FROM survey_distribution_logs
-            ORDER BY sent_date DESC
-        '''
-        
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        
-        return df
+        ensure_schema("feedback_surveys", "distribution_listing", db_path=DB_PATH)
+        return list_feedback_page(
+            "distribution", columns=columns, limit=limit, cursor=cursor, scope=survey_type,
+            status=status, date_from=date_from, date_to=date_to, db_path=DB_PATH
+        )
     except Exception as e:
-        logger.error(f"❌ Error getting distribution status: {e}")
-        return pd.DataFrame()
+        logger.error(f"❌ Error listing distributions: {e}")
+        return {"rows": [], "next_cursor": None, "total": 0}
+
+
+def get_distribution_counts() -> Dict:
+    """Distribution totals by status and by survey type, from the listing counters"""
+    try:
+        ensure_schema("feedback_surveys", "distribution_listing", db_path=DB_PATH)
+        by_status = get_listing_counts("distribution", by="status", db_path=DB_PATH)
+        return {
+            "total": sum(by_status.values()),
+            "sent": by_status.get("sent", 0),
+            "opened": by_status.get("opened", 0),
+            "completed": by_status.get("completed", 0),
+            "by_survey_type": get_listing_counts("distribution", by="scope", db_path=DB_PATH)
+        }
+    except Exception as e:
+        logger.error(f"❌ Error getting distribution counts: {e}")
+        return {"total": 0, "sent": 0, "opened": 0, "completed": 0, "by_survey_type": {}}
+
+
+def get_survey_distribution_status(limit: int = 500) -> pd.DataFrame:
+    """Latest survey distributions (page further with list_survey_distributions)"""
+    return pd.DataFrame(list_survey_distributions(limit=limit)["rows"])
 
 
 def get_employer_survey_details(survey_id: int) -> Optional[Dict]:
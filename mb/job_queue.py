@@ -0,0 +1,691 @@
+"""
+Background Job Queue Module
+Persistent SQLite-backed job queue so slow work (audio screening, GPT scoring,
+resume parsing) runs off the Streamlit script thread. Pages enqueue a job,
+keep the job_id in session state and poll get_job() until it finishes.
+
+Run a standalone worker process with:  python mb/job_queue.py
+"""
+
+import os
+import sqlite3
+import json
+import sys
+import time
+import base64
+import socket
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DB_PATH = PROJECT_ROOT / "data" / "mb_compass.db"
+
+# Job priorities (higher runs first)
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 5
+PRIORITY_HIGH = 10
+
+# Periodic jobs are enqueued by running workers; how often they look for due schedules
+SCHEDULE_CHECK_SECONDS = 60
+# Workers touch heartbeat_at of their running jobs; a running job silent for JOB_STALE_SECONDS
+# belonged to a dead worker
+JOB_HEARTBEAT_SECONDS = 30
+JOB_STALE_SECONDS = 300
+HOURLY = 3600
+DAILY = 24 * HOURLY
+WEEKLY = 7 * DAILY
+
+# Registered job handlers: job_type -> {"func": callable(payload) -> dict, "max_concurrency": int,
+#                                       "every_seconds": Optional[int]}
+JOB_HANDLERS: Dict[str, Dict] = {}
+
+
+def register_job_handler(job_type: str, max_concurrency: int = 2, every_seconds: Optional[int] = None):
+    """
+    Decorator registering a handler for a job type with a concurrency limit
+    shared by all workers on the database, and optionally a period after which
+    workers enqueue it automatically (see JobQueue.schedule_due)
+    """
+    def decorator(func: Callable[[Dict], Dict]):
+        JOB_HANDLERS[job_type] = {
+            "func": func, "max_concurrency": max(1, max_concurrency), "every_seconds": every_seconds
+        }
+        return func
+    return decorator
+
+
+class JobQueue:
+    """Persistent job queue stored in the SQLite `jobs` table"""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._init_db()
+
+    def get_connection(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Initialize jobs table"""
+        conn = self.get_connection()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_type VARCHAR(50) NOT NULL,
+                    payload TEXT,
+                    status VARCHAR(20) DEFAULT 'queued',
+                    priority INTEGER DEFAULT 5,
+                    attempts INTEGER DEFAULT 0,
+                    max_attempts INTEGER DEFAULT 3,
+                    result TEXT,
+                    error TEXT,
+                    worker_id VARCHAR(100),
+                    run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    started_at TIMESTAMP,
+                    heartbeat_at TIMESTAMP,
+                    finished_at TIMESTAMP
+                )
+            """)
+            try:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at TIMESTAMP")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name" not in str(e):
+                    raise
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_claim
+                ON jobs(status, job_type, priority DESC, run_after)
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_type_created
+                ON jobs(job_type, created_at)
+            """)
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Job queue initialization failed: {e}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def enqueue(self, job_type: str, payload: Dict, priority: int = PRIORITY_NORMAL,
+                max_attempts: int = 3, delay_seconds: float = 0) -> int:
+        """Add a job to the queue and return its job_id (runnable after delay_seconds)"""
+        run_after = (datetime.now() + timedelta(seconds=delay_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+        conn = self.get_connection()
+        try:
+            cursor = conn.execute("""
+                INSERT INTO jobs (job_type, payload, priority, max_attempts, run_after, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (job_type, json.dumps(payload, default=str), priority, max_attempts, run_after, self._now()))
+            conn.commit()
+            logger.info(f"Enqueued {job_type} job {cursor.lastrowid}")
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        """Get a job with its decoded payload and result"""
+        conn = self.get_connection()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            return self._row_to_job(row) if row else None
+        finally:
+            conn.close()
+
+    def get_jobs(self, job_types: List[str] = None, status: str = None, limit: int = 50) -> List[Dict]:
+        """List recent jobs, optionally filtered by type and status"""
+        query = "SELECT * FROM jobs WHERE 1=1"
+        params = []
+        if job_types:
+            query += f" AND job_type IN ({','.join('?' * len(job_types))})"
+            params.extend(job_types)
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY job_id DESC LIMIT ?"
+        params.append(limit)
+
+        conn = self.get_connection()
+        try:
+            return [self._row_to_job(row, include_payload=False) for row in conn.execute(query, params)]
+        finally:
+            conn.close()
+
+    def get_status_counts(self) -> Dict[str, int]:
+        """Job counts by status"""
+        conn = self.get_connection()
+        try:
+            return {row[0]: row[1] for row in conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")}
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row, include_payload=True) -> Dict:
+        job = dict(row)
+        if include_payload:
+            job["payload"] = json.loads(job["payload"]) if job.get("payload") else {}
+        else:
+            job.pop("payload", None)
+        job["result"] = json.loads(job["result"]) if job.get("result") else None
+        return job
+
+    def claim(self, slots: Dict[str, int], limit: int, worker_id: str) -> List[Dict]:
+        """
+        Atomically claim up to `limit` runnable jobs, highest priority first,
+        taking at most slots[job_type] jobs of each type. Jobs already running
+        on any worker count against the handler's max_concurrency, so the limit
+        holds across processes sharing the database.
+        """
+        slots = {job_type: n for job_type, n in slots.items() if n > 0}
+        if not slots or limit <= 0:
+            return []
+
+        conn = self.get_connection()
+        try:
+            # Write lock up front so the running count and the claims below are one atomic step
+            conn.execute("BEGIN IMMEDIATE")
+            running = dict(conn.execute(f"""
+                SELECT job_type, COUNT(*) FROM jobs
+                WHERE status = 'running' AND job_type IN ({','.join('?' * len(slots))})
+                GROUP BY job_type
+            """, tuple(slots)).fetchall())
+            for job_type in list(slots):
+                if job_type in JOB_HANDLERS:
+                    slots[job_type] = min(
+                        slots[job_type], JOB_HANDLERS[job_type]["max_concurrency"] - running.get(job_type, 0)
+                    )
+                if slots[job_type] <= 0:
+                    del slots[job_type]
+            if not slots:
+                conn.rollback()
+                return []
+
+            rows = conn.execute(f"""
+                SELECT job_id, job_type FROM jobs
+                WHERE status = 'queued' AND run_after <= ?
+                  AND job_type IN ({','.join('?' * len(slots))})
+                ORDER BY priority DESC, job_id
+                LIMIT ?
+            """, (self._now(), *slots, limit * len(slots))).fetchall()
+
+            claimed = []
+            for row in rows:
+                if len(claimed) >= limit:
+                    break
+                if slots.get(row["job_type"], 0) <= 0:
+                    continue
+                # Conditional update so concurrent workers never run the same job twice
+                cursor = conn.execute("""
+                    UPDATE jobs
+                    SET status = 'running', attempts = attempts + 1, worker_id = ?, started_at = ?, heartbeat_at = ?
+                    WHERE job_id = ? AND status = 'queued'
+                """, (worker_id, self._now(), self._now(), row["job_id"]))
+                if cursor.rowcount:
+                    claimed.append(row["job_id"])
+                    slots[row["job_type"]] -= 1
+            conn.commit()
+
+            if not claimed:
+                return []
+            jobs = conn.execute(
+                f"SELECT * FROM jobs WHERE job_id IN ({','.join('?' * len(claimed))}) ORDER BY priority DESC, job_id",
+                claimed
+            ).fetchall()
+            return [self._row_to_job(row) for row in jobs]
+        finally:
+            conn.close()
+
+    def complete(self, job_id: int, result: Dict, worker_id: str = None):
+        """Mark a job as succeeded and store its result (only while worker_id still owns it, if given)"""
+        conn = self.get_connection()
+        try:
+            conn.execute("""
+                UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, finished_at = ?
+                WHERE job_id = ? AND (? IS NULL OR (status = 'running' AND worker_id = ?))
+            """, (json.dumps(result, default=str), self._now(), job_id, worker_id, worker_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def fail(self, job_id: int, error: str, base_backoff_seconds: int = 5, worker_id: str = None):
+        """
+        Record a failure; requeue with exponential backoff until max_attempts is reached
+        With worker_id, a job already taken back from that worker (see requeue_stale) is left alone.
+        """
+        conn = self.get_connection()
+        try:
+            row = conn.execute("""
+                SELECT attempts, max_attempts FROM jobs
+                WHERE job_id = ? AND (? IS NULL OR (status = 'running' AND worker_id = ?))
+            """, (job_id, worker_id, worker_id)).fetchone()
+            if row is None:
+                return
+            if row["attempts"] < row["max_attempts"]:
+                retry_at = datetime.now() + timedelta(seconds=base_backoff_seconds * (2 ** (row["attempts"] - 1)))
+                conn.execute("""
+                    UPDATE jobs SET status = 'queued', error = ?, run_after = ?, worker_id = NULL
+                    WHERE job_id = ?
+                """, (error, retry_at.strftime("%Y-%m-%d %H:%M:%S"), job_id))
+                logger.warning(f"Job {job_id} failed (attempt {row['attempts']}), retrying at {retry_at:%H:%M:%S}: {error}")
+            else:
+                conn.execute("""
+                    UPDATE jobs SET status = 'failed', error = ?, finished_at = ?
+                    WHERE job_id = ?
+                """, (error, self._now(), job_id))
+                logger.error(f"Job {job_id} failed permanently: {error}")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_ids: List[int], worker_id: str):
+        """Mark a worker's running jobs as alive, so requeue_stale leaves them alone"""
+        if not job_ids:
+            return
+        conn = self.get_connection()
+        try:
+            conn.execute("""
+                UPDATE jobs SET heartbeat_at = ?
+                WHERE job_id IN (SELECT value FROM json_each(?)) AND status = 'running' AND worker_id = ?
+            """, (self._now(), json.dumps(list(job_ids)), worker_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def requeue_stale(self, older_than_seconds: int = JOB_STALE_SECONDS) -> int:
+        """
+        Take back jobs left 'running' by a worker that died mid-job (no heartbeat for
+        older_than_seconds). The lost run counts as a failed attempt: the job is requeued, or
+        marked failed once it has used max_attempts, so a job that kills its worker cannot loop.
+        """
+        cutoff = (datetime.now() - timedelta(seconds=older_than_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+        conn = self.get_connection()
+        try:
+            cursor = conn.execute("""
+                UPDATE jobs
+                SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                    error = 'Worker stopped responding (attempt ' || attempts || ')',
+                    finished_at = CASE WHEN attempts >= max_attempts THEN ? ELSE finished_at END,
+                    worker_id = NULL
+                WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < ?
+            """, (self._now(), cutoff))
+            conn.commit()
+            if cursor.rowcount:
+                logger.warning(f"Took back {cursor.rowcount} stale running jobs")
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def schedule_due(self, schedules: Dict[str, int] = None) -> List[int]:
+        """
+        Enqueue each periodic job type ({job_type: every_seconds}, defaulting to
+        the handlers registered with every_seconds) whose last run was created
+        at least every_seconds ago and that has nothing queued or running.
+        Safe to call from several workers at once.
+        """
+        if schedules is None:
+            schedules = {
+                job_type: handler["every_seconds"]
+                for job_type, handler in JOB_HANDLERS.items() if handler.get("every_seconds")
+            }
+        if not schedules:
+            return []
+
+        now = datetime.now()
+        conn = self.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            enqueued = []
+            for job_type, every_seconds in schedules.items():
+                row = conn.execute("""
+                    SELECT MAX(created_at) AS last_created,
+                           SUM(status IN ('queued', 'running')) AS pending
+                    FROM jobs WHERE job_type = ?
+                """, (job_type,)).fetchone()
+                if row["pending"]:
+                    continue
+                due_before = (now - timedelta(seconds=every_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+                if row["last_created"] and row["last_created"] > due_before:
+                    continue
+                cursor = conn.execute("""
+                    INSERT INTO jobs (job_type, payload, priority, run_after, created_at)
+                    VALUES (?, '{}', ?, ?, ?)
+                """, (job_type, PRIORITY_LOW, self._now(), self._now()))
+                enqueued.append(cursor.lastrowid)
+            conn.commit()
+            if enqueued:
+                logger.info(f"Scheduled {len(enqueued)} periodic jobs")
+            return enqueued
+        finally:
+            conn.close()
+
+
+class JobWorker:
+    """
+    Drains the job queue on a thread pool, honouring per-type concurrency limits.
+    Every schedule_interval seconds it also requeues stale jobs and enqueues
+    periodic jobs that are due.
+    """
+
+    def __init__(self, queue: JobQueue = None, max_workers: int = 4, poll_interval: float = 0.5,
+                 schedule_interval: float = SCHEDULE_CHECK_SECONDS):
+        self.queue = queue or JobQueue()
+        self.max_workers = max(1, max_workers)
+        self.poll_interval = poll_interval
+        self.schedule_interval = schedule_interval
+        self._maintained_at = 0.0
+        self._heartbeat_at = 0.0
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{id(self)}"
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._running: Dict[str, int] = {}
+        self._running_ids = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _free_slots(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                job_type: handler["max_concurrency"] - self._running.get(job_type, 0)
+                for job_type, handler in JOB_HANDLERS.items()
+                if handler["max_concurrency"] - self._running.get(job_type, 0) > 0
+            }
+
+    def _execute(self, job: Dict):
+        job_type = job["job_type"]
+        try:
+            result = JOB_HANDLERS[job_type]["func"](job["payload"])
+            if isinstance(result, dict) and result.get("error"):
+                self.queue.fail(job["job_id"], str(result["error"]), worker_id=self.worker_id)
+            else:
+                self.queue.complete(job["job_id"], result, worker_id=self.worker_id)
+        except Exception as e:
+            self.queue.fail(job["job_id"], str(e), worker_id=self.worker_id)
+        finally:
+            with self._lock:
+                self._running[job_type] -= 1
+                self._running_ids.discard(job["job_id"])
+
+    def run_pending(self) -> int:
+        """Claim and dispatch as many runnable jobs as there are free slots"""
+        free = self._free_slots()
+        with self._lock:
+            capacity = self.max_workers - sum(self._running.values())
+        if capacity <= 0 or not free:
+            return 0
+
+        dispatched = 0
+        for job in self.queue.claim(free, capacity, self.worker_id):
+            with self._lock:
+                self._running[job["job_type"]] = self._running.get(job["job_type"], 0) + 1
+                self._running_ids.add(job["job_id"])
+            self._pool.submit(self._execute, job)
+            dispatched += 1
+        return dispatched
+
+    def _heartbeat(self):
+        """Keep this worker's running jobs from looking stale (throttled)"""
+        if time.monotonic() - self._heartbeat_at < JOB_HEARTBEAT_SECONDS:
+            return
+        self._heartbeat_at = time.monotonic()
+        with self._lock:
+            job_ids = list(self._running_ids)
+        self.queue.heartbeat(job_ids, self.worker_id)
+
+    def _maintain(self):
+        """Requeue jobs orphaned by dead workers and enqueue due periodic jobs (throttled)"""
+        if time.monotonic() - self._maintained_at < self.schedule_interval:
+            return
+        self._maintained_at = time.monotonic()
+        self.queue.requeue_stale()
+        self.queue.schedule_due()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self._heartbeat()
+                self._maintain()
+                if not self.run_pending():
+                    self._stop.wait(self.poll_interval)
+            except Exception as e:
+                logger.error(f"Job worker loop error: {e}")
+                self._stop.wait(self.poll_interval * 4)
+
+    def start(self):
+        """Start polling in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="job-worker", daemon=True)
+        self._thread.start()
+        logger.info(f"Job worker started ({self.max_workers} threads)")
+
+    def stop(self, wait: bool = True):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._pool.shutdown(wait=wait)
+
+
+_default_queue = None
+_default_worker = None
+_singleton_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue on the default database"""
+    global _default_queue
+    with _singleton_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue()
+        return _default_queue
+
+
+def start_job_worker(max_workers: int = 4) -> JobWorker:
+    """Start the in-process background worker once per process"""
+    global _default_worker
+    queue = get_job_queue()
+    with _singleton_lock:
+        if _default_worker is None:
+            _default_worker = JobWorker(queue, max_workers=max_workers)
+            _default_worker.start()
+        return _default_worker
+
+
+def enqueue_job(job_type: str, payload: Dict, priority: int = PRIORITY_NORMAL, max_attempts: int = 3) -> int:
+    """Enqueue a job on the default queue"""
+    return get_job_queue().enqueue(job_type, payload, priority=priority, max_attempts=max_attempts)
+
+
+def get_job(job_id: int) -> Optional[Dict]:
+    """Look up a job on the default queue"""
+    return get_job_queue().get_job(job_id)
+
+
+# ========================
+# BUILT-IN JOB HANDLERS
+# ========================
+def _screening_service(db_path=None):
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    from mb import MultiModalScreeningService
+    return MultiModalScreeningService(db_path)
+
+
+@register_job_handler("screen_voice", max_concurrency=4)
+def handle_screen_voice(payload: Dict) -> Dict:
+    """Score a voice transcript (keyword + optional GPT analysis)"""
+    return _screening_service(payload.get("db_path")).screen_candidate_voice(
+        payload["student_id"], payload["transcript"]
+    )
+
+
+@register_job_handler("screen_audio", max_concurrency=4)
+def handle_screen_audio(payload: Dict) -> Dict:
+    """Transcribe an audio submission and score it"""
+    return _screening_service(payload.get("db_path")).screen_candidate_from_audio(
+        payload["student_id"], payload["audio_file_path"]
+    )
+
+
+@register_job_handler("parse_resume", max_concurrency=2)
+def handle_parse_resume(payload: Dict) -> Dict:
+    """Parse an uploaded resume (file bytes are base64 encoded in the payload)"""
+    if str(Path(__file__).parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).parent))
+    from resume_parser import get_resume_parser
+
+    parsed = get_resume_parser().parse(payload["file_name"], base64.b64decode(payload["file_b64"]))
+    # An unparseable resume is a final answer, not a transient failure worth retrying
+    return {"parsed": parsed}
+
+
+@register_job_handler("score_churn_risk", max_concurrency=1, every_seconds=DAILY)
+def handle_score_churn_risk(payload: Dict) -> Dict:
+    """Batch-rescore churn risk for all students (runs daily)"""
+    if str(Path(__file__).parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).parent))
+    from services.gamification import score_all_churn_risk
+
+    return score_all_churn_risk()
+
+
+@register_job_handler("train_churn_model", max_concurrency=1, every_seconds=WEEKLY)
+def handle_train_churn_model(payload: Dict) -> Dict:
+    """Retrain the churn model, activate it and rescore churn_risk_scores (runs weekly)"""
+    if str(Path(__file__).parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).parent))
+    from services.churn_model import CHURN_HORIZON_DAYS, train_churn_model
+    from services.gamification import score_all_churn_risk
+
+    result = train_churn_model(
+        horizon_days=payload.get("horizon_days", CHURN_HORIZON_DAYS),
+        use_xgboost=payload.get("use_xgboost", False)
+    )
+    if "error" in result:
+        return result
+    return {**result, "rescored": score_all_churn_risk()}
+
+
+@register_job_handler("skill_gap_heatmap", max_concurrency=1, every_seconds=DAILY)
+def handle_skill_gap_heatmap(payload: Dict) -> Dict:
+    """Recompute the cohort role x skill gap heatmap (runs daily; also enqueue after profile imports)"""
+    if str(Path(__file__).parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).parent))
+    from services.skill_gap_heatmap import compute_skill_gap_heatmap, refresh_heatmap_if_stale
+
+    if payload.get("force", True):
+        return compute_skill_gap_heatmap()
+    return refresh_heatmap_if_stale()
+
+
+@register_job_handler("update_feedback_themes", max_concurrency=1, every_seconds=HOURLY)
+def handle_update_feedback_themes(payload: Dict) -> Dict:
+    """Add newly completed feedback to the theme term counts (runs hourly; also enqueue after survey imports)"""
+    if str(Path(__file__).parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).parent))
+    from services.feedback_themes import update_feedback_themes
+
+    return update_feedback_themes()
+
+
+@register_job_handler("survey_reminders", max_concurrency=1, every_seconds=DAILY)
+def handle_survey_reminders(payload: Dict) -> Dict:
+    """Queue reminder emails for surveys pending more than payload["days"] days (runs daily)"""
+    if str(Path(__file__).parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).parent))
+    from survey_lifecycle import queue_survey_reminders
+    from email_outbox import enqueue_outbox_delivery
+
+    result = queue_survey_reminders(
+        days=payload.get("days", 7), limit=payload.get("limit", 500), max_reminders=payload.get("max_reminders", 2)
+    )
+    if result.get("queued"):
+        enqueue_outbox_delivery()
+    return result
+
+
+@register_job_handler("award_badges", max_concurrency=1)
+def handle_award_badges(payload: Dict) -> Dict:
+    """Re-evaluate badge rules for the given user_ids (whole cohort if omitted), e.g. after a bulk import"""
+    if str(Path(__file__).parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).parent))
+    from services.gamification import award_badges
+
+    awarded = award_badges(payload.get("user_ids"))
+    return {"badges_awarded": len(awarded)}
+
+
+@register_job_handler("recompute_streaks", max_concurrency=1, every_seconds=DAILY)
+def handle_recompute_streaks(payload: Dict) -> Dict:
+    """Rebuild learning streaks from the activity log (runs daily)"""
+    if str(Path(__file__).parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).parent))
+    from services.gamification import recompute_streaks
+
+    return recompute_streaks(payload.get("user_ids"))
+
+
+@register_job_handler("retention_snapshot", max_concurrency=1, every_seconds=DAILY)
+def handle_retention_snapshot(payload: Dict) -> Dict:
+    """Write today's retention_daily_snapshots row (runs daily)"""
+    if str(Path(__file__).parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).parent))
+    from services.gamification import take_retention_snapshot
+
+    return take_retention_snapshot()
+
+
+@register_job_handler("deliver_interventions", max_concurrency=2)
+def handle_deliver_interventions(payload: Dict) -> Dict:
+    """Send queued intervention deliveries for one channel, re-enqueueing itself while deliveries are ready or backing off"""
+    if str(Path(__file__).parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).parent))
+    from services.interventions import InterventionDispatcher
+
+    dispatcher = InterventionDispatcher(payload.get("db_path") or DB_PATH)
+    result = dispatcher.deliver_pending(payload["channel"])
+    if result["remaining"]:
+        dispatcher.enqueue_delivery(payload["channel"])
+    elif result["next_attempt_at"]:
+        wait = (datetime.strptime(result["next_attempt_at"], "%Y-%m-%d %H:%M:%S") - datetime.now()).total_seconds()
+        dispatcher.enqueue_delivery(payload["channel"], delay_seconds=max(wait, 0))
+    return result
+
+
+@register_job_handler("deliver_email_outbox", max_concurrency=1)
+def handle_deliver_email_outbox(payload: Dict) -> Dict:
+    """Drain the survey email outbox, re-enqueueing itself while messages are ready or waiting on backoff"""
+    if str(Path(__file__).parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).parent))
+    from email_outbox import deliver_outbox, enqueue_outbox_delivery
+
+    db_path = payload.get("db_path") or DB_PATH
+    result = deliver_outbox(db_path)
+    if result["ready"]:
+        enqueue_outbox_delivery(db_path)
+    elif result["next_attempt_at"]:
+        wait = (datetime.strptime(result["next_attempt_at"], "%Y-%m-%d %H:%M:%S") - datetime.now()).total_seconds()
+        enqueue_outbox_delivery(db_path, delay_seconds=max(wait, 0))
+    return result
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    worker = JobWorker(JobQueue(), max_workers=int(sys.argv[1]) if len(sys.argv) > 1 else 4)
+    worker.start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        worker.stop()
@@ -8,6 +8,9 @@ import pandas as pd
 import re
 import json
 import uuid
+import time
+import base64
+import sys
 import qrcode
 from PIL import Image, ImageDraw, ImageFont
 from io import BytesIO
@@ -26,6 +29,10 @@ logger = logging.getLogger(__name__)
 # SQLite database path
 DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from resume_parser import get_resume_parser
+from job_queue import enqueue_job, get_job, start_job_worker, PRIORITY_HIGH
+
 # Import blob storage manager for optional resume archival
 try:
     from app.data.blob_storage import get_blob_storage_manager
@@ -57,128 +64,24 @@ def validate_phone(phone):
     pattern = r'^[\d\s\-\+\(\)]{10,}$'
     return re.match(pattern, phone) is not None
 
-def extract_name_from_text(text):
-    """Extract likely name from text"""
-    lines = text.split('\n')
-    for line in lines[:5]:
-        line = line.strip()
-        if line and len(line.split()) >= 2:
-            words = line.split()[:2]
-            if all(word.isalpha() for word in words):
-                return words[0], words[1] if len(words) > 1 else ""
-    return "", ""
-
-def extract_email_from_text(text):
-    """Extract email from text"""
-    pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    match = re.search(pattern, text)
-    return match.group(0) if match else ""
-
-def extract_phone_from_text(text):
-    """Extract phone from text"""
-    pattern = r'(?:\+91|0)?[\s\-]?[6-9]\d{9}|(?:\+\d{1,3}[-.\s]?)?\(?(\d{3})\)?[-.\s]?(\d{3})[-.\s]?(\d{4})'
-    matches = re.findall(pattern, text)
-    if matches:
-        if isinstance(matches[0], tuple):
-            return f"({matches[0][0]}) {matches[0][1]}-{matches[0][2]}"
-        return matches[0]
-    return ""
-
-def extract_skills_from_text(text):
-    """Extract technical skills from text"""
-    all_skills = [
-        "Python", "Java", "JavaScript", "C++", "C#", "SQL", "R",
-        "React", "Angular", "Vue", "Node.js", "Django", "Flask",
-        "AWS", "Azure", "GCP", "Docker", "Kubernetes",
-        "Machine Learning", "Data Analysis", "Data Science",
-        "TensorFlow", "PyTorch", "Scikit-learn", "Pandas", "NumPy",
-        "Communication", "Leadership", "Teamwork", "Problem Solving"
-    ]
-    
-    found_skills = []
-    text_lower = text.lower()
-    
-    for skill in all_skills:
-        if skill.lower() in text_lower:
-            found_skills.append(skill)
-    
-    return list(set(found_skills))
-
-def extract_education_from_text(text):
-    """Extract education information from text"""
-    education = []
-    
-    degree_patterns = {
-        "Bachelor": r"(?:B\.?A|B\.?S|BA|BS)(?:\s+in\s+([^,\n]+))?",
-        "Master": r"(?:M\.?A|M\.?S|MA|MS)(?:\s+in\s+([^,\n]+))?",
-        "PhD": r"(?:Ph\.?D|PhD)(?:\s+in\s+([^,\n]+))?"
-    }
-    
-    for degree_type, pattern in degree_patterns.items():
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            field = match.group(1) if match.group(1) else "Not specified"
-            education.append({
-                "degree": degree_type,
-                "field": field.strip()
-            })
-    
-    return education
-
 def parse_resume(uploaded_file):
     """Parse resume and extract information"""
     try:
         if uploaded_file is None:
             return None
-        
-        file_type = uploaded_file.name.split('.')[-1].lower()
-        text = ""
-        
-        if file_type == "pdf":
-            try:
-                import pdfplumber
-                with pdfplumber.open(BytesIO(uploaded_file.getvalue())) as pdf:
-                    for page in pdf.pages:
-                        text += page.extract_text() or ""
-            except Exception as e:
-                logger.error(f"PDF parsing error: {e}")
-                return None
-        
-        elif file_type in ["docx", "doc"]:
-            try:
-                from docx import Document
-                doc = Document(BytesIO(uploaded_file.getvalue()))
-                for para in doc.paragraphs:
-                    text += para.text + "\n"
-            except Exception as e:
-                logger.error(f"DOCX parsing error: {e}")
-                return None
-        else:
-            return None
-        
-        if not text:
-            return None
-        
-        first_name, last_name = extract_name_from_text(text)
-        email = extract_email_from_text(text)
-        phone = extract_phone_from_text(text)
-        skills = extract_skills_from_text(text)
-        education = extract_education_from_text(text)
-        
-        return {
-            "first_name": first_name,
-            "last_name": last_name,
-            "email": email,
-            "phone": phone,
-            "skills": skills,
-            "education": education,
-            "raw_text": text
-        }
-    
+        return get_resume_parser().parse(uploaded_file.name, uploaded_file.getvalue())
     except Exception as e:
         logger.error(f"Resume parsing error: {e}")
         return None
 
+def enqueue_resume_parse(uploaded_file):
+    """Queue resume parsing on the background worker; returns the job_id"""
+    payload = {
+        "file_name": uploaded_file.name,
+        "file_b64": base64.b64encode(uploaded_file.getvalue()).decode("ascii")
+    }
+    return enqueue_job("parse_resume", payload, priority=PRIORITY_HIGH, max_attempts=1)
+
 def generate_student_id():
     """Generate unique student ID"""
     timestamp = datetime.now().strftime("%Y")
@@ -551,8 +454,29 @@ with tab1:
     if uploaded_file is not None:
         st.info(f"📄 File uploaded: {uploaded_file.name}")
         
-        with st.spinner("🔍 Parsing resume..."):
-            parsed_resume = parse_resume(uploaded_file)
+        # Same content already parsed in this process: served from the hash cache
+        cache_hit, parsed_resume = get_resume_parser().get_cached(uploaded_file.name, uploaded_file.getvalue())
+        
+        if not cache_hit:
+            # Parse on the background worker; reruns with the same upload reuse the job
+            upload_key = f"{uploaded_file.name}:{uploaded_file.size}"
+            if st.session_state.get("resume_upload_key") != upload_key:
+                start_job_worker()
+                st.session_state.resume_upload_key = upload_key
+                st.session_state.resume_job_id = enqueue_resume_parse(uploaded_file)
+            
+            resume_job = get_job(st.session_state.resume_job_id)
+            
+            if resume_job and resume_job["status"] in ("queued", "running"):
+                with st.spinner("🔍 Parsing resume..."):
+                    time.sleep(0.5)
+                st.rerun()
+            
+            if resume_job and resume_job["status"] == "succeeded":
+                parsed_resume = (resume_job.get("result") or {}).get("parsed")
+            elif resume_job is None:
+                # Job record missing (e.g. queue table reset); parse inline instead
+                parsed_resume = parse_resume(uploaded_file)
         
         if parsed_resume:
             st.success("✓ Resume parsed successfully!")
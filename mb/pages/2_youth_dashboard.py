@@ -15,7 +15,8 @@ import json
 import sys
 from pathlib import Path as PathlibPath
 sys.path.insert(0, str(PathlibPath(__file__).parent.parent))
-from services.gamification import check_and_award_badges, get_user_badges, get_user_streak, get_motivational_message, update_streak
+from services.gamification import check_and_award_badges, get_user_badges, get_user_streak, get_motivational_message, update_streak, log_learning_activity
+from services.leaderboard import init_leaderboard_service
 from job_scraper import fetch_jobs
 from resume_matcher import match_resume_to_job, get_quick_match_score
 from interview_bot import simulate_interview
@@ -142,6 +143,21 @@ def update_module_status(module_assignment_id, status, progress=None):
         conn = sqlite3.connect(str(DB_PATH))
         cursor = conn.cursor()
         
+        # Append to the activity log in the same transaction (streaks are derived from it)
+        cursor.execute(
+            "SELECT user_id, module_id FROM learning_modules WHERE module_assignment_id = ?",
+            (module_assignment_id,)
+        )
+        module_row = cursor.fetchone()
+        if module_row:
+            log_learning_activity(
+                module_row[0],
+                module_id=module_row[1],
+                event_type=status,
+                progress=100 if status == "completed" else progress,
+                conn=conn
+            )
+        
         update_fields = ["status = ?"]
         params = [status]
         
@@ -241,6 +257,39 @@ else:
     motivational = get_motivational_message(stats['completed_modules'])
     st.info(f"💡 {motivational}")
     
+    # Leaderboard (top-K boards are served from memory)
+    with st.expander("🏆 Leaderboard", expanded=False):
+        leaderboard = init_leaderboard_service()
+        lb_col1, lb_col2 = st.columns(2)
+        with lb_col1:
+            lb_metric = st.selectbox(
+                "Rank by",
+                ["badges", "streak", "modules_completed"],
+                format_func=lambda m: {"badges": "🏅 Badges", "streak": "🔥 Streak", "modules_completed": "📚 Modules Completed"}[m],
+                key="leaderboard_metric"
+            )
+        with lb_col2:
+            lb_scope = st.selectbox(
+                "Compare with",
+                ["all", "school", "cohort", "region"],
+                format_func=lambda s: {"all": "Everyone", "school": "My School", "cohort": "My Cohort", "region": "My Region"}[s],
+                key="leaderboard_scope"
+            )
+        
+        my_rank = leaderboard.get_user_rank(st.session_state.user_id, metric=lb_metric, scope_type=lb_scope)
+        if my_rank.get("rank"):
+            st.metric("Your Rank", f"#{my_rank['rank']} of {my_rank['total']}", f"Score: {my_rank['score']}")
+            board = leaderboard.get_leaderboard(lb_metric, lb_scope, my_rank["scope_value"], limit=10)
+            if board:
+                st.dataframe(
+                    pd.DataFrame(board)[["rank", "student_id", "score"]],
+                    column_config={"rank": "Rank", "student_id": "Student ID", "score": "Score"},
+                    width="stretch",
+                    hide_index=True
+                )
+        else:
+            st.info("No ranking available for this view yet.")
+    
     st.markdown("---")
     
     # YOUTH POTENTIAL SCORE SECTION
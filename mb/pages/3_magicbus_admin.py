@@ -27,21 +27,36 @@ from feedback_survey import (
     get_employer_feedback_analytics,
     get_youth_feedback_analytics,
     get_pending_surveys,
-    get_survey_distribution_status,
+    list_survey_distributions,
+    get_distribution_counts,
     create_employer_survey_entry,
-    create_youth_survey_entry
+    create_youth_survey_entry,
+    create_employer_survey_entries,
+    create_youth_survey_entries,
+    get_survey_token
 )
 from email_service import (
     send_employer_survey_email,
     send_youth_survey_email,
     verify_email_configuration
 )
+from email_outbox import (
+    new_campaign_id,
+    enqueue_outbox_delivery,
+    get_outbox_progress,
+    get_dead_letters,
+    requeue_dead_letters
+)
 
 # Import multimodal screening service
 import sys
 from pathlib import Path as PathlibPath
 sys.path.insert(0, str(PathlibPath(__file__).parent.parent))
 from integrations.multimodal_screening import MultiModalScreeningService
+from job_queue import get_job_queue, start_job_worker
+from feedback_db import list_feedback_surveys, get_feedback_company_counts
+from survey_lifecycle import get_campaign_funnel, get_reminder_candidates, queue_survey_reminders
+from services.feedback_themes import refresh_feedback_themes_if_stale, get_feedback_themes, get_theme_scopes
 
 st.set_page_config(page_title="Magic Bus Staff Dashboard", page_icon="📈", layout="wide")
 
@@ -52,6 +67,37 @@ st.info("👋 Welcome to the MagicBus Admin Dashboard. This dashboard provides c
 
 DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
 
+
+def render_keyset_page(state_key: str, filters: tuple, fetch_page):
+    """
+    Show one page of a keyset listing with Previous / Next buttons
+    fetch_page(cursor) returns {"rows", "next_cursor", "total"}; the cursors of earlier pages are
+    kept in session state (reset whenever the filters change), so paging never re-reads skipped rows.
+    """
+    state = st.session_state.get(state_key)
+    if state is None or state["filters"] != filters:
+        state = st.session_state[state_key] = {"filters": filters, "cursors": [None]}
+    
+    page = fetch_page(state["cursors"][-1])
+    page_number = len(state["cursors"])
+    
+    if page["rows"]:
+        st.dataframe(pd.DataFrame(page["rows"]), width="stretch", hide_index=True)
+    else:
+        st.info("No matching records")
+    
+    col_prev, col_info, col_next = st.columns([1, 3, 1])
+    with col_prev:
+        if st.button("⬅️ Previous", key=f"{state_key}_prev", disabled=page_number == 1):
+            state["cursors"].pop()
+            st.rerun()
+    with col_info:
+        st.caption(f"Page {page_number} · {page['total']:,} matching records")
+    with col_next:
+        if st.button("Next ➡️", key=f"{state_key}_next", disabled=page["next_cursor"] is None):
+            state["cursors"].append(page["next_cursor"])
+            st.rerun()
+
 # Initialize feedback tables on first load
 init_feedback_tables()
 
@@ -570,17 +616,18 @@ with main_tabs[5]:
             cursor = conn.cursor()
             
             try:
-                cursor.execute("SELECT COUNT(*) FROM mb_multimodal_screenings")
-                total_screenings = cursor.fetchone()[0] or 0
-                
-                cursor.execute("SELECT COUNT(*) FROM mb_multimodal_screenings WHERE personality_fit_level = 'High'")
-                high_fit = cursor.fetchone()[0] or 0
-                
-                cursor.execute("SELECT AVG(overall_soft_skill_score) FROM mb_multimodal_screenings")
-                avg_score = cursor.fetchone()[0] or 0
-                
-                cursor.execute("SELECT COUNT(DISTINCT student_id) FROM mb_multimodal_screenings")
-                unique_candidates = cursor.fetchone()[0] or 0
+                # Single-row KPI rollup maintained by screening triggers
+                cursor.execute("""
+                    SELECT total_screenings, fit_high,
+                           CASE WHEN n_overall > 0 THEN sum_overall / n_overall END,
+                           unique_students
+                    FROM screening_kpi_rollup WHERE rollup_id = 1
+                """)
+                row = cursor.fetchone() or (0, 0, 0, 0)
+                total_screenings = row[0] or 0
+                high_fit = row[1] or 0
+                avg_score = row[2] or 0
+                unique_candidates = row[3] or 0
                 
             except:
                 total_screenings = high_fit = avg_score = unique_candidates = 0
@@ -624,6 +671,41 @@ with main_tabs[5]:
                     
             except Exception as e:
                 st.error(f"Error loading screenings: {e}")
+            
+            st.markdown("---")
+            st.markdown("### ⏳ Background Screening Jobs")
+            
+            with st.expander("➕ Queue a Screening"):
+                with st.form("queue_screening_form"):
+                    queue_student_id = st.number_input("Student ID", min_value=1, step=1, key="queue_screening_student")
+                    queue_audio_path = st.text_input("Audio file path (WhatsApp voice note, etc.)")
+                    queue_transcript = st.text_area("...or paste a transcript", height=100)
+                    
+                    if st.form_submit_button("📥 Queue Screening"):
+                        start_job_worker()
+                        if queue_audio_path.strip():
+                            job_id = screener.enqueue_audio_screening(queue_student_id, queue_audio_path.strip())
+                        elif queue_transcript.strip():
+                            job_id = screener.enqueue_voice_screening(queue_student_id, queue_transcript.strip())
+                        else:
+                            job_id = None
+                            st.warning("Provide an audio file path or a transcript")
+                        if job_id:
+                            st.success(f"✅ Screening queued as job #{job_id}")
+            
+            try:
+                screening_jobs = get_job_queue().get_jobs(["screen_voice", "screen_audio"], limit=20)
+                if screening_jobs:
+                    df_jobs = pd.DataFrame(screening_jobs)[
+                        ["job_id", "job_type", "status", "priority", "attempts", "created_at", "finished_at", "error"]
+                    ]
+                    st.dataframe(df_jobs, use_container_width=True, hide_index=True)
+                    if (df_jobs["status"].isin(["queued", "running"])).any():
+                        st.button("🔄 Refresh Job Status", key="refresh_screening_jobs")
+                else:
+                    st.info("No background screening jobs yet")
+            except Exception as e:
+                st.error(f"Error loading screening jobs: {e}")
         
         with screening_subtab2:
             st.markdown("### Review & Approve Screenings")
@@ -966,17 +1048,46 @@ with main_tabs[7]:
             
             st.markdown("---")
             
-            # Top strengths
-            if employer_analytics['top_strengths']:
-                st.markdown("**Top Strengths Mentioned:**")
-                for i, strength in enumerate(employer_analytics['top_strengths'][:5], 1):
-                    st.write(f"{i}. {strength[:100]}...")
+            # Themes from strengths / areas for improvement (precomputed term counts)
+            refresh_feedback_themes_if_stale()
+            theme_scopes = get_theme_scopes()
+            
+            col_t1, col_t2 = st.columns(2)
+            with col_t1:
+                theme_employer = st.selectbox(
+                    "Employer", ["All employers"] + theme_scopes['employers'], key="theme_employer"
+                )
+            with col_t2:
+                theme_period = st.selectbox(
+                    "Period", ["All time"] + theme_scopes['periods'], key="theme_period"
+                )
+            theme_filters = {
+                "employer": None if theme_employer == "All employers" else theme_employer,
+                "periods": None if theme_period == "All time" else [theme_period],
+                "n": 8
+            }
+            
+            for field, heading in (("strengths", "Top Strength Themes"), ("areas_for_improvement", "Improvement Themes")):
+                themes = get_feedback_themes(field, **theme_filters)
+                if not themes.empty:
+                    st.markdown(f"**{heading}:**")
+                    st.dataframe(
+                        themes.rename(columns={
+                            "term": "Theme", "mentions": "Responses", "share_pct": "% of Responses"
+                        })[["Theme", "Responses", "% of Responses"]],
+                        width="stretch",
+                        hide_index=True
+                    )
             
-            # Areas for improvement
+            # A few verbatim quotes for context
+            if employer_analytics['top_strengths']:
+                with st.expander("💬 Recent strength comments"):
+                    for strength in employer_analytics['top_strengths'][:5]:
+                        st.write(f"• {strength[:200]}")
             if employer_analytics['areas_for_improvement']:
-                st.markdown("**Areas for Improvement:**")
-                for i, area in enumerate(employer_analytics['areas_for_improvement'][:5], 1):
-                    st.write(f"{i}. {area[:100]}...")
+                with st.expander("💬 Recent improvement comments"):
+                    for area in employer_analytics['areas_for_improvement'][:5]:
+                        st.write(f"• {area[:200]}")
         
         else:
             st.info("📊 No employer feedback data available yet")
@@ -1050,6 +1161,40 @@ with main_tabs[7]:
     
     st.markdown("---")
     
+    # Individual feedback responses, paged newest first
+    st.markdown("### 📋 Feedback Responses")
+    
+    feedback_kinds = {
+        "Employer Interview": "interview",
+        "Employer Placement": "placement",
+        "Youth Post-Placement": "youth"
+    }
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        feedback_kind = feedback_kinds[st.selectbox("Feedback Type", list(feedback_kinds), key="feedback_kind")]
+    with col2:
+        feedback_employers = get_feedback_company_counts(feedback_kind)
+        feedback_employer = st.selectbox(
+            "Company", ["All"] + [name for name in feedback_employers if name], key="feedback_employer"
+        )
+    with col3:
+        feedback_from = st.date_input("Completed From", value=None, key="feedback_from")
+    with col4:
+        feedback_to = st.date_input("Completed To", value=None, key="feedback_to")
+    
+    feedback_filters = {
+        "employer": None if feedback_employer == "All" else feedback_employer,
+        "date_from": feedback_from.isoformat() if feedback_from else None,
+        "date_to": feedback_to.isoformat() if feedback_to else None
+    }
+    render_keyset_page(
+        "feedback_pages",
+        (feedback_kind, *feedback_filters.values()),
+        lambda cursor: list_feedback_surveys(feedback_kind, limit=50, cursor=cursor, **feedback_filters)
+    )
+    
+    st.markdown("---")
+    
     # Overall insights
     st.markdown("### 🎯 Key Insights & Recommendations")
     
@@ -1162,7 +1307,8 @@ with main_tabs[8]:
                                     employer_name=employer_name,
                                     student_name=student_id,
                                     job_title=job_title,
-                                    survey_id=survey_id
+                                    survey_id=survey_id,
+                                    survey_token=get_survey_token("employer", survey_id)
                                 )
                                 if email_success:
                                     st.success(email_msg)
@@ -1185,43 +1331,20 @@ with main_tabs[8]:
                     st.dataframe(df_bulk, width="stretch")
                     
                     if st.button("📧 Send Surveys to All Employers", key="send_emp_bulk"):
-                        success_count = 0
-                        fail_count = 0
-                        
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-                        
-                        for idx, row in df_bulk.iterrows():
-                            status_text.text(f"Processing {idx + 1}/{len(df_bulk)}...")
-                            
-                            success, message, survey_id = create_employer_survey_entry(
-                                student_id=row['student_id'],
-                                employer_name=row['employer_name'],
-                                employer_email=row['employer_email'],
-                                job_title=row['job_title']
+                        # Survey rows and their emails commit together; delivery happens in the background
+                        with st.spinner("Creating surveys..."):
+                            created, rejected = create_employer_survey_entries(
+                                df_bulk, queue_email=is_configured, campaign_id=new_campaign_id("employer")
                             )
-                            
-                            if success and is_configured:
-                                email_success, _ = send_employer_survey_email(
-                                    employer_email=row['employer_email'],
-                                    employer_name=row['employer_name'],
-                                    student_name=row['student_id'],
-                                    job_title=row['job_title'],
-                                    survey_id=survey_id
-                                )
-                                if email_success:
-                                    success_count += 1
-                                else:
-                                    fail_count += 1
-                            elif success:
-                                success_count += 1
-                            else:
-                                fail_count += 1
-                            
-                            progress_bar.progress((idx + 1) / len(df_bulk))
                         
-                        status_text.text("")
-                        st.success(f"✅ Sent {success_count} surveys, {fail_count} failed")
+                        if is_configured and len(created):
+                            enqueue_outbox_delivery()
+                            start_job_worker()
+                            st.success(f"✅ Created {len(created)} surveys ({len(rejected)} rejected); emails are sending in the background")
+                        else:
+                            st.success(f"✅ Created {len(created)} surveys, {len(rejected)} rejected")
+                        if len(rejected):
+                            st.dataframe(rejected, width="stretch")
                 
                 except Exception as e:
                     st.error(f"❌ Error processing file: {e}")
@@ -1264,7 +1387,8 @@ with main_tabs[8]:
                                     youth_name=youth_name,
                                     placement_company=company_name,
                                     job_title=position,
-                                    survey_id=survey_id
+                                    survey_id=survey_id,
+                                    survey_token=get_survey_token("youth", survey_id)
                                 )
                                 if email_success:
                                     st.success(email_msg)
@@ -1287,59 +1411,137 @@ with main_tabs[8]:
                     st.dataframe(df_youth_bulk, width="stretch")
                     
                     if st.button("📧 Send Surveys to All Students", key="send_youth_bulk"):
-                        success_count = 0
-                        fail_count = 0
-                        
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-                        
-                        for idx, row in df_youth_bulk.iterrows():
-                            status_text.text(f"Processing {idx + 1}/{len(df_youth_bulk)}...")
-                            
-                            success, message, survey_id = create_youth_survey_entry(
-                                student_id=row['student_id'],
-                                user_id=int(row['user_id']),
-                                placement_company=row['company_name'],
-                                job_title=row['position']
+                        # Survey rows and their emails commit together; delivery happens in the background
+                        with st.spinner("Creating surveys..."):
+                            created, rejected = create_youth_survey_entries(
+                                df_youth_bulk, queue_email=is_configured, campaign_id=new_campaign_id("youth")
                             )
-                            
-                            if success and is_configured:
-                                email_success, _ = send_youth_survey_email(
-                                    youth_email=row['youth_email'],
-                                    youth_name=row['youth_name'],
-                                    placement_company=row['company_name'],
-                                    job_title=row['position'],
-                                    survey_id=survey_id
-                                )
-                                if email_success:
-                                    success_count += 1
-                                else:
-                                    fail_count += 1
-                            elif success:
-                                success_count += 1
-                            else:
-                                fail_count += 1
-                            
-                            progress_bar.progress((idx + 1) / len(df_youth_bulk))
                         
-                        status_text.text("")
-                        st.success(f"✅ Sent {success_count} surveys, {fail_count} failed")
+                        if is_configured and len(created):
+                            enqueue_outbox_delivery()
+                            start_job_worker()
+                            st.success(f"✅ Created {len(created)} surveys ({len(rejected)} rejected); emails are sending in the background")
+                        else:
+                            st.success(f"✅ Created {len(created)} surveys, {len(rejected)} rejected")
+                        if len(rejected):
+                            st.dataframe(rejected, width="stretch")
                 
                 except Exception as e:
                     st.error(f"❌ Error processing file: {e}")
     
+    st.markdown("---")
+    st.markdown("### 📬 Email Campaigns")
+    
+    campaigns = get_outbox_progress()
+    if campaigns:
+        for campaign in campaigns:
+            delivered = (campaign['sent'] + campaign['dead']) / campaign['total'] if campaign['total'] else 1
+            st.progress(
+                delivered,
+                text=(
+                    f"{campaign['campaign_id'] or 'single sends'}: {campaign['sent']}/{campaign['total']} sent · "
+                    f"{campaign['pending']} pending ({campaign['retrying']} retrying) · {campaign['dead']} failed"
+                )
+            )
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("▶️ Resume Delivery", key="resume_outbox"):
+                enqueue_outbox_delivery()
+                start_job_worker()
+                st.success("✅ Delivery job queued")
+        with col2:
+            if st.button("🔁 Retry Failed Emails", key="retry_dead_letters"):
+                requeued = requeue_dead_letters()
+                if requeued:
+                    enqueue_outbox_delivery()
+                    start_job_worker()
+                st.success(f"✅ Requeued {requeued} emails")
+        
+        dead_letters = get_dead_letters(limit=50)
+        if dead_letters:
+            with st.expander(f"❌ Failed emails ({len(dead_letters)})"):
+                st.dataframe(pd.DataFrame(dead_letters), width="stretch", hide_index=True)
+        
+        # Lifecycle funnel for one campaign (reads only that campaign's surveys)
+        campaign_ids = [campaign['campaign_id'] for campaign in campaigns if campaign['campaign_id']]
+        if campaign_ids:
+            st.markdown("#### 📈 Campaign Funnel")
+            funnel_campaign = st.selectbox("Campaign", campaign_ids, key="funnel_campaign")
+            funnel = get_campaign_funnel(funnel_campaign)
+            
+            if funnel.get('surveys', 0) > 0:
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Sent", funnel['sent'], help=f"{funnel['surveys']} surveys, {funnel['failed']} failed")
+                with col2:
+                    st.metric("Opened", funnel['opened'], f"{funnel['open_rate']}%", delta_color="off")
+                with col3:
+                    st.metric("Completed", funnel['completed'], f"{funnel['completion_rate']}%", delta_color="off")
+                with col4:
+                    st.metric("Reminders Sent", funnel['reminders_sent'])
+                
+                latency = pd.DataFrame(
+                    [funnel['hours_to_open'], funnel['hours_to_complete']],
+                    index=["Hours to open", "Hours to complete"]
+                )
+                st.dataframe(latency, width="stretch")
+            else:
+                st.info("No lifecycle events recorded for this campaign yet")
+        
+        # Reminder batches for surveys still pending after N days
+        st.markdown("#### 🔔 Survey Reminders")
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            reminder_days = st.number_input("Pending for more than (days)", min_value=1, value=7, key="reminder_days")
+        reminder_candidates = get_reminder_candidates(days=int(reminder_days), limit=500)
+        with col2:
+            st.markdown(f"**{len(reminder_candidates)}{'+' if len(reminder_candidates) == 500 else ''}** surveys awaiting a reminder")
+            if reminder_candidates and st.button("🔔 Queue Reminders", key="queue_reminders"):
+                result = queue_survey_reminders(days=int(reminder_days), limit=500)
+                if result['queued']:
+                    enqueue_outbox_delivery()
+                    start_job_worker()
+                st.success(f"✅ Queued {result['queued']} reminders ({result['skipped']} without a stored email)")
+    else:
+        st.info("No email campaigns yet")
+    
     st.markdown("---")
     st.markdown("### 📊 Distribution Status")
     
     try:
-        dist_status = get_survey_distribution_status()
+        dist_counts = get_distribution_counts()
         
-        if not dist_status.empty:
-            st.markdown(f"**Total Surveys Sent:** {len(dist_status)}")
-            st.markdown(f"**Completed:** {dist_status['completed'].sum() if 'completed' in dist_status.columns else 0}")
-            st.markdown(f"**Pending:** {(~dist_status['completed']).sum() if 'completed' in dist_status.columns else len(dist_status)}")
+        if dist_counts['total'] > 0:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total Surveys Sent", dist_counts['total'])
+            with col2:
+                st.metric("Completed", dist_counts['completed'])
+            with col3:
+                st.metric("Pending", dist_counts['sent'] + dist_counts['opened'])
             
-            st.dataframe(dist_status, width="stretch", hide_index=True)
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                dist_status_filter = st.selectbox("Status", ["All", "sent", "opened", "completed"], key="dist_status_filter")
+            with col2:
+                dist_type_filter = st.selectbox("Survey Type", ["All"] + list(dist_counts['by_survey_type']), key="dist_type_filter")
+            with col3:
+                dist_from = st.date_input("Sent From", value=None, key="dist_from")
+            with col4:
+                dist_to = st.date_input("Sent To", value=None, key="dist_to")
+            
+            dist_filters = {
+                "status": None if dist_status_filter == "All" else dist_status_filter,
+                "survey_type": None if dist_type_filter == "All" else dist_type_filter,
+                "date_from": dist_from.isoformat() if dist_from else None,
+                "date_to": dist_to.isoformat() if dist_to else None
+            }
+            render_keyset_page(
+                "dist_pages",
+                tuple(dist_filters.values()),
+                lambda cursor: list_survey_distributions(limit=50, cursor=cursor, **dist_filters)
+            )
         else:
             st.info("No surveys sent yet")
     except Exception as e:
@@ -1353,13 +1555,30 @@ with main_tabs[9]:
     st.markdown("*Proactive intervention system to retain high-potential students*")
     
     try:
-        from mb.pages.gamification import predict_churn_risk, trigger_churn_intervention
+        from services.gamification import (
+            trigger_churn_intervention,
+            refresh_churn_scores_if_stale,
+            score_all_churn_risk,
+            get_churn_risk_scores,
+            get_churn_risk_summary
+        )
+        from services.interventions import init_intervention_dispatcher, CHANNEL_RATE_LIMITS, DEFAULT_COOLDOWN_DAYS
+        from services.churn_model import init_churn_model_service
+        
+        # Scores are batch-computed into churn_risk_scores; rescore only when stale
+        refresh_churn_scores_if_stale()
+        churn_summary = get_churn_risk_summary()
         
         # Churn prediction metrics
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("⚠️ At-Risk Students", "24", delta="-3 from last week")
+            st.metric(
+                "⚠️ At-Risk Students",
+                churn_summary.get("at_risk_students", 0),
+                delta=f"{churn_summary.get('risk_levels', {}).get('Critical', 0)} critical",
+                delta_color="inverse"
+            )
         
         with col2:
             st.metric("✅ Interventions (7d)", "18", delta="75% success")
@@ -1372,42 +1591,51 @@ with main_tabs[9]:
         # At-risk students list
         st.subheader("⚠️ At-Risk Students by Churn Risk Score")
         
-        conn = sqlite3.connect(str(DB_PATH))
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT DISTINCT m.user_id, m.student_id, COUNT(*) as module_count,
-                   AVG(m.progress) as avg_progress
-            FROM learning_modules m
-            GROUP BY m.user_id, m.student_id
-            ORDER BY avg_progress ASC
-            LIMIT 25
-        ''')
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.caption(f"Scores computed at: {churn_summary.get('scored_at') or 'never'}")
+            churn_model = init_churn_model_service().model_info
+            if churn_model:
+                st.caption(
+                    f"🤖 Model v{churn_model['version']} ({churn_model['model_type']}) · "
+                    f"ROC AUC {churn_model['roc_auc']:.2f} · Brier {churn_model['brier_score']:.3f} · "
+                    f"{churn_model['horizon_days']}-day horizon"
+                )
+            else:
+                st.caption("🤖 No trained churn model yet, using weighted risk factors (run scripts/train_churn_model.py)")
+        with col2:
+            if st.button("🔄 Rescore All Students", use_container_width=True):
+                with st.spinner("Scoring churn risk..."):
+                    rescore = score_all_churn_risk()
+                if "error" in rescore:
+                    st.error(f"Rescoring failed: {rescore['error']}")
+                else:
+                    st.success(f"✅ Scored {rescore['students_scored']} students")
+                    st.rerun()
         
-        at_risk_rows = cursor.fetchall()
+        at_risk_rows = get_churn_risk_scores(limit=25)
         
         if at_risk_rows:
+            level_status = {"Critical": "🔴 Critical", "High": "🟠 High", "Medium": "🟡 Medium", "Low": "🟢 Low"}
             at_risk_data = []
-            for idx, (user_id, student_id, mod_count, avg_prog) in enumerate(at_risk_rows, 1):
-                # Calculate risk score (higher = more at-risk)
-                churn_risk = 100 - (avg_prog if avg_prog else 0)
-                
+            for idx, row in enumerate(at_risk_rows, 1):
                 at_risk_data.append({
                     "Rank": idx,
-                    "Student ID": student_id or "Unknown",
-                    "Churn Risk %": round(churn_risk, 1),
-                    "Modules": mod_count,
-                    "Avg Progress": f"{avg_prog if avg_prog else 0:.1f}%",
-                    "Status": "🔴 Critical" if churn_risk > 75 else "🟠 High" if churn_risk > 50 else "🟡 Medium"
+                    "Student ID": row["student_id"] or "Unknown",
+                    "Churn Risk %": round(row["churn_risk_score"], 1),
+                    "Recent Activity": row["recent_activity_score"],
+                    "Dropout Factor": row["dropout_risk_factor"],
+                    "Consistency": row["interaction_consistency"],
+                    "Status": level_status.get(row["risk_level"], row["risk_level"])
                 })
             
             df_risk = pd.DataFrame(at_risk_data)
             
             # Color code by risk
             def risk_color(val):
-                if val > 75:
+                if val >= 75:
                     return "background-color: #ffcccc"
-                elif val > 50:
+                elif val >= 60:
                     return "background-color: #ffe6cc"
                 else:
                     return "background-color: #ffffcc"
@@ -1420,48 +1648,105 @@ with main_tabs[9]:
         else:
             st.info("No at-risk students detected.")
         
-        conn.close()
-        
         st.markdown("---")
         
         # Intervention controls
         st.subheader("🎯 Trigger Interventions")
         
+        intervention_types = {
+            "Mentorship Assignment": "mentor",
+            "Badge Challenge": "reward",
+            "1-on-1 Support": "urgent",
+            "Career Coaching": "motivational",
+            "Peer Pairing": "mentor"
+        }
+        
         col1, col2 = st.columns(2)
         
         with col1:
             intervention_student = st.selectbox(
                 "Select Student",
-                [row[1] or row[0] for row in at_risk_rows] if at_risk_rows else [],
+                [row["student_id"] for row in at_risk_rows] if at_risk_rows else [],
                 key="intervention_student"
             )
         
         with col2:
             intervention_type = st.selectbox(
                 "Intervention Type",
-                ["Mentorship Assignment", "Badge Challenge", "1-on-1 Support", "Career Coaching", "Peer Pairing"],
+                list(intervention_types),
                 key="intervention_type"
             )
         
-        if st.button("🚀 Launch Intervention", use_container_width=True):
+        if st.button("🚀 Launch Intervention", use_container_width=True, disabled=not intervention_student):
             with st.spinner("Triggering intervention..."):
+                launched = trigger_churn_intervention(intervention_student, intervention_types[intervention_type])
+            if "error" in launched:
+                st.error(f"❌ Could not launch intervention: {launched['error']}")
+            else:
+                start_job_worker()
                 st.success(f"✅ {intervention_type} intervention launched for {intervention_student}")
-                st.info("📊 Intervention tracked and monitored for effectiveness")
+                st.info(f"💬 {launched['message']}")
         
         st.markdown("---")
         
-        # Intervention effectiveness log
-        st.subheader("📊 Recent Interventions & Effectiveness")
+        # Cohort sweep
+        st.subheader("🧹 Intervention Sweep")
+        st.caption("Contact every student at or above the churn threshold who hasn't had an intervention during the cooldown window.")
         
-        intervention_log = pd.DataFrame([
-            {"Date": "Jan 29, 2025", "Student": "STU015", "Type": "Badge Challenge", "Status": "Active", "Impact": "✅ +5% progress"},
-            {"Date": "Jan 28, 2025", "Student": "STU023", "Type": "Mentorship", "Status": "Completed", "Impact": "✅ +12% progress"},
-            {"Date": "Jan 27, 2025", "Student": "STU008", "Type": "1-on-1 Support", "Status": "Completed", "Impact": "✅ +8% progress"},
-            {"Date": "Jan 26, 2025", "Student": "STU031", "Type": "Peer Pairing", "Status": "Active", "Impact": "✅ +3% progress"},
-            {"Date": "Jan 25, 2025", "Student": "STU042", "Type": "Career Coaching", "Status": "Completed", "Impact": "✅ +15% progress"},
-        ])
+        dispatcher = init_intervention_dispatcher()
         
-        st.dataframe(intervention_log, use_container_width=True, hide_index=True)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            sweep_min_score = st.slider("Minimum churn risk", 0, 100, 60, key="sweep_min_score")
+        with col2:
+            sweep_cooldown = st.number_input("Cooldown (days)", min_value=0, max_value=90, value=DEFAULT_COOLDOWN_DAYS, key="sweep_cooldown")
+        with col3:
+            sweep_channel = st.selectbox("Channel", list(CHANNEL_RATE_LIMITS), key="sweep_channel")
+        
+        if st.button("📣 Run Sweep", use_container_width=True):
+            with st.spinner("Dispatching interventions..."):
+                sweep = dispatcher.dispatch(
+                    min_score=sweep_min_score,
+                    cooldown_days=sweep_cooldown,
+                    channel=sweep_channel
+                )
+            if "error" in sweep:
+                st.error(f"❌ Sweep failed: {sweep['error']}")
+            else:
+                start_job_worker()
+                st.success(f"✅ {sweep['dispatched']} interventions queued for {sweep_channel} delivery")
+        
+        delivery_status = dispatcher.get_delivery_status()
+        if delivery_status:
+            st.dataframe(
+                pd.DataFrame(delivery_status).T.fillna(0).astype(int),
+                use_container_width=True
+            )
+        
+        st.markdown("---")
+        
+        # Intervention log
+        st.subheader("📊 Recent Interventions")
+        
+        recent_interventions = dispatcher.get_recent_interventions(limit=20)
+        if recent_interventions:
+            st.dataframe(
+                pd.DataFrame(recent_interventions)[
+                    ["triggered_date", "student_id", "intervention_type", "channel", "delivery_status", "sent_at"]
+                ],
+                column_config={
+                    "triggered_date": "Date",
+                    "student_id": "Student",
+                    "intervention_type": "Type",
+                    "channel": "Channel",
+                    "delivery_status": "Delivery",
+                    "sent_at": "Sent At"
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info("No interventions recorded yet.")
         
     except Exception as e:
         st.error(f"Error loading churn prevention: {e}")
@@ -9,7 +9,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 
 # Import custom modules
@@ -727,7 +727,13 @@ with dashboard_tabs[9]:
     st.markdown("*Monitor and manage student retention toward 85% goal*")
     
     try:
-        from mb.pages.gamification import predict_churn_risk, calculate_retention_impact
+        from services.gamification import (
+            calculate_retention_impact,
+            get_retention_snapshots,
+            refresh_churn_scores_if_stale,
+            get_churn_risk_scores,
+            get_churn_risk_summary
+        )
         
         # Retention metrics
         impact = calculate_retention_impact()
@@ -790,6 +796,65 @@ with dashboard_tabs[9]:
             ))
             st.plotly_chart(fig_meter, use_container_width=True)
         
+        refresh_churn_scores_if_stale()
+        churn_summary = get_churn_risk_summary()
+        
+        with col2:
+            st.markdown("**Churn Risk Levels**")
+            for level, count in churn_summary.get('risk_levels', {}).items():
+                st.metric(level, count)
+        
+        st.markdown("---")
+        
+        # Retention trend (one row per day from retention_daily_snapshots)
+        st.subheader("📈 Retention Trend")
+        trend_days = st.selectbox("Period", [30, 90, 365], format_func=lambda d: f"Last {d} days", key="retention_trend_days")
+        trend = get_retention_snapshots(start_date=(datetime.now() - timedelta(days=trend_days)).date())
+        
+        if trend:
+            df_trend = pd.DataFrame(trend)
+            fig_trend = px.line(
+                df_trend,
+                x='snapshot_date',
+                y='retention_rate',
+                markers=True,
+                labels={'snapshot_date': 'Date', 'retention_rate': 'Retention Rate (%)'},
+                title="Daily Retention Rate"
+            )
+            fig_trend.add_hline(y=target, line_dash="dash", line_color="green", annotation_text="Target")
+            fig_trend.add_hline(y=baseline, line_dash="dot", line_color="red", annotation_text="Baseline")
+            st.plotly_chart(fig_trend, use_container_width=True)
+            
+            st.caption(f"Latest snapshot: {impact.get('snapshot_date', 'N/A')}")
+        else:
+            st.info("No retention snapshots recorded yet.")
+        
+        st.markdown("---")
+        
+        # Highest churn risk (batch scores from churn_risk_scores)
+        st.subheader("🚨 Highest Churn Risk")
+        st.caption(f"Scores computed at: {churn_summary.get('scored_at') or 'never'}")
+        
+        top_churn = get_churn_risk_scores(limit=20, min_score=40)
+        if top_churn:
+            st.dataframe(
+                pd.DataFrame(top_churn)[['student_id', 'churn_risk_score', 'risk_level', 'recent_activity_score',
+                                         'dropout_risk_factor', 'interaction_consistency', 'last_activity']],
+                column_config={
+                    "student_id": "Student ID",
+                    "churn_risk_score": "Churn Risk",
+                    "risk_level": "Risk Level",
+                    "recent_activity_score": "Recent Activity",
+                    "dropout_risk_factor": "Dropout Factor",
+                    "interaction_consistency": "Consistency",
+                    "last_activity": "Last Activity"
+                },
+                width="stretch",
+                hide_index=True
+            )
+        else:
+            st.info("No students at Medium churn risk or above.")
+        
         st.markdown("---")
         
         # Intervention effectiveness
@@ -858,10 +923,14 @@ with dashboard_tabs[10]:
         with col2:
             role = st.selectbox(
                 "Target Role",
-                ["Software Developer", "Data Analyst", "Business Analyst", "Project Manager", "UX Designer"],
+                list(bridger.role_requirements),
                 key="skill_role"
             )
         
+        hours_budget = st.number_input(
+            "Learning hours budget (0 = no limit)", min_value=0, max_value=500, value=0, step=5, key="skill_hours_budget"
+        )
+        
         if st.button("🔍 Analyze Skill Gaps", use_container_width=True):
             with st.spinner("Analyzing skills and generating learning path..."):
                 gaps = bridger.analyze_skill_gaps(student_id, role)
@@ -881,31 +950,34 @@ with dashboard_tabs[10]:
                     
                     st.markdown("---")
                     
-                    # Generate learning path
-                    path = bridger.generate_learning_path(gaps)
+                    # Shortest resource set covering the gaps (within the hours budget, if set)
+                    path = bridger.optimize_learning_path(gaps, hours_budget=hours_budget or None)
                     
                     st.subheader("📚 Personalized Learning Path")
                     
-                    if path.get('learning_path'):
+                    if "error" in path:
+                        st.error(f"Error: {path['error']}")
+                    elif path.get('resources'):
                         col1, col2 = st.columns(2)
                         
                         with col1:
-                            st.metric("Total Hours", f"{path.get('total_estimated_hours', 0)}")
-                            st.metric("Estimated Days", f"{path.get('total_estimated_days', 0):.0f}")
+                            st.metric("Total Hours", f"{path.get('total_estimated_hours', 0):g}")
+                            st.metric("Priority Coverage", f"{path.get('coverage_pct', 0):.0f}%")
                         
                         with col2:
                             st.info(path.get('recommendation', 'Complete learning path to develop skills'))
+                            if path.get('uncovered_skills'):
+                                st.caption(f"Not covered: {', '.join(path['uncovered_skills'])}")
                         
                         st.markdown("---")
                         
                         # Detailed learning path
-                        for i, item in enumerate(path['learning_path'], 1):
-                            with st.expander(f"📖 {item['skill']} - {item['priority']} Priority"):
-                                for resource in item['resources']:
-                                    st.write(f"**{resource['resource']}**")
-                                    st.write(f"Platform: {resource['platform']} | Duration: {resource['duration_hours']}h")
-                                    st.write(f"[📎 View Resource]({resource.get('url', '#')})")
-                                    st.divider()
+                        for i, resource in enumerate(path['resources'], 1):
+                            with st.expander(f"📖 {i}. {resource['resource']} - covers {', '.join(resource['skills_covered'])}"):
+                                st.write(f"Platform: {resource['platform']} | Duration: {resource['duration_hours']}h")
+                                st.write(f"[📎 View Resource]({resource.get('url') or '#'})")
+                    elif path.get('uncovered_skills'):
+                        st.warning(f"No learning resources fit for: {', '.join(path['uncovered_skills'])}")
                     else:
                         st.info("✅ All skills aligned with role requirements!")
                 else:
@@ -913,15 +985,129 @@ with dashboard_tabs[10]:
         
         st.markdown("---")
         
+        # Closest candidates per role (all students x all roles from the skill matrix)
+        st.subheader("🎯 Closest Candidates by Role")
+        
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            candidate_role = st.selectbox("Role", list(bridger.role_requirements), key="candidate_role")
+        with col2:
+            candidate_count = st.number_input("Top N", min_value=5, max_value=100, value=10, step=5, key="candidate_count")
+        with col3:
+            candidate_max_gaps = st.number_input("Max gaps", min_value=0, max_value=10, value=3, key="candidate_max_gaps")
+        
+        candidates = bridger.get_top_candidates(candidate_role, n=int(candidate_count), max_gaps=int(candidate_max_gaps))
+        if isinstance(candidates, dict) and "error" in candidates:
+            st.error(f"Error: {candidates['error']}")
+        elif candidates:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "Rank": candidate["rank"],
+                        "Student": candidate["student_id"],
+                        "Readiness %": candidate["readiness_pct"],
+                        "Gaps": candidate["gap_count"],
+                        "Missing Skills": ", ".join(candidate["missing_skills"]) or "—"
+                    }
+                    for candidate in candidates
+                ]),
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info(f"No students within {candidate_max_gaps} skill gaps of {candidate_role} yet")
+        
+        with st.expander(f"🗓️ Cohort learning plan for {candidate_role}"):
+            if st.button("Plan paths for all students", key="plan_cohort_paths"):
+                with st.spinner("Optimizing learning paths..."):
+                    plan = bridger.optimize_cohort_paths(candidate_role, hours_budget=hours_budget or None)
+                if "error" in plan:
+                    st.error(f"Error: {plan['error']}")
+                else:
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Students", plan["students"])
+                    col2.metric("Avg Hours", plan["avg_hours"])
+                    col3.metric("Avg Priority Coverage", f"{plan['avg_coverage_pct']:.0f}%")
+                    st.caption(f"{plan['distinct_gap_sets']} distinct gap sets solved in {plan['computed_in_seconds']}s")
+                    if plan["paths"]:
+                        st.dataframe(
+                            pd.DataFrame([
+                                {
+                                    "Student": item["student_id"],
+                                    "Gaps": item["gap_count"],
+                                    "Hours": item["total_estimated_hours"],
+                                    "Coverage %": item["coverage_pct"],
+                                    "Resources": ", ".join(item["resources"]) or "—"
+                                }
+                                for item in plan["paths"]
+                            ]).sort_values(["Gaps", "Hours"]),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+        
+        st.markdown("---")
+        
+        # Cohort role x skill gaps, read from the precomputed heatmap table
+        st.subheader("🔥 Cohort Skill Gap Heatmap")
+        
+        from mb.services.skill_gap_heatmap import (
+            compute_skill_gap_heatmap, get_heatmap_scopes, get_heatmap_status, get_skill_gap_heatmap,
+            refresh_heatmap_if_stale
+        )
+        
+        refresh_heatmap_if_stale()
+        heatmap_scopes = get_heatmap_scopes()
+        
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            scope_type = st.selectbox("Breakdown", list(heatmap_scopes) or ["all"], key="gap_scope_type")
+        with col2:
+            scope_value = st.selectbox("Group", heatmap_scopes.get(scope_type, ["all"]), key="gap_scope_value")
+        with col3:
+            if st.button("🔄 Recompute", key="recompute_gap_heatmap"):
+                with st.spinner("Recomputing cohort skill gaps..."):
+                    result = compute_skill_gap_heatmap()
+                if "error" in result:
+                    st.error(f"Error: {result['error']}")
+        
+        gap_heatmap = get_skill_gap_heatmap(scope_type, scope_value)
+        if not gap_heatmap.empty:
+            fig = px.imshow(
+                gap_heatmap.pivot_table(index='role_id', columns='skill', values='missing_pct'),
+                labels=dict(x="Skill", y="Role", color="% Missing"),
+                title=f"Share of students missing each required skill ({scope_value})",
+                color_continuous_scale="Reds",
+                height=400
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            
+            worst_gaps = gap_heatmap.nlargest(10, 'gap_severity')
+            st.dataframe(
+                worst_gaps[['role_id', 'skill', 'students_missing', 'missing_pct', 'gap_severity']].rename(columns={
+                    'role_id': 'Role', 'skill': 'Skill', 'students_missing': 'Students Missing',
+                    'missing_pct': '% Missing', 'gap_severity': 'Weighted Severity'
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
+            
+            heatmap_status = get_heatmap_status()
+            if heatmap_status:
+                st.caption(
+                    f"{heatmap_status['students']} students · computed {heatmap_status['computed_at'][:16]} "
+                    f"in {heatmap_status['duration_ms']} ms"
+                )
+        else:
+            st.info("No skill gap data yet. Recompute once onboarding profiles are available.")
+        
+        st.markdown("---")
+        
         # Supported roles info
         st.subheader("📋 Supported Roles & Skills")
         
         roles_info = {
-            "Software Developer": ["Python", "SQL", "Problem Solving", "Version Control", "APIs", "Testing"],
-            "Data Analyst": ["SQL", "Excel", "Data Visualization", "Statistics", "Python", "Tableau"],
-            "Business Analyst": ["Communication", "Business Acumen", "Documentation", "Excel", "SQL", "Stakeholder Management"],
-            "Project Manager": ["Leadership", "Communication", "Planning", "Risk Management", "Budgeting", "Team Management"],
-            "UX Designer": ["Design Thinking", "Figma", "User Research", "Wireframing", "Communication", "Prototyping"]
+            role_id: requirements["required_skills"]
+            for role_id, requirements in bridger.role_requirements.items()
         }
         
         selected_role = st.selectbox("View role requirements:", list(roles_info.keys()), key="view_role")
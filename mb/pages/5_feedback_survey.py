@@ -12,6 +12,8 @@ from feedback_survey import (
     init_feedback_tables,
     submit_employer_feedback,
     submit_youth_feedback,
+    mark_survey_opened,
+    verify_survey_link,
     get_employer_feedback_analytics,
     get_youth_feedback_analytics
 )
@@ -27,10 +29,27 @@ init_feedback_tables()
 st.title("📋 Feedback Survey Portal")
 st.markdown("Your feedback helps us improve and support better placement outcomes")
 
+# Emailed survey links carry ?type=employer|youth&survey_id=N&token=...
+link_type = st.query_params.get("type")
+link_survey_id = st.query_params.get("survey_id")
+link_token = st.query_params.get("token")
+link_survey_id = int(link_survey_id) if link_survey_id and link_survey_id.isdigit() else None
+if link_type not in ("employer", "youth"):
+    link_survey_id = None
+if link_survey_id and not verify_survey_link(link_type, link_survey_id, link_token):
+    st.warning("⚠️ This survey link is not valid. Your feedback will be recorded as a new response.")
+    link_survey_id = None
+
+# Record the first open of an emailed survey once per session
+if link_survey_id and st.session_state.get("opened_survey") != (link_type, link_survey_id):
+    mark_survey_opened(link_type, link_survey_id, link_token)
+    st.session_state["opened_survey"] = (link_type, link_survey_id)
+
 # Survey type selection
 survey_type = st.radio(
     "What feedback would you like to provide?",
     ["👤 Youth Post-Placement Feedback", "🏢 Employer Feedback"],
+    index=1 if link_type == "employer" else 0,
     horizontal=True
 )
 
@@ -134,7 +153,9 @@ if survey_type == "👤 Youth Post-Placement Feedback":
                     would_recommend_magicbus=recommend,
                     suggestions_for_improvement=suggestions,
                     challenges_faced=challenges,
-                    additional_training_needed=training_needed
+                    additional_training_needed=training_needed,
+                    survey_id=link_survey_id if link_type == "youth" else None,
+                    survey_token=link_token
                 )
                 
                 if success:
@@ -232,7 +253,9 @@ else:  # Employer Feedback
                     areas_for_improvement=areas_improve,
                     would_rehire=would_rehire,
                     feedback_comments=feedback_comments,
-                    recommendation_score=recommendation
+                    recommendation_score=recommendation,
+                    survey_id=link_survey_id if link_type == "employer" else None,
+                    survey_token=link_token
                 )
                 
                 if success:
@@ -0,0 +1,366 @@
+"""
+Resume Parser Module
+Extracts contact details, skills and education from PDF / Word resumes.
+
+Text extraction runs in a small set of worker processes with a page limit and
+a per-file timeout, so a pathological PDF cannot stall the Streamlit thread: a
+worker that overruns is terminated and replaced. Results are cached by file
+content hash so reruns with the same upload are free.
+
+Bulk import a folder:  python mb/resume_parser.py <folder> [output.json]
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import logging
+import queue
+import threading
+import multiprocessing
+from io import BytesIO
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "10"))
+RESUME_PARSE_TIMEOUT = float(os.getenv("RESUME_PARSE_TIMEOUT", "20"))
+RESUME_FILE_TYPES = ("pdf", "docx", "doc")
+
+
+def extract_name_from_text(text):
+    """Extract likely name from text"""
+    lines = text.split('\n')
+    for line in lines[:5]:
+        line = line.strip()
+        if line and len(line.split()) >= 2:
+            words = line.split()[:2]
+            if all(word.isalpha() for word in words):
+                return words[0], words[1] if len(words) > 1 else ""
+    return "", ""
+
+
+def extract_email_from_text(text):
+    """Extract email from text"""
+    pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+    match = re.search(pattern, text)
+    return match.group(0) if match else ""
+
+
+def extract_phone_from_text(text):
+    """Extract phone from text"""
+    pattern = r'(?:\+91|0)?[\s\-]?[6-9]\d{9}|(?:\+\d{1,3}[-.\s]?)?\(?(\d{3})\)?[-.\s]?(\d{3})[-.\s]?(\d{4})'
+    matches = re.findall(pattern, text)
+    if matches:
+        if isinstance(matches[0], tuple):
+            return f"({matches[0][0]}) {matches[0][1]}-{matches[0][2]}"
+        return matches[0]
+    return ""
+
+
+def extract_skills_from_text(text):
+    """Extract technical skills from text"""
+    all_skills = [
+        "Python", "Java", "JavaScript", "C++", "C#", "SQL", "R",
+        "React", "Angular", "Vue", "Node.js", "Django", "Flask",
+        "AWS", "Azure", "GCP", "Docker", "Kubernetes",
+        "Machine Learning", "Data Analysis", "Data Science",
+        "TensorFlow", "PyTorch", "Scikit-learn", "Pandas", "NumPy",
+        "Communication", "Leadership", "Teamwork", "Problem Solving"
+    ]
+
+    found_skills = []
+    text_lower = text.lower()
+
+    for skill in all_skills:
+        if skill.lower() in text_lower:
+            found_skills.append(skill)
+
+    return list(set(found_skills))
+
+
+def extract_education_from_text(text):
+    """Extract education information from text"""
+    education = []
+
+    degree_patterns = {
+        "Bachelor": r"(?:B\.?A|B\.?S|BA|BS)(?:\s+in\s+([^,\n]+))?",
+        "Master": r"(?:M\.?A|M\.?S|MA|MS)(?:\s+in\s+([^,\n]+))?",
+        "PhD": r"(?:Ph\.?D|PhD)(?:\s+in\s+([^,\n]+))?"
+    }
+
+    for degree_type, pattern in degree_patterns.items():
+        matches = re.finditer(pattern, text, re.IGNORECASE)
+        for match in matches:
+            field = match.group(1) if match.group(1) else "Not specified"
+            education.append({
+                "degree": degree_type,
+                "field": field.strip()
+            })
+
+    return education
+
+
+def extract_resume_text(file_name: str, file_bytes: bytes, max_pages: int = RESUME_MAX_PAGES) -> str:
+    """Extract raw text from a PDF or Word resume (PDFs stop after max_pages)"""
+    file_type = file_name.split('.')[-1].lower()
+    text = ""
+
+    if file_type == "pdf":
+        import pdfplumber
+        with pdfplumber.open(BytesIO(file_bytes)) as pdf:
+            for page in pdf.pages[:max_pages]:
+                text += page.extract_text() or ""
+    elif file_type in ["docx", "doc"]:
+        from docx import Document
+        doc = Document(BytesIO(file_bytes))
+        for para in doc.paragraphs:
+            text += para.text + "\n"
+
+    return text
+
+
+def parse_resume_text(text: str) -> Dict:
+    """Run the field extractors over resume text"""
+    first_name, last_name = extract_name_from_text(text)
+
+    return {
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": extract_email_from_text(text),
+        "phone": extract_phone_from_text(text),
+        "skills": extract_skills_from_text(text),
+        "education": extract_education_from_text(text),
+        "raw_text": text
+    }
+
+
+def parse_resume_bytes(file_name: str, file_bytes: bytes, max_pages: int = RESUME_MAX_PAGES) -> Optional[Dict]:
+    """Parse resume file contents and extract information"""
+    try:
+        text = extract_resume_text(file_name, file_bytes, max_pages)
+    except Exception as e:
+        logger.error(f"Resume text extraction error for {file_name}: {e}")
+        return None
+
+    if not text:
+        return None
+
+    try:
+        return parse_resume_text(text)
+    except Exception as e:
+        logger.error(f"Resume parsing error: {e}")
+        return None
+
+
+def _parse_worker(conn):
+    """Worker process loop: parse (file_name, file_bytes, max_pages) tasks until told to stop"""
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        conn.send(parse_resume_bytes(*task))
+
+
+class _Worker:
+    """A parse worker process and the pipe it takes tasks on"""
+
+    def __init__(self):
+        # spawn: forking a multi-threaded Streamlit process is unsafe
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_parse_worker, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.conn.close()
+        self.process.join(timeout=1)
+        self.kill()
+
+    def kill(self):
+        """Terminate the process, e.g. when it is stuck on a pathological file"""
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        self.conn.close()
+
+
+class ResumeParserService:
+    """Parses resumes in worker processes with a content-hash cache"""
+
+    def __init__(self, max_workers: int = 2, timeout: float = RESUME_PARSE_TIMEOUT,
+                 max_pages: int = RESUME_MAX_PAGES, cache_size: int = 256):
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.cache_size = cache_size
+        self._cache: Dict[str, Dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Worker slots shared by every caller; a slot holds None until its process is started
+        self._idle = queue.Queue()
+        for _ in range(self.max_workers):
+            self._idle.put(None)
+
+    @staticmethod
+    def content_hash(file_name: str, file_bytes: bytes) -> str:
+        file_type = file_name.split('.')[-1].lower()
+        return f"{file_type}:{hashlib.sha256(file_bytes).hexdigest()}"
+
+    def _run(self, file_name: str, file_bytes: bytes) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Parse one file on a checked-out worker; returns (parsed, error)
+        The timeout starts when the worker receives the file, so waiting for a free worker
+        does not use it up. A worker that overruns is terminated and its slot restarts it.
+        """
+        worker = self._idle.get()
+        try:
+            if worker is None or not worker.process.is_alive():
+                worker = _Worker()
+            worker.conn.send((file_name, file_bytes, self.max_pages))
+            if not worker.conn.poll(self.timeout):
+                worker.kill()
+                worker = None
+                logger.warning(f"Resume parse timed out: {file_name}")
+                return None, f"Timed out after {self.timeout:.0f}s"
+            parsed = worker.conn.recv()
+            return parsed, None if parsed else "No text could be extracted"
+        except Exception as e:
+            if worker is not None:
+                worker.kill()
+                worker = None
+            logger.error(f"Resume parse failed for {file_name}: {e}")
+            return None, str(e)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        """Stop every worker process (the next parse starts fresh ones)"""
+        for _ in range(self.max_workers):
+            worker = self._idle.get()
+            if worker is not None:
+                worker.stop()
+        for _ in range(self.max_workers):
+            self._idle.put(None)
+
+    def get_cached(self, file_name: str, file_bytes: bytes) -> Tuple[bool, Optional[Dict]]:
+        """Return (hit, parsed) from the content-hash cache"""
+        key = self.content_hash(file_name, file_bytes)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return True, self._cache[key]
+        return False, None
+
+    def _store(self, key: str, parsed: Dict):
+        with self._lock:
+            self._cache[key] = parsed
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def parse(self, file_name: str, file_bytes: bytes) -> Optional[Dict]:
+        """Parse one resume, serving repeats of the same content from cache"""
+        return self.parse_batch([(file_name, file_bytes)])[0]["parsed"]
+
+    def parse_batch(self, files: Iterable[Tuple[str, bytes]]) -> List[Dict]:
+        """
+        Parse many resumes across the pool.
+        Returns one {"file_name", "content_hash", "parsed", "error", "cached"} dict per input, in order.
+        """
+        results = []
+        pending = {}
+        for file_name, file_bytes in files:
+            key = self.content_hash(file_name, file_bytes)
+            result = {"file_name": file_name, "content_hash": key, "parsed": None, "error": None, "cached": False}
+            results.append(result)
+
+            if file_name.split('.')[-1].lower() not in RESUME_FILE_TYPES:
+                result["error"] = "Unsupported file type"
+                continue
+
+            hit, parsed = self.get_cached(file_name, file_bytes)
+            if hit:
+                result.update(parsed=parsed, cached=True)
+            elif key in pending:
+                pending[key][1].append(result)
+            else:
+                pending[key] = ((file_name, file_bytes), [result])
+
+        def parse_one(key):
+            (file_name, file_bytes), waiting = pending[key]
+            parsed, error = self._run(file_name, file_bytes)
+            # Only successes are cached, so a failed or timed-out file can be retried
+            if parsed:
+                self._store(key, parsed)
+            for result in waiting:
+                result.update(parsed=parsed, error=error)
+
+        if pending:
+            # One thread per worker slot; each file waits for a free worker, then gets the full timeout
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                list(executor.map(parse_one, pending))
+
+        return results
+
+    def parse_folder(self, folder: str) -> List[Dict]:
+        """Bulk-import every resume in a folder"""
+        paths = sorted(
+            path for path in Path(folder).iterdir()
+            if path.is_file() and path.suffix.lower().lstrip('.') in RESUME_FILE_TYPES
+        )
+        logger.info(f"Parsing {len(paths)} resumes from {folder}")
+        return self.parse_batch((path.name, path.read_bytes()) for path in paths)
+
+
+_default_service = None
+_service_lock = threading.Lock()
+
+
+def get_resume_parser() -> ResumeParserService:
+    """Process-wide resume parser service"""
+    global _default_service
+    with _service_lock:
+        if _default_service is None:
+            _default_service = ResumeParserService()
+        return _default_service
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 2:
+        print("Usage: python mb/resume_parser.py <folder> [output.json]")
+        sys.exit(1)
+
+    service = ResumeParserService(max_workers=os.cpu_count() or 2)
+    batch = service.parse_folder(sys.argv[1])
+    service.close()
+    for item in batch:
+        if item["parsed"]:
+            item["parsed"].pop("raw_text", None)
+
+    parsed_count = sum(1 for item in batch if item["parsed"])
+    print(f"✓ Parsed {parsed_count}/{len(batch)} resumes")
+    for item in batch:
+        if item["error"]:
+            print(f"  ✗ {item['file_name']}: {item['error']}")
+
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], "w") as f:
+            json.dump(batch, f, indent=2)
+        print(f"✓ Results written to {sys.argv[2]}")
@@ -2,40 +2,108 @@
 Services Module - Core business logic and utilities for Magic Bus Compass 360
 """
 
+from .schema_registry import (
+    register_schema,
+    ensure_schema,
+)
 from .gamification import (
     check_and_award_badges,
+    award_badges,
     get_user_badges,
     get_user_streak,
     get_motivational_message,
     update_streak,
+    log_learning_activity,
+    recompute_streaks,
     calculate_retention_impact,
+    take_retention_snapshot,
+    get_retention_snapshots,
     trigger_churn_intervention,
     predict_churn_risk,
+    score_all_churn_risk,
+    refresh_churn_scores_if_stale,
+    get_churn_risk_scores,
+    get_churn_risk_summary,
+)
+from .churn_model import (
+    ChurnModelService,
+    init_churn_model_service,
+    train_churn_model,
+    get_churn_model_versions,
+)
+from .leaderboard import (
+    LeaderboardService,
+    init_leaderboard_service,
+)
+from .interventions import (
+    InterventionDispatcher,
+    init_intervention_dispatcher,
 )
 from .peer_matching import (
-    find_peer_mentors,
-    calculate_similarity,
-    match_peers,
+    PeerMatchingNetwork,
+    init_peer_matching_network,
+)
+from .skill_catalog import (
+    SkillCatalog,
+    get_skill_catalog,
 )
 from .skill_gap_bridger import (
-    analyze_skill_gaps,
-    generate_learning_paths,
-    recommend_courses,
+    SkillGapBridger,
+    init_skill_gap_bridger,
+    SkillMatrixIndex,
+    get_skill_index,
+)
+from .skill_gap_heatmap import (
+    compute_skill_gap_heatmap,
+    refresh_heatmap_if_stale,
+    get_skill_gap_heatmap,
+)
+from .feedback_themes import (
+    update_feedback_themes,
+    refresh_feedback_themes_if_stale,
+    get_feedback_themes,
 )
 
 __all__ = [
+    "register_schema",
+    "ensure_schema",
     "check_and_award_badges",
+    "award_badges",
     "get_user_badges",
     "get_user_streak",
     "get_motivational_message",
     "update_streak",
+    "log_learning_activity",
+    "recompute_streaks",
     "calculate_retention_impact",
+    "take_retention_snapshot",
+    "get_retention_snapshots",
     "trigger_churn_intervention",
     "predict_churn_risk",
-    "find_peer_mentors",
-    "calculate_similarity",
-    "match_peers",
-    "analyze_skill_gaps",
-    "generate_learning_paths",
-    "recommend_courses",
+    "score_all_churn_risk",
+    "refresh_churn_scores_if_stale",
+    "get_churn_risk_scores",
+    "get_churn_risk_summary",
+    "ChurnModelService",
+    "init_churn_model_service",
+    "train_churn_model",
+    "get_churn_model_versions",
+    "LeaderboardService",
+    "init_leaderboard_service",
+    "InterventionDispatcher",
+    "init_intervention_dispatcher",
+    "PeerMatchingNetwork",
+    "init_peer_matching_network",
+    "SkillCatalog",
+    "get_skill_catalog",
+    "SkillGapBridger",
+    "init_skill_gap_bridger",
+    "SkillMatrixIndex",
+    "get_skill_index",
+    "compute_skill_gap_heatmap",
+    "refresh_heatmap_if_stale",
+    "get_skill_gap_heatmap",
+    "update_feedback_themes",
+    "refresh_feedback_themes_if_stale",
+    "get_feedback_themes",
 ]
@@ -0,0 +1,557 @@
+"""
+Churn Model Service
+Trains a calibrated gradient-boosted churn classifier and serves its scores.
+
+Features are built point-in-time from learning_modules, learning_activity_events,
+career_surveys, multimodal screenings and placement feedback. A student counts
+as churned at a cutoff when they show no learning activity in the following
+horizon, so training stacks several historical cutoffs into one matrix.
+
+Each trained model is written to data/models/ as a versioned joblib artifact
+and recorded in `churn_model_versions`. The inference service loads the active
+artifact once per version (re-checking which version is active every
+MODEL_CHECK_SECONDS), scores the whole cohort with a single vectorized
+predict_proba call and answers per-student lookups from that cached vector.
+
+Train from the command line:  python scripts/train_churn_model.py [horizon_days]
+"""
+
+import sqlite3
+import json
+import time
+import threading
+import logging
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .schema_registry import register_schema, ensure_schema
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
+CHURN_MODEL_DIR = Path(__file__).parent.parent.parent / "data" / "models"
+
+CHURN_HORIZON_DAYS = 14        # No activity within this window after a cutoff = churned
+TRAINING_CUTOFFS = 12          # Historical cutoffs stacked into the training matrix
+TRAINING_CUTOFF_STEP_DAYS = 7
+MIN_TRAINING_SAMPLES = 50
+COHORT_CACHE_SECONDS = 300     # How long a cohort score vector is served before rescoring
+MODEL_CHECK_SECONDS = 60       # How often the service looks for a newly activated version
+
+CHURN_FEATURES = [
+    "days_since_registration",
+    "modules_assigned",
+    "modules_started",
+    "modules_completed",
+    "completion_rate",
+    "avg_progress",
+    "days_since_last_activity",
+    "activity_events_7d",
+    "activity_events_30d",
+    "active_days_30d",
+    "has_career_survey",
+    "screening_count",
+    "soft_skill_score",
+    "neet_score",
+    "marginalized_score",
+    "youth_satisfaction",
+    "employer_performance",
+]
+
+register_schema("churn_model", [
+    """
+        CREATE TABLE IF NOT EXISTS churn_model_versions (
+            version VARCHAR(20) PRIMARY KEY,
+            artifact_path TEXT NOT NULL,
+            model_type VARCHAR(50),
+            calibration VARCHAR(20),
+            horizon_days INTEGER,
+            n_samples INTEGER,
+            positive_rate REAL,
+            roc_auc REAL,
+            brier_score REAL,
+            feature_columns TEXT,
+            trained_at TIMESTAMP,
+            is_active INTEGER DEFAULT 0
+        )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_churn_model_active ON churn_model_versions(is_active, trained_at)",
+])
+
+
+# ========================
+# FEATURES
+# ========================
+def _existing_tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def build_churn_features(conn, as_of=None, student_ids: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Feature matrix as of a point in time, one row per student registered by then
+    Returns student_id, user_id and CHURN_FEATURES columns (NaN where a source has no data)
+    """
+    as_of = (as_of or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+    tables = _existing_tables(conn)
+
+    student_filter = ""
+    user_params = {"as_of": as_of}
+    if student_ids is not None:
+        student_filter = "AND u.student_id IN (SELECT value FROM json_each(:students))"
+        user_params["students"] = json.dumps(list(student_ids))
+
+    users = pd.read_sql_query(f"""
+        SELECT u.user_id, u.student_id,
+               julianday(:as_of) - julianday(u.created_at) as days_since_registration
+        FROM mb_users u
+        WHERE u.student_id IS NOT NULL
+          AND (u.created_at IS NULL OR julianday(u.created_at) <= julianday(:as_of))
+          {student_filter}
+    """, conn, params=user_params)
+    users = users.drop_duplicates("student_id")
+
+    if users.empty:
+        return pd.DataFrame(columns=["student_id", "user_id"] + CHURN_FEATURES)
+
+    user_list = json.dumps([int(user_id) for user_id in users["user_id"]])
+    student_list = json.dumps(users["student_id"].tolist())
+    params = {"as_of": as_of, "users": user_list, "students": student_list}
+    features = users
+
+    if "learning_modules" in tables:
+        # Progress is current-state only; for historical cutoffs it is an approximation
+        modules = pd.read_sql_query("""
+            SELECT user_id,
+                   COUNT(*) as modules_assigned,
+                   SUM(julianday(started_date) <= julianday(:as_of)) as modules_started,
+                   SUM(julianday(completed_date) <= julianday(:as_of)) as modules_completed,
+                   AVG(CASE
+                       WHEN julianday(completed_date) <= julianday(:as_of) THEN 100
+                       WHEN julianday(started_date) <= julianday(:as_of) THEN COALESCE(progress, 0)
+                       ELSE 0
+                   END) as avg_progress,
+                   MAX(CASE WHEN julianday(completed_date) <= julianday(:as_of) THEN julianday(completed_date) END) as last_completed,
+                   MAX(CASE WHEN julianday(started_date) <= julianday(:as_of) THEN julianday(started_date) END) as last_started
+            FROM learning_modules
+            WHERE user_id IN (SELECT value FROM json_each(:users))
+              AND (assigned_date IS NULL OR julianday(assigned_date) <= julianday(:as_of))
+            GROUP BY user_id
+        """, conn, params=params)
+        features = features.merge(modules, on="user_id", how="left")
+
+    if "learning_activity_events" in tables:
+        events = pd.read_sql_query("""
+            SELECT user_id,
+                   SUM(julianday(occurred_at) > julianday(:as_of) - 7) as activity_events_7d,
+                   SUM(julianday(occurred_at) > julianday(:as_of) - 30) as activity_events_30d,
+                   COUNT(DISTINCT CASE WHEN julianday(occurred_at) > julianday(:as_of) - 30
+                                       THEN date(occurred_at) END) as active_days_30d,
+                   MAX(julianday(occurred_at)) as last_event
+            FROM learning_activity_events
+            WHERE user_id IN (SELECT value FROM json_each(:users))
+              AND julianday(occurred_at) <= julianday(:as_of)
+            GROUP BY user_id
+        """, conn, params=params)
+        features = features.merge(events, on="user_id", how="left")
+
+    if "career_surveys" in tables:
+        surveys = pd.read_sql_query("""
+            SELECT DISTINCT student_id, 1 as has_career_survey
+            FROM career_surveys
+            WHERE student_id IN (SELECT value FROM json_each(:students))
+              AND (completed_at IS NULL OR julianday(completed_at) <= julianday(:as_of))
+        """, conn, params=params)
+        features = features.merge(surveys, on="student_id", how="left")
+
+    if "mb_multimodal_screenings" in tables:
+        screenings = pd.read_sql_query("""
+            SELECT student_id,
+                   COUNT(*) as screening_count,
+                   AVG(COALESCE(manual_override_score, overall_soft_skill_score)) as soft_skill_score,
+                   AVG(neet_score) as neet_score,
+                   AVG(marginalized_score) as marginalized_score
+            FROM mb_multimodal_screenings
+            WHERE student_id IN (SELECT value FROM json_each(:students))
+              AND julianday(submitted_at) <= julianday(:as_of)
+            GROUP BY student_id
+        """, conn, params=params)
+        features = features.merge(screenings, on="student_id", how="left")
+
+    if "youth_feedback_surveys" in tables:
+        youth = pd.read_sql_query("""
+            SELECT student_id, AVG(overall_satisfaction) as youth_satisfaction
+            FROM youth_feedback_surveys
+            WHERE student_id IN (SELECT value FROM json_each(:students))
+              AND julianday(completed_date) <= julianday(:as_of)
+            GROUP BY student_id
+        """, conn, params=params)
+        features = features.merge(youth, on="student_id", how="left")
+
+    if "employer_feedback_surveys" in tables:
+        employer = pd.read_sql_query("""
+            SELECT student_id, AVG(overall_performance) as employer_performance
+            FROM employer_feedback_surveys
+            WHERE student_id IN (SELECT value FROM json_each(:students))
+              AND julianday(completed_date) <= julianday(:as_of)
+            GROUP BY student_id
+        """, conn, params=params)
+        features = features.merge(employer, on="student_id", how="left")
+
+    for column in CHURN_FEATURES + ["last_completed", "last_started", "last_event"]:
+        if column not in features:
+            features[column] = np.nan
+
+    # Counts are zero, not unknown, when a source table simply has no rows for the student
+    count_columns = ["modules_assigned", "modules_started", "modules_completed", "activity_events_7d",
+                     "activity_events_30d", "active_days_30d", "has_career_survey", "screening_count"]
+    features[count_columns] = features[count_columns].fillna(0)
+
+    assigned = features["modules_assigned"].to_numpy(dtype=float)
+    features["completion_rate"] = np.where(
+        assigned > 0, features["modules_completed"].to_numpy(dtype=float) / np.maximum(assigned, 1), np.nan
+    )
+
+    last_activity = features[["last_completed", "last_started", "last_event"]].max(axis=1)
+    as_of_julian = conn.execute("SELECT julianday(?)", (as_of,)).fetchone()[0]
+    features["days_since_last_activity"] = (as_of_julian - last_activity).fillna(features["days_since_registration"])
+
+    return features[["student_id", "user_id"] + CHURN_FEATURES].reset_index(drop=True)
+
+
+def _churn_labels(conn, features, as_of, horizon_days):
+    """1 where the student has no learning activity in (as_of, as_of + horizon]"""
+    tables = _existing_tables(conn)
+    start = as_of.strftime("%Y-%m-%d %H:%M:%S")
+    end = (as_of + timedelta(days=horizon_days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    sources = [
+        "SELECT user_id, started_date as at FROM learning_modules",
+        "SELECT user_id, completed_date as at FROM learning_modules",
+    ]
+    if "learning_activity_events" in tables:
+        sources.append("SELECT user_id, occurred_at as at FROM learning_activity_events")
+
+    active = {
+        row[0] for row in conn.execute(f"""
+            SELECT DISTINCT user_id FROM ({' UNION ALL '.join(sources)})
+            WHERE julianday(at) > julianday(?) AND julianday(at) <= julianday(?)
+        """, (start, end))
+    }
+    return (~features["user_id"].isin(active)).astype(int).to_numpy()
+
+
+def build_training_set(conn, horizon_days=CHURN_HORIZON_DAYS, cutoffs=TRAINING_CUTOFFS,
+                       step_days=TRAINING_CUTOFF_STEP_DAYS):
+    """Stack point-in-time feature rows and churn labels over several historical cutoffs"""
+    latest_cutoff = datetime.now() - timedelta(days=horizon_days)
+    frames = []
+    for index in range(cutoffs):
+        as_of = latest_cutoff - timedelta(days=index * step_days)
+        features = build_churn_features(conn, as_of)
+        if features.empty:
+            continue
+        features["churned"] = _churn_labels(conn, features, as_of, horizon_days)
+        features["cutoff"] = as_of.date().isoformat()
+        frames.append(features)
+
+    if not frames:
+        return pd.DataFrame(columns=["student_id", "user_id"] + CHURN_FEATURES + ["churned", "cutoff"])
+    return pd.concat(frames, ignore_index=True)
+
+
+# ========================
+# TRAINING
+# ========================
+def _make_estimator(use_xgboost=False):
+    """Gradient-boosted trees; both options handle missing feature values natively"""
+    if use_xgboost:
+        try:
+            from xgboost import XGBClassifier
+            return XGBClassifier(n_estimators=200, max_depth=4, learning_rate=0.05,
+                                 eval_metric="logloss", n_jobs=1), "xgboost"
+        except ImportError:
+            logger.warning("xgboost not installed, falling back to scikit-learn")
+
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    return HistGradientBoostingClassifier(max_iter=200, max_depth=4, learning_rate=0.05,
+                                          random_state=42), "hist_gradient_boosting"
+
+
+def train_churn_model(db_path=DB_PATH, horizon_days=CHURN_HORIZON_DAYS, use_xgboost=False, activate=True):
+    """
+    Fit a calibrated gradient-boosted churn model, write a versioned artifact and
+    record it in churn_model_versions (activated unless activate=False)
+    """
+    try:
+        import joblib
+        from sklearn.calibration import CalibratedClassifierCV
+        from sklearn.metrics import roc_auc_score, brier_score_loss
+        from sklearn.model_selection import train_test_split
+
+        ensure_schema("churn_model", db_path=db_path)
+        conn = sqlite3.connect(str(db_path))
+        try:
+            training = build_training_set(conn, horizon_days)
+        finally:
+            conn.close()
+
+        labels = training["churned"].to_numpy(dtype=int)
+        class_counts = np.bincount(labels, minlength=2)
+        if len(training) < MIN_TRAINING_SAMPLES or class_counts.min() < 10:
+            return {"error": f"Not enough training data: {len(training)} samples, "
+                             f"{class_counts[1]} churned / {class_counts[0]} active"}
+
+        # Sources with no data at all yet (e.g. no screenings) are left out of this version
+        feature_columns = [column for column in CHURN_FEATURES if training[column].notna().any()]
+        X = training[feature_columns].to_numpy(dtype=float)
+        # Isotonic needs plenty of data per fold; Platt scaling is safer on small cohorts
+        calibration = "isotonic" if len(training) >= 1000 else "sigmoid"
+
+        # Hold out whole students so stacked cutoffs of one student don't leak across the split
+        students = training["student_id"].drop_duplicates().to_numpy(dtype=object)
+        _, test_students = train_test_split(students, test_size=0.25, random_state=42)
+        test_mask = training["student_id"].isin(test_students).to_numpy()
+        if np.bincount(labels[~test_mask], minlength=2).min() < 3 or len(np.unique(labels[test_mask])) < 2:
+            return {"error": "Not enough churned and active students for a held-out evaluation"}
+
+        # ensemble=False: one booster calibrated on out-of-fold predictions, so inference
+        # walks a single set of trees instead of one per fold
+        estimator, model_type = _make_estimator(use_xgboost)
+        holdout_model = CalibratedClassifierCV(estimator, method=calibration, cv=3, ensemble=False)
+        holdout_model.fit(X[~test_mask], labels[~test_mask])
+        test_probabilities = holdout_model.predict_proba(X[test_mask])[:, 1]
+        roc_auc = float(roc_auc_score(labels[test_mask], test_probabilities))
+        brier = float(brier_score_loss(labels[test_mask], test_probabilities))
+
+        # Final model is refit on every sample
+        estimator, model_type = _make_estimator(use_xgboost)
+        model = CalibratedClassifierCV(estimator, method=calibration, cv=3, ensemble=False)
+        model.fit(X, labels)
+
+        version = datetime.now().strftime("%Y%m%d%H%M%S")
+        trained_at = datetime.now().isoformat()
+        CHURN_MODEL_DIR.mkdir(parents=True, exist_ok=True)
+        artifact_path = CHURN_MODEL_DIR / f"churn_model_{version}.joblib"
+        metadata = {
+            "version": version,
+            "model_type": model_type,
+            "calibration": calibration,
+            "horizon_days": horizon_days,
+            "n_samples": int(len(training)),
+            "positive_rate": round(float(labels.mean()), 4),
+            "roc_auc": round(roc_auc, 4),
+            "brier_score": round(brier, 4),
+            "feature_columns": feature_columns,
+            "trained_at": trained_at,
+        }
+        joblib.dump({"model": model, **metadata}, artifact_path)
+
+        conn = sqlite3.connect(str(db_path))
+        try:
+            if activate:
+                conn.execute("UPDATE churn_model_versions SET is_active = 0 WHERE is_active = 1")
+            conn.execute("""
+                INSERT INTO churn_model_versions (
+                    version, artifact_path, model_type, calibration, horizon_days, n_samples,
+                    positive_rate, roc_auc, brier_score, feature_columns, trained_at, is_active
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (version, str(artifact_path), model_type, calibration, horizon_days, metadata["n_samples"],
+                  metadata["positive_rate"], metadata["roc_auc"], metadata["brier_score"],
+                  json.dumps(feature_columns), trained_at, 1 if activate else 0))
+            conn.commit()
+        finally:
+            conn.close()
+
+        if activate:
+            init_churn_model_service(db_path).reload()
+
+        logger.info(f"Trained churn model {version}: AUC {roc_auc:.3f}, Brier {brier:.3f} on {len(training)} samples")
+        return {**metadata, "artifact_path": str(artifact_path), "active": activate}
+    except Exception as e:
+        logger.error(f"Error training churn model: {e}")
+        return {"error": str(e)}
+
+
+def get_churn_model_versions(db_path=DB_PATH):
+    """Trained churn model versions, newest first"""
+    try:
+        ensure_schema("churn_model", db_path=db_path)
+        conn = sqlite3.connect(str(db_path))
+        try:
+            df = pd.read_sql_query("""
+                SELECT version, model_type, calibration, horizon_days, n_samples, positive_rate,
+                       roc_auc, brier_score, trained_at, is_active
+                FROM churn_model_versions
+                ORDER BY trained_at DESC
+            """, conn)
+        finally:
+            conn.close()
+        return df.to_dict('records')
+    except Exception as e:
+        logger.error(f"Error getting churn model versions: {e}")
+        return []
+
+
+# ========================
+# INFERENCE
+# ========================
+class ChurnModelService:
+    """Active churn model, loaded once per version, plus a cached cohort score vector"""
+
+    def __init__(self, db_path=DB_PATH, cache_seconds=COHORT_CACHE_SECONDS, check_seconds=MODEL_CHECK_SECONDS):
+        self.db_path = db_path
+        self.cache_seconds = cache_seconds
+        self.check_seconds = check_seconds
+        self._artifact = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        # Cached cohort scores: student_id -> row index into _probabilities
+        self._index = {}
+        self._probabilities = np.empty(0)
+        self._scored_at = 0.0
+
+    def _active_version(self):
+        ensure_schema("churn_model", db_path=self.db_path)
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            return conn.execute("""
+                SELECT version, artifact_path FROM churn_model_versions
+                WHERE is_active = 1 ORDER BY trained_at DESC LIMIT 1
+            """).fetchone()
+        finally:
+            conn.close()
+
+    def load(self):
+        """
+        Active artifact, None when no model is trained
+        The active version is re-checked at most every check_seconds, so versions activated by the
+        training script or the worker are picked up; the artifact is only re-read when it changed.
+        """
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.check_seconds:
+                return self._artifact
+
+            previous = self._artifact["version"] if self._artifact else None
+            try:
+                active = self._active_version()
+                if active and active[0] != previous:
+                    import joblib
+                    self._artifact = joblib.load(active[1])
+                    logger.info(f"Loaded churn model {active[0]}")
+                elif not active:
+                    self._artifact = None
+            except Exception as e:
+                logger.error(f"Error loading churn model: {e}")
+                self._artifact = None
+
+            self._checked_at = time.monotonic()
+            if (self._artifact["version"] if self._artifact else None) != previous:
+                # Cached scores came from the previous model
+                self._index, self._probabilities, self._scored_at = {}, np.empty(0), 0.0
+            return self._artifact
+
+    def reload(self):
+        """Check for a newly activated version now (the artifact is only re-read if it changed)"""
+        with self._lock:
+            self._checked_at = float("-inf")
+        return self.load()
+
+    @property
+    def model_info(self) -> Optional[Dict]:
+        artifact = self.load()
+        if artifact is None:
+            return None
+        return {key: value for key, value in artifact.items() if key != "model"}
+
+    def _predict(self, features: pd.DataFrame, artifact) -> np.ndarray:
+        X = features[artifact["feature_columns"]].to_numpy(dtype=float)
+        return artifact["model"].predict_proba(X)[:, 1]
+
+    def score_cohort(self, conn=None) -> Optional[pd.DataFrame]:
+        """Score every student in one predict_proba call and cache the vector"""
+        artifact = self.load()
+        if artifact is None:
+            return None
+
+        own_conn = conn is None
+        conn = conn or sqlite3.connect(str(self.db_path))
+        try:
+            features = build_churn_features(conn)
+        finally:
+            if own_conn:
+                conn.close()
+
+        probabilities = self._predict(features, artifact) if len(features) else np.empty(0)
+        with self._lock:
+            self._index = {student_id: i for i, student_id in enumerate(features["student_id"])}
+            self._probabilities = probabilities
+            self._scored_at = time.monotonic()
+
+        return pd.DataFrame({
+            "student_id": features["student_id"],
+            "user_id": features["user_id"],
+            "churn_probability": probabilities,
+        })
+
+    def _cache_fresh(self):
+        return self._scored_at and time.monotonic() - self._scored_at < self.cache_seconds
+
+    def predict(self, conn, student_ids) -> Optional[np.ndarray]:
+        """
+        Churn probabilities aligned with student_ids, or None without a trained model
+        Served from the cached cohort vector when fresh; otherwise only these students are scored
+        """
+        artifact = self.load()
+        if artifact is None:
+            return None
+
+        student_ids = list(student_ids)
+        with self._lock:
+            if self._cache_fresh() and all(student_id in self._index for student_id in student_ids):
+                return self._probabilities[[self._index[student_id] for student_id in student_ids]]
+
+        try:
+            if len(student_ids) > 1 or not self._cache_fresh():
+                # Batch requests and cold caches refresh the whole cohort vector in one pass
+                self.score_cohort(conn)
+                with self._lock:
+                    if all(student_id in self._index for student_id in student_ids):
+                        return self._probabilities[[self._index[student_id] for student_id in student_ids]]
+
+            features = build_churn_features(conn, student_ids=student_ids)
+            if features.empty:
+                return np.full(len(student_ids), np.nan)
+            probabilities = pd.Series(self._predict(features, artifact), index=features["student_id"])
+            return probabilities.reindex(student_ids).to_numpy(dtype=float)
+        except Exception as e:
+            logger.error(f"Error scoring churn model: {e}")
+            return None
+
+    def get_student_risk(self, student_id) -> Optional[float]:
+        """Calibrated churn probability (0-1) for one student from the cached cohort vector"""
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            probabilities = self.predict(conn, [student_id])
+        finally:
+            conn.close()
+        if probabilities is None or np.isnan(probabilities[0]):
+            return None
+        return float(probabilities[0])
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def init_churn_model_service(db_path=DB_PATH):
+    """Process-wide churn model service (one per database, so the model loads once)"""
+    with _services_lock:
+        key = str(db_path)
+        if key not in _services:
+            _services[key] = ChurnModelService(db_path)
+        return _services[key]
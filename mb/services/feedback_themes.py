@@ -0,0 +1,336 @@
+"""
+Feedback Themes
+Ranked terms and bigrams from free-text feedback (employer strengths and areas
+for improvement), per month and per employer.
+
+New completed feedback is tokenized in one CountVectorizer pass (lowercased,
+accents stripped, English stop words removed, unigrams + bigrams, each term
+counted once per response). A group-membership matrix times the document-term
+matrix gives the mention counts for every (scope, period) at once, and those
+counts are added to `feedback_term_counts`. Rankings are then a small indexed
+aggregate, independent of how much feedback history exists.
+"""
+
+import json
+import sqlite3
+import time
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .schema_registry import register_schema, ensure_schema
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
+
+# Free-text sources: source -> table, key, period timestamp, employer column and text fields
+THEME_SOURCES = {
+    "employer_survey": {
+        "table": "employer_feedback_surveys",
+        "key": "survey_id",
+        "period": "COALESCE(completed_date, survey_date)",
+        "employer": "employer_name",
+        "fields": ["strengths", "areas_for_improvement"],
+        "where": "completion_status = 'completed'",
+    },
+}
+
+THEME_BATCH_SIZE = 5000
+THEME_TOKEN_PATTERN = r"(?u)\b[^\W\d_]{2,}\b"  # Words of 2+ letters; numbers and ratings are noise
+THEME_OVERFETCH = 3  # Extra ranked rows read so collapsing redundant words still leaves n themes
+THEME_CHECK_SECONDS = 60  # How often readers look for unprocessed feedback
+
+_themes_checked = {}  # db path -> time.monotonic() of the last staleness check
+
+register_schema("feedback_themes", [
+    """
+        CREATE TABLE IF NOT EXISTS feedback_term_counts (
+            source VARCHAR(50) NOT NULL,
+            field VARCHAR(50) NOT NULL,
+            scope_type VARCHAR(20) NOT NULL,
+            scope_value VARCHAR(255) NOT NULL,
+            period VARCHAR(7) NOT NULL,
+            term VARCHAR(100) NOT NULL,
+            ngram INTEGER NOT NULL,
+            documents INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (source, field, scope_type, scope_value, period, term)
+        )
+    """,
+    # Responses with non-empty text per scope/period, for mention shares
+    """
+        CREATE TABLE IF NOT EXISTS feedback_term_documents (
+            source VARCHAR(50) NOT NULL,
+            field VARCHAR(50) NOT NULL,
+            scope_type VARCHAR(20) NOT NULL,
+            scope_value VARCHAR(255) NOT NULL,
+            period VARCHAR(7) NOT NULL,
+            documents INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (source, field, scope_type, scope_value, period)
+        )
+    """,
+    # Source rows already counted, so updates only tokenize new feedback
+    """
+        CREATE TABLE IF NOT EXISTS feedback_theme_processed (
+            source VARCHAR(50) NOT NULL,
+            source_id INTEGER NOT NULL,
+            processed_at TIMESTAMP,
+            PRIMARY KEY (source, source_id)
+        )
+    """,
+])
+
+
+def _vectorizer():
+    from sklearn.feature_extraction.text import CountVectorizer
+    return CountVectorizer(
+        lowercase=True,
+        strip_accents="unicode",
+        stop_words="english",
+        token_pattern=THEME_TOKEN_PATTERN,
+        ngram_range=(1, 2),
+        binary=True
+    )
+
+
+def _scope_groups(frame: pd.DataFrame):
+    """(scope_type, scope_value, period) per group and each document's group ids, overall and per employer"""
+    periods = frame["period"].to_numpy(dtype=object)
+    employers = frame["employer"].to_numpy(dtype=object)
+    keys = [("all", "all", period) for period in periods] + [
+        ("employer", employer, period) for employer, period in zip(employers, periods)
+    ]
+    groups, inverse = np.unique(np.array(keys, dtype=object).astype(str), axis=0, return_inverse=True)
+    documents = np.concatenate([np.arange(len(frame)), np.arange(len(frame))])
+    return [tuple(group) for group in groups], inverse.ravel(), documents
+
+
+def _count_batch(frame: pd.DataFrame, field: str):
+    """Term and document counts per (scope, period) for one text field of a batch"""
+    from scipy.sparse import csr_matrix
+
+    texts = frame[field].fillna("").astype(str).str.strip()
+    frame = frame.loc[texts != ""].assign(text=texts[texts != ""])
+    if frame.empty:
+        return [], []
+
+    vectorizer = _vectorizer()
+    try:
+        matrix = vectorizer.fit_transform(frame["text"])
+    except ValueError:
+        # Empty vocabulary: the batch holds only stop words or numbers
+        return [], []
+    terms = vectorizer.get_feature_names_out()
+
+    groups, group_of, document_of = _scope_groups(frame)
+    membership = csr_matrix(
+        (np.ones(len(group_of), dtype=np.int32), (group_of, document_of)),
+        shape=(len(groups), len(frame))
+    )
+    counts = (membership @ matrix).tocoo()
+    term_rows = [
+        (*groups[group], str(terms[column]), terms[column].count(" ") + 1, int(value))
+        for group, column, value in zip(counts.row, counts.col, counts.data)
+    ]
+    document_rows = [
+        (*groups[group], int(total))
+        for group, total in enumerate(np.asarray(membership.sum(axis=1)).ravel())
+    ]
+    return term_rows, document_rows
+
+
+def update_feedback_themes(db_path=DB_PATH, batch_size: int = THEME_BATCH_SIZE) -> Dict:
+    """
+    Count terms in completed feedback not processed yet and add them to feedback_term_counts
+    Each batch (counts plus processed markers) commits in one transaction.
+    """
+    try:
+        ensure_schema("feedback_themes", db_path=db_path)
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        processed = 0
+        try:
+            for source, config in THEME_SOURCES.items():
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (config["table"],)
+                ).fetchone()
+                if not exists:
+                    continue
+                while True:
+                    frame = pd.read_sql_query(f"""
+                        SELECT s.{config['key']} as source_id,
+                               COALESCE(strftime('%Y-%m', {config['period']}), 'unknown') as period,
+                               COALESCE(NULLIF(TRIM(s.{config['employer']}), ''), 'Unknown') as employer,
+                               {', '.join(config['fields'])}
+                        FROM {config['table']} s
+                        WHERE {config['where']}
+                          AND NOT EXISTS (
+                              SELECT 1 FROM feedback_theme_processed p
+                              WHERE p.source = ? AND p.source_id = s.{config['key']}
+                          )
+                        ORDER BY s.{config['key']}
+                        LIMIT ?
+                    """, conn, params=(source, batch_size))
+                    if frame.empty:
+                        break
+
+                    now = datetime.now().isoformat()
+                    conn.execute("BEGIN IMMEDIATE")
+                    for field in config["fields"]:
+                        term_rows, document_rows = _count_batch(frame, field)
+                        conn.executemany("""
+                            INSERT INTO feedback_term_counts
+                                (source, field, scope_type, scope_value, period, term, ngram, documents)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT(source, field, scope_type, scope_value, period, term)
+                            DO UPDATE SET documents = documents + excluded.documents
+                        """, [(source, field, *row) for row in term_rows])
+                        conn.executemany("""
+                            INSERT INTO feedback_term_documents (source, field, scope_type, scope_value, period, documents)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                            ON CONFLICT(source, field, scope_type, scope_value, period)
+                            DO UPDATE SET documents = documents + excluded.documents
+                        """, [(source, field, *row) for row in document_rows])
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO feedback_theme_processed (source, source_id, processed_at) VALUES (?, ?, ?)",
+                        [(source, int(source_id), now) for source_id in frame["source_id"]]
+                    )
+                    conn.commit()
+                    processed += len(frame)
+        finally:
+            conn.close()
+
+        if processed:
+            logger.info(f"Feedback themes updated from {processed} responses")
+        return {"responses_processed": processed}
+    except Exception as e:
+        logger.error(f"Error updating feedback themes: {e}")
+        return {"error": str(e)}
+
+
+def refresh_feedback_themes_if_stale(db_path=DB_PATH) -> Dict:
+    """
+    Run the incremental update only when completed feedback outnumbers processed responses
+    Checked at most every THEME_CHECK_SECONDS per database, so it is safe to call on every render
+    """
+    try:
+        if time.monotonic() - _themes_checked.get(str(db_path), float("-inf")) < THEME_CHECK_SECONDS:
+            return {"responses_processed": 0}
+        _themes_checked[str(db_path)] = time.monotonic()
+        ensure_schema("feedback_themes", db_path=db_path)
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        try:
+            stale = False
+            for source, config in THEME_SOURCES.items():
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (config["table"],)
+                ).fetchone()
+                if not exists:
+                    continue
+                completed = conn.execute(f"SELECT COUNT(*) FROM {config['table']} WHERE {config['where']}").fetchone()[0]
+                processed = conn.execute(
+                    "SELECT COUNT(*) FROM feedback_theme_processed WHERE source = ?", (source,)
+                ).fetchone()[0]
+                stale = stale or completed > processed
+        finally:
+            conn.close()
+        return update_feedback_themes(db_path) if stale else {"responses_processed": 0}
+    except Exception as e:
+        logger.error(f"Error refreshing feedback themes: {e}")
+        return {"error": str(e)}
+
+
+def rebuild_feedback_themes(db_path=DB_PATH) -> Dict:
+    """Reconcile: drop all counts and re-tokenize every completed response"""
+    ensure_schema("feedback_themes", db_path=db_path)
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for table in ("feedback_term_counts", "feedback_term_documents", "feedback_theme_processed"):
+            conn.execute(f"DELETE FROM {table}")
+        conn.commit()
+    finally:
+        conn.close()
+    return update_feedback_themes(db_path)
+
+
+def get_feedback_themes(
+    field: str,
+    source: str = "employer_survey",
+    employer: Optional[str] = None,
+    periods: Optional[List[str]] = None,
+    n: int = 10,
+    ngram: Optional[int] = None,
+    collapse: bool = True,
+    db_path=DB_PATH
+) -> pd.DataFrame:
+    """
+    Top terms for a text field, overall or for one employer, optionally within periods ('YYYY-MM')
+    Columns: term, ngram, mentions (responses using the term), share_pct (of responses with text)
+    collapse drops single words that only ever appear inside a listed bigram
+    ("communication" under "communication skills")
+    """
+    try:
+        ensure_schema("feedback_themes", db_path=db_path)
+        scope = ("employer", employer) if employer else ("all", "all")
+        period_filter = json.dumps(periods) if periods else None
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        try:
+            themes = pd.read_sql_query("""
+                SELECT term, ngram, SUM(documents) as mentions
+                FROM feedback_term_counts
+                WHERE source = ? AND field = ? AND scope_type = ? AND scope_value = ?
+                  AND (? IS NULL OR period IN (SELECT value FROM json_each(?)))
+                  AND (? IS NULL OR ngram = ?)
+                GROUP BY term, ngram
+                ORDER BY mentions DESC, ngram DESC, term
+                LIMIT ?
+            """, conn, params=(source, field, *scope, period_filter, period_filter or "[]", ngram, ngram,
+                               n * THEME_OVERFETCH if collapse else n))
+            responses = conn.execute("""
+                SELECT SUM(documents) FROM feedback_term_documents
+                WHERE source = ? AND field = ? AND scope_type = ? AND scope_value = ?
+                  AND (? IS NULL OR period IN (SELECT value FROM json_each(?)))
+            """, (source, field, *scope, period_filter, period_filter or "[]")).fetchone()[0] or 0
+        finally:
+            conn.close()
+        if collapse and not themes.empty:
+            bigram_mentions = {}
+            for term, mentions in themes.loc[themes["ngram"] == 2, ["term", "mentions"]].itertuples(index=False):
+                for word in term.split():
+                    bigram_mentions[word] = max(bigram_mentions.get(word, 0), mentions)
+            covered = [
+                ngram_size == 1 and bigram_mentions.get(term, 0) >= mentions
+                for term, ngram_size, mentions in themes[["term", "ngram", "mentions"]].itertuples(index=False)
+            ]
+            themes = themes.loc[~np.array(covered, dtype=bool)].head(n).reset_index(drop=True)
+        themes["share_pct"] = (100.0 * themes["mentions"] / responses).round(1) if responses else 0.0
+        return themes
+    except Exception as e:
+        logger.error(f"Error getting feedback themes: {e}")
+        return pd.DataFrame(columns=["term", "ngram", "mentions", "share_pct"])
+
+
+def get_theme_scopes(source: str = "employer_survey", db_path=DB_PATH) -> Dict[str, list]:
+    """Employers and periods that have theme counts"""
+    try:
+        ensure_schema("feedback_themes", db_path=db_path)
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        try:
+            employers = [row[0] for row in conn.execute("""
+                SELECT DISTINCT scope_value FROM feedback_term_documents
+                WHERE source = ? AND scope_type = 'employer' ORDER BY scope_value
+            """, (source,))]
+            periods = [row[0] for row in conn.execute("""
+                SELECT DISTINCT period FROM feedback_term_documents
+                WHERE source = ? AND scope_type = 'all' ORDER BY period DESC
+            """, (source,))]
+        finally:
+            conn.close()
+        return {"employers": employers, "periods": periods}
+    except Exception as e:
+        logger.error(f"Error getting theme scopes: {e}")
+        return {"employers": [], "periods": []}
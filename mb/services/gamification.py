@@ -2,22 +2,24 @@
 Gamification - Badges, Streaks, and Motivational Elements
 """
 import sqlite3
+import pandas as pd
+import numpy as np
 from pathlib import Path
 from datetime import datetime, timedelta
 import json
 import logging
 
+from .schema_registry import register_schema, ensure_schema
+from .leaderboard import init_leaderboard_service
+from .churn_model import init_churn_model_service
+
 logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
 
-def init_gamification_tables():
-    """Initialize gamification tables"""
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
-    
+register_schema("gamification", [
     # User achievements/badges
-    cursor.execute('''
+    '''
         CREATE TABLE IF NOT EXISTS user_badges (
             badge_id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
@@ -28,10 +30,9 @@ def init_gamification_tables():
             FOREIGN KEY (user_id) REFERENCES mb_users(user_id),
             UNIQUE(user_id, badge_name)
         )
-    ''')
-    
+    ''',
     # Learning streaks
-    cursor.execute('''
+    '''
         CREATE TABLE IF NOT EXISTS learning_streaks (
             streak_id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
@@ -41,95 +42,163 @@ def init_gamification_tables():
             FOREIGN KEY (user_id) REFERENCES mb_users(user_id),
             UNIQUE(user_id)
         )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    ''',
+    # Append-only learning activity log (source of truth for streaks)
+    '''
+        CREATE TABLE IF NOT EXISTS learning_activity_events (
+            event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            module_id TEXT,
+            event_type TEXT NOT NULL,
+            progress INTEGER,
+            occurred_at TIMESTAMP NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES mb_users(user_id)
+        )
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_activity_events_user ON learning_activity_events(user_id, occurred_at)",
+], version=2)
 
+register_schema("churn_interventions", [
+    """
+        CREATE TABLE IF NOT EXISTS churn_interventions (
+            intervention_id INTEGER PRIMARY KEY,
+            student_id VARCHAR(50),
+            intervention_type VARCHAR(50),
+            triggered_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status VARCHAR(50) DEFAULT 'pending',
+            response_date TIMESTAMP,
+            effectiveness_score INTEGER
+        )
+    """,
+])
 
-def check_and_award_badges(user_id, student_id):
-    """Check user progress and award badges"""
+
+def init_gamification_tables():
+    """Initialize gamification tables (no-op once applied in this process)"""
+    ensure_schema("gamification", db_path=DB_PATH)
+
+
+def _refresh_leaderboards(user_ids=None):
+    """Push badge/streak changes into the leaderboards (full rebuild when user_ids is None)"""
+    try:
+        leaderboard = init_leaderboard_service(DB_PATH)
+        if user_ids is None:
+            leaderboard.rebuild()
+        else:
+            leaderboard.update_users(user_ids)
+    except Exception as e:
+        logger.error(f"Error refreshing leaderboards: {e}")
+
+
+# Declarative badge rules: "condition" is a SQL predicate over the per-user
+# module aggregate (total, completed, in_progress) built in award_badges()
+BADGE_RULES = [
+    {
+        "name": "First Step",
+        "description": "Started your first learning module",
+        "icon": "🎯",
+        "condition": "in_progress > 0 OR completed > 0"
+    },
+    {
+        "name": "Module Completer",
+        "description": "Completed your first learning module",
+        "icon": "✅",
+        "condition": "completed >= 1"
+    },
+    {
+        "name": "Dedicated Learner",
+        "description": "Completed 5 learning modules",
+        "icon": "🌟",
+        "condition": "completed >= 5"
+    },
+    {
+        "name": "Knowledge Master",
+        "description": "Completed 10 learning modules",
+        "icon": "🏆",
+        "condition": "completed >= 10"
+    },
+    {
+        "name": "Multi-Tasker",
+        "description": "Have 3 or more modules in progress",
+        "icon": "⚡",
+        "condition": "in_progress >= 3"
+    },
+    {
+        "name": "Focused Learner",
+        "description": "Completed all modules in a learning path",
+        "icon": "🎓",
+        "condition": "total > 0 AND completed = total"
+    }
+]
+
+
+def award_badges(user_ids=None):
+    """
+    Evaluate BADGE_RULES set-based for the given users (all users if None)
+    One aggregate over learning_modules, then one INSERT OR IGNORE per rule;
+    UNIQUE(user_id, badge_name) skips badges already earned.
+    Returns the newly awarded badges as {"user_id", "name", "description", "icon"} dicts
+    """
+    init_gamification_tables()
+    conn = sqlite3.connect(str(DB_PATH))
     try:
-        init_gamification_tables()
-        conn = sqlite3.connect(str(DB_PATH))
         cursor = conn.cursor()
-        
-        badges_earned = []
-        
-        # Get user's module statistics
-        cursor.execute('''
-            SELECT 
+        cursor.execute("BEGIN IMMEDIATE")
+
+        user_filter, params = "", ()
+        if user_ids is not None:
+            user_filter = "WHERE user_id IN (SELECT value FROM json_each(?))"
+            params = (json.dumps([int(user_id) for user_id in user_ids]),)
+
+        cursor.execute(f"""
+            CREATE TEMP TABLE badge_stats AS
+            SELECT
+                user_id,
                 COUNT(*) as total,
                 SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
-                SUM(CASE WHEN status = 'in_progress' THEN 1 ELSE 0 END) as in_progress,
-                AVG(progress) as avg_progress
+                SUM(CASE WHEN status = 'in_progress' THEN 1 ELSE 0 END) as in_progress
             FROM learning_modules
-            WHERE user_id = ?
-        ''', (user_id,))
-        
-        stats = cursor.fetchone()
-        total, completed, in_progress = stats[0] or 0, stats[1] or 0, stats[2] or 0
-        
-        # Badge criteria
-        badge_criteria = [
-            {
-                "name": "First Step",
-                "description": "Started your first learning module",
-                "icon": "🎯",
-                "condition": lambda: in_progress > 0 or completed > 0
-            },
-            {
-                "name": "Module Completer",
-                "description": "Completed your first learning module",
-                "icon": "✅",
-                "condition": lambda: completed >= 1
-            },
-            {
-                "name": "Dedicated Learner",
-                "description": "Completed 5 learning modules",
-                "icon": "🌟",
-                "condition": lambda: completed >= 5
-            },
-            {
-                "name": "Knowledge Master",
-                "description": "Completed 10 learning modules",
-                "icon": "🏆",
-                "condition": lambda: completed >= 10
-            },
-            {
-                "name": "Multi-Tasker",
-                "description": "Have 3 or more modules in progress",
-                "icon": "⚡",
-                "condition": lambda: in_progress >= 3
-            },
-            {
-                "name": "Focused Learner",
-                "description": "Completed all modules in a learning path",
-                "icon": "🎓",
-                "condition": lambda: total > 0 and completed == total
-            }
+            {user_filter}
+            GROUP BY user_id
+        """, params)
+
+        # Every badge inserted by this call gets a badge_id above the current max
+        last_badge_id = cursor.execute("SELECT COALESCE(MAX(badge_id), 0) FROM user_badges").fetchone()[0]
+
+        for rule in BADGE_RULES:
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO user_badges (user_id, badge_name, badge_description, badge_icon)
+                SELECT user_id, ?, ?, ?
+                FROM badge_stats
+                WHERE {rule["condition"]}
+            """, (rule["name"], rule["description"], rule["icon"]))
+
+        awarded = [
+            {"user_id": row[0], "name": row[1], "description": row[2], "icon": row[3]}
+            for row in cursor.execute("""
+                SELECT user_id, badge_name, badge_description, badge_icon
+                FROM user_badges
+                WHERE badge_id > ?
+                ORDER BY badge_id
+            """, (last_badge_id,))
         ]
-        
-        for badge in badge_criteria:
-            if badge["condition"]():
-                # Check if badge already earned
-                cursor.execute(
-                    "SELECT badge_id FROM user_badges WHERE user_id = ? AND badge_name = ?",
-                    (user_id, badge["name"])
-                )
-                
-                if not cursor.fetchone():
-                    cursor.execute('''
-                        INSERT INTO user_badges (user_id, badge_name, badge_description, badge_icon)
-                        VALUES (?, ?, ?, ?)
-                    ''', (user_id, badge["name"], badge["description"], badge["icon"]))
-                    badges_earned.append(badge)
-        
+
+        cursor.execute("DROP TABLE badge_stats")
         conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
         conn.close()
-        
-        return badges_earned
-        
+
+    _refresh_leaderboards(user_ids)
+    return awarded
+
+
+def check_and_award_badges(user_id, student_id):
+    """Check user progress and award badges"""
+    try:
+        return award_badges([user_id])
     except Exception as e:
         logger.error(f"Error awarding badges: {e}")
         return []
@@ -166,55 +235,137 @@ def get_user_badges(user_id):
         return []
 
 
-def update_streak(user_id):
-    """Update learning streak for user"""
-    try:
-        init_gamification_tables()
+# ========================
+# ACTIVITY LOG & STREAKS
+# ========================
+# Streak after one more activity at excluded.last_activity_date, from the stored row (SQLite
+# evaluates every DO UPDATE expression against the old row)
+_EXTENDED_STREAK = """
+    CASE
+        WHEN date(last_activity_date) >= date(excluded.last_activity_date) THEN MAX(current_streak, 1)
+        WHEN date(last_activity_date) = date(excluded.last_activity_date, '-1 day') THEN current_streak + 1
+        ELSE 1
+    END
+"""
+
+
+def log_learning_activity(user_id, module_id=None, event_type="progress", progress=None, conn=None):
+    """
+    Append a learning activity event and extend the user's learning_streaks row in the same transaction
+    Pass conn to write in the caller's transaction (the caller commits)
+    """
+    init_gamification_tables()
+    own_conn = conn is None
+    if own_conn:
         conn = sqlite3.connect(str(DB_PATH))
+    try:
+        occurred_at = datetime.now().isoformat()
+        conn.execute("""
+            INSERT INTO learning_activity_events (user_id, module_id, event_type, progress, occurred_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (user_id, module_id, event_type, progress, occurred_at))
+        conn.execute(f"""
+            INSERT INTO learning_streaks (user_id, current_streak, longest_streak, last_activity_date)
+            VALUES (?, 1, 1, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                current_streak = {_EXTENDED_STREAK},
+                longest_streak = MAX(longest_streak, {_EXTENDED_STREAK}),
+                last_activity_date = MAX(COALESCE(last_activity_date, ''), excluded.last_activity_date)
+        """, (user_id, occurred_at))
+        if own_conn:
+            conn.commit()
+    finally:
+        if own_conn:
+            conn.close()
+    if own_conn:
+        _refresh_leaderboards([user_id])
+
+
+def backfill_activity_events(conn):
+    """Seed the activity log from learning_modules start/completion dates (idempotent)"""
+    cursor = conn.cursor()
+    inserted = 0
+    for event_type, date_column in (("started", "started_date"), ("completed", "completed_date")):
+        cursor.execute(f"""
+            INSERT INTO learning_activity_events (user_id, module_id, event_type, occurred_at)
+            SELECT lm.user_id, lm.module_id, ?, lm.{date_column}
+            FROM learning_modules lm
+            WHERE lm.{date_column} IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM learning_activity_events e
+                  WHERE e.user_id = lm.user_id AND e.module_id = lm.module_id AND e.event_type = ?
+              )
+        """, (event_type, event_type))
+        inserted += cursor.rowcount
+    conn.commit()
+    return inserted
+
+
+def recompute_streaks(user_ids=None, as_of=None):
+    """
+    Rebuild learning_streaks from learning_activity_events (all users if user_ids is None)
+    log_learning_activity keeps the rows current; this reconciles them (rebuild_rollups, jobs).
+    Gaps-and-islands: consecutive active days share the same (day - row_number) group.
+    The current streak is the latest run if it ended today or yesterday, otherwise 0.
+    """
+    init_gamification_tables()
+    as_of = (as_of or datetime.now().date()).isoformat()
+    user_filter, params = "", []
+    if user_ids is not None:
+        user_filter = "WHERE user_id IN (SELECT value FROM json_each(?))"
+        params.append(json.dumps([int(user_id) for user_id in user_ids]))
+
+    conn = sqlite3.connect(str(DB_PATH))
+    try:
         cursor = conn.cursor()
-        
-        today = datetime.now().date()
-        
-        # Get current streak info
-        cursor.execute(
-            "SELECT current_streak, longest_streak, last_activity_date FROM learning_streaks WHERE user_id = ?",
-            (user_id,)
-        )
-        
-        result = cursor.fetchone()
-        
-        if result:
-            current_streak, longest_streak, last_activity = result
-            last_activity_date = datetime.fromisoformat(last_activity).date() if last_activity else None
-            
-            # Check if activity was today
-            if last_activity_date == today:
-                # Already counted today
-                pass
-            elif last_activity_date == today - timedelta(days=1):
-                # Streak continues
-                current_streak += 1
-                if current_streak > longest_streak:
-                    longest_streak = current_streak
-            else:
-                # Streak broken
-                current_streak = 1
-            
-            cursor.execute('''
-                UPDATE learning_streaks
-                SET current_streak = ?, longest_streak = ?, last_activity_date = ?
-                WHERE user_id = ?
-            ''', (current_streak, longest_streak, datetime.now().isoformat(), user_id))
-        else:
-            # First time
-            cursor.execute('''
-                INSERT INTO learning_streaks (user_id, current_streak, longest_streak, last_activity_date)
-                VALUES (?, ?, ?, ?)
-            ''', (user_id, 1, 1, datetime.now().isoformat()))
-        
+        changes_before = conn.total_changes
+        cursor.execute(f"""
+            WITH days AS (
+                SELECT DISTINCT user_id, date(occurred_at) as day, MAX(occurred_at) OVER (PARTITION BY user_id) as last_activity
+                FROM learning_activity_events
+                {user_filter}
+            ),
+            islands AS (
+                SELECT user_id, day, last_activity,
+                       julianday(day) - ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY day) as grp
+                FROM days
+            ),
+            runs AS (
+                SELECT user_id, grp, COUNT(*) as run_length, MAX(day) as run_end, MAX(last_activity) as last_activity
+                FROM islands
+                GROUP BY user_id, grp
+            ),
+            ranked AS (
+                SELECT user_id, run_length, run_end, last_activity,
+                       MAX(run_length) OVER (PARTITION BY user_id) as longest,
+                       ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY run_end DESC) as recency
+                FROM runs
+            )
+            INSERT INTO learning_streaks (user_id, current_streak, longest_streak, last_activity_date)
+            SELECT user_id,
+                   CASE WHEN run_end >= date(?, '-1 day') THEN run_length ELSE 0 END,
+                   longest,
+                   last_activity
+            FROM ranked
+            WHERE recency = 1
+            ON CONFLICT(user_id) DO UPDATE SET
+                current_streak = excluded.current_streak,
+                longest_streak = excluded.longest_streak,
+                last_activity_date = excluded.last_activity_date
+        """, params + [as_of])
+        updated = conn.total_changes - changes_before
         conn.commit()
+    finally:
         conn.close()
-        
+
+    _refresh_leaderboards(user_ids)
+    return {"users_updated": updated, "as_of": as_of}
+
+
+def update_streak(user_id):
+    """Record activity for today and return the user's refreshed streak"""
+    try:
+        log_learning_activity(user_id, event_type="activity")
         return get_user_streak(user_id)
         
     except Exception as e:
@@ -223,24 +374,25 @@ def update_streak(user_id):
 
 
 def get_user_streak(user_id):
-    """Get user's current learning streak"""
+    """
+    Get user's current learning streak from the maintained learning_streaks row
+    A streak whose last activity is older than yesterday reads as 0
+    """
     try:
         init_gamification_tables()
         conn = sqlite3.connect(str(DB_PATH))
         cursor = conn.cursor()
         
-        cursor.execute(
-            "SELECT current_streak, longest_streak FROM learning_streaks WHERE user_id = ?",
-            (user_id,)
-        )
+        cursor.execute("""
+            SELECT CASE WHEN date(last_activity_date) >= date(?, '-1 day') THEN current_streak ELSE 0 END,
+                   longest_streak
+            FROM learning_streaks WHERE user_id = ?
+        """, (datetime.now().date().isoformat(), user_id))
         
         result = cursor.fetchone()
         conn.close()
         
-        if result:
-            return {"current": result[0], "longest": result[1]}
-        else:
-            return {"current": 0, "longest": 0}
+        return {"current": result[0], "longest": result[1]} if result else {"current": 0, "longest": 0}
         
     except Exception as e:
         logger.error(f"Error getting streak: {e}")
@@ -266,104 +418,285 @@ def get_motivational_message(completed_modules):
     return "📚 Every step counts. Keep learning!"
 
 
-def predict_churn_risk(student_id, days_ahead=7):
+CHURN_SCORE_MAX_AGE_HOURS = 24
+
+CHURN_INTERVENTIONS = {
+    "Critical": [
+        "🚨 Send urgent engagement push notification",
+        "📞 Schedule intervention call with mentor",
+        "🎁 Offer bonus badge or challenge to re-engage",
+        "💬 Send personalized message from peer mentor"
+    ],
+    "High": [
+        "⚠️ Send reminder notification",
+        "🎯 Suggest milestone-based goal setting",
+        "👥 Connect with peer mentor for support",
+        "📊 Share progress visualization"
+    ],
+    "Medium": [
+        "💡 Suggest new learning module",
+        "🌟 Highlight earned badges",
+        "📈 Share learning path progress",
+        "🤝 Encourage peer interaction"
+    ],
+    "Low": [
+        "✨ Celebrate engagement streak",
+        "🎓 Suggest advanced modules",
+        "🏆 Recognize as role model"
+    ],
+}
+
+register_schema("churn_risk_scores", [
+    """
+        CREATE TABLE IF NOT EXISTS churn_risk_scores (
+            student_id VARCHAR(50) PRIMARY KEY,
+            user_id INTEGER,
+            churn_risk_score REAL,
+            risk_level VARCHAR(20),
+            recent_activity_score REAL,
+            dropout_risk_factor REAL,
+            interaction_consistency REAL,
+            last_activity TIMESTAMP,
+            scored_at TIMESTAMP
+        )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_churn_risk_score ON churn_risk_scores(churn_risk_score)",
+    "CREATE INDEX IF NOT EXISTS idx_churn_risk_scored_at ON churn_risk_scores(scored_at)",
+])
+
+
+def _churn_risk_level(churn_risk):
+    if churn_risk >= 75:
+        return "Critical"
+    elif churn_risk >= 60:
+        return "High"
+    elif churn_risk >= 40:
+        return "Medium"
+    return "Low"
+
+
+def _compute_churn_scores(conn, student_ids=None):
+    """
+    Score churn risk for many students at once
+    Uses the trained churn model's calibrated probability when one is active;
+    otherwise falls back to the weighted factors: recent activity (15%),
+    dropout risk (55%), interaction consistency (30%). The factor scores are
+    stored either way as explanations.
+    Returns a DataFrame with one row per student, in churn_risk_scores column order
+    """
+    student_filter = ""
+    params = []
+    if student_ids is not None:
+        student_filter = f"AND u.student_id IN ({','.join('?' * len(student_ids))})"
+        params = list(student_ids)
+
+    # Recent activity (last 7 days) for every student in one grouped pass; a module's
+    # latest activity is its completion, start or assignment date
+    activity = pd.read_sql_query(f"""
+        SELECT
+            u.student_id,
+            u.user_id,
+            COUNT(DISTINCT lm.module_id) as recent_modules,
+            MAX(COALESCE(lm.completed_date, lm.started_date, lm.assigned_date)) as last_activity,
+            COUNT(lm.user_id) as total_interactions
+        FROM mb_users u
+        LEFT JOIN learning_modules lm
+            ON lm.user_id = u.user_id
+            AND datetime(COALESCE(lm.completed_date, lm.started_date, lm.assigned_date)) > datetime('now', '-7 days')
+        WHERE u.student_id IS NOT NULL {student_filter}
+        GROUP BY u.user_id, u.student_id
+    """, conn, params=params)
+
+    if activity.empty:
+        return activity
+
+    # Dropout risk (first row per student, matching the single-student lookup)
+    dropout = pd.read_sql_query(f"""
+        SELECT student_id, risk_score FROM student_dropout_risk
+        WHERE student_id IN (SELECT u.student_id FROM mb_users u WHERE u.student_id IS NOT NULL {student_filter})
+        ORDER BY rowid
+    """, conn, params=params).drop_duplicates("student_id")
+
+    activity = activity.drop_duplicates("student_id").merge(dropout, on="student_id", how="left")
+
+    recent_modules = activity["recent_modules"].to_numpy(dtype=float)
+    total_interactions = activity["total_interactions"].to_numpy(dtype=float)
+    risk_score = activity["risk_score"].to_numpy(dtype=float)
+    # Missing or zero dropout score defaults to a neutral 5
+    risk_score = np.where(np.isnan(risk_score) | (risk_score == 0), 5, risk_score)
+
+    activity_score = np.minimum(100, recent_modules * 20)  # 0-5 modules = 0-100
+    dropout_factor = (risk_score / 9) * 100  # Convert 1-9 to 0-100
+    consistency_score = np.minimum(100, total_interactions * 15)  # 0-6+ interactions = 0-100
+
+    churn_risk = (activity_score * 0.15) + (dropout_factor * 0.55) + (consistency_score * 0.30)
+
+    model_probabilities = init_churn_model_service(DB_PATH).predict(conn, activity["student_id"])
+    if model_probabilities is not None:
+        # Students the model could not score keep the weighted-factor score
+        churn_risk = np.where(np.isnan(model_probabilities), churn_risk, model_probabilities * 100)
+    churn_risk = np.clip(churn_risk, 0, 100)
+
+    return pd.DataFrame({
+        "student_id": activity["student_id"],
+        "user_id": activity["user_id"],
+        "churn_risk_score": np.round(churn_risk, 2),
+        "risk_level": [_churn_risk_level(score) for score in churn_risk],
+        "recent_activity_score": np.round(activity_score, 2),
+        "dropout_risk_factor": np.round(dropout_factor, 2),
+        "interaction_consistency": np.round(consistency_score, 2),
+        "last_activity": activity["last_activity"],
+    })
+
+
+def _store_churn_scores(conn, scores, scored_at, replace_all=False):
+    cursor = conn.cursor()
+    if replace_all:
+        cursor.execute("DELETE FROM churn_risk_scores")
+    rows = [
+        (*row, scored_at)
+        for row in scores.astype(object).where(scores.notna(), None).itertuples(index=False, name=None)
+    ]
+    cursor.executemany("""
+        INSERT OR REPLACE INTO churn_risk_scores (
+            student_id, user_id, churn_risk_score, risk_level, recent_activity_score,
+            dropout_risk_factor, interaction_consistency, last_activity, scored_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+
+
+def score_all_churn_risk():
+    """
+    Batch-score churn risk for every student and rewrite churn_risk_scores
+    Intended for a scheduled job; dashboards read the stored scores
+    """
+    try:
+        ensure_schema("churn_risk_scores", db_path=DB_PATH)
+        conn = sqlite3.connect(str(DB_PATH))
+        try:
+            scores = _compute_churn_scores(conn)
+            scored_at = datetime.now().isoformat()
+            _store_churn_scores(conn, scores, scored_at, replace_all=True)
+        finally:
+            conn.close()
+
+        logger.info(f"Scored churn risk for {len(scores)} students")
+        return {"students_scored": len(scores), "scored_at": scored_at}
+    except Exception as e:
+        logger.error(f"Error batch scoring churn risk: {e}")
+        return {"error": str(e)}
+
+
+def refresh_churn_scores_if_stale(max_age_hours=CHURN_SCORE_MAX_AGE_HOURS):
+    """Re-run the batch scorer when the oldest stored score is older than max_age_hours"""
+    try:
+        ensure_schema("churn_risk_scores", db_path=DB_PATH)
+        conn = sqlite3.connect(str(DB_PATH))
+        try:
+            oldest = conn.execute("SELECT MIN(scored_at) FROM churn_risk_scores").fetchone()[0]
+        finally:
+            conn.close()
+
+        cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+        if oldest is None or oldest < cutoff:
+            return score_all_churn_risk()
+        return {"students_scored": 0, "scored_at": oldest}
+    except Exception as e:
+        logger.error(f"Error refreshing churn scores: {e}")
+        return {"error": str(e)}
+
+
+def get_churn_risk_scores(limit=25, min_score=None):
+    """Highest churn-risk students from churn_risk_scores, ranked by score"""
+    try:
+        ensure_schema("churn_risk_scores", db_path=DB_PATH)
+        conn = sqlite3.connect(str(DB_PATH))
+        try:
+            df = pd.read_sql_query("""
+                SELECT student_id, user_id, churn_risk_score, risk_level, recent_activity_score,
+                       dropout_risk_factor, interaction_consistency, last_activity, scored_at
+                FROM churn_risk_scores
+                WHERE churn_risk_score >= ?
+                ORDER BY churn_risk_score DESC
+                LIMIT ?
+            """, conn, params=(min_score if min_score is not None else 0, limit))
+        finally:
+            conn.close()
+        return df.to_dict('records')
+    except Exception as e:
+        logger.error(f"Error getting churn risk scores: {e}")
+        return []
+
+
+def get_churn_risk_summary():
+    """Student counts per churn risk level plus when scores were last computed"""
+    try:
+        ensure_schema("churn_risk_scores", db_path=DB_PATH)
+        conn = sqlite3.connect(str(DB_PATH))
+        try:
+            rows = conn.execute("""
+                SELECT risk_level, COUNT(*) FROM churn_risk_scores GROUP BY risk_level
+            """).fetchall()
+            scored_at = conn.execute("SELECT MAX(scored_at) FROM churn_risk_scores").fetchone()[0]
+        finally:
+            conn.close()
+
+        counts = {level: 0 for level in CHURN_INTERVENTIONS}
+        counts.update({level: count for level, count in rows if level in counts})
+        return {
+            "risk_levels": counts,
+            "total_students": sum(counts.values()),
+            "at_risk_students": counts["Critical"] + counts["High"],
+            "scored_at": scored_at
+        }
+    except Exception as e:
+        logger.error(f"Error getting churn risk summary: {e}")
+        return {"error": str(e)}
+
+
+def predict_churn_risk(student_id, days_ahead=7, max_age_hours=CHURN_SCORE_MAX_AGE_HOURS):
     """
     Predict churn risk for a student over next N days
     Returns risk score 0-100 and intervention recommendations
+    Reads the stored batch score; rescores just this student if missing or stale
     """
     try:
+        ensure_schema("churn_risk_scores", db_path=DB_PATH)
         conn = sqlite3.connect(str(DB_PATH))
-        cursor = conn.cursor()
-        
-        # Get user_id from student_id
-        cursor.execute("SELECT user_id FROM mb_users WHERE student_id = ?", (student_id,))
-        row = cursor.fetchone()
-        if not row:
-            return {"error": "Student not found"}
-        user_id = row[0]
-        
-        # Get recent activity (last 7 days)
-        cursor.execute("""
-            SELECT 
-                COUNT(DISTINCT module_id) as recent_modules,
-                MAX(updated_at) as last_activity,
-                AVG(progress) as avg_progress,
-                COUNT(*) as total_interactions
-            FROM learning_modules
-            WHERE user_id = ? AND datetime(updated_at) > datetime('now', '-7 days')
-        """, (user_id,))
-        
-        activity_row = cursor.fetchone()
-        recent_modules = activity_row[0] or 0
-        last_activity = activity_row[1]
-        avg_progress = activity_row[2] or 0
-        total_interactions = activity_row[3] or 0
-        
-        # Get dropout risk
-        cursor.execute("""
-            SELECT risk_score FROM student_dropout_risk WHERE student_id = ?
-        """, (student_id,))
-        
-        dropout_row = cursor.fetchone()
-        dropout_risk_score = (dropout_row[0] or 5) if dropout_row else 5
-        
-        # Calculate churn risk
-        # Factors: recent activity (40%), dropout risk (40%), interaction consistency (20%)
-        activity_score = min(100, recent_modules * 20)  # 0-5 modules = 0-100
-        dropout_factor = (dropout_risk_score / 9) * 100  # Convert 1-9 to 0-100
-        consistency_score = min(100, total_interactions * 15)  # 0-6+ interactions = 0-100
-        
-        churn_risk = (activity_score * 0.15) + (dropout_factor * 0.55) + (consistency_score * 0.30)
-        churn_risk = max(0, min(100, churn_risk))
-        
-        # Determine risk level and interventions
-        if churn_risk >= 75:
-            risk_level = "Critical"
-            interventions = [
-                "🚨 Send urgent engagement push notification",
-                "📞 Schedule intervention call with mentor",
-                "🎁 Offer bonus badge or challenge to re-engage",
-                "💬 Send personalized message from peer mentor"
-            ]
-        elif churn_risk >= 60:
-            risk_level = "High"
-            interventions = [
-                "⚠️ Send reminder notification",
-                "🎯 Suggest milestone-based goal setting",
-                "👥 Connect with peer mentor for support",
-                "📊 Share progress visualization"
-            ]
-        elif churn_risk >= 40:
-            risk_level = "Medium"
-            interventions = [
-                "💡 Suggest new learning module",
-                "🌟 Highlight earned badges",
-                "📈 Share learning path progress",
-                "🤝 Encourage peer interaction"
-            ]
-        else:
-            risk_level = "Low"
-            interventions = [
-                "✨ Celebrate engagement streak",
-                "🎓 Suggest advanced modules",
-                "🏆 Recognize as role model"
-            ]
-        
-        conn.close()
-        
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute(
+                "SELECT * FROM churn_risk_scores WHERE student_id = ?", (student_id,)
+            ).fetchone()
+
+            cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+            if row is None or (row["scored_at"] or "") < cutoff:
+                scores = _compute_churn_scores(conn, [student_id])
+                if scores.empty:
+                    return {"error": "Student not found"}
+                _store_churn_scores(conn, scores, datetime.now().isoformat())
+                row = conn.execute(
+                    "SELECT * FROM churn_risk_scores WHERE student_id = ?", (student_id,)
+                ).fetchone()
+        finally:
+            conn.close()
+
         return {
             "student_id": student_id,
-            "churn_risk_score": round(churn_risk, 2),
-            "risk_level": risk_level,
+            "churn_risk_score": row["churn_risk_score"],
+            "risk_level": row["risk_level"],
             "prediction_window_days": days_ahead,
             "risk_factors": {
-                "recent_activity_score": round(activity_score, 2),
-                "dropout_risk_factor": round(dropout_factor, 2),
-                "interaction_consistency": round(consistency_score, 2)
+                "recent_activity_score": row["recent_activity_score"],
+                "dropout_risk_factor": row["dropout_risk_factor"],
+                "interaction_consistency": row["interaction_consistency"]
             },
-            "last_activity": last_activity,
-            "recommended_interventions": interventions,
-            "predicted_at": datetime.now().isoformat()
+            "last_activity": row["last_activity"],
+            "recommended_interventions": CHURN_INTERVENTIONS[row["risk_level"]],
+            "predicted_at": datetime.now().isoformat(),
+            "scored_at": row["scored_at"]
         }
     except Exception as e:
         logger.error(f"Error predicting churn risk: {e}")
@@ -374,83 +707,74 @@ def trigger_churn_intervention(student_id, intervention_type="auto"):
     """
     Trigger intervention for at-risk student
     intervention_type: "auto" (system recommended), "urgent", "reminder", "motivational"
+    Cohort sweeps should use InterventionDispatcher.dispatch() directly
     """
     try:
-        conn = sqlite3.connect(str(DB_PATH))
-        cursor = conn.cursor()
-        
-        # Create intervention tracking table if not exists
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS churn_interventions (
-                intervention_id INTEGER PRIMARY KEY,
-                student_id VARCHAR(50),
-                intervention_type VARCHAR(50),
-                triggered_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status VARCHAR(50) DEFAULT 'pending',
-                response_date TIMESTAMP,
-                effectiveness_score INTEGER
-            )
-        """)
-        
-        # Get churn risk
+        # Make sure the stored churn score is fresh before dispatching on it
         churn_data = predict_churn_risk(student_id)
         
         if "error" in churn_data:
             return churn_data
         
-        # Map intervention types
-        intervention_messages = {
-            "urgent": "🚨 Don't give up! Your mentor believes in you. Let's get back on track!",
-            "reminder": "💭 Missing you! Let's continue your learning journey. What's your next step?",
-            "motivational": "🌟 You're doing great! One more module completed and you'll earn a new badge!",
-            "mentor": "👥 Your peer mentor wants to check in and help you succeed!",
-            "reward": "🎁 You're close to unlocking a new achievement. Just a little more!"
-        }
-        
-        # Determine message based on risk level if auto
-        if intervention_type == "auto":
-            risk_level = churn_data.get("risk_level", "Medium")
-            if risk_level == "Critical":
-                intervention_type = "urgent"
-            elif risk_level == "High":
-                intervention_type = "mentor"
-            elif risk_level == "Medium":
-                intervention_type = "motivational"
-            else:
-                intervention_type = "reward"
-        
-        message = intervention_messages.get(intervention_type, "Keep up the great work!")
-        
-        # Log intervention
-        cursor.execute("""
-            INSERT INTO churn_interventions (student_id, intervention_type, status)
-            VALUES (?, ?, 'triggered')
-        """, (student_id, intervention_type))
+        from .interventions import init_intervention_dispatcher
+        result = init_intervention_dispatcher(DB_PATH).dispatch(
+            min_score=0,
+            cooldown_days=0,
+            intervention_type=intervention_type,
+            student_ids=[student_id]
+        )
         
-        conn.commit()
-        conn.close()
+        if "error" in result:
+            return result
+        if not result["interventions"]:
+            return {"error": "Intervention could not be recorded"}
         
+        intervention = result["interventions"][0]
         return {
             "student_id": student_id,
-            "intervention_type": intervention_type,
-            "message": message,
-            "churn_risk": churn_data.get("churn_risk_score"),
-            "risk_level": churn_data.get("risk_level"),
+            "intervention_id": intervention["intervention_id"],
+            "intervention_type": intervention["intervention_type"],
+            "message": intervention["message"],
+            "churn_risk": intervention["churn_risk"],
+            "risk_level": intervention["risk_level"],
             "status": "triggered",
-            "triggered_at": datetime.now().isoformat()
+            "triggered_at": result["triggered_at"]
         }
     except Exception as e:
         logger.error(f"Error triggering intervention: {e}")
         return {"error": str(e)}
 
 
-def calculate_retention_impact(start_date=None, end_date=None):
+BASELINE_RETENTION = 65.0  # Starting point
+TARGET_RETENTION = 85.0    # Goal
+
+register_schema("retention_snapshots", [
     """
-    Calculate retention impact over time
-    Track progress toward 65%→85% retention target
+        CREATE TABLE IF NOT EXISTS retention_daily_snapshots (
+            snapshot_date DATE PRIMARY KEY,
+            total_students INTEGER,
+            retained_students INTEGER,
+            at_risk_students INTEGER,
+            retention_rate REAL,
+            interventions_30d INTEGER,
+            successful_interventions_30d INTEGER,
+            badge_earners_30d INTEGER,
+            badges_earned_30d INTEGER,
+            created_at TIMESTAMP
+        )
+    """,
+])
+
+
+def take_retention_snapshot(snapshot_date=None):
     """
+    Compute today's retention, intervention and badge figures from the raw tables
+    and store them as one retention_daily_snapshots row (re-running replaces the row)
+    """
+    ensure_schema("gamification", "churn_interventions", "retention_snapshots", db_path=DB_PATH)
+    snapshot_date = (snapshot_date or datetime.now().date()).isoformat()
+    conn = sqlite3.connect(str(DB_PATH))
     try:
-        conn = sqlite3.connect(str(DB_PATH))
         cursor = conn.cursor()
         
         # Get target and current retention
@@ -460,11 +784,10 @@ def calculate_retention_impact(start_date=None, end_date=None):
                 COUNT(DISTINCT CASE WHEN dropout_risk_level != 'HIGH' THEN student_id END) as retained_students
             FROM student_dropout_risk
         """)
-        
-        row = cursor.fetchone()
-        total_students = row[0] or 1
-        retained_students = row[1] or 0
-        current_retention_rate = (retained_students / total_students * 100) if total_students > 0 else 0
+        total_students, retained_students = cursor.fetchone()
+        total_students = total_students or 0
+        retained_students = retained_students or 0
+        retention_rate = (retained_students / total_students * 100) if total_students > 0 else 0
         
         # Get intervention effectiveness
         cursor.execute("""
@@ -472,13 +795,9 @@ def calculate_retention_impact(start_date=None, end_date=None):
                 COUNT(*) as total_interventions,
                 SUM(CASE WHEN status = 'successful' THEN 1 ELSE 0 END) as successful_interventions
             FROM churn_interventions
-            WHERE triggered_date > datetime('now', '-30 days')
-        """)
-        
-        interv_row = cursor.fetchone()
-        total_interventions = interv_row[0] or 0
-        successful_interventions = interv_row[1] or 0
-        intervention_success_rate = (successful_interventions / total_interventions * 100) if total_interventions > 0 else 0
+            WHERE triggered_date > datetime(?, '-30 days')
+        """, (snapshot_date + " 23:59:59",))
+        interventions, successful = cursor.fetchone()
         
         # Get badge earning rate
         cursor.execute("""
@@ -486,18 +805,92 @@ def calculate_retention_impact(start_date=None, end_date=None):
                 COUNT(DISTINCT user_id) as badge_earners,
                 COUNT(*) as total_badges_earned
             FROM user_badges
-            WHERE earned_date > datetime('now', '-30 days')
-        """)
-        
-        badge_row = cursor.fetchone()
-        badge_earners = badge_row[0] or 0
-        total_badges = badge_row[1] or 0
+            WHERE earned_date > datetime(?, '-30 days')
+        """, (snapshot_date + " 23:59:59",))
+        badge_earners, badges_earned = cursor.fetchone()
         
+        snapshot = {
+            "snapshot_date": snapshot_date,
+            "total_students": total_students,
+            "retained_students": retained_students,
+            "at_risk_students": total_students - retained_students,
+            "retention_rate": round(retention_rate, 2),
+            "interventions_30d": interventions or 0,
+            "successful_interventions_30d": successful or 0,
+            "badge_earners_30d": badge_earners or 0,
+            "badges_earned_30d": badges_earned or 0,
+            "created_at": datetime.now().isoformat()
+        }
+        cursor.execute(f"""
+            INSERT OR REPLACE INTO retention_daily_snapshots ({', '.join(snapshot)})
+            VALUES ({', '.join('?' * len(snapshot))})
+        """, tuple(snapshot.values()))
+        conn.commit()
+        return snapshot
+    finally:
         conn.close()
+
+
+def get_retention_snapshots(start_date=None, end_date=None):
+    """Daily retention snapshots between start_date and end_date (inclusive), oldest first"""
+    try:
+        ensure_schema("retention_snapshots", db_path=DB_PATH)
+        conn = sqlite3.connect(str(DB_PATH))
+        try:
+            df = pd.read_sql_query("""
+                SELECT * FROM retention_daily_snapshots
+                WHERE snapshot_date BETWEEN ? AND ?
+                ORDER BY snapshot_date
+            """, conn, params=(
+                str(start_date) if start_date else "0000-01-01",
+                str(end_date) if end_date else "9999-12-31"
+            ))
+        finally:
+            conn.close()
+        return df.to_dict('records')
+    except Exception as e:
+        logger.error(f"Error getting retention snapshots: {e}")
+        return []
+
+
+def _latest_retention_snapshot():
+    """Most recent snapshot row; takes today's snapshot first if it hasn't run yet"""
+    ensure_schema("retention_snapshots", db_path=DB_PATH)
+    conn = sqlite3.connect(str(DB_PATH))
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute("""
+            SELECT * FROM retention_daily_snapshots ORDER BY snapshot_date DESC LIMIT 1
+        """).fetchone()
+    finally:
+        conn.close()
+
+    if row is None or row["snapshot_date"] < datetime.now().date().isoformat():
+        return take_retention_snapshot()
+    return dict(row)
+
+
+def calculate_retention_impact(start_date=None, end_date=None):
+    """
+    Calculate retention impact over time
+    Track progress toward 65%→85% retention target
+    Reads the latest daily snapshot; start_date/end_date add the snapshot trend for that range
+    """
+    try:
+        snapshot = _latest_retention_snapshot()
+        
+        total_students = snapshot["total_students"] or 1
+        retained_students = snapshot["retained_students"]
+        current_retention_rate = snapshot["retention_rate"]
+        total_interventions = snapshot["interventions_30d"]
+        successful_interventions = snapshot["successful_interventions_30d"]
+        intervention_success_rate = (successful_interventions / total_interventions * 100) if total_interventions > 0 else 0
+        badge_earners = snapshot["badge_earners_30d"]
+        total_badges = snapshot["badges_earned_30d"]
         
         # Calculate trajectory
-        baseline_retention = 65.0  # Starting point
-        target_retention = 85.0    # Goal
+        baseline_retention = BASELINE_RETENTION
+        target_retention = TARGET_RETENTION
         progress_pct = ((current_retention_rate - baseline_retention) / (target_retention - baseline_retention)) * 100 if target_retention > baseline_retention else 0
         progress_pct = max(0, min(100, progress_pct))
         
@@ -524,6 +917,8 @@ def calculate_retention_impact(start_date=None, end_date=None):
                 f"Intervention effectiveness: {intervention_success_rate:.0f}%" if total_interventions > 0 else "Deploy interventions to increase retention",
                 f"Engagement momentum: {badge_earners} students earning badges in past 30 days"
             ],
+            "snapshot_date": snapshot["snapshot_date"],
+            "trend": get_retention_snapshots(start_date, end_date) if (start_date or end_date) else [],
             "calculated_at": datetime.now().isoformat()
         }
     except Exception as e:
@@ -0,0 +1,441 @@
+"""
+Intervention Dispatcher Service
+Bulk churn interventions: select a cohort from churn_risk_scores, skip students
+already contacted within a cooldown window, record the interventions in one
+transaction and queue their deliveries. Deliveries are drained by background
+jobs with a per-channel rate limit.
+
+Re-running a sweep is safe: the cooldown check and insert share one write
+transaction, and each delivery is claimed by a conditional update before it
+is sent, so no student is contacted twice.
+"""
+
+import sqlite3
+import json
+import time
+import threading
+import logging
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from .schema_registry import register_schema, ensure_schema
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
+
+INTERVENTION_MESSAGES = {
+    "urgent": "🚨 Don't give up! Your mentor believes in you. Let's get back on track!",
+    "reminder": "💭 Missing you! Let's continue your learning journey. What's your next step?",
+    "motivational": "🌟 You're doing great! One more module completed and you'll earn a new badge!",
+    "mentor": "👥 Your peer mentor wants to check in and help you succeed!",
+    "reward": "🎁 You're close to unlocking a new achievement. Just a little more!"
+}
+
+# Intervention chosen for "auto" dispatches, by churn risk level
+AUTO_INTERVENTIONS = {
+    "Critical": "urgent",
+    "High": "mentor",
+    "Medium": "motivational",
+    "Low": "reward"
+}
+
+# Deliveries per minute per channel (None = unlimited)
+CHANNEL_RATE_LIMITS = {
+    "in_app": None,
+    "email": 30,
+}
+
+DEFAULT_COOLDOWN_DAYS = 7
+
+# Failed deliveries are retried after exponential backoff
+DELIVERY_BASE_BACKOFF_SECONDS = 60
+DELIVERY_MAX_BACKOFF_SECONDS = 3600
+DELIVERY_STALE_CLAIM_SECONDS = 600  # 'sending' rows older than this belonged to a crashed run
+
+register_schema("intervention_dispatch", [
+    "CREATE INDEX IF NOT EXISTS idx_churn_interventions_student ON churn_interventions(student_id, triggered_date)",
+    """
+        CREATE TABLE IF NOT EXISTS intervention_deliveries (
+            delivery_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            intervention_id INTEGER NOT NULL UNIQUE,
+            student_id VARCHAR(50),
+            channel VARCHAR(20) NOT NULL,
+            recipient VARCHAR(255),
+            message TEXT,
+            status VARCHAR(20) DEFAULT 'queued',
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            queued_at TIMESTAMP,
+            sent_at TIMESTAMP,
+            next_attempt_at TIMESTAMP,
+            claimed_at TIMESTAMP,
+            FOREIGN KEY (intervention_id) REFERENCES churn_interventions(intervention_id)
+        )
+    """,
+    "ALTER TABLE intervention_deliveries ADD COLUMN next_attempt_at TIMESTAMP",
+    "ALTER TABLE intervention_deliveries ADD COLUMN claimed_at TIMESTAMP",
+    "CREATE INDEX IF NOT EXISTS idx_intervention_deliveries_queue ON intervention_deliveries(channel, status, delivery_id)",
+], version=2)
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _backoff_seconds(attempts: int) -> int:
+    return min(DELIVERY_BASE_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0), DELIVERY_MAX_BACKOFF_SECONDS)
+
+
+def intervention_type_for_level(risk_level):
+    """Intervention used for an "auto" dispatch at the given churn risk level"""
+    return AUTO_INTERVENTIONS.get(risk_level, "motivational")
+
+
+# ========================
+# RATE LIMITING
+# ========================
+class ChannelRateLimiter:
+    """Token bucket per channel, shared by every delivery job in the process"""
+
+    def __init__(self, limits: Dict[str, Optional[int]]):
+        self.limits = limits
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, channel: str, deadline: float = None) -> bool:
+        """
+        Block until the channel may send one more message.
+        Returns False instead of waiting past deadline (a time.monotonic() value).
+        """
+        per_minute = self.limits.get(channel)
+        if not per_minute:
+            return True
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, updated = self._buckets.get(channel, (float(per_minute), now))
+                tokens = min(per_minute, tokens + (now - updated) * per_minute / 60.0)
+                if tokens >= 1:
+                    self._buckets[channel] = (tokens - 1, now)
+                    return True
+                self._buckets[channel] = (tokens, now)
+                wait = (1 - tokens) * 60.0 / per_minute
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+_rate_limiter = ChannelRateLimiter(CHANNEL_RATE_LIMITS)
+
+
+# ========================
+# CHANNEL SENDERS
+# ========================
+def _send_in_app(delivery: Dict):
+    """In-app nudges are read from intervention_deliveries; marking them sent is the delivery"""
+    return None
+
+
+def _send_email(delivery: Dict):
+    if not delivery.get("recipient"):
+        raise ValueError("Student has no email address")
+
+    import smtplib
+    from email.mime.text import MIMEText
+    try:
+        import email_service
+    except ImportError:
+        from mb import email_service
+
+    if not email_service.SENDER_EMAIL or not email_service.SENDER_PASSWORD:
+        raise RuntimeError("Email service not configured")
+
+    msg = MIMEText(delivery["message"], 'plain')
+    msg['From'] = email_service.SENDER_EMAIL
+    msg['To'] = delivery["recipient"]
+    msg['Subject'] = f"{email_service.MAGICBUS_NAME}: Keep your learning going"
+
+    server = smtplib.SMTP(email_service.SMTP_SERVER, email_service.SMTP_PORT)
+    try:
+        server.starttls()
+        server.login(email_service.SENDER_EMAIL, email_service.SENDER_PASSWORD)
+        server.send_message(msg)
+    finally:
+        server.quit()
+
+
+CHANNEL_SENDERS: Dict[str, Callable[[Dict], None]] = {
+    "in_app": _send_in_app,
+    "email": _send_email,
+}
+
+
+class InterventionDispatcher:
+    """Bulk churn intervention dispatch and rate-limited delivery"""
+
+    def __init__(self, db_path=DB_PATH, rate_limiter: ChannelRateLimiter = None):
+        self.db_path = db_path
+        self.rate_limiter = rate_limiter or _rate_limiter
+
+    def get_connection(self):
+        ensure_schema("churn_interventions", "churn_risk_scores", "intervention_dispatch", db_path=self.db_path)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ========================
+    # DISPATCH
+    # ========================
+    def dispatch(self, min_score=60, cooldown_days=DEFAULT_COOLDOWN_DAYS, channel="in_app",
+                 intervention_type="auto", student_ids: List[str] = None, limit: int = None,
+                 enqueue_delivery: bool = True):
+        """
+        Create interventions for every scored student at or above min_score
+        (optionally restricted to student_ids) who has had no intervention in
+        the last cooldown_days, and queue one delivery per intervention.
+        """
+        if channel not in CHANNEL_SENDERS:
+            return {"error": f"Unknown channel: {channel}"}
+
+        student_filter, params = "", [min_score]
+        if student_ids is not None:
+            student_filter = "AND s.student_id IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(list(student_ids)))
+        params.append(f"-{int(cooldown_days * 86400)} seconds")
+        params.append(limit if limit is not None else -1)
+
+        conn = self.get_connection()
+        try:
+            # IMMEDIATE: concurrent sweeps serialize, so the cooldown check can't race
+            conn.execute("BEGIN IMMEDIATE")
+            candidates = conn.execute(f"""
+                SELECT s.student_id, s.risk_level, s.churn_risk_score, u.email
+                FROM churn_risk_scores s
+                LEFT JOIN mb_users u ON u.student_id = s.student_id
+                WHERE s.churn_risk_score >= ? {student_filter}
+                  AND NOT EXISTS (
+                      SELECT 1 FROM churn_interventions ci
+                      WHERE ci.student_id = s.student_id
+                        AND ci.triggered_date > datetime('now', ?)
+                  )
+                ORDER BY s.churn_risk_score DESC
+                LIMIT ?
+            """, params).fetchall()
+
+            triggered_date = conn.execute("SELECT datetime('now')").fetchone()[0]
+            last_id = conn.execute("SELECT COALESCE(MAX(intervention_id), 0) FROM churn_interventions").fetchone()[0]
+
+            interventions = []
+            for row in candidates:
+                chosen_type = (
+                    intervention_type_for_level(row["risk_level"])
+                    if intervention_type == "auto" else intervention_type
+                )
+                interventions.append({
+                    "student_id": row["student_id"],
+                    "intervention_type": chosen_type,
+                    "message": INTERVENTION_MESSAGES.get(chosen_type, "Keep up the great work!"),
+                    "churn_risk": row["churn_risk_score"],
+                    "risk_level": row["risk_level"],
+                    "recipient": row["email"]
+                })
+
+            conn.executemany("""
+                INSERT INTO churn_interventions (student_id, intervention_type, triggered_date, status)
+                VALUES (?, ?, ?, 'triggered')
+            """, [(item["student_id"], item["intervention_type"], triggered_date) for item in interventions])
+
+            # Inserted in order, so new ids follow last_id in the same order
+            new_ids = [
+                row[0] for row in conn.execute(
+                    "SELECT intervention_id FROM churn_interventions WHERE intervention_id > ? ORDER BY intervention_id",
+                    (last_id,)
+                )
+            ]
+            queued_at = datetime.now().isoformat()
+            for item, intervention_id in zip(interventions, new_ids):
+                item["intervention_id"] = intervention_id
+
+            conn.executemany("""
+                INSERT INTO intervention_deliveries (intervention_id, student_id, channel, recipient, message, queued_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                (item["intervention_id"], item["student_id"], channel, item["recipient"], item["message"], queued_at)
+                for item in interventions
+            ])
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error dispatching interventions: {e}")
+            return {"error": str(e)}
+        finally:
+            conn.close()
+
+        if interventions and enqueue_delivery:
+            self.enqueue_delivery(channel)
+
+        logger.info(f"Dispatched {len(interventions)} {channel} interventions (min score {min_score})")
+        return {
+            "dispatched": len(interventions),
+            "channel": channel,
+            "interventions": interventions,
+            "triggered_at": triggered_date
+        }
+
+    def enqueue_delivery(self, channel, delay_seconds=0):
+        """Queue a background job that drains this channel's deliveries"""
+        try:
+            from job_queue import JobQueue
+        except ImportError:
+            from mb.job_queue import JobQueue
+        return JobQueue(self.db_path).enqueue(
+            "deliver_interventions", {"channel": channel, "db_path": str(self.db_path)}, delay_seconds=delay_seconds
+        )
+
+    # ========================
+    # DELIVERY
+    # ========================
+    def _claim(self, conn, channel, batch_size):
+        """Atomically move up to batch_size queued deliveries that are due to 'sending'"""
+        now = _now()
+        rows = conn.execute("""
+            SELECT delivery_id FROM intervention_deliveries
+            WHERE channel = ? AND status = 'queued' AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+            ORDER BY delivery_id
+            LIMIT ?
+        """, (channel, now, batch_size)).fetchall()
+        claimed = []
+        for row in rows:
+            cursor = conn.execute("""
+                UPDATE intervention_deliveries SET status = 'sending', attempts = attempts + 1, claimed_at = ?
+                WHERE delivery_id = ? AND status = 'queued'
+            """, (now, row["delivery_id"]))
+            if cursor.rowcount:
+                claimed.append(row["delivery_id"])
+        conn.commit()
+        if not claimed:
+            return []
+        return [
+            dict(row) for row in conn.execute(
+                f"SELECT * FROM intervention_deliveries WHERE delivery_id IN ({','.join('?' * len(claimed))})",
+                claimed
+            )
+        ]
+
+    def deliver_pending(self, channel, time_budget_seconds=50, batch_size=50, max_attempts=3):
+        """
+        Send queued deliveries for one channel within the channel's rate limit.
+        Deliveries stuck in 'sending' by a crashed run are requeued first; failures are retried
+        after exponential backoff. Stops after time_budget_seconds and reports how many are ready
+        ("remaining") and when the next backed-off delivery is due ("next_attempt_at").
+        """
+        sender = CHANNEL_SENDERS[channel]
+        deadline = time.monotonic() + time_budget_seconds
+        sent = failed = 0
+        self.requeue_stale_deliveries()
+
+        conn = self.get_connection()
+        try:
+            while time.monotonic() < deadline:
+                batch = self._claim(conn, channel, batch_size)
+                if not batch:
+                    break
+                for index, delivery in enumerate(batch):
+                    if not self.rate_limiter.acquire(channel, deadline):
+                        # Out of time budget: hand unsent claims back to the queue
+                        conn.executemany(
+                            "UPDATE intervention_deliveries SET status = 'queued', attempts = attempts - 1 WHERE delivery_id = ?",
+                            [(item["delivery_id"],) for item in batch[index:]]
+                        )
+                        deadline = time.monotonic()
+                        break
+
+                    try:
+                        sender(delivery)
+                        conn.execute("""
+                            UPDATE intervention_deliveries SET status = 'sent', sent_at = ?, last_error = NULL
+                            WHERE delivery_id = ?
+                        """, (datetime.now().isoformat(), delivery["delivery_id"]))
+                        conn.execute(
+                            "UPDATE churn_interventions SET status = 'delivered' WHERE intervention_id = ?",
+                            (delivery["intervention_id"],)
+                        )
+                        sent += 1
+                    except Exception as e:
+                        retry = delivery["attempts"] < max_attempts
+                        retry_at = datetime.now() + timedelta(seconds=_backoff_seconds(delivery["attempts"]))
+                        conn.execute("""
+                            UPDATE intervention_deliveries SET status = ?, last_error = ?, next_attempt_at = ?
+                            WHERE delivery_id = ?
+                        """, ("queued" if retry else "failed", str(e), retry_at.strftime("%Y-%m-%d %H:%M:%S"),
+                              delivery["delivery_id"]))
+                        if not retry:
+                            failed += 1
+                        logger.warning(f"Delivery {delivery['delivery_id']} via {channel} failed: {e}")
+                    conn.commit()
+                conn.commit()
+
+            remaining, next_attempt_at = conn.execute("""
+                SELECT COALESCE(SUM(next_attempt_at IS NULL OR next_attempt_at <= ?), 0),
+                       MIN(CASE WHEN next_attempt_at > ? THEN next_attempt_at END)
+                FROM intervention_deliveries WHERE channel = ? AND status = 'queued'
+            """, (_now(), _now(), channel)).fetchone()
+        finally:
+            conn.close()
+
+        return {"channel": channel, "sent": sent, "failed": failed, "remaining": remaining,
+                "next_attempt_at": next_attempt_at}
+
+    def requeue_stale_deliveries(self, older_than_seconds=DELIVERY_STALE_CLAIM_SECONDS):
+        """Return deliveries left in 'sending' by a crashed run to the queue"""
+        cutoff = (datetime.now() - timedelta(seconds=older_than_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+        conn = self.get_connection()
+        try:
+            # Claims made before claimed_at was recorded have no timestamp and count as stale
+            cursor = conn.execute("""
+                UPDATE intervention_deliveries SET status = 'queued'
+                WHERE status = 'sending' AND (claimed_at IS NULL OR claimed_at < ?)
+            """, (cutoff,))
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def get_delivery_status(self):
+        """Delivery counts by channel and status"""
+        conn = self.get_connection()
+        try:
+            rows = conn.execute("""
+                SELECT channel, status, COUNT(*) FROM intervention_deliveries GROUP BY channel, status
+            """).fetchall()
+        finally:
+            conn.close()
+        status = {}
+        for channel, delivery_status, count in rows:
+            status.setdefault(channel, {})[delivery_status] = count
+        return status
+
+    def get_recent_interventions(self, limit=20):
+        """Latest interventions with their delivery state"""
+        conn = self.get_connection()
+        try:
+            return [
+                dict(row) for row in conn.execute("""
+                    SELECT ci.intervention_id, ci.student_id, ci.intervention_type, ci.triggered_date, ci.status,
+                           d.channel, d.status as delivery_status, d.sent_at
+                    FROM churn_interventions ci
+                    LEFT JOIN intervention_deliveries d ON d.intervention_id = ci.intervention_id
+                    ORDER BY ci.intervention_id DESC
+                    LIMIT ?
+                """, (limit,))
+            ]
+        finally:
+            conn.close()
+
+
+def init_intervention_dispatcher(db_path=DB_PATH):
+    """Initialize intervention dispatcher service"""
+    return InterventionDispatcher(db_path)
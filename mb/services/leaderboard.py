@@ -0,0 +1,363 @@
+"""
+Leaderboard Service
+Ranks youth by badges earned, current learning streak and completed modules,
+overall and per cohort / school / region.
+
+Scores live in the indexed `leaderboard_entries` table and are updated
+incrementally whenever badges or streaks are written. Each board keeps a
+bounded top-K min-heap in memory, so reading a board is O(K) and never sorts
+the whole table. Every write bumps `leaderboard_version`; readers compare it
+(throttled) to drop heaps made stale by other processes, and rebuild the table
+on first use when it has never been built.
+"""
+
+import sqlite3
+import heapq
+import json
+import threading
+import time
+import logging
+from pathlib import Path
+from datetime import datetime
+
+from .schema_registry import register_schema, ensure_schema
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
+
+LEADERBOARD_METRICS = ("badges", "streak", "modules_completed")
+
+# Scope type -> SQL expression over mb_users (u) giving the scope value.
+# Scopes whose column is missing from mb_users are skipped.
+LEADERBOARD_SCOPES = {
+    "all": "'all'",
+    "cohort": "strftime('%Y', u.created_at)",
+    "school": "u.institution",
+    "region": "u.region",
+}
+SCOPE_COLUMNS = {"cohort": "created_at", "school": "institution", "region": "region"}
+
+register_schema("leaderboard", [
+    """
+        CREATE TABLE IF NOT EXISTS leaderboard_entries (
+            metric VARCHAR(30) NOT NULL,
+            scope_type VARCHAR(20) NOT NULL,
+            scope_value VARCHAR(255) NOT NULL,
+            user_id INTEGER NOT NULL,
+            student_id VARCHAR(50),
+            score INTEGER NOT NULL,
+            updated_at TIMESTAMP,
+            PRIMARY KEY (metric, scope_type, scope_value, user_id)
+        )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_leaderboard_rank ON leaderboard_entries(metric, scope_type, scope_value, score)",
+    "CREATE INDEX IF NOT EXISTS idx_leaderboard_user ON leaderboard_entries(user_id)",
+    # Single row written by rebuild(); its absence means the table was never fully built
+    """
+        CREATE TABLE IF NOT EXISTS leaderboard_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL,
+            built_at TIMESTAMP
+        )
+    """,
+], version=2)
+
+LEADERBOARD_VERSION_CHECK_SECONDS = 5  # How often readers look for writes from other processes
+
+
+class LeaderboardService:
+    """Top-K leaderboards backed by leaderboard_entries"""
+
+    def __init__(self, db_path=DB_PATH, top_k=50, version_check_seconds=LEADERBOARD_VERSION_CHECK_SECONDS):
+        self.db_path = db_path
+        self.top_k = top_k
+        self.version_check_seconds = version_check_seconds
+        self._boards = {}  # (metric, scope_type, scope_value) -> min-heap of (score, -user_id, user_id, student_id)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._scopes = None
+        self._version = None  # leaderboard_version the loaded heaps reflect
+        self._checked_at = float("-inf")
+
+    def get_connection(self):
+        ensure_schema("leaderboard", db_path=self.db_path)
+        return sqlite3.connect(str(self.db_path))
+
+    def _available_scopes(self, conn):
+        """Scope expressions usable against this database's mb_users"""
+        if self._scopes is None:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(mb_users)")}
+            self._scopes = {
+                scope_type: expression
+                for scope_type, expression in LEADERBOARD_SCOPES.items()
+                if SCOPE_COLUMNS.get(scope_type, "") in columns or scope_type == "all"
+            }
+        return self._scopes
+
+    def _compute_entries(self, conn, user_ids=None):
+        """Current (metric, scope_type, scope_value, user_id, student_id, score) rows"""
+        user_filter, params = "", []
+        if user_ids is not None:
+            user_filter = "WHERE user_id IN (SELECT value FROM json_each(?))"
+            params = [json.dumps([int(user_id) for user_id in user_ids])]
+
+        scopes = self._available_scopes(conn)
+        scope_select = ", ".join(f"{expression} as scope_{scope_type}" for scope_type, expression in scopes.items())
+
+        # Each aggregate is restricted to the requested users before joining
+        cursor = conn.execute(f"""
+            SELECT u.user_id, u.student_id, {scope_select},
+                   COALESCE(b.badges, 0), COALESCE(s.streak, 0), COALESCE(m.modules_completed, 0)
+            FROM (SELECT * FROM mb_users {user_filter}) u
+            LEFT JOIN (
+                SELECT user_id, COUNT(*) as badges FROM user_badges {user_filter} GROUP BY user_id
+            ) b ON b.user_id = u.user_id
+            LEFT JOIN (
+                SELECT user_id, current_streak as streak FROM learning_streaks {user_filter}
+            ) s ON s.user_id = u.user_id
+            LEFT JOIN (
+                SELECT user_id, COUNT(*) as modules_completed FROM learning_modules
+                {user_filter + " AND" if user_filter else "WHERE"} status = 'completed'
+                GROUP BY user_id
+            ) m ON m.user_id = u.user_id
+        """, params * 4)
+
+        entries = []
+        n_scopes = len(scopes)
+        for row in cursor:
+            user_id, student_id = row[0], row[1]
+            scope_values = row[2:2 + n_scopes]
+            scores = row[2 + n_scopes:]
+            for scope_type, scope_value in zip(scopes, scope_values):
+                if scope_value in (None, ""):
+                    continue
+                for metric, score in zip(LEADERBOARD_METRICS, scores):
+                    entries.append((metric, scope_type, str(scope_value), user_id, student_id, score))
+        return entries
+
+    # ========================
+    # WRITES
+    # ========================
+    def update_users(self, user_ids):
+        """
+        Incrementally refresh leaderboard rows for users whose badges/streaks/modules changed
+        Only rows whose score actually changed are written
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {"entries_updated": 0}
+
+        conn = self.get_connection()
+        try:
+            entries = self._compute_entries(conn, user_ids)
+            current = {
+                row[:4]: row[4]
+                for row in conn.execute("""
+                    SELECT metric, scope_type, scope_value, user_id, score FROM leaderboard_entries
+                    WHERE user_id IN (SELECT value FROM json_each(?))
+                """, (json.dumps([int(user_id) for user_id in user_ids]),))
+            }
+            changed = [entry for entry in entries if current.get(entry[:4]) != entry[5]]
+            # Rows for scopes the user no longer belongs to (e.g. changed school)
+            stale = set(current) - {entry[:4] for entry in entries}
+
+            if stale:
+                conn.executemany("""
+                    DELETE FROM leaderboard_entries
+                    WHERE metric = ? AND scope_type = ? AND scope_value = ? AND user_id = ?
+                """, list(stale))
+            if changed:
+                updated_at = datetime.now().isoformat()
+                conn.executemany("""
+                    INSERT OR REPLACE INTO leaderboard_entries
+                        (metric, scope_type, scope_value, user_id, student_id, score, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, [entry + (updated_at,) for entry in changed])
+            version = None
+            if changed or stale:
+                # No-op until rebuild() has created the row
+                conn.execute("UPDATE leaderboard_version SET version = version + 1")
+                row = conn.execute("SELECT version FROM leaderboard_version").fetchone()
+                version = row[0] if row else None
+            conn.commit()
+        finally:
+            conn.close()
+
+        with self._lock:
+            if version is not None and self._version == version - 1:
+                # Only this write happened since the heaps were loaded; they are patched below
+                self._version = version
+            for metric, scope_type, scope_value, _ in stale:
+                self._boards.pop((metric, scope_type, scope_value), None)
+        for metric, scope_type, scope_value, user_id, student_id, score in changed:
+            self._apply_to_board((metric, scope_type, scope_value), user_id, student_id, score)
+
+        return {"entries_updated": len(changed) + len(stale)}
+
+    def _apply_to_board(self, board_key, user_id, student_id, score):
+        """Keep an already-loaded top-K heap in step with one score change"""
+        with self._lock:
+            heap = self._boards.get(board_key)
+            if heap is None:
+                return  # Not loaded yet; first read comes from the table
+
+            existing = next((item for item in heap if item[2] == user_id), None)
+            if existing is not None:
+                if score < existing[0] and len(heap) >= self.top_k:
+                    # Someone outside the heap may now outrank this user; reload lazily
+                    del self._boards[board_key]
+                    return
+                heap.remove(existing)
+                heapq.heapify(heap)
+                heapq.heappush(heap, (score, -user_id, user_id, student_id))
+            elif len(heap) < self.top_k:
+                heapq.heappush(heap, (score, -user_id, user_id, student_id))
+            elif (score, -user_id) > heap[0][:2]:
+                heapq.heapreplace(heap, (score, -user_id, user_id, student_id))
+
+    def rebuild(self):
+        """Recompute every leaderboard row from source tables"""
+        conn = self.get_connection()
+        try:
+            entries = self._compute_entries(conn)
+            updated_at = datetime.now().isoformat()
+            conn.execute("DELETE FROM leaderboard_entries")
+            conn.executemany("""
+                INSERT INTO leaderboard_entries
+                    (metric, scope_type, scope_value, user_id, student_id, score, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [entry + (updated_at,) for entry in entries])
+            conn.execute("""
+                INSERT INTO leaderboard_version (id, version, built_at) VALUES (1, 1, ?)
+                ON CONFLICT(id) DO UPDATE SET version = version + 1, built_at = excluded.built_at
+            """, (updated_at,))
+            version = conn.execute("SELECT version FROM leaderboard_version").fetchone()[0]
+            conn.commit()
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._boards.clear()
+            self._version = version
+            self._checked_at = time.monotonic()
+        return {"entries": len(entries), "rebuilt_at": updated_at}
+
+    def _sync(self):
+        """
+        Build the table on first use and drop heaps when another process changed it
+        Checks the stored version at most every version_check_seconds
+        """
+        if time.monotonic() - self._checked_at < self.version_check_seconds:
+            return
+        with self._sync_lock:
+            if time.monotonic() - self._checked_at < self.version_check_seconds:
+                return
+            conn = self.get_connection()
+            try:
+                row = conn.execute("SELECT version FROM leaderboard_version").fetchone()
+            finally:
+                conn.close()
+
+            if row is None:
+                logger.info("Leaderboard not built yet; rebuilding")
+                self.rebuild()
+                return
+            with self._lock:
+                if row[0] != self._version:
+                    self._boards.clear()
+                    self._version = row[0]
+                self._checked_at = time.monotonic()
+
+    # ========================
+    # READS
+    # ========================
+    def _load_board(self, board_key):
+        with self._lock:
+            if board_key in self._boards:
+                return self._boards[board_key]
+
+        conn = self.get_connection()
+        try:
+            rows = conn.execute("""
+                SELECT score, user_id, student_id FROM leaderboard_entries
+                WHERE metric = ? AND scope_type = ? AND scope_value = ?
+                ORDER BY score DESC, user_id ASC
+                LIMIT ?
+            """, (*board_key, self.top_k)).fetchall()
+        finally:
+            conn.close()
+
+        heap = [(score, -user_id, user_id, student_id) for score, user_id, student_id in rows]
+        heapq.heapify(heap)
+        with self._lock:
+            return self._boards.setdefault(board_key, heap)
+
+    def get_leaderboard(self, metric="badges", scope_type="all", scope_value="all", limit=10):
+        """Top entries for one board (limit is capped at top_k)"""
+        if metric not in LEADERBOARD_METRICS:
+            return {"error": f"Unknown metric: {metric}"}
+
+        try:
+            self._sync()
+            heap = self._load_board((metric, scope_type, str(scope_value)))
+            with self._lock:
+                top = heapq.nlargest(min(limit, self.top_k), heap)
+            return [
+                {"rank": rank, "user_id": user_id, "student_id": student_id, "score": score}
+                for rank, (score, _, user_id, student_id) in enumerate(top, 1)
+            ]
+        except Exception as e:
+            logger.error(f"Error getting leaderboard: {e}")
+            return []
+
+    def get_user_rank(self, user_id, metric="badges", scope_type="all"):
+        """Rank of a user within their own scope (1 = best; ties share a rank)"""
+        self._sync()
+        conn = self.get_connection()
+        try:
+            row = conn.execute("""
+                SELECT scope_value, score FROM leaderboard_entries
+                WHERE metric = ? AND scope_type = ? AND user_id = ?
+            """, (metric, scope_type, user_id)).fetchone()
+            if not row:
+                return {"user_id": user_id, "metric": metric, "scope_type": scope_type, "rank": None}
+
+            scope_value, score = row
+            # Both counts are range scans on idx_leaderboard_rank
+            ahead = conn.execute("""
+                SELECT COUNT(*) FROM leaderboard_entries
+                WHERE metric = ? AND scope_type = ? AND scope_value = ? AND score > ?
+            """, (metric, scope_type, scope_value, score)).fetchone()[0]
+            total = conn.execute("""
+                SELECT COUNT(*) FROM leaderboard_entries
+                WHERE metric = ? AND scope_type = ? AND scope_value = ?
+            """, (metric, scope_type, scope_value)).fetchone()[0]
+
+            return {
+                "user_id": user_id,
+                "metric": metric,
+                "scope_type": scope_type,
+                "scope_value": scope_value,
+                "score": score,
+                "rank": ahead + 1,
+                "total": total
+            }
+        except Exception as e:
+            logger.error(f"Error getting user rank: {e}")
+            return {"error": str(e)}
+        finally:
+            conn.close()
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def init_leaderboard_service(db_path=DB_PATH):
+    """Process-wide leaderboard service (one per database, so heaps are shared)"""
+    with _services_lock:
+        key = str(db_path)
+        if key not in _services:
+            _services[key] = LeaderboardService(db_path)
+        return _services[key]
@@ -0,0 +1,178 @@
+"""
+Learning Path Optimizer
+Chooses learning resources that close a learner's skill gaps in as few hours as
+possible, optionally within an hours budget.
+
+Each catalog item covers one or more skills and has a duration; each gap skill
+has a priority weight. Without a budget this is weighted set cover (cover every
+coverable gap in the fewest hours); with a budget it is budgeted maximum
+coverage (cover the most gap weight that fits).
+
+- Greedy: repeatedly take the item with the best newly covered weight per hour,
+  re-evaluating lazily from a heap, and compare against the best single item
+  when budgeted.
+- Exact: dynamic programming over covered-skill bitmasks, used automatically
+  when the gap set is small enough.
+"""
+
+import heapq
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Exact solver limits: gap skills, and items x 2^skills state updates
+EXACT_MAX_SKILLS = 12
+EXACT_MAX_WORK = 200_000
+
+MIN_ITEM_HOURS = 0.1  # Items without a duration still cost something
+
+
+def _candidate_items(gap_weights: Dict[str, float], catalog: Dict) -> List[Dict]:
+    """Catalog items touching at least one gap skill, with only the gap skills they cover"""
+    items = catalog["learning_items"]
+    seen, candidates = set(), []
+    for skill in gap_weights:
+        for index in catalog["items_by_skill"].get(skill, ()):
+            if index in seen:
+                continue
+            seen.add(index)
+            item = items[index]
+            candidates.append({
+                "index": index,
+                "hours": max(float(item["duration_hours"] or 0), MIN_ITEM_HOURS),
+                "skills": [skill_key for skill_key in item["skills"] if skill_key in gap_weights]
+            })
+    return candidates
+
+
+def _greedy(gap_weights, candidates, hours_budget):
+    uncovered = dict(gap_weights)
+    heap = [
+        (-sum(gap_weights[skill] for skill in candidate["skills"]) / candidate["hours"], candidate["hours"], position)
+        for position, candidate in enumerate(candidates)
+    ]
+    heapq.heapify(heap)
+
+    selected, hours_used = [], 0.0
+    while heap and uncovered:
+        _, hours, position = heapq.heappop(heap)
+        if hours_budget is not None and hours_used + hours > hours_budget:
+            continue  # Hours only grow, so this item can never fit again
+        gain = sum(uncovered.get(skill, 0) for skill in candidates[position]["skills"])
+        if gain <= 0:
+            continue
+        ratio = gain / hours
+        if heap and ratio < -heap[0][0]:
+            # Stale priority: another item may now cover more per hour
+            heapq.heappush(heap, (-ratio, hours, position))
+            continue
+        selected.append(position)
+        hours_used += hours
+        for skill in candidates[position]["skills"]:
+            uncovered.pop(skill, None)
+
+    if hours_budget is not None:
+        # Best single affordable item guards the ratio greedy against small, low-value picks
+        affordable = [position for position, candidate in enumerate(candidates) if candidate["hours"] <= hours_budget]
+        if affordable:
+            best = max(affordable, key=lambda position: (
+                sum(gap_weights[skill] for skill in candidates[position]["skills"]), -candidates[position]["hours"]
+            ))
+            if _covered_weight(gap_weights, candidates, [best]) > _covered_weight(gap_weights, candidates, selected):
+                selected = [best]
+    return selected
+
+
+def _exact(gap_weights, candidates, hours_budget):
+    skills = list(gap_weights)
+    bits = {skill: 1 << position for position, skill in enumerate(skills)}
+    masks = [sum(bits[skill] for skill in set(candidate["skills"])) for candidate in candidates]
+
+    # covered mask -> (fewest hours reaching it, chosen items as a linked list)
+    states = {0: (0.0, None)}
+    for position, (mask, candidate) in enumerate(zip(masks, candidates)):
+        for state_mask, (hours, chosen) in list(states.items()):
+            new_mask = state_mask | mask
+            if new_mask == state_mask:
+                continue
+            new_hours = hours + candidate["hours"]
+            if hours_budget is not None and new_hours > hours_budget:
+                continue
+            current = states.get(new_mask)
+            if current is None or new_hours < current[0]:
+                states[new_mask] = (new_hours, (position, chosen))
+
+    weights = [gap_weights[skill] for skill in skills]
+
+    def mask_weight(mask):
+        return sum(weight for position, weight in enumerate(weights) if mask >> position & 1)
+
+    best_mask = max(states, key=lambda mask: (mask_weight(mask), -states[mask][0]))
+    selected, chosen = [], states[best_mask][1]
+    while chosen is not None:
+        selected.append(chosen[0])
+        chosen = chosen[1]
+    return selected[::-1]
+
+
+def _covered_weight(gap_weights, candidates, selected):
+    covered = {skill for position in selected for skill in candidates[position]["skills"]}
+    return sum(gap_weights[skill] for skill in covered)
+
+
+def optimize_path(gap_weights: Dict[str, float], catalog: Dict, hours_budget: Optional[float] = None,
+                  method: str = "auto") -> Dict:
+    """
+    Pick resources for gap skills ({skill_key: priority weight}) from a loaded skill catalog
+    method: "auto" (exact when small enough), "greedy" or "exact"
+    """
+    candidates = _candidate_items(gap_weights, catalog)
+    coverable = {skill: weight for skill, weight in gap_weights.items()
+                 if any(skill in candidate["skills"] for candidate in candidates)}
+
+    if method == "auto":
+        small = (len(coverable) <= EXACT_MAX_SKILLS
+                 and len(candidates) * (1 << len(coverable)) <= EXACT_MAX_WORK)
+        method = "exact" if small else "greedy"
+
+    if not coverable:
+        selected = []
+    elif method == "exact":
+        selected = _exact(coverable, candidates, hours_budget)
+    else:
+        selected = _greedy(coverable, candidates, hours_budget)
+
+    items = catalog["learning_items"]
+    covered = set()
+    resources = []
+    for position in selected:
+        candidate = candidates[position]
+        item = items[candidate["index"]]
+        newly_covered = [skill for skill in candidate["skills"] if skill not in covered]
+        covered.update(candidate["skills"])
+        resources.append({
+            "resource": item["resource"],
+            "platform": item["platform"],
+            "duration_hours": item["duration_hours"],
+            "url": item["url"],
+            "skills_covered": newly_covered,
+            "priority_weight": max(gap_weights[skill] for skill in newly_covered) if newly_covered else 0
+        })
+    # Highest-priority skills first, shorter resources before longer ones
+    resources.sort(key=lambda resource: (-resource["priority_weight"], resource["duration_hours"]))
+
+    total_weight = sum(gap_weights.values())
+    covered_weight = sum(gap_weights[skill] for skill in covered)
+    return {
+        "method": method,
+        "resources": resources,
+        "covered_skills": sorted(covered),
+        "uncovered_skills": sorted(skill for skill in gap_weights if skill not in covered),
+        "no_resources_for": sorted(skill for skill in gap_weights if skill not in coverable),
+        "total_estimated_hours": round(sum(resource["duration_hours"] for resource in resources), 2),
+        "hours_budget": hours_budget,
+        "covered_weight": covered_weight,
+        "total_weight": total_weight,
+        "coverage_pct": round(100.0 * covered_weight / total_weight, 1) if total_weight else 100.0
+    }
@@ -12,10 +12,26 @@ from datetime import datetime
 import logging
 import math
 
+from .schema_registry import register_schema, ensure_schema
+
 logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
 
+register_schema("peer_mentoring", [
+    """
+        CREATE TABLE IF NOT EXISTS peer_mentoring_connections (
+            connection_id INTEGER PRIMARY KEY,
+            mentee_id VARCHAR(50),
+            mentor_id VARCHAR(50),
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status VARCHAR(50) DEFAULT 'active',
+            check_ins INTEGER DEFAULT 0,
+            last_interaction TIMESTAMP
+        )
+    """,
+])
+
 
 class PeerMatchingNetwork:
     """Service for finding peer mentors and similar youth"""
@@ -251,23 +267,11 @@ class PeerMatchingNetwork:
         Create a formal peer mentoring connection
         Stores relationship for tracking and engagement
         """
+        ensure_schema("peer_mentoring", db_path=self.db_path)
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
             
-            # Create table if needed
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS peer_mentoring_connections (
-                    connection_id INTEGER PRIMARY KEY,
-                    mentee_id VARCHAR(50),
-                    mentor_id VARCHAR(50),
-                    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    status VARCHAR(50) DEFAULT 'active',
-                    check_ins INTEGER DEFAULT 0,
-                    last_interaction TIMESTAMP
-                )
-            """)
-            
             cursor.execute(
                 """INSERT INTO peer_mentoring_connections (mentee_id, mentor_id)
                    VALUES (?, ?)""",
@@ -294,6 +298,7 @@ class PeerMatchingNetwork:
         Get all mentoring connections for a student
         role: "mentor", "mentee", or "any"
         """
+        ensure_schema("peer_mentoring", db_path=self.db_path)
         conn = self.get_connection()
         try:
             if role == "mentor":
@@ -0,0 +1,82 @@
+"""
+Schema Registry - One-time DDL bootstrap
+Modules register their CREATE TABLE / CREATE INDEX statements here at import
+time and call ensure_schema() before touching their tables. DDL for a schema
+runs once per database file and version (recorded in `schema_versions`) and is
+skipped entirely for the rest of the process, so hot paths no longer pay a
+connection + DDL + commit per call.
+"""
+
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Registered schemas: name -> {"version": int, "statements": [ddl, ...]}
+SCHEMAS: Dict[str, Dict] = {}
+
+# (db path, schema name, version) already verified in this process
+_applied: Set[Tuple[str, str, int]] = set()
+_lock = threading.Lock()
+
+
+def register_schema(name: str, statements: List[str], version: int = 1):
+    """Register DDL for a schema; bump version when the statements change"""
+    SCHEMAS[name] = {"version": version, "statements": list(statements)}
+
+
+def ensure_schema(*names: str, db_path) -> None:
+    """Apply pending DDL for the named schemas (all registered schemas if none given)"""
+    names = names or tuple(SCHEMAS)
+    db_key = str(db_path)
+
+    # Fast path: nothing to do once verified in this process
+    if all((db_key, name, SCHEMAS[name]["version"]) in _applied for name in names):
+        return
+
+    with _lock:
+        pending = [name for name in names if (db_key, name, SCHEMAS[name]["version"]) not in _applied]
+        if not pending:
+            return
+
+        conn = sqlite3.connect(str(db_path))
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_versions (
+                    schema_name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    applied_at TIMESTAMP
+                )
+            """)
+            recorded = dict(cursor.execute("SELECT schema_name, version FROM schema_versions").fetchall())
+
+            for name in pending:
+                schema = SCHEMAS[name]
+                if recorded.get(name, 0) < schema["version"]:
+                    for statement in schema["statements"]:
+                        try:
+                            cursor.execute(statement)
+                        except sqlite3.OperationalError as e:
+                            # ALTER TABLE ... ADD COLUMN has no IF NOT EXISTS: an existing column means it already ran
+                            if "duplicate column name" not in str(e):
+                                raise
+                    cursor.execute(
+                        "INSERT OR REPLACE INTO schema_versions (schema_name, version, applied_at) VALUES (?, ?, ?)",
+                        (name, schema["version"], datetime.now().isoformat())
+                    )
+                    logger.info(f"Applied schema '{name}' v{schema['version']}")
+
+            conn.commit()
+            _applied.update((db_key, name, SCHEMAS[name]["version"]) for name in pending)
+        finally:
+            conn.close()
+
+
+def reset_applied_cache():
+    """Forget which schemas were verified (e.g. after swapping the database file)"""
+    with _lock:
+        _applied.clear()
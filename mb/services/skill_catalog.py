@@ -0,0 +1,386 @@
+"""
+Skill Catalog Service
+Roles, their required skills and learning resources, stored in indexed SQLite
+tables under normalized skill keys.
+
+The loader keeps the whole catalog in memory as dicts keyed by role and skill
+key, so lookups during gap analysis and path generation are O(1). Every write
+bumps the catalog version in the same transaction, and the in-memory copy is
+reloaded only when the stored version changes.
+"""
+
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List
+
+from .schema_registry import register_schema, ensure_schema
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
+
+CATALOG_NAME = "skill_catalog"
+
+register_schema("skill_catalog", [
+    """
+        CREATE TABLE IF NOT EXISTS catalog_versions (
+            catalog VARCHAR(50) PRIMARY KEY,
+            version INTEGER NOT NULL,
+            updated_at TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS catalog_roles (
+            role_id VARCHAR(100) PRIMARY KEY,
+            proficiency_level VARCHAR(50) DEFAULT 'Intermediate',
+            updated_at TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS catalog_role_skills (
+            role_id VARCHAR(100) NOT NULL,
+            skill_key VARCHAR(100) NOT NULL,
+            skill_name VARCHAR(100) NOT NULL,
+            is_priority INTEGER DEFAULT 0,
+            position INTEGER DEFAULT 0,
+            PRIMARY KEY (role_id, skill_key),
+            FOREIGN KEY (role_id) REFERENCES catalog_roles(role_id)
+        )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_catalog_role_skills_skill ON catalog_role_skills(skill_key)",
+    """
+        CREATE TABLE IF NOT EXISTS catalog_resources (
+            resource_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            skill_key VARCHAR(100) NOT NULL,
+            skill_name VARCHAR(100) NOT NULL,
+            resource VARCHAR(255) NOT NULL,
+            platform VARCHAR(50),
+            duration_hours REAL,
+            url TEXT,
+            UNIQUE (skill_key, resource)
+        )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_catalog_resources_skill ON catalog_resources(skill_key, resource_id)",
+])
+
+# Seed roles, loaded into the catalog tables the first time they are empty
+SEED_ROLE_REQUIREMENTS = {
+    "Software Developer": {
+        "required_skills": ["Python", "SQL", "Problem Solving", "Version Control", "APIs", "Testing"],
+        "priority": ["Python", "Problem Solving", "Testing"],
+        "proficiency_level": "Intermediate"
+    },
+    "Data Analyst": {
+        "required_skills": ["SQL", "Excel", "Data Visualization", "Statistics", "Python", "Tableau"],
+        "priority": ["SQL", "Data Visualization", "Statistics"],
+        "proficiency_level": "Intermediate"
+    },
+    "Business Analyst": {
+        "required_skills": ["Communication", "Business Acumen", "Documentation", "Excel", "SQL", "Stakeholder Management"],
+        "priority": ["Communication", "Business Acumen", "Documentation"],
+        "proficiency_level": "Intermediate"
+    },
+    "Project Manager": {
+        "required_skills": ["Leadership", "Communication", "Planning", "Risk Management", "Budgeting", "Team Management"],
+        "priority": ["Leadership", "Communication", "Planning"],
+        "proficiency_level": "Intermediate"
+    },
+    "UX Designer": {
+        "required_skills": ["Design Thinking", "Figma", "User Research", "Wireframing", "Communication", "Prototyping"],
+        "priority": ["Design Thinking", "User Research", "Figma"],
+        "proficiency_level": "Intermediate"
+    }
+}
+
+# Seed learning resources (YouTube/Udemy style)
+SEED_LEARNING_RESOURCES = {
+    "Python": [
+        {"resource": "Python Basics", "platform": "YouTube", "duration_hours": 10, "url": "https://youtube.com/python-basics"},
+        {"resource": "Python Advanced", "platform": "Udemy", "duration_hours": 20, "url": "https://udemy.com/python-advanced"},
+    ],
+    "SQL": [
+        {"resource": "SQL Fundamentals", "platform": "YouTube", "duration_hours": 8, "url": "https://youtube.com/sql-intro"},
+        {"resource": "Advanced SQL", "platform": "Udemy", "duration_hours": 15, "url": "https://udemy.com/sql-advanced"},
+    ],
+    "Problem Solving": [
+        {"resource": "Problem Solving Techniques", "platform": "Udemy", "duration_hours": 12, "url": "https://udemy.com/problem-solving"},
+        {"resource": "Coding Challenges", "platform": "YouTube", "duration_hours": 20, "url": "https://youtube.com/coding-challenges"},
+    ],
+    "Communication": [
+        {"resource": "Professional Communication", "platform": "Udemy", "duration_hours": 6, "url": "https://udemy.com/communication"},
+        {"resource": "Presentation Skills", "platform": "YouTube", "duration_hours": 8, "url": "https://youtube.com/presentations"},
+    ],
+    "Leadership": [
+        {"resource": "Leadership Fundamentals", "platform": "Udemy", "duration_hours": 15, "url": "https://udemy.com/leadership"},
+        {"resource": "Team Management", "platform": "YouTube", "duration_hours": 12, "url": "https://youtube.com/team-management"},
+    ],
+    "Data Visualization": [
+        {"resource": "Tableau Basics", "platform": "Udemy", "duration_hours": 10, "url": "https://udemy.com/tableau"},
+        {"resource": "Power BI Essentials", "platform": "YouTube", "duration_hours": 12, "url": "https://youtube.com/powerbi"},
+    ],
+    "Design Thinking": [
+        {"resource": "Design Thinking Workshop", "platform": "Udemy", "duration_hours": 8, "url": "https://udemy.com/design-thinking"},
+        {"resource": "User-Centered Design", "platform": "YouTube", "duration_hours": 10, "url": "https://youtube.com/user-design"},
+    ],
+    "Figma": [
+        {"resource": "Figma Masterclass", "platform": "Udemy", "duration_hours": 12, "url": "https://udemy.com/figma"},
+        {"resource": "Prototyping with Figma", "platform": "YouTube", "duration_hours": 10, "url": "https://youtube.com/figma-prototyping"},
+    ],
+}
+
+
+def normalize_skill(skill):
+    """Canonical catalog key for a skill name (case and whitespace insensitive)"""
+    return " ".join(str(skill).split()).lower()
+
+
+def parse_skill_list(skills_str):
+    """Normalized skill set from a comma-separated extracted_skills value"""
+    return {normalize_skill(skill) for skill in (skills_str or "").split(",") if skill.strip()}
+
+
+class SkillCatalog:
+    """Role / learning-resource catalog with a version-invalidated in-memory copy"""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._cache = None
+        self._lock = threading.Lock()
+
+    def get_connection(self):
+        ensure_schema("skill_catalog", db_path=self.db_path)
+        return sqlite3.connect(str(self.db_path))
+
+    @staticmethod
+    def _bump_version(conn):
+        conn.execute("""
+            INSERT INTO catalog_versions (catalog, version, updated_at) VALUES (?, 1, ?)
+            ON CONFLICT(catalog) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+        """, (CATALOG_NAME, datetime.now().isoformat()))
+
+    @staticmethod
+    def _stored_version(conn):
+        row = conn.execute("SELECT version FROM catalog_versions WHERE catalog = ?", (CATALOG_NAME,)).fetchone()
+        return row[0] if row else 0
+
+    # ========================
+    # LOADING
+    # ========================
+    def load(self) -> Dict:
+        """
+        Current catalog: {"version", "roles": {role_id: {...}}, "resources": {skill_key: [...]},
+        "learning_items": [{..., "skills": [skill_key, ...]}], "items_by_skill": {skill_key: [item index]}}
+        Served from memory unless the stored catalog version changed
+        """
+        conn = self.get_connection()
+        try:
+            version = self._stored_version(conn)
+            if self._cache is not None and self._cache["version"] == version:
+                return self._cache
+
+            with self._lock:
+                if version == 0:
+                    # Fresh database: seed from the built-in catalog
+                    self._import(conn, SEED_ROLE_REQUIREMENTS, SEED_LEARNING_RESOURCES, only_if_empty=True)
+                    version = self._stored_version(conn)
+                if self._cache is None or self._cache["version"] != version:
+                    self._cache = self._read(conn, version)
+                return self._cache
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _read(conn, version):
+        roles = {
+            role_id: {
+                "required_skills": [],
+                "priority": [],
+                "proficiency_level": proficiency_level or "Intermediate",
+                "required_keys": set(),
+                "priority_keys": set(),
+            }
+            for role_id, proficiency_level in conn.execute("SELECT role_id, proficiency_level FROM catalog_roles")
+        }
+        for role_id, skill_key, skill_name, is_priority in conn.execute("""
+            SELECT role_id, skill_key, skill_name, is_priority FROM catalog_role_skills
+            ORDER BY role_id, position
+        """):
+            role = roles.get(role_id)
+            if role is None:
+                continue
+            role["required_skills"].append(skill_name)
+            role["required_keys"].add(skill_key)
+            if is_priority:
+                role["priority"].append(skill_name)
+                role["priority_keys"].add(skill_key)
+
+        resources = {}
+        # One learning item per distinct resource; listing it under several skills means it covers all of them
+        items, items_by_key, items_by_skill = [], {}, {}
+        for skill_key, resource, platform, duration_hours, url in conn.execute("""
+            SELECT skill_key, resource, platform, duration_hours, url FROM catalog_resources
+            ORDER BY skill_key, resource_id
+        """):
+            resources.setdefault(skill_key, []).append({
+                "resource": resource,
+                "platform": platform,
+                "duration_hours": duration_hours,
+                "url": url
+            })
+
+            item_key = (resource, platform, url)
+            index = items_by_key.get(item_key)
+            if index is None:
+                index = items_by_key[item_key] = len(items)
+                items.append({"resource": resource, "platform": platform, "duration_hours": duration_hours or 0,
+                              "url": url, "skills": []})
+            item = items[index]
+            item["skills"].append(skill_key)
+            item["duration_hours"] = max(item["duration_hours"], duration_hours or 0)
+            items_by_skill.setdefault(skill_key, []).append(index)
+
+        return {
+            "version": version,
+            "roles": roles,
+            "resources": resources,
+            "learning_items": items,
+            "items_by_skill": items_by_skill
+        }
+
+    # ========================
+    # WRITES
+    # ========================
+    def _import(self, conn, role_requirements, learning_resources, only_if_empty=False):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if only_if_empty and conn.execute("SELECT 1 FROM catalog_roles LIMIT 1").fetchone():
+                conn.rollback()
+                return {"roles": 0, "resources": 0}
+
+            now = datetime.now().isoformat()
+            role_rows, skill_rows = [], []
+            for role_id, requirements in (role_requirements or {}).items():
+                priority = {normalize_skill(skill) for skill in requirements.get("priority", [])}
+                role_rows.append((role_id, requirements.get("proficiency_level", "Intermediate"), now))
+                seen = set()
+                for position, skill in enumerate(requirements.get("required_skills", [])):
+                    skill_key = normalize_skill(skill)
+                    if skill_key in seen:
+                        continue
+                    seen.add(skill_key)
+                    skill_rows.append((role_id, skill_key, skill.strip(), int(skill_key in priority), position))
+
+            if role_rows:
+                conn.executemany("""
+                    INSERT INTO catalog_roles (role_id, proficiency_level, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT(role_id) DO UPDATE SET
+                        proficiency_level = excluded.proficiency_level, updated_at = excluded.updated_at
+                """, role_rows)
+                # Imported roles replace their previous skill lists
+                conn.executemany("DELETE FROM catalog_role_skills WHERE role_id = ?", [(row[0],) for row in role_rows])
+                conn.executemany("""
+                    INSERT INTO catalog_role_skills (role_id, skill_key, skill_name, is_priority, position)
+                    VALUES (?, ?, ?, ?, ?)
+                """, skill_rows)
+
+            resource_rows = [
+                (normalize_skill(skill), skill.strip(), item["resource"], item.get("platform"),
+                 item.get("duration_hours"), item.get("url"))
+                for skill, items in (learning_resources or {}).items()
+                for item in items
+            ]
+            if resource_rows:
+                conn.executemany("""
+                    INSERT INTO catalog_resources (skill_key, skill_name, resource, platform, duration_hours, url)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(skill_key, resource) DO UPDATE SET
+                        platform = excluded.platform, duration_hours = excluded.duration_hours, url = excluded.url
+                """, resource_rows)
+
+            self._bump_version(conn)
+            conn.commit()
+            return {"roles": len(role_rows), "resources": len(resource_rows)}
+        except Exception:
+            conn.rollback()
+            raise
+
+    def import_catalog(self, role_requirements=None, learning_resources=None):
+        """
+        Bulk upsert roles ({role_id: {"required_skills", "priority", "proficiency_level"}})
+        and resources ({skill: [{"resource", "platform", "duration_hours", "url"}]})
+        """
+        conn = self.get_connection()
+        try:
+            result = self._import(conn, role_requirements, learning_resources)
+            logger.info(f"Imported skill catalog: {result}")
+            return result
+        except Exception as e:
+            logger.error(f"Error importing skill catalog: {e}")
+            return {"error": str(e)}
+        finally:
+            conn.close()
+
+    def upsert_role(self, role_id, required_skills, priority=None, proficiency_level="Intermediate"):
+        """Add or replace one role's requirements"""
+        return self.import_catalog({role_id: {
+            "required_skills": list(required_skills),
+            "priority": list(priority or []),
+            "proficiency_level": proficiency_level
+        }})
+
+    def add_learning_resource(self, skill, resource, platform=None, duration_hours=None, url=None):
+        """Add or update one learning resource for a skill"""
+        return self.import_catalog(learning_resources={skill: [{
+            "resource": resource,
+            "platform": platform,
+            "duration_hours": duration_hours,
+            "url": url
+        }]})
+
+    def delete_role(self, role_id):
+        """Remove a role and its skill requirements"""
+        conn = self.get_connection()
+        try:
+            conn.execute("DELETE FROM catalog_role_skills WHERE role_id = ?", (role_id,))
+            deleted = conn.execute("DELETE FROM catalog_roles WHERE role_id = ?", (role_id,)).rowcount
+            if deleted:
+                self._bump_version(conn)
+            conn.commit()
+            return {"role_id": role_id, "deleted": bool(deleted)}
+        except Exception as e:
+            logger.error(f"Error deleting role: {e}")
+            return {"error": str(e)}
+        finally:
+            conn.close()
+
+    # ========================
+    # QUERIES
+    # ========================
+    def roles_requiring(self, skill) -> List[str]:
+        """Roles that list a skill as required (indexed by skill key)"""
+        conn = self.get_connection()
+        try:
+            return [
+                row[0] for row in conn.execute(
+                    "SELECT role_id FROM catalog_role_skills WHERE skill_key = ? ORDER BY role_id",
+                    (normalize_skill(skill),)
+                )
+            ]
+        finally:
+            conn.close()
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_skill_catalog(db_path=DB_PATH):
+    """Process-wide skill catalog (one per database, so the cache is shared)"""
+    with _catalogs_lock:
+        key = str(db_path)
+        if key not in _catalogs:
+            _catalogs[key] = SkillCatalog(db_path)
+        return _catalogs[key]
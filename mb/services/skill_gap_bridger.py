@@ -11,75 +11,344 @@ from pathlib import Path
 from datetime import datetime
 import logging
 import json
+import threading
+import time
+
+from .schema_registry import register_schema, ensure_schema
+from .skill_catalog import get_skill_catalog, normalize_skill, parse_skill_list
+from .learning_path_optimizer import optimize_path
 
 logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
 
-# Mock role requirements database
-ROLE_REQUIREMENTS = {
-    "Software Developer": {
-        "required_skills": ["Python", "SQL", "Problem Solving", "Version Control", "APIs", "Testing"],
-        "priority": ["Python", "Problem Solving", "Testing"],
-        "proficiency_level": "Intermediate"
-    },
-    "Data Analyst": {
-        "required_skills": ["SQL", "Excel", "Data Visualization", "Statistics", "Python", "Tableau"],
-        "priority": ["SQL", "Data Visualization", "Statistics"],
-        "proficiency_level": "Intermediate"
-    },
-    "Business Analyst": {
-        "required_skills": ["Communication", "Business Acumen", "Documentation", "Excel", "SQL", "Stakeholder Management"],
-        "priority": ["Communication", "Business Acumen", "Documentation"],
-        "proficiency_level": "Intermediate"
-    },
-    "Project Manager": {
-        "required_skills": ["Leadership", "Communication", "Planning", "Risk Management", "Budgeting", "Team Management"],
-        "priority": ["Leadership", "Communication", "Planning"],
-        "proficiency_level": "Intermediate"
-    },
-    "UX Designer": {
-        "required_skills": ["Design Thinking", "Figma", "User Research", "Wireframing", "Communication", "Prototyping"],
-        "priority": ["Design Thinking", "User Research", "Figma"],
-        "proficiency_level": "Intermediate"
-    }
-}
+# Proficiency levels from lowest to highest (string MAX would rank "Proficient" above "Expert")
+PROFICIENCY_LEVELS = ["Beginner", "Basic", "Proficient", "Expert"]
+PROFICIENCY_RANK_SQL = "CASE proficiency_level {} ELSE 0 END".format(
+    " ".join(f"WHEN '{level}' THEN {rank}" for rank, level in enumerate(PROFICIENCY_LEVELS, 1))
+)
+BEST_PROFICIENCY_SQL = "CASE MAX({}) {} END".format(
+    PROFICIENCY_RANK_SQL, " ".join(f"WHEN {rank} THEN '{level}'" for rank, level in enumerate(PROFICIENCY_LEVELS, 1))
+)
+
+# Per (student, skill) rollup of the tracking log, grouped in one pass
+SKILL_PROGRESS_ROLLUP_SQL = f"""
+    INSERT OR IGNORE INTO student_skill_progress (
+        student_id, skill, completions, score_sum, best_proficiency_rank, best_proficiency, last_completion
+    )
+    SELECT student_id, skill, COUNT(*), SUM(quiz_score), MAX({PROFICIENCY_RANK_SQL}),
+           {BEST_PROFICIENCY_SQL}, MAX(completion_date)
+    FROM skill_learning_tracking
+    WHERE student_id IS NOT NULL AND skill IS NOT NULL
+    GROUP BY student_id, skill
+"""
+
+register_schema("skill_learning", [
+    """
+        CREATE TABLE IF NOT EXISTS skill_learning_tracking (
+            tracking_id INTEGER PRIMARY KEY,
+            student_id VARCHAR(50),
+            skill VARCHAR(100),
+            quiz_score INTEGER,
+            completion_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            proficiency_level VARCHAR(50)
+        )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_skill_tracking_student ON skill_learning_tracking(student_id, skill)",
+    # Primary key doubles as the student_id index: progress reads are one range scan
+    """
+        CREATE TABLE IF NOT EXISTS student_skill_progress (
+            student_id VARCHAR(50) NOT NULL,
+            skill VARCHAR(100) NOT NULL,
+            completions INTEGER NOT NULL DEFAULT 0,
+            score_sum REAL,
+            best_proficiency_rank INTEGER DEFAULT 0,
+            best_proficiency VARCHAR(50),
+            last_completion TIMESTAMP,
+            PRIMARY KEY (student_id, skill)
+        )
+    """,
+    # Backfill from the existing log when this version is first applied
+    SKILL_PROGRESS_ROLLUP_SQL,
+], version=2)
+
+# Gap weights per required skill (same scale as analyze_skill_gaps priority_score)
+PRIORITY_SKILL_WEIGHT = 10
+REQUIRED_SKILL_WEIGHT = 5
+
+SKILL_INDEX_REFRESH_SECONDS = 60
+
+
+class SkillMatrixIndex:
+    """
+    Skill vocabulary with a sparse student x skill matrix and a weighted role x skill matrix
+    
+    Student rows come from mb_onboarding_profiles.extracted_skills and are refreshed
+    incrementally by updated_at. Roles follow the skill catalog and are rebuilt when
+    its version changes. Gap counts and weighted gap scores for every student
+    against every role come from one sparse matrix product.
+    """
+    
+    def __init__(self, db_path=DB_PATH, role_requirements=None, refresh_seconds=SKILL_INDEX_REFRESH_SECONDS):
+        self.db_path = db_path
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self.vocabulary = {}        # normalized skill -> column
+        self.skill_names = []       # column -> normalized skill
+        self.student_ids = []       # row -> student_id
+        self._rows = {}             # student_id -> row
+        self._student_columns = []  # row -> sorted array of skill columns
+        self._watermark = None
+        self._refreshed_at = 0.0
+        self._student_matrix = None
+        self._gaps = None
+        self.roles, self._role_columns = [], []
+        # Explicit role requirements pin the roles; otherwise they track the catalog
+        self._fixed_roles = role_requirements is not None
+        self._roles_version = None
+        if self._fixed_roles:
+            self.set_roles(role_requirements)
+    
+    def _column(self, skill):
+        column = self.vocabulary.get(skill)
+        if column is None:
+            column = self.vocabulary[skill] = len(self.skill_names)
+            self.skill_names.append(skill)
+        return column
+    
+    def set_roles(self, role_requirements):
+        """(Re)load role requirements; required skills join the vocabulary"""
+        with self._lock:
+            self.roles = list(role_requirements)
+            self._role_columns = []
+            for role in self.roles:
+                requirements = role_requirements[role]
+                priority = {normalize_skill(skill) for skill in requirements.get("priority", [])}
+                self._role_columns.append({
+                    self._column(skill): PRIORITY_SKILL_WEIGHT if skill in priority else REQUIRED_SKILL_WEIGHT
+                    for skill in (normalize_skill(skill) for skill in requirements["required_skills"])
+                })
+            self._gaps = None
+    
+    def _sync_roles(self):
+        if self._fixed_roles:
+            return
+        catalog = get_skill_catalog(self.db_path).load()
+        with self._lock:
+            if catalog["version"] != self._roles_version:
+                self.set_roles(catalog["roles"])
+                self._roles_version = catalog["version"]
+    
+    # ========================
+    # STUDENT MATRIX
+    # ========================
+    def refresh(self, force=False, full=None):
+        """
+        Pull new or changed onboarding profiles into the student x skill matrix
+        force skips the refresh throttle; full (defaults to force) re-reads every profile
+        """
+        full = force if full is None else full
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed_at < self.refresh_seconds:
+                return {"students_updated": 0}
+            
+            conn = sqlite3.connect(str(self.db_path))
+            try:
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(mb_onboarding_profiles)")}
+                full_reload = not ("updated_at" in columns and self._watermark is not None and not full)
+                if not columns:
+                    rows = []
+                elif not full_reload:
+                    # >= so rows sharing the watermark timestamp are never missed (re-applying is a no-op)
+                    rows = conn.execute("""
+                        SELECT student_id, extracted_skills, updated_at FROM mb_onboarding_profiles
+                        WHERE updated_at >= ?
+                    """, (self._watermark,)).fetchall()
+                else:
+                    updated_at = "updated_at" if "updated_at" in columns else "NULL"
+                    rows = conn.execute(f"""
+                        SELECT student_id, extracted_skills, {updated_at} FROM mb_onboarding_profiles
+                    """).fetchall()
+            finally:
+                conn.close()
+            
+            updated = 0
+            for student_id, skills_str, updated_at in rows:
+                if student_id is None:
+                    continue
+                skill_columns = np.array(
+                    sorted(self._column(skill) for skill in parse_skill_list(skills_str)), dtype=np.int32
+                )
+                row = self._rows.get(student_id)
+                if row is None:
+                    self._rows[student_id] = len(self.student_ids)
+                    self.student_ids.append(student_id)
+                    self._student_columns.append(skill_columns)
+                elif np.array_equal(self._student_columns[row], skill_columns):
+                    continue
+                else:
+                    self._student_columns[row] = skill_columns
+                updated += 1
+                if updated_at is not None and (self._watermark is None or str(updated_at) > self._watermark):
+                    self._watermark = str(updated_at)
+            
+            if full_reload:
+                # Drop students whose profiles no longer exist
+                present = {row[0] for row in rows}
+                if len(present) != len(self.student_ids):
+                    keep = [row for row, student_id in enumerate(self.student_ids) if student_id in present]
+                    self.student_ids = [self.student_ids[row] for row in keep]
+                    self._student_columns = [self._student_columns[row] for row in keep]
+                    self._rows = {student_id: row for row, student_id in enumerate(self.student_ids)}
+                    updated += 1
+            
+            if updated:
+                self._student_matrix = None
+                self._gaps = None
+            self._refreshed_at = time.monotonic()
+            return {"students_updated": updated, "students": len(self.student_ids), "skills": len(self.skill_names)}
+    
+    def _matrices(self):
+        """CSR student x skill matrix and stacked [weights; required] role x skill matrix"""
+        from scipy.sparse import csr_matrix
+        
+        n_skills = len(self.skill_names)
+        if self._student_matrix is None or self._student_matrix.shape[1] != n_skills:
+            lengths = np.fromiter((len(columns) for columns in self._student_columns), dtype=np.int64,
+                                  count=len(self._student_columns))
+            indptr = np.concatenate(([0], np.cumsum(lengths)))
+            indices = (np.concatenate(self._student_columns) if self._student_columns
+                       else np.empty(0, dtype=np.int32))
+            self._student_matrix = csr_matrix(
+                (np.ones(len(indices), dtype=np.float32), indices, indptr),
+                shape=(len(self.student_ids), n_skills)
+            )
+        
+        role_matrix = np.zeros((2 * len(self.roles), n_skills), dtype=np.float32)
+        for index, weights in enumerate(self._role_columns):
+            columns = np.fromiter(weights.keys(), dtype=np.int64, count=len(weights))
+            role_matrix[index, columns] = np.fromiter(weights.values(), dtype=np.float32, count=len(weights))
+            role_matrix[len(self.roles) + index, columns] = 1
+        return self._student_matrix, role_matrix
+    
+    def gap_matrix(self):
+        """
+        Gaps for every student against every role
+        Returns student_ids, roles, gap_counts and weighted gap_scores (students x roles arrays)
+        plus readiness (share of the role's weighted requirements already held)
+        """
+        self._sync_roles()
+        self.refresh()
+        with self._lock:
+            if self._gaps is None:
+                students, role_matrix = self._matrices()
+                n_roles = len(self.roles)
+                # One sparse product: held weight and held count for all roles at once
+                held = students @ role_matrix.T
+                totals = role_matrix.sum(axis=1)
+                weight_totals = totals[:n_roles]
+                self._gaps = {
+                    "student_ids": list(self.student_ids),
+                    "roles": list(self.roles),
+                    "gap_counts": (totals[n_roles:] - held[:, n_roles:]).astype(np.int32),
+                    "gap_scores": weight_totals - held[:, :n_roles],
+                    "readiness": held[:, :n_roles] / np.maximum(weight_totals, 1),
+                }
+            return self._gaps
+    
+    def snapshot(self, force_refresh=False):
+        """
+        Current (student_ids, CSR student x skill matrix, skill_names, {role: {skill_key: weight}})
+        for batch jobs that aggregate over the whole cohort
+        """
+        self._sync_roles()
+        self.refresh(force=force_refresh, full=False)
+        with self._lock:
+            students, _ = self._matrices()
+            roles = {
+                role: {self.skill_names[column]: weight for column, weight in role_columns.items()}
+                for role, role_columns in zip(self.roles, self._role_columns)
+            }
+            return list(self.student_ids), students, list(self.skill_names), roles
+    
+    def student_skills(self, student_id):
+        """Normalized skills indexed for a student"""
+        with self._lock:
+            row = self._rows.get(student_id)
+            if row is None:
+                return set()
+            return {self.skill_names[column] for column in self._student_columns[row]}
+    
+    def role_gaps(self, role_id, student_ids=None):
+        """
+        Missing skills per student for one role
+        Returns ({skill_key: weight} for the role, {student_id: tuple of missing skill keys})
+        """
+        self._sync_roles()
+        self.refresh()
+        with self._lock:
+            role_columns = self._role_columns[self.roles.index(role_id)]
+            weights = {self.skill_names[column]: weight for column, weight in role_columns.items()}
+            missing = {}
+            for student_id in (self.student_ids if student_ids is None else student_ids):
+                row = self._rows.get(student_id)
+                if row is None:
+                    continue
+                held = set(self._student_columns[row].tolist())
+                missing[student_id] = tuple(sorted(
+                    self.skill_names[column] for column in role_columns if column not in held
+                ))
+        return weights, missing
+    
+    def top_candidates(self, role_id, n=10, max_gaps=None):
+        """Students closest to readiness for a role (lowest weighted gap first)"""
+        self._sync_roles()
+        if role_id not in self.roles:
+            return {"error": f"Role '{role_id}' not found in requirements database"}
+        
+        gaps = self.gap_matrix()
+        role = gaps["roles"].index(role_id)
+        gap_scores = gaps["gap_scores"][:, role]
+        gap_counts = gaps["gap_counts"][:, role]
+        
+        candidates = np.arange(len(gap_scores))
+        if max_gaps is not None:
+            candidates = candidates[gap_counts <= max_gaps]
+        if len(candidates) > n:
+            # Partition out the n best before sorting just those (ties broken by gap count, then row)
+            cutoff = np.partition(gap_scores[candidates], n - 1)[n - 1]
+            candidates = candidates[gap_scores[candidates] <= cutoff]
+        order = np.lexsort((candidates, gap_counts[candidates], gap_scores[candidates]))
+        
+        with self._lock:
+            role_columns = self._role_columns[self.roles.index(role_id)]
+            results = []
+            for rank, row in enumerate(candidates[order][:n], 1):
+                held = set(self._student_columns[row].tolist())
+                results.append({
+                    "rank": rank,
+                    "student_id": gaps["student_ids"][row],
+                    "gap_count": int(gap_counts[row]),
+                    "weighted_gap": float(gap_scores[row]),
+                    "readiness_pct": round(float(gaps["readiness"][row, role]) * 100, 1),
+                    "missing_skills": sorted(
+                        self.skill_names[column] for column in role_columns if column not in held
+                    )
+                })
+        return results
+
+
+_skill_indexes = {}
+_skill_indexes_lock = threading.Lock()
 
-# Mock learning resources (YouTube/Udemy style)
-LEARNING_RESOURCES = {
-    "Python": [
-        {"resource": "Python Basics", "platform": "YouTube", "duration_hours": 10, "url": "https://youtube.com/python-basics"},
-        {"resource": "Python Advanced", "platform": "Udemy", "duration_hours": 20, "url": "https://udemy.com/python-advanced"},
-    ],
-    "SQL": [
-        {"resource": "SQL Fundamentals", "platform": "YouTube", "duration_hours": 8, "url": "https://youtube.com/sql-intro"},
-        {"resource": "Advanced SQL", "platform": "Udemy", "duration_hours": 15, "url": "https://udemy.com/sql-advanced"},
-    ],
-    "Problem Solving": [
-        {"resource": "Problem Solving Techniques", "platform": "Udemy", "duration_hours": 12, "url": "https://udemy.com/problem-solving"},
-        {"resource": "Coding Challenges", "platform": "YouTube", "duration_hours": 20, "url": "https://youtube.com/coding-challenges"},
-    ],
-    "Communication": [
-        {"resource": "Professional Communication", "platform": "Udemy", "duration_hours": 6, "url": "https://udemy.com/communication"},
-        {"resource": "Presentation Skills", "platform": "YouTube", "duration_hours": 8, "url": "https://youtube.com/presentations"},
-    ],
-    "Leadership": [
-        {"resource": "Leadership Fundamentals", "platform": "Udemy", "duration_hours": 15, "url": "https://udemy.com/leadership"},
-        {"resource": "Team Management", "platform": "YouTube", "duration_hours": 12, "url": "https://youtube.com/team-management"},
-    ],
-    "Data Visualization": [
-        {"resource": "Tableau Basics", "platform": "Udemy", "duration_hours": 10, "url": "https://udemy.com/tableau"},
-        {"resource": "Power BI Essentials", "platform": "YouTube", "duration_hours": 12, "url": "https://youtube.com/powerbi"},
-    ],
-    "Design Thinking": [
-        {"resource": "Design Thinking Workshop", "platform": "Udemy", "duration_hours": 8, "url": "https://udemy.com/design-thinking"},
-        {"resource": "User-Centered Design", "platform": "YouTube", "duration_hours": 10, "url": "https://youtube.com/user-design"},
-    ],
-    "Figma": [
-        {"resource": "Figma Masterclass", "platform": "Udemy", "duration_hours": 12, "url": "https://udemy.com/figma"},
-        {"resource": "Prototyping with Figma", "platform": "YouTube", "duration_hours": 10, "url": "https://youtube.com/figma-prototyping"},
-    ],
-}
+
+def get_skill_index(db_path=DB_PATH):
+    """Process-wide skill matrix index (one per database)"""
+    with _skill_indexes_lock:
+        key = str(db_path)
+        if key not in _skill_indexes:
+            _skill_indexes[key] = SkillMatrixIndex(db_path)
+        return _skill_indexes[key]
 
 
 class SkillGapBridger:
@@ -87,8 +356,17 @@ class SkillGapBridger:
     
     def __init__(self, db_path=DB_PATH):
         self.db_path = db_path
-        self.role_requirements = ROLE_REQUIREMENTS
-        self.learning_resources = LEARNING_RESOURCES
+        self.catalog = get_skill_catalog(db_path)
+    
+    @property
+    def role_requirements(self):
+        """Roles from the skill catalog: {role_id: {"required_skills", "priority", ...}}"""
+        return self.catalog.load()["roles"]
+    
+    @property
+    def learning_resources(self):
+        """Learning resources from the skill catalog, keyed by normalized skill"""
+        return self.catalog.load()["resources"]
     
     def get_connection(self):
         return sqlite3.connect(str(self.db_path))
@@ -110,21 +388,23 @@ class SkillGapBridger:
             current_skills = set()
             if not df_skills.empty:
                 skills_str = df_skills.iloc[0]['extracted_skills'] or ""
-                current_skills = set(skill.strip().lower() for skill in skills_str.split(",") if skill.strip())
+                current_skills = parse_skill_list(skills_str)
             
             # Get role requirements
-            if role_id not in self.role_requirements:
+            catalog = self.catalog.load()
+            if role_id not in catalog["roles"]:
                 return {"error": f"Role '{role_id}' not found in requirements database"}
             
-            role_reqs = self.role_requirements[role_id]
-            required_skills = set(skill.lower() for skill in role_reqs["required_skills"])
+            role_reqs = catalog["roles"][role_id]
+            required_skills = role_reqs["required_keys"]
+            resources = catalog["resources"]
             
             # Calculate gaps
             gaps = []
             for skill in required_skills:
                 if skill not in current_skills:
                     # Determine priority
-                    is_priority = skill in [s.lower() for s in role_reqs.get("priority", [])]
+                    is_priority = skill in role_reqs["priority_keys"]
                     priority_score = 10 if is_priority else 5
                     
                     gaps.append({
@@ -132,7 +412,7 @@ class SkillGapBridger:
                         "priority": "High" if is_priority else "Medium",
                         "priority_score": priority_score,
                         "status": "Gap",
-                        "resources_available": skill in self.learning_resources
+                        "resources_available": skill in resources
                     })
             
             # Calculate proficiency gaps (existing skills to improve)
@@ -143,7 +423,7 @@ class SkillGapBridger:
                         "priority": "Low",
                         "priority_score": 3,
                         "status": "Improve",
-                        "resources_available": skill in self.learning_resources
+                        "resources_available": skill in resources
                     })
             
             # Sort by priority score
@@ -166,6 +446,22 @@ class SkillGapBridger:
         finally:
             conn.close()
     
+    def get_skill_gap_matrix(self):
+        """Gap counts and weighted gap scores for all students x all roles"""
+        try:
+            return get_skill_index(self.db_path).gap_matrix()
+        except Exception as e:
+            logger.error(f"Error computing skill gap matrix: {e}")
+            return {"error": str(e)}
+    
+    def get_top_candidates(self, role_id, n=10, max_gaps=None):
+        """Top-N students closest to readiness for a role"""
+        try:
+            return get_skill_index(self.db_path).top_candidates(role_id, n=n, max_gaps=max_gaps)
+        except Exception as e:
+            logger.error(f"Error getting top candidates: {e}")
+            return {"error": str(e)}
+    
     def generate_learning_path(self, gaps_data, max_resources_per_skill=2):
         """
         Generate personalized learning path from gap analysis
@@ -183,22 +479,25 @@ class SkillGapBridger:
             
             learning_path = []
             total_hours = 0
+            learning_resources = self.learning_resources
             
             for gap in gaps:
-                skill = gap["skill"].lower()
+                # Catalog resources are keyed by normalized skill, whatever case the gap uses
+                skill = normalize_skill(gap["skill"])
                 
-                if skill not in self.learning_resources:
+                if skill not in learning_resources:
                     continue
                 
-                resources = self.learning_resources[skill][:max_resources_per_skill]
+                resources = learning_resources[skill][:max_resources_per_skill]
+                duration_hours = sum(r.get("duration_hours") or 0 for r in resources)
                 
                 path_item = {
                     "skill": gap["skill"],
                     "priority": gap["priority"],
                     "status": gap["status"],
                     "resources": resources,
-                    "total_duration_hours": sum(r.get("duration_hours", 0) for r in resources),
-                    "estimated_completion_days": max(7, sum(r.get("duration_hours", 0) for r in resources) / 2)  # Assume 2 hrs/day
+                    "total_duration_hours": duration_hours,
+                    "estimated_completion_days": max(7, duration_hours / 2)  # Assume 2 hrs/day
                 }
                 
                 learning_path.append(path_item)
@@ -217,25 +516,90 @@ class SkillGapBridger:
             logger.error(f"Error generating learning path: {e}")
             return {"error": str(e)}
     
+    def optimize_learning_path(self, gaps_data, hours_budget=None, method="auto"):
+        """
+        Shortest set of resources covering the analyzed gaps (weighted by priority_score)
+        With hours_budget, covers as much priority weight as fits in the budget instead
+        """
+        try:
+            gap_weights = {}
+            for gap in gaps_data.get("gaps", []):
+                skill = normalize_skill(gap["skill"])
+                gap_weights[skill] = max(gap_weights.get(skill, 0), gap.get("priority_score", 1))
+            
+            path = optimize_path(gap_weights, self.catalog.load(), hours_budget=hours_budget, method=method)
+            total_days = path["total_estimated_hours"] / 2  # Assume 2 hrs/day
+            return {
+                "student_id": gaps_data.get("student_id"),
+                "role_id": gaps_data.get("role_id"),
+                **path,
+                "total_estimated_days": total_days,
+                "path_created_at": datetime.now().isoformat(),
+                "recommendation": (
+                    f"Complete {len(path['resources'])} resources ({path['total_estimated_hours']:.0f}h) "
+                    f"covering {len(path['covered_skills'])} of {len(gap_weights)} skill areas "
+                    f"over approximately {total_days:.0f} days"
+                )
+            }
+        except Exception as e:
+            logger.error(f"Error optimizing learning path: {e}")
+            return {"error": str(e)}
+    
+    def optimize_cohort_paths(self, role_id, student_ids=None, hours_budget=None, method="auto"):
+        """
+        Optimized learning paths toward a role for a whole cohort
+        Students with the same missing skills share one solve, so cost scales with distinct gap sets
+        """
+        try:
+            started = time.perf_counter()
+            catalog = self.catalog.load()
+            index = get_skill_index(self.db_path)
+            if role_id not in catalog["roles"]:
+                return {"error": f"Role '{role_id}' not found in requirements database"}
+            
+            weights, missing = index.role_gaps(role_id, student_ids)
+            solved = {}
+            paths = []
+            for student_id, gap_skills in missing.items():
+                if gap_skills not in solved:
+                    solved[gap_skills] = optimize_path(
+                        {skill: weights[skill] for skill in gap_skills}, catalog,
+                        hours_budget=hours_budget, method=method
+                    )
+                path = solved[gap_skills]
+                paths.append({
+                    "student_id": student_id,
+                    "gap_count": len(gap_skills),
+                    "resources": [resource["resource"] for resource in path["resources"]],
+                    "total_estimated_hours": path["total_estimated_hours"],
+                    "coverage_pct": path["coverage_pct"],
+                    "uncovered_skills": path["uncovered_skills"]
+                })
+            
+            hours = [path["total_estimated_hours"] for path in paths]
+            return {
+                "role_id": role_id,
+                "hours_budget": hours_budget,
+                "students": len(paths),
+                "distinct_gap_sets": len(solved),
+                "avg_hours": round(float(np.mean(hours)), 1) if hours else 0,
+                "avg_coverage_pct": round(float(np.mean([path["coverage_pct"] for path in paths])), 1) if paths else 100.0,
+                "paths": paths,
+                "computed_in_seconds": round(time.perf_counter() - started, 3)
+            }
+        except Exception as e:
+            logger.error(f"Error optimizing cohort learning paths: {e}")
+            return {"error": str(e)}
+    
     def track_learning_completion(self, student_id, skill, quiz_score):
         """
         Track learning resource completion
         Updates student's skill proficiency
         """
+        ensure_schema("skill_learning", db_path=self.db_path)
         conn = self.get_connection()
         try:
-            # Check if tracking table exists, create if needed
             cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS skill_learning_tracking (
-                    tracking_id INTEGER PRIMARY KEY,
-                    student_id VARCHAR(50),
-                    skill VARCHAR(100),
-                    quiz_score INTEGER,
-                    completion_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    proficiency_level VARCHAR(50)
-                )
-            """)
             
             # Determine proficiency from quiz score
             if quiz_score >= 85:
@@ -253,6 +617,25 @@ class SkillGapBridger:
                 (student_id, skill, quiz_score, proficiency)
             )
             
+            # Fold the new row into the rollup in the same transaction
+            cursor.execute(
+                f"""INSERT INTO student_skill_progress (
+                        student_id, skill, completions, score_sum, best_proficiency_rank,
+                        best_proficiency, last_completion
+                    )
+                    SELECT student_id, skill, 1, quiz_score, {PROFICIENCY_RANK_SQL}, proficiency_level, completion_date
+                    FROM skill_learning_tracking
+                    WHERE tracking_id = ?
+                    ON CONFLICT(student_id, skill) DO UPDATE SET
+                        completions = completions + 1,
+                        score_sum = COALESCE(score_sum, 0) + COALESCE(excluded.score_sum, 0),
+                        best_proficiency = CASE WHEN excluded.best_proficiency_rank > best_proficiency_rank
+                                                THEN excluded.best_proficiency ELSE best_proficiency END,
+                        best_proficiency_rank = MAX(best_proficiency_rank, excluded.best_proficiency_rank),
+                        last_completion = MAX(COALESCE(last_completion, ''), excluded.last_completion)""",
+                (cursor.lastrowid,)
+            )
+            
             conn.commit()
             
             return {
@@ -274,16 +657,16 @@ class SkillGapBridger:
         Get student's learning progress across skills
         Returns tracked skills and proficiency levels
         """
+        ensure_schema("skill_learning", db_path=self.db_path)
         conn = self.get_connection()
         try:
             df = pd.read_sql_query(
-                """SELECT skill, AVG(quiz_score) as avg_score, 
-                          MAX(proficiency_level) as current_proficiency,
-                          COUNT(*) as completions,
-                          MAX(completion_date) as last_completion
-                   FROM skill_learning_tracking
+                """SELECT skill, score_sum / completions as avg_score,
+                          best_proficiency as current_proficiency,
+                          completions,
+                          last_completion
+                   FROM student_skill_progress
                    WHERE student_id = ?
-                   GROUP BY skill
                    ORDER BY last_completion DESC""",
                 conn,
                 params=(student_id,)
@@ -305,6 +688,24 @@ class SkillGapBridger:
             conn.close()
 
 
+def rebuild_skill_progress(db_path=DB_PATH):
+    """Recompute student_skill_progress from skill_learning_tracking"""
+    ensure_schema("skill_learning", db_path=db_path)
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM student_skill_progress")
+        conn.execute(SKILL_PROGRESS_ROLLUP_SQL)
+        rows = conn.execute("SELECT COUNT(*) FROM student_skill_progress").fetchone()[0]
+        conn.commit()
+        return {"skill_progress_rows": rows}
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
 def init_skill_gap_bridger():
     """Initialize skill gap bridger service"""
     return SkillGapBridger()
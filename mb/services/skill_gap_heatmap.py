@@ -0,0 +1,297 @@
+"""
+Skill Gap Heatmap
+Cohort view of which skills are most lacking for each role, overall and per
+institution / region.
+
+A batch job aggregates the skill matrix index into `skill_gap_heatmap`
+(scope x role x skill: students, students missing the skill, weighted severity).
+Group membership times the student x skill matrix gives every scope's skill
+counts in one sparse product. Re-runs pick up changed onboarding profiles
+through the index and only rewrite heatmap rows whose counts changed, so the
+dashboard reads a small precomputed table.
+"""
+
+import sqlite3
+import time
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .schema_registry import register_schema, ensure_schema
+from .skill_gap_bridger import get_skill_index
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = Path(__file__).parent.parent.parent / "data" / "mb_compass.db"
+
+# Scope type -> (table, column) giving each student's scope value; missing columns are skipped
+HEATMAP_SCOPES = {
+    "institution": ("mb_users", "institution"),
+    "region": ("mb_onboarding_profiles", "location"),
+}
+
+register_schema("skill_gap_heatmap", [
+    """
+        CREATE TABLE IF NOT EXISTS skill_gap_heatmap (
+            scope_type VARCHAR(20) NOT NULL,
+            scope_value VARCHAR(255) NOT NULL,
+            role_id VARCHAR(100) NOT NULL,
+            skill VARCHAR(100) NOT NULL,
+            students INTEGER NOT NULL,
+            students_missing INTEGER NOT NULL,
+            gap_severity REAL NOT NULL,
+            computed_at TIMESTAMP,
+            PRIMARY KEY (scope_type, scope_value, role_id, skill)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS skill_gap_heatmap_runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            computed_at TIMESTAMP NOT NULL,
+            students INTEGER,
+            rows_changed INTEGER,
+            duration_ms INTEGER
+        )
+    """,
+    # Source state seen by the last run: profile count, catalog version and the UTC read time
+    """
+        CREATE TABLE IF NOT EXISTS skill_gap_heatmap_sources (
+            source VARCHAR(100) PRIMARY KEY,
+            watermark TEXT
+        )
+    """,
+], version=2)
+
+
+def _scope_groups(conn, student_ids):
+    """{scope_type: array of group labels per student row} for every available scope"""
+    groups = {"all": np.array(["all"] * len(student_ids), dtype=object)}
+    position = {student_id: row for row, student_id in enumerate(student_ids)}
+
+    for scope_type, (table, column) in HEATMAP_SCOPES.items():
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns or "student_id" not in columns:
+            continue
+        labels = np.full(len(student_ids), None, dtype=object)
+        for student_id, value in conn.execute(f"SELECT student_id, {column} FROM {table} WHERE student_id IS NOT NULL"):
+            row = position.get(student_id)
+            if row is not None and value not in (None, ""):
+                labels[row] = str(value).strip()
+        groups[scope_type] = labels
+    return groups
+
+
+def _compute_rows(conn, db_path):
+    """Current heatmap rows keyed by (scope_type, scope_value, role_id, skill)"""
+    from scipy.sparse import csr_matrix
+
+    student_ids, students, skill_names, roles = get_skill_index(db_path).snapshot(force_refresh=True)
+    if not student_ids:
+        return {}, 0
+
+    column_of = {skill: column for column, skill in enumerate(skill_names)}
+    rows = {}
+    for scope_type, labels in _scope_groups(conn, student_ids).items():
+        assigned = np.flatnonzero(labels != None)  # noqa: E711 - elementwise over an object array
+        if len(assigned) == 0:
+            continue
+        values, group_of = np.unique(labels[assigned].astype(str), return_inverse=True)
+        membership = csr_matrix(
+            (np.ones(len(assigned), dtype=np.float32), (group_of, assigned)),
+            shape=(len(values), len(student_ids))
+        )
+        # Skill holders per group for every skill at once
+        held = (membership @ students).toarray()
+        group_sizes = np.bincount(group_of, minlength=len(values))
+
+        for role_id, weights in roles.items():
+            for skill, weight in weights.items():
+                missing = group_sizes - held[:, column_of[skill]].astype(np.int64)
+                for group, scope_value in enumerate(values):
+                    rows[(scope_type, scope_value, role_id, skill)] = (
+                        int(group_sizes[group]), int(missing[group]), float(missing[group] * weight)
+                    )
+    return rows, len(student_ids)
+
+
+def _table_columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _source_watermarks(conn) -> Dict[str, str]:
+    """
+    {source: watermark} for the heatmap inputs: onboarding profile count, role catalog version and
+    "read_at", SQLite's UTC clock when they were read (profile updated_at is CURRENT_TIMESTAMP, i.e. UTC)
+    """
+    watermarks = {"read_at": conn.execute("SELECT datetime('now')").fetchone()[0]}
+    if _table_columns(conn, "mb_onboarding_profiles"):
+        watermarks["mb_onboarding_profiles"] = str(conn.execute("SELECT COUNT(*) FROM mb_onboarding_profiles").fetchone()[0])
+    if _table_columns(conn, "catalog_versions"):
+        watermarks["catalog_versions"] = str(conn.execute("SELECT MAX(version) FROM catalog_versions").fetchone()[0])
+    return watermarks
+
+
+def _profiles_changed_since(conn, read_at) -> bool:
+    """Any onboarding profile updated at or after read_at (>=: timestamps only have second resolution)"""
+    if read_at is None or "updated_at" not in _table_columns(conn, "mb_onboarding_profiles"):
+        return read_at is None
+    return conn.execute(
+        "SELECT MAX(julianday(updated_at)) >= julianday(?) FROM mb_onboarding_profiles", (read_at,)
+    ).fetchone()[0] == 1
+
+
+def compute_skill_gap_heatmap(db_path=DB_PATH):
+    """
+    Batch job: refresh skill_gap_heatmap from the skill index
+    Only rows whose counts changed are rewritten; rows for vanished scopes or roles are removed
+    """
+    started = time.perf_counter()
+    try:
+        ensure_schema("skill_gap_heatmap", db_path=db_path)
+        conn = sqlite3.connect(str(db_path))
+        try:
+            # Read before the data so changes made during the run leave the heatmap stale
+            watermarks = _source_watermarks(conn)
+            rows, student_count = _compute_rows(conn, db_path)
+            current = {
+                row[:4]: row[4:]
+                for row in conn.execute("""
+                    SELECT scope_type, scope_value, role_id, skill, students, students_missing, gap_severity
+                    FROM skill_gap_heatmap
+                """)
+            }
+            changed = [key + value for key, value in rows.items() if current.get(key) != value]
+            stale = [key for key in current if key not in rows]
+            computed_at = datetime.now().isoformat()
+
+            conn.execute("BEGIN IMMEDIATE")
+            if stale:
+                conn.executemany("""
+                    DELETE FROM skill_gap_heatmap
+                    WHERE scope_type = ? AND scope_value = ? AND role_id = ? AND skill = ?
+                """, stale)
+            if changed:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO skill_gap_heatmap
+                        (scope_type, scope_value, role_id, skill, students, students_missing, gap_severity, computed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [row + (computed_at,) for row in changed])
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            conn.execute("""
+                INSERT INTO skill_gap_heatmap_runs (computed_at, students, rows_changed, duration_ms)
+                VALUES (?, ?, ?, ?)
+            """, (computed_at, student_count, len(changed) + len(stale), duration_ms))
+            conn.execute("DELETE FROM skill_gap_heatmap_sources")
+            conn.executemany(
+                "INSERT INTO skill_gap_heatmap_sources (source, watermark) VALUES (?, ?)", watermarks.items()
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        logger.info(f"Skill gap heatmap: {len(changed)} rows updated, {len(stale)} removed")
+        return {
+            "students": student_count,
+            "rows_updated": len(changed),
+            "rows_removed": len(stale),
+            "computed_at": computed_at,
+            "duration_ms": duration_ms
+        }
+    except Exception as e:
+        logger.error(f"Error computing skill gap heatmap: {e}")
+        return {"error": str(e)}
+
+
+def get_heatmap_status(db_path=DB_PATH) -> Optional[Dict]:
+    """Latest heatmap run (None if it has never been computed)"""
+    try:
+        ensure_schema("skill_gap_heatmap", db_path=db_path)
+        conn = sqlite3.connect(str(db_path))
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute("""
+                SELECT computed_at, students, rows_changed, duration_ms
+                FROM skill_gap_heatmap_runs ORDER BY run_id DESC LIMIT 1
+            """).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row else None
+    except Exception as e:
+        logger.error(f"Error getting heatmap status: {e}")
+        return None
+
+
+def refresh_heatmap_if_stale(db_path=DB_PATH):
+    """
+    Recompute the heatmap when onboarding profiles or the role catalog changed since the last run
+    Profiles count as changed when one was added, removed or updated (julianday comparison against
+    the last run's UTC read time, so timestamp format differences cannot hide it); the catalog by
+    its version. Cheap enough to call on every dashboard render: a few aggregate lookups
+    """
+    try:
+        status = get_heatmap_status(db_path)
+        if status is None:
+            return compute_skill_gap_heatmap(db_path)
+
+        conn = sqlite3.connect(str(db_path))
+        try:
+            current = _source_watermarks(conn)
+            stored = dict(conn.execute("SELECT source, watermark FROM skill_gap_heatmap_sources").fetchall())
+            read_at = stored.pop("read_at", None)
+            current.pop("read_at")
+            stale = current != stored or _profiles_changed_since(conn, read_at)
+        finally:
+            conn.close()
+
+        if stale:
+            return compute_skill_gap_heatmap(db_path)
+        return {"rows_updated": 0, "computed_at": status["computed_at"]}
+    except Exception as e:
+        logger.error(f"Error refreshing skill gap heatmap: {e}")
+        return {"error": str(e)}
+
+
+def get_heatmap_scopes(db_path=DB_PATH) -> Dict[str, list]:
+    """Scope values available in the heatmap, by scope type"""
+    try:
+        ensure_schema("skill_gap_heatmap", db_path=db_path)
+        conn = sqlite3.connect(str(db_path))
+        try:
+            scopes = {}
+            for scope_type, scope_value in conn.execute("""
+                SELECT DISTINCT scope_type, scope_value FROM skill_gap_heatmap ORDER BY scope_type, scope_value
+            """):
+                scopes.setdefault(scope_type, []).append(scope_value)
+        finally:
+            conn.close()
+        return scopes
+    except Exception as e:
+        logger.error(f"Error getting heatmap scopes: {e}")
+        return {}
+
+
+def get_skill_gap_heatmap(scope_type="all", scope_value="all", role_id=None, db_path=DB_PATH) -> pd.DataFrame:
+    """Heatmap rows for one scope (optionally one role), with the share of students missing each skill"""
+    try:
+        ensure_schema("skill_gap_heatmap", db_path=db_path)
+        conn = sqlite3.connect(str(db_path))
+        try:
+            role_filter = "AND role_id = ?" if role_id else ""
+            params = [scope_type, str(scope_value)] + ([role_id] if role_id else [])
+            df = pd.read_sql_query(f"""
+                SELECT role_id, skill, students, students_missing, gap_severity,
+                       ROUND(100.0 * students_missing / students, 1) as missing_pct, computed_at
+                FROM skill_gap_heatmap
+                WHERE scope_type = ? AND scope_value = ? {role_filter}
+                ORDER BY role_id, gap_severity DESC
+            """, conn, params=params)
+        finally:
+            conn.close()
+        return df
+    except Exception as e:
+        logger.error(f"Error getting skill gap heatmap: {e}")
+        return pd.DataFrame()
@@ -0,0 +1,440 @@
+"""
+Survey Lifecycle Module
+Event-sourced status tracking for employer and youth surveys.
+
+Every transition (created, sent, opened, completed, failed, reminded) is
+appended to `survey_lifecycle_events` by the code that causes it, inside that
+code's transaction. `survey_lifecycle_state` keeps each survey's current
+status and first milestone timestamps, indexed on (status, sent_date) and
+(campaign_id, status), so campaign funnels and latency percentiles read only
+the campaign's rows and reminder batches are an index range scan. The state
+table can always be replayed from the events (`rebuild_survey_lifecycle`).
+"""
+
+import json
+import sqlite3
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    from services.schema_registry import register_schema, ensure_schema
+except ImportError:
+    from mb.services.schema_registry import register_schema, ensure_schema
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = Path(__file__).parent.parent / "data" / "mb_compass.db"
+
+# Status ranks: the current status only moves forward (a late 'sent' after 'failed' still counts)
+STATUS_RANK = {"created": 0, "failed": 1, "sent": 2, "opened": 3, "completed": 4}
+# Event type -> state column holding its first occurrence ('reminded' is tracked separately)
+EVENT_MILESTONES = {
+    "created": "created_at",
+    "sent": "sent_date",
+    "opened": "opened_date",
+    "completed": "completed_date",
+}
+EVENT_TYPES = set(STATUS_RANK) | {"reminded"}
+PENDING_STATUSES = ("sent", "opened")
+LATENCY_PERCENTILES = (50, 90, 95)
+
+register_schema("survey_lifecycle", [
+    '''
+        CREATE TABLE IF NOT EXISTS survey_lifecycle_events (
+            event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            survey_type VARCHAR(20) NOT NULL,
+            survey_id INTEGER NOT NULL,
+            event_type VARCHAR(20) NOT NULL,
+            campaign_id VARCHAR(100),
+            recipient VARCHAR(255),
+            occurred_at TIMESTAMP NOT NULL,
+            detail TEXT
+        )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_lifecycle_events_survey ON survey_lifecycle_events(survey_type, survey_id, occurred_at)',
+    '''
+        CREATE TABLE IF NOT EXISTS survey_lifecycle_state (
+            survey_type VARCHAR(20) NOT NULL,
+            survey_id INTEGER NOT NULL,
+            campaign_id VARCHAR(100),
+            recipient VARCHAR(255),
+            status VARCHAR(20) NOT NULL,
+            created_at TIMESTAMP,
+            sent_date TIMESTAMP,
+            opened_date TIMESTAMP,
+            completed_date TIMESTAMP,
+            reminder_count INTEGER NOT NULL DEFAULT 0,
+            last_reminded_at TIMESTAMP,
+            updated_at TIMESTAMP,
+            PRIMARY KEY (survey_type, survey_id)
+        )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_lifecycle_state_status ON survey_lifecycle_state(status, sent_date)',
+    'CREATE INDEX IF NOT EXISTS idx_lifecycle_state_campaign ON survey_lifecycle_state(campaign_id, status)',
+])
+
+
+def _timestamp(value=None) -> str:
+    """'YYYY-MM-DD HH:MM:SS' for datetimes and ISO strings, so stored times compare as text"""
+    if value is None:
+        value = datetime.now()
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)[:19].replace("T", " ")
+
+
+def _rank_sql(column: str) -> str:
+    cases = " ".join(f"WHEN '{status}' THEN {rank}" for status, rank in STATUS_RANK.items())
+    return f"(CASE {column} {cases} ELSE -1 END)"
+
+
+def _earliest(column: str) -> str:
+    return f"COALESCE(MIN({column}, excluded.{column}), {column}, excluded.{column})"
+
+
+def record_survey_events(conn: sqlite3.Connection, events: Iterable[Dict]) -> int:
+    """
+    Append lifecycle events and fold them into survey_lifecycle_state, on the caller's connection
+    events: {"survey_type", "survey_id", "event_type", optional "campaign_id", "recipient",
+    "occurred_at", "detail"}. Call inside the transaction that made the change, after
+    ensure_schema("survey_lifecycle"). Returns the number of events recorded.
+    """
+    rows = []
+    for event in events:
+        if event["event_type"] not in EVENT_TYPES:
+            raise ValueError(f"Unknown survey event: {event['event_type']}")
+        if event.get("survey_id") is None:
+            continue
+        rows.append((
+            event["survey_type"], int(event["survey_id"]), event["event_type"], event.get("campaign_id"),
+            event.get("recipient"), _timestamp(event.get("occurred_at")), event.get("detail")
+        ))
+    if not rows:
+        return 0
+
+    conn.executemany('''
+        INSERT INTO survey_lifecycle_events (
+            survey_type, survey_id, event_type, campaign_id, recipient, occurred_at, detail
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+
+    now = _timestamp()
+    state_rows = []
+    for survey_type, survey_id, event_type, campaign_id, recipient, occurred_at, _ in rows:
+        milestones = {column: None for column in EVENT_MILESTONES.values()}
+        if event_type in EVENT_MILESTONES:
+            milestones[EVENT_MILESTONES[event_type]] = occurred_at
+        reminded = event_type == "reminded"
+        state_rows.append((
+            survey_type, survey_id, campaign_id, recipient,
+            event_type if event_type in STATUS_RANK else "created",
+            *milestones.values(), int(reminded), occurred_at if reminded else None, now
+        ))
+    conn.executemany(f'''
+        INSERT INTO survey_lifecycle_state (
+            survey_type, survey_id, campaign_id, recipient, status,
+            created_at, sent_date, opened_date, completed_date,
+            reminder_count, last_reminded_at, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(survey_type, survey_id) DO UPDATE SET
+            campaign_id = COALESCE(campaign_id, excluded.campaign_id),
+            recipient = COALESCE(recipient, excluded.recipient),
+            status = CASE WHEN {_rank_sql('excluded.status')} > {_rank_sql('status')}
+                THEN excluded.status ELSE status END,
+            created_at = {_earliest('created_at')},
+            sent_date = {_earliest('sent_date')},
+            opened_date = {_earliest('opened_date')},
+            completed_date = {_earliest('completed_date')},
+            reminder_count = reminder_count + excluded.reminder_count,
+            last_reminded_at = COALESCE(MAX(last_reminded_at, excluded.last_reminded_at),
+                                        last_reminded_at, excluded.last_reminded_at),
+            updated_at = excluded.updated_at
+    ''', state_rows)
+    return len(rows)
+
+
+def record_survey_event(survey_type: str, survey_id: int, event_type: str, db_path=DB_PATH, **fields) -> bool:
+    """Record a single event in its own transaction"""
+    try:
+        ensure_schema("survey_lifecycle", db_path=db_path)
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        try:
+            record_survey_events(conn, [{
+                "survey_type": survey_type, "survey_id": survey_id, "event_type": event_type, **fields
+            }])
+            conn.commit()
+        finally:
+            conn.close()
+        return True
+    except Exception as e:
+        logger.error(f"❌ Error recording survey event: {e}")
+        return False
+
+
+def get_survey_state(survey_type: str, survey_id: int, db_path=DB_PATH) -> Optional[Dict]:
+    """Current lifecycle state of one survey (None if no events were recorded)"""
+    ensure_schema("survey_lifecycle", db_path=db_path)
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute(
+            "SELECT * FROM survey_lifecycle_state WHERE survey_type = ? AND survey_id = ?",
+            (survey_type, survey_id)
+        ).fetchone()
+    finally:
+        conn.close()
+    return dict(row) if row else None
+
+
+# ========================
+# CAMPAIGN MONITORING
+# ========================
+
+def _percentiles(values: np.ndarray) -> Dict:
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return {f"p{q}": None for q in LATENCY_PERCENTILES}
+    return {f"p{q}": round(float(np.percentile(values, q)), 1) for q in LATENCY_PERCENTILES}
+
+
+def get_campaign_funnel(campaign_id: str, db_path=DB_PATH) -> Dict:
+    """
+    Funnel and latency for one campaign, read from the campaign's state rows only
+    Counts are cumulative (a completed survey was also sent and opened); latencies are hours from
+    sending to first open / completion, as p50 / p90 / p95.
+    """
+    try:
+        ensure_schema("survey_lifecycle", db_path=db_path)
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        try:
+            rows = conn.execute('''
+                SELECT status,
+                       sent_date IS NOT NULL,
+                       opened_date IS NOT NULL OR completed_date IS NOT NULL,
+                       completed_date IS NOT NULL,
+                       (julianday(opened_date) - julianday(sent_date)) * 24,
+                       (julianday(completed_date) - julianday(sent_date)) * 24,
+                       reminder_count
+                FROM survey_lifecycle_state
+                WHERE campaign_id = ?
+            ''', (campaign_id,)).fetchall()
+        finally:
+            conn.close()
+
+        if not rows:
+            return {"campaign_id": campaign_id, "surveys": 0}
+        data = np.array([[np.nan if value is None else value for value in row[1:]] for row in rows], dtype=float)
+        sent, opened, completed = (int(np.nansum(data[:, column])) for column in range(3))
+        return {
+            "campaign_id": campaign_id,
+            "surveys": len(rows),
+            "sent": sent,
+            "opened": opened,
+            "completed": completed,
+            "failed": sum(1 for row in rows if row[0] == "failed"),
+            "pending": sum(1 for row in rows if row[0] in PENDING_STATUSES),
+            "reminders_sent": int(np.nansum(data[:, 5])),
+            "open_rate": round(100.0 * opened / sent, 1) if sent else 0.0,
+            "completion_rate": round(100.0 * completed / sent, 1) if sent else 0.0,
+            "hours_to_open": _percentiles(data[:, 3]),
+            "hours_to_complete": _percentiles(data[:, 4])
+        }
+    except Exception as e:
+        logger.error(f"❌ Error getting campaign funnel: {e}")
+        return {"campaign_id": campaign_id, "surveys": 0, "error": str(e)}
+
+
+def get_reminder_candidates(
+    days: int = 7,
+    limit: int = 500,
+    max_reminders: int = 2,
+    campaign_id: Optional[str] = None,
+    db_path=DB_PATH
+) -> List[Dict]:
+    """
+    Surveys sent more than `days` ago and still not completed, oldest first
+    Skips surveys already reminded max_reminders times or within the last `days`.
+    Reads an index range on (status, sent_date), so a batch costs O(limit) rows.
+    """
+    try:
+        ensure_schema("survey_lifecycle", db_path=db_path)
+        cutoff = _timestamp(datetime.now() - timedelta(days=days))
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            # One index range per status keeps each read ordered by sent_date (no sort of all matches)
+            rows = []
+            for status in PENDING_STATUSES:
+                rows += conn.execute('''
+                    SELECT survey_type, survey_id, campaign_id, recipient, status, sent_date,
+                           reminder_count, last_reminded_at
+                    FROM survey_lifecycle_state
+                    WHERE status = ?
+                      AND sent_date < ?
+                      AND reminder_count < ?
+                      AND (last_reminded_at IS NULL OR last_reminded_at < ?)
+                      AND (? IS NULL OR campaign_id = ?)
+                    ORDER BY sent_date
+                    LIMIT ?
+                ''', (status, cutoff, max_reminders, cutoff, campaign_id, campaign_id, limit)).fetchall()
+        finally:
+            conn.close()
+        rows = sorted(rows, key=lambda row: row["sent_date"])[:limit]
+        return [dict(row) for row in rows]
+    except Exception as e:
+        logger.error(f"❌ Error getting reminder candidates: {e}")
+        return []
+
+
+def queue_survey_reminders(
+    days: int = 7,
+    limit: int = 500,
+    max_reminders: int = 2,
+    campaign_id: Optional[str] = None,
+    db_path=DB_PATH
+) -> Dict:
+    """
+    Queue reminder emails for a batch of reminder candidates through email_outbox
+    Each reminder reuses the survey's original outbox payload, flagged with its reminder number so
+    it is worded as a reminder, under the key "<type>_survey:<id>:reminder:<n>". deliver_outbox
+    records the 'reminded' event when it is sent (it is not a new distribution), and the key keeps
+    a reminder queued twice before delivery from going out twice. Surveys first sent outside the
+    outbox have no stored message and are skipped.
+    """
+    try:
+        from email_outbox import enqueue_email
+    except ImportError:
+        from mb.email_outbox import enqueue_email
+
+    candidates = get_reminder_candidates(days, limit, max_reminders, campaign_id, db_path)
+    if not candidates:
+        return {"queued": 0, "skipped": 0}
+
+    ensure_schema("email_outbox", "survey_lifecycle", db_path=db_path)
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    queued = 0
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        originals = {
+            key: (message_type, recipient, payload)
+            for key, message_type, recipient, payload in conn.execute('''
+                SELECT idempotency_key, message_type, recipient, payload FROM email_outbox
+                WHERE idempotency_key IN (SELECT value FROM json_each(?))
+            ''', (json.dumps([f"{row['survey_type']}_survey:{row['survey_id']}" for row in candidates]),))
+        }
+        for row in candidates:
+            original = originals.get(f"{row['survey_type']}_survey:{row['survey_id']}")
+            if original is None:
+                continue
+            message_type, recipient, payload = original
+            reminder = row["reminder_count"] + 1
+            if enqueue_email(
+                conn, message_type, recipient, {**json.loads(payload), "reminder": reminder},
+                idempotency_key=f"{row['survey_type']}_survey:{row['survey_id']}:reminder:{reminder}",
+                campaign_id=row["campaign_id"]
+            ):
+                queued += 1
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ Error queueing survey reminders: {e}")
+        return {"queued": 0, "skipped": len(candidates), "error": str(e)}
+    finally:
+        conn.close()
+
+    logger.info(f"🔔 {queued} survey reminders queued")
+    return {"queued": queued, "skipped": len(candidates) - queued}
+
+
+# ========================
+# BACKFILL / REBUILD
+# ========================
+
+def _table_exists(conn, table: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def _backfill_events(conn) -> int:
+    """Events for surveys that predate lifecycle tracking (surveys with no events yet)"""
+    no_events = '''NOT EXISTS (
+        SELECT 1 FROM survey_lifecycle_events e WHERE e.survey_type = {survey_type} AND e.survey_id = {survey_id}
+    )'''
+    campaign = ("(SELECT campaign_id FROM email_outbox WHERE idempotency_key = {survey_type} || '_survey:' || {survey_id})"
+                if _table_exists(conn, "email_outbox") else "NULL")
+    sources = []
+    for survey_type, table, recipient in (("employer", "employer_feedback_surveys", "employer_email"),
+                                          ("youth", "youth_feedback_surveys", "NULL")):
+        if not _table_exists(conn, table):
+            continue
+        keys = {"survey_type": f"'{survey_type}'", "survey_id": "s.survey_id"}
+        sources.append(f'''
+            SELECT '{survey_type}', s.survey_id, 'created', {campaign.format(**keys)}, {recipient},
+                   COALESCE(s.created_at, s.survey_date) FROM {table} s WHERE {no_events.format(**keys)}
+            UNION ALL
+            SELECT '{survey_type}', s.survey_id, 'completed', NULL, NULL,
+                   COALESCE(s.completed_date, s.survey_date) FROM {table} s
+            WHERE s.completion_status = 'completed' AND {no_events.format(**keys)}
+        ''')
+    if _table_exists(conn, "survey_distribution_logs"):
+        keys = {"survey_type": "l.survey_type", "survey_id": "l.survey_id"}
+        sources.append(f'''
+            SELECT l.survey_type, l.survey_id, 'sent', NULL, l.recipient_email, l.sent_date
+            FROM survey_distribution_logs l
+            WHERE l.survey_id IS NOT NULL AND l.sent_date IS NOT NULL AND {no_events.format(**keys)}
+            UNION ALL
+            SELECT l.survey_type, l.survey_id, 'opened', NULL, l.recipient_email, COALESCE(l.opened_date, l.sent_date)
+            FROM survey_distribution_logs l
+            WHERE l.survey_id IS NOT NULL AND l.opened AND {no_events.format(**keys)}
+        ''')
+    if not sources:
+        return 0
+
+    # Select everything before inserting, so the NOT EXISTS checks see the pre-backfill events
+    rows = conn.execute(" UNION ALL ".join(sources)).fetchall()
+    conn.executemany('''
+        INSERT INTO survey_lifecycle_events (
+            survey_type, survey_id, event_type, campaign_id, recipient, occurred_at, detail
+        ) VALUES (?, ?, ?, ?, ?, ?, 'backfill')
+    ''', [row[:5] + (_timestamp(row[5]),) for row in rows if row[5] is not None])
+    return len(rows)
+
+
+def rebuild_survey_lifecycle(db_path=DB_PATH) -> Dict:
+    """
+    Reconcile: backfill events for untracked surveys, then replay survey_lifecycle_state from
+    all events
+    """
+    ensure_schema("survey_lifecycle", db_path=db_path)
+    first = {event_type: f"MIN(CASE WHEN event_type = '{event_type}' THEN occurred_at END)"
+             for event_type in EVENT_MILESTONES}
+    rank_cases = " ".join(f"WHEN {rank} THEN '{status}'" for status, rank in STATUS_RANK.items())
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        backfilled = _backfill_events(conn)
+        conn.execute("DELETE FROM survey_lifecycle_state")
+        conn.execute(f'''
+            INSERT INTO survey_lifecycle_state (
+                survey_type, survey_id, campaign_id, recipient, status,
+                created_at, sent_date, opened_date, completed_date,
+                reminder_count, last_reminded_at, updated_at
+            )
+            SELECT survey_type, survey_id, MAX(campaign_id), MAX(recipient),
+                   CASE MAX({_rank_sql('event_type')}) {rank_cases} ELSE 'created' END,
+                   {first['created']}, {first['sent']}, {first['opened']}, {first['completed']},
+                   SUM(event_type = 'reminded'),
+                   MAX(CASE WHEN event_type = 'reminded' THEN occurred_at END),
+                   ?
+            FROM survey_lifecycle_events
+            GROUP BY survey_type, survey_id
+        ''', (_timestamp(),))
+        surveys = conn.execute("SELECT COUNT(*) FROM survey_lifecycle_state").fetchone()[0]
+        conn.commit()
+    finally:
+        conn.close()
+    logger.info(f"Survey lifecycle rebuilt: {surveys} surveys, {backfilled} events backfilled")
+    return {"surveys": surveys, "events_backfilled": backfilled}
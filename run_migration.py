@@ -5,6 +5,17 @@ import sqlite3
 from pathlib import Path
 import sys
 
+def migrate_screening_indexes(conn):
+    """Create and backfill the role index table and the KPI rollup"""
+    sys.path.insert(0, str(Path(__file__).parent))
+    from mb import backfill_role_recommendations, rebuild_screening_kpi_rollup
+    
+    backfilled = backfill_role_recommendations(conn)
+    print(f"  ✓ screening_role_recommendations ready ({backfilled} role rows backfilled)")
+    
+    rollup = rebuild_screening_kpi_rollup(conn)
+    print(f"  ✓ screening_kpi_rollup rebuilt ({rollup['total_screenings']} screenings)")
+
 def run_migration():
     db_path = Path('data/mb_compass.db')
     print(f"Connecting to database: {db_path}")
@@ -65,6 +76,8 @@ def run_migration():
             """)
             print("  ✓ Created idx_screening_personality_fit")
             
+            migrate_screening_indexes(conn)
+            
             conn.commit()
             print("\n✅ Database migration complete!")
             return True
@@ -76,6 +89,8 @@ def run_migration():
             indices = cursor.fetchall()
             print(f"✓ {len(indices)} indices found")
             
+            migrate_screening_indexes(conn)
+            
             return True
     
     except Exception as e:
@@ -191,3 +191,13 @@ CREATE INDEX IF NOT EXISTS idx_screening_student ON mb_multimodal_screenings(stu
 CREATE INDEX IF NOT EXISTS idx_screening_submitted ON mb_multimodal_screenings(submitted_at);
 CREATE INDEX IF NOT EXISTS idx_screening_status ON mb_multimodal_screenings(screening_status);
 CREATE INDEX IF NOT EXISTS idx_screening_personality_fit ON mb_multimodal_screenings(personality_fit_level);
+
+-- Normalized role recommendations per screening (one row per recommended role)
+CREATE TABLE IF NOT EXISTS screening_role_recommendations (
+    screening_id INTEGER NOT NULL,
+    role VARCHAR(100) NOT NULL,
+    PRIMARY KEY (screening_id, role),
+    FOREIGN KEY (screening_id) REFERENCES mb_multimodal_screenings(screening_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_screening_roles_role ON screening_role_recommendations(role, screening_id);
@@ -0,0 +1,110 @@
+"""
+Rebuild (reconcile) incrementally maintained rollup tables from their source tables.
+
+Usage:
+    python scripts/rebuild_rollups.py              # rebuild everything
+    python scripts/rebuild_rollups.py screening_kpis
+"""
+
+import sys
+import sqlite3
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+# mb-level modules are imported by their top-level names (as the pages and services do),
+# so every rebuild shares one copy of each module and its schema/listing registries
+sys.path.insert(0, str(PROJECT_ROOT / "mb"))
+
+DB_PATH = PROJECT_ROOT / "data" / "mb_compass.db"
+
+
+def rebuild_screening_kpis(conn):
+    """Screening KPI rollup (screening_kpi_rollup)"""
+    from mb import rebuild_screening_kpi_rollup
+    return rebuild_screening_kpi_rollup(conn)
+
+
+def rebuild_learning_streaks(conn):
+    """Learning streaks (learning_streaks) from learning_activity_events"""
+    from services.gamification import init_gamification_tables, backfill_activity_events, recompute_streaks
+    init_gamification_tables()
+    backfilled = backfill_activity_events(conn)
+    return {"events_backfilled": backfilled, **recompute_streaks()}
+
+
+def rebuild_leaderboards(conn):
+    """Leaderboards (leaderboard_entries)"""
+    from services.leaderboard import init_leaderboard_service
+    return init_leaderboard_service().rebuild()
+
+
+def rebuild_skill_progress(conn):
+    """Skill progress (student_skill_progress) from skill_learning_tracking"""
+    from services.skill_gap_bridger import rebuild_skill_progress as rebuild
+    return rebuild()
+
+
+def rebuild_feedback_analytics(conn):
+    """Feedback analytics (feedback_analytics_cache) from the feedback survey tables"""
+    from feedback_db import rebuild_feedback_rollup
+    return rebuild_feedback_rollup(DB_PATH)
+
+
+def rebuild_feedback_listings(conn):
+    """Feedback listing counters (feedback_listing_counts) for feedback responses and distribution logs"""
+    from feedback_survey import init_feedback_tables
+    from feedback_db import ensure_schema, rebuild_listing_counts
+    init_feedback_tables()
+    ensure_schema("placement_feedback", "feedback_listings", db_path=DB_PATH)
+    return rebuild_listing_counts(DB_PATH)
+
+
+def rebuild_survey_lifecycle(conn):
+    """Survey lifecycle state (survey_lifecycle_state) replayed from survey_lifecycle_events"""
+    from feedback_survey import init_feedback_tables
+    from survey_lifecycle import rebuild_survey_lifecycle as rebuild
+    init_feedback_tables()
+    return rebuild(DB_PATH)
+
+
+def rebuild_feedback_themes(conn):
+    """Feedback theme term counts (feedback_term_counts) from employer survey free text"""
+    from services.feedback_themes import rebuild_feedback_themes as rebuild
+    return rebuild(DB_PATH)
+
+
+ROLLUPS = {
+    "screening_kpis": rebuild_screening_kpis,
+    "learning_streaks": rebuild_learning_streaks,
+    "leaderboards": rebuild_leaderboards,
+    "skill_progress": rebuild_skill_progress,
+    "feedback_analytics": rebuild_feedback_analytics,
+    "feedback_listings": rebuild_feedback_listings,
+    "survey_lifecycle": rebuild_survey_lifecycle,
+    "feedback_themes": rebuild_feedback_themes,
+}
+
+
+def main(names):
+    unknown = [name for name in names if name not in ROLLUPS]
+    if unknown:
+        print(f"✗ Unknown rollup(s): {', '.join(unknown)}. Available: {', '.join(ROLLUPS)}")
+        return False
+
+    conn = sqlite3.connect(str(DB_PATH))
+    try:
+        for name in names or ROLLUPS:
+            print(f"Rebuilding {name}...")
+            result = ROLLUPS[name](conn)
+            print(f"  ✓ {name}: {result}")
+        return True
+    except Exception as e:
+        print(f"✗ Rebuild failed: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(sys.argv[1:]) else 1)
@@ -0,0 +1,44 @@
+"""
+Train the churn model and make it the active version.
+
+Usage:
+    python scripts/train_churn_model.py                # 14-day churn horizon
+    python scripts/train_churn_model.py 30             # custom horizon in days
+    python scripts/train_churn_model.py 14 xgboost     # use xgboost when installed
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "mb"))
+
+from services.churn_model import CHURN_HORIZON_DAYS, train_churn_model
+from services.gamification import init_gamification_tables, score_all_churn_risk
+
+
+def main(args):
+    horizon_days = int(args[0]) if args else CHURN_HORIZON_DAYS
+    use_xgboost = len(args) > 1 and args[1] == "xgboost"
+
+    # Activity events feed the features and labels
+    init_gamification_tables()
+
+    print(f"Training churn model ({horizon_days}-day horizon)...")
+    result = train_churn_model(horizon_days=horizon_days, use_xgboost=use_xgboost)
+    if "error" in result:
+        print(f"✗ Training failed: {result['error']}")
+        return False
+
+    print(f"  ✓ Version {result['version']} ({result['model_type']}, {result['calibration']} calibration)")
+    print(f"  ✓ {result['n_samples']} samples, {result['positive_rate']:.0%} churned")
+    print(f"  ✓ Held-out ROC AUC {result['roc_auc']:.3f}, Brier score {result['brier_score']:.3f}")
+    print(f"  ✓ Artifact: {result['artifact_path']}")
+
+    print("Rescoring churn_risk_scores with the new model...")
+    print(f"  ✓ {score_all_churn_risk()}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(sys.argv[1:]) else 1)
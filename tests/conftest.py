@@ -0,0 +1,8 @@
+"""Shared test setup: mb-level modules are imported by their top-level names, as the pages do"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "mb"))
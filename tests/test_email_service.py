@@ -0,0 +1,115 @@
+"""SMTP session pool against a local aiosmtpd server"""
+
+import socket
+from email.mime.text import MIMEText
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller
+
+import email_service
+
+SENDER = "Magic Bus <surveys@magicbus.test>"
+
+
+class RecordingHandler:
+    """Accepts mail for everyone except the refused/deferred test addresses"""
+
+    def __init__(self):
+        self.envelopes = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("refused@"):
+            return "550 no such user"
+        if address.startswith("deferred@"):
+            return "451 try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.envelopes.append(envelope)
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    try:
+        yield controller, handler
+    finally:
+        controller.stop()
+
+
+def _pool(controller, **kwargs):
+    options = dict(host=controller.hostname, port=controller.port, username="", password="",
+                   size=2, rate_limit_per_minute=0, starttls=False, sender=SENDER)
+    options.update(kwargs)
+    return email_service.SMTPSessionPool(**options)
+
+
+def _message(recipient, sender=None):
+    msg = MIMEText("Please take our survey", "plain")
+    msg["Subject"] = "Survey"
+    msg["To"] = recipient
+    if sender is not None:
+        msg["From"] = sender
+    return msg
+
+
+def test_send_uses_the_pool_sender(smtp_server):
+    controller, handler = smtp_server
+    pool = _pool(controller)
+    try:
+        for recipient in ("a@example.com", "b@example.com", "c@example.com"):
+            assert pool.send(_message(recipient, sender=""))[0]
+    finally:
+        pool.close()
+
+    assert [env.rcpt_tos for env in handler.envelopes] == [["a@example.com"], ["b@example.com"], ["c@example.com"]]
+    assert {env.mail_from for env in handler.envelopes} == {"surveys@magicbus.test"}
+    assert all(f"From: {SENDER}" in env.content.decode() for env in handler.envelopes)
+    assert pool.connects <= pool.size
+
+
+@pytest.mark.parametrize("sender", ["", "not-an-address"])
+def test_pool_rejects_missing_sender(smtp_server, sender):
+    controller, _ = smtp_server
+    with pytest.raises(ValueError):
+        _pool(controller, sender=sender)
+
+
+def test_permanent_refusal_is_not_retried(smtp_server, monkeypatch):
+    controller, handler = smtp_server
+    monkeypatch.setattr(email_service, "SMTP_SEND_ATTEMPTS", 3)
+    pool = _pool(controller)
+    try:
+        success, detail, attempts, retryable = pool.send(_message("refused@example.com"))
+        assert not success and not retryable
+        assert attempts == 1
+        assert "refused@example.com" in detail
+        # The session is still usable after the refusal
+        assert pool.send(_message("ok@example.com"))[0]
+    finally:
+        pool.close()
+    assert [env.rcpt_tos for env in handler.envelopes] == [["ok@example.com"]]
+
+
+def test_temporary_refusal_is_retryable(smtp_server, monkeypatch):
+    controller, _ = smtp_server
+    monkeypatch.setattr(email_service, "SMTP_SEND_ATTEMPTS", 1)
+    pool = _pool(controller)
+    try:
+        success, _, attempts, retryable = pool.send(_message("deferred@example.com"))
+    finally:
+        pool.close()
+    assert not success and retryable
+    assert attempts == 1
@@ -0,0 +1,49 @@
+"""Feedback listings served to the admin dashboard"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+import feedback_db
+import feedback_survey
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def shipped_db_copy(tmp_path, monkeypatch):
+    """Point the feedback modules at a copy of the shipped database so the repo copy is not modified"""
+    db_path = tmp_path / "mb_compass.db"
+    shutil.copy(feedback_db.DB_PATH, db_path)
+    monkeypatch.setattr(feedback_db, "DB_PATH", db_path)
+    monkeypatch.setattr(feedback_survey, "DB_PATH", db_path)
+    return db_path
+
+
+def test_default_db_path_is_the_project_database():
+    assert feedback_db.DB_PATH == PROJECT_ROOT / "data" / "mb_compass.db"
+    assert feedback_db.DB_PATH.exists()
+
+
+def test_list_feedback_surveys_uses_the_default_db(shipped_db_copy):
+    assert feedback_db.submit_employer_interview_feedback({
+        "employer_email": "hr@acme.test", "company_name": "Acme", "student_id": "S1",
+        "student_name": "Test Student", "overall_impression_rating": 4,
+    })
+
+    page = feedback_db.list_feedback_surveys("interview")
+
+    assert page["total"] == 1
+    assert [row["company_name"] for row in page["rows"]] == ["Acme"]
+    assert feedback_db.get_feedback_company_counts("interview") == {"Acme": 1}
+
+
+def test_distribution_listing_is_registered_with_the_feedback_listings(shipped_db_copy):
+    assert "distribution" in feedback_db.FEEDBACK_LISTINGS
+
+    feedback_survey.init_feedback_tables()
+    feedback_db.init_feedback_tables()
+    rebuilt = feedback_db.rebuild_listing_counts(shipped_db_copy)
+
+    assert "distribution" in rebuilt["rows_counted"]